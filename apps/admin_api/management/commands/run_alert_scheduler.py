@@ -0,0 +1,37 @@
+"""
+Commande de lancement du planificateur des règles d'alerte système
+"""
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from apps.admin_api.services.alert_scheduler import get_alert_scheduler
+
+
+class Command(BaseCommand):
+    help = "Évalue les règles d'alerte actives selon leur intervalle de vérification"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Évaluer les règles dues une seule fois puis s'arrêter")
+
+    def handle(self, *args, **options):
+        scheduler = get_alert_scheduler()
+
+        if options['once']:
+            triggered = scheduler.tick()
+            self.stdout.write(self.style.SUCCESS(f"{len(triggered)} alerte(s) déclenchée(s)"))
+            return
+
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write("Arrêt du planificateur demandé...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        self.stdout.write(self.style.SUCCESS("Planificateur des alertes démarré"))
+        scheduler.run_forever(stop_event=stop_event)
+        self.stdout.write(self.style.SUCCESS("Planificateur des alertes arrêté"))
@@ -3,14 +3,22 @@ Services pour l'Admin API
 """
 from .report_service import ReportService
 from .alert_service import AlertService
+from .alert_scheduler import AlertScheduler, get_alert_scheduler
 from .monitoring_service import MonitoringService
 from .notification_service import NotificationService
+from .webhook_delivery import WebhookDeliveryService, get_webhook_delivery_service
+from .user_import_job import start_user_import
 
 __all__ = [
     'ReportService',
     'AlertService',
+    'AlertScheduler',
+    'get_alert_scheduler',
     'MonitoringService',
     'NotificationService',
+    'WebhookDeliveryService',
+    'get_webhook_delivery_service',
+    'start_user_import',
 ]
 
 
@@ -0,0 +1,209 @@
+"""
+Planificateur des règles d'alerte système
+
+Les règles actives sont placées dans une file de priorité ordonnée par date de
+prochaine vérification : chaque règle est évaluée selon son propre
+`check_interval` au lieu d'un balayage complet. À chaque tick, les règles dues
+sont regroupées par source de données (`alert_type`) et chaque source n'est
+calculée qu'une seule fois. L'état de cooldown et le compteur horaire de toutes
+les règles sont chargés par une seule requête agrégée, puis maintenus en mémoire
+entre deux rechargements.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from apps.admin_api.models import AlertRule, SystemAlert
+
+logger = logging.getLogger(__name__)
+
+# Statuts d'alerte qui maintiennent une règle en cooldown
+COOLDOWN_STATUSES = ('triggered', 'acknowledged')
+
+
+class RuleState:
+    """État de déclenchement d'une règle, maintenu en mémoire"""
+
+    __slots__ = ('last_active_at', 'hourly_count')
+
+    def __init__(self, last_active_at=None, hourly_count=0):
+        self.last_active_at = last_active_at
+        self.hourly_count = hourly_count
+
+    def is_in_cooldown(self, rule, now):
+        """Vérifie si la règle est en période de cooldown"""
+        if self.last_active_at is None:
+            return False
+        return now < self.last_active_at + timedelta(seconds=rule.cooldown_period)
+
+    def has_reached_hourly_limit(self, rule):
+        """Vérifie si la règle a atteint la limite d'alertes par heure"""
+        return self.hourly_count >= rule.max_alerts_per_hour
+
+    def record_trigger(self, now):
+        """Enregistre un déclenchement"""
+        self.last_active_at = now
+        self.hourly_count += 1
+
+
+class AlertScheduler:
+    """Planifie et évalue les règles d'alerte par lots"""
+
+    def __init__(self, alert_service, reload_interval=None):
+        self.alert_service = alert_service
+        self.reload_interval = (
+            reload_interval if reload_interval is not None
+            else getattr(settings, 'ADMIN_ALERT_SCHEDULER_RELOAD_INTERVAL', 60)
+        )
+        self.rules = {}
+        self.states = {}
+        self._queue = []
+        self._counter = itertools.count()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def load_rules(self, now=None):
+        """
+        Recharge les règles actives et resynchronise leur état.
+
+        Les règles déjà planifiées conservent leur prochaine échéance ; les
+        nouvelles sont dues immédiatement.
+        """
+        now_ts = now if now is not None else time.time()
+        rules = {rule.id: rule for rule in AlertRule.objects.filter(status='active')}
+        scheduled = {rule_id for _, _, rule_id in self._queue}
+
+        self.rules = rules
+        self.states = self.load_states(list(rules))
+        self._queue = [entry for entry in self._queue if entry[2] in rules]
+        heapq.heapify(self._queue)
+        for rule_id in rules:
+            if rule_id not in scheduled:
+                self._schedule(rule_id, now_ts)
+        self._loaded_at = now_ts
+
+    def load_states(self, rule_ids):
+        """Charge l'état de cooldown et le compteur horaire en une requête"""
+        states = {rule_id: RuleState() for rule_id in rule_ids}
+        if not rule_ids:
+            return states
+
+        one_hour_ago = timezone.now() - timedelta(hours=1)
+        rows = (
+            SystemAlert.objects
+            .filter(alert_rule_id__in=rule_ids)
+            .values('alert_rule_id')
+            .annotate(
+                last_active_at=Max('triggered_at', filter=Q(status__in=COOLDOWN_STATUSES)),
+                hourly_count=Count('id', filter=Q(triggered_at__gte=one_hour_ago)),
+            )
+        )
+        for row in rows:
+            states[row['alert_rule_id']] = RuleState(row['last_active_at'], row['hourly_count'])
+        return states
+
+    def _schedule(self, rule_id, run_at):
+        heapq.heappush(self._queue, (run_at, next(self._counter), rule_id))
+
+    def next_run_in(self, now=None):
+        """Nombre de secondes avant la prochaine règle due"""
+        if not self._queue:
+            return self.reload_interval
+        now_ts = now if now is not None else time.time()
+        return max(0, self._queue[0][0] - now_ts)
+
+    def tick(self, now=None, force=False):
+        """
+        Évalue les règles dues et retourne les alertes déclenchées
+
+        Avec `force`, les règles sont rechargées et toutes les règles actives
+        sont évaluées (vérification manuelle), puis replanifiées.
+        """
+        now_ts = now if now is not None else time.time()
+
+        with self._lock:
+            if force or self._loaded_at is None or now_ts - self._loaded_at >= self.reload_interval:
+                self.load_rules(now_ts)
+
+            due = []
+            if force:
+                self._queue = []
+                for rule_id, rule in self.rules.items():
+                    due.append(rule)
+                    self._schedule(rule_id, now_ts + max(1, rule.check_interval))
+            while self._queue and self._queue[0][0] <= now_ts:
+                _, _, rule_id = heapq.heappop(self._queue)
+                rule = self.rules.get(rule_id)
+                if rule is None:
+                    continue
+                due.append(rule)
+                self._schedule(rule_id, now_ts + max(1, rule.check_interval))
+
+        return self.evaluate(due)
+
+    def evaluate(self, rules):
+        """
+        Évalue un lot de règles.
+
+        Chaque source de données n'est calculée qu'une fois pour tout le lot ;
+        les règles en cooldown ou ayant atteint leur limite horaire ne
+        déclenchent pas le calcul de leur source.
+        """
+        now = timezone.now()
+        values = {}
+        triggered = []
+
+        for rule in rules:
+            state = self.states.setdefault(rule.id, RuleState())
+            if state.is_in_cooldown(rule, now) or state.has_reached_hourly_limit(rule):
+                continue
+
+            source = rule.alert_type
+            if source not in values:
+                try:
+                    values[source] = self.alert_service.get_source_value(source)
+                except Exception as e:
+                    logger.error(f"Erreur lors du calcul de la source {source}: {e}")
+                    values[source] = None
+
+            current_value = values[source]
+            if current_value is None:
+                continue
+
+            try:
+                if rule.should_trigger_alert(current_value):
+                    triggered.append(self.alert_service._trigger_alert(rule, current_value))
+                    state.record_trigger(now)
+            except Exception as e:
+                logger.error(f"Erreur lors de la vérification de la règle {rule.name}: {e}")
+
+        return triggered
+
+    def run_forever(self, stop_event=None):
+        """Boucle de planification (à lancer dans un processus dédié)"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.tick()
+            stop_event.wait(min(self.next_run_in(), self.reload_interval))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_alert_scheduler():
+    """Retourne le planificateur partagé du processus"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                from .alert_service import AlertService
+                _scheduler = AlertScheduler(AlertService())
+    return _scheduler
@@ -4,6 +4,7 @@ Service pour la gestion des alertes système
 import psutil
 import time
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
 from apps.admin_api.models import AlertRule, SystemAlert, AlertNotification
 from .monitoring_service import MonitoringService
@@ -15,15 +16,19 @@ class AlertService:
     def __init__(self):
         self.monitoring = MonitoringService()
     
-    def check_all_alerts(self):
-        """Vérifie toutes les règles d'alerte actives"""
-        active_rules = AlertRule.objects.filter(status='active')
-        
-        for rule in active_rules:
-            try:
-                self.check_alert_rule(rule)
-            except Exception as e:
-                print(f"Erreur lors de la vérification de la règle {rule.name}: {e}")
+    def check_all_alerts(self, force=False):
+        """
+        Vérifie les règles d'alerte actives dont l'échéance est atteinte.
+
+        Passe par le planificateur du processus : une règle n'est pas
+        réévaluée avant la fin de son `check_interval` (sauf `force`, qui
+        évalue toutes les règles actives), chaque source de données est
+        calculée une fois par lot et l'état de cooldown est chargé en une
+        requête.
+        """
+        from .alert_scheduler import get_alert_scheduler
+
+        return get_alert_scheduler().tick(force=force)
     
     def check_alert_rule(self, rule):
         """Vérifie une règle d'alerte spécifique"""
@@ -71,8 +76,10 @@ class AlertService:
     
     def _get_current_value(self, rule):
         """Récupère la valeur actuelle selon le type d'alerte"""
-        alert_type = rule.alert_type
-        
+        return self.get_source_value(rule.alert_type)
+    
+    def get_source_value(self, alert_type):
+        """Calcule la valeur d'une source de données (type d'alerte)"""
         if alert_type == 'cpu':
             return psutil.cpu_percent(interval=1)
         elif alert_type == 'memory':
@@ -137,7 +144,12 @@ class AlertService:
         )
     
     def _send_notifications(self, alert, rule):
-        """Envoie les notifications pour une alerte"""
+        """
+        Envoie les notifications pour une alerte
+
+        Les canaux HTTP (webhook, Slack, Teams, Discord) partent en
+        arrière-plan : un endpoint lent ne retarde pas l'évaluation des règles.
+        """
         from .notification_service import NotificationService
         notification_service = NotificationService()
         
@@ -151,6 +163,15 @@ class AlertService:
                     message=alert.message
                 )
                 
+                if notification.channel_type in NotificationService.HTTP_CHANNELS:
+                    # Le statut est enregistré par le thread d'envoi
+                    transaction.on_commit(
+                        lambda notification=notification: notification_service.send_alert_notification(
+                            notification, wait=False
+                        )
+                    )
+                    continue
+                
                 # Envoie la notification
                 success = notification_service.send_alert_notification(notification)
                 
@@ -0,0 +1,106 @@
+"""
+Import d'utilisateurs en arrière-plan pour l'API d'administration
+
+Le fichier reçu est recopié par morceaux dans un fichier temporaire, puis
+importé par `BulkUserImporter` dans un pool de threads borné, après la
+validation de la transaction de la requête. L'import est suivi par une
+`AdminAction` (`data_import`) : statut, résultat (`created`, `skipped`,
+`failed`, `errors`) et message d'erreur.
+"""
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from apps.authentication.services import BulkUserImporter
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_import_executor() -> ThreadPoolExecutor:
+    """Retourne le pool de threads des imports d'utilisateurs"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, getattr(settings, 'USER_IMPORT_JOB_WORKERS', 1)),
+                    thread_name_prefix='user-import'
+                )
+    return _executor
+
+
+def start_user_import(upload, file_format: str, admin_user, ip_address: str = None):
+    """
+    Crée l'action de suivi d'un import et l'exécute en arrière-plan
+
+    Returns:
+        AdminAction: Action au statut `pending`
+    """
+    from ..models import AdminAction
+
+    suffix = os.path.splitext(upload.name or '')[1]
+    fd, path = tempfile.mkstemp(prefix='user-import-', suffix=suffix)
+    with os.fdopen(fd, 'wb') as destination:
+        for chunk in upload.chunks():
+            destination.write(chunk)
+
+    action = AdminAction.objects.create(
+        action_type='data_import',
+        admin_user=admin_user,
+        title=f"Import d'utilisateurs: {upload.name}",
+        details={'filename': upload.name, 'format': file_format},
+        result={'created': 0, 'skipped': 0, 'failed': 0, 'errors': []},
+        ip_address=ip_address,
+    )
+    transaction.on_commit(
+        lambda: get_import_executor().submit(_run_in_background, action.pk, path, file_format)
+    )
+    return action
+
+
+def _run_in_background(action_id, path: str, file_format: str):
+    """Exécute un import dans un thread du pool (connexion DB propre au thread)"""
+    from ..models import AdminAction
+
+    close_old_connections()
+    try:
+        run_user_import(AdminAction.objects.get(pk=action_id), path, file_format)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'import d'utilisateurs {action_id}: {str(e)}")
+    finally:
+        connection.close()
+
+
+def run_user_import(action, path: str, file_format: str) -> dict:
+    """Importe le fichier d'une action puis le supprime"""
+    from ..models import AdminLog
+
+    action.start()
+    try:
+        with open(path, 'rb') as stream:
+            result = BulkUserImporter().run(stream, file_format)
+    except Exception as e:
+        action.complete(error_message=str(e))
+        raise
+    finally:
+        os.remove(path)
+    action.complete(result=result)
+
+    # Log de l'action
+    AdminLog.objects.create(
+        admin_user=action.admin_user,
+        action='user_import',
+        target_model='User',
+        message=f"Import d'utilisateurs: {result['created']} créé(s) depuis {action.details.get('filename')}",
+        level='warning' if result['failed'] else 'info',
+        details={key: result[key] for key in ('created', 'skipped', 'failed')},
+    )
+    return result
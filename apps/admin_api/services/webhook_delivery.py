@@ -0,0 +1,278 @@
+"""
+Livraison HTTP sortante des notifications d'alerte (webhook, Slack, Teams, Discord)
+
+Les requêtes passent par une session HTTP partagée (connexions keep-alive
+mutualisées) et sont exécutées dans un pool de threads borné : l'évaluation
+des alertes soumet les envois sans attendre les endpoints lents. Chaque
+destination (hôte) a sa propre limite de concurrence et de débit ; un
+disjoncteur par URL suspend les appels vers un endpoint en échec répété, et
+les erreurs transitoires (connexion, 429, 5xx) sont retentées avec un backoff
+exponentiel.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from core.utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Codes HTTP transitoires : la requête est retentée
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'un endpoint
+
+    Après `failure_threshold` échecs consécutifs, le circuit s'ouvre et les
+    appels échouent immédiatement pendant `reset_timeout` secondes ; un seul
+    appel d'essai est ensuite autorisé (semi-ouvert) et referme le circuit
+    s'il réussit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Indique si un appel peut être tenté"""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                # Réouverture (essai échoué) ou seuil atteint
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class _Destination:
+    """Limites d'une destination (hôte) : concurrence et débit"""
+
+    def __init__(self, concurrency: int, rate: float):
+        self.semaphore = threading.BoundedSemaphore(max(1, concurrency))
+        self.rate_limiter = RateLimiter(rate)
+
+
+_session = None
+_session_lock = threading.Lock()
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_webhook_session() -> requests.Session:
+    """
+    Retourne la session HTTP partagée des webhooks d'alerte
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = max(1, getattr(settings, 'ADMIN_WEBHOOK_MAX_WORKERS', 8))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+class WebhookDeliveryService:
+    """
+    Envoi des requêtes HTTP sortantes des alertes
+    """
+
+    def __init__(self, max_workers: int = None, session: Optional[requests.Session] = None):
+        self.max_workers = (
+            max_workers if max_workers is not None
+            else getattr(settings, 'ADMIN_WEBHOOK_MAX_WORKERS', 8)
+        )
+        self.timeout = getattr(settings, 'ADMIN_WEBHOOK_TIMEOUT', 10)
+        self.max_retries = getattr(settings, 'ADMIN_WEBHOOK_MAX_RETRIES', 3)
+        self.backoff_base = getattr(settings, 'ADMIN_WEBHOOK_BACKOFF_BASE', 0.5)
+        self.backoff_max = getattr(settings, 'ADMIN_WEBHOOK_BACKOFF_MAX', 30)
+        self.host_concurrency = getattr(settings, 'ADMIN_WEBHOOK_HOST_CONCURRENCY', 4)
+        self.host_rate = getattr(settings, 'ADMIN_WEBHOOK_HOST_RATE', 5)
+        self.failure_threshold = getattr(settings, 'ADMIN_WEBHOOK_CIRCUIT_FAILURE_THRESHOLD', 5)
+        self.reset_timeout = getattr(settings, 'ADMIN_WEBHOOK_CIRCUIT_RESET_TIMEOUT', 60)
+        self.session = session or get_webhook_session()
+
+        self._executor = None
+        self._destinations = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    # Destinations
+
+    def _destination(self, url: str) -> _Destination:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            destination = self._destinations.get(host)
+            if destination is None:
+                destination = self._destinations[host] = _Destination(self.host_concurrency, self.host_rate)
+        return destination
+
+    def get_breaker(self, url: str) -> CircuitBreaker:
+        """Disjoncteur d'une URL"""
+        with self._lock:
+            breaker = self._breakers.get(url)
+            if breaker is None:
+                breaker = self._breakers[url] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Délai avant la tentative suivante (Retry-After prioritaire)"""
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    # Envoi
+
+    def post(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Envoie `payload` en JSON à `url` (bloquant, avec retries)
+
+        Returns:
+            Dict avec le résultat de l'envoi (`success`, `status_code`,
+            `error`, `attempts`)
+        """
+        breaker = self.get_breaker(url)
+        destination = self._destination(url)
+        result = {'success': False, 'status_code': None, 'error': '', 'attempts': 0}
+
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                if not result['attempts']:
+                    result['error'] = f'Circuit ouvert pour {url}'
+                    return result
+                # Le circuit s'est ouvert pendant les retries
+                break
+
+            destination.rate_limiter.acquire()
+            retry_after = None
+            result['attempts'] += 1
+            try:
+                with destination.semaphore:
+                    response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                result['status_code'], result['error'] = None, str(e)
+                retryable = True
+            else:
+                result['status_code'] = response.status_code
+                if 200 <= response.status_code < 300:
+                    breaker.record_success()
+                    result['success'], result['error'] = True, ''
+                    return result
+                result['error'] = f'HTTP {response.status_code}'
+                retryable = response.status_code in RETRYABLE_STATUS_CODES
+                retry_after = response.headers.get('Retry-After')
+
+            breaker.record_failure()
+            if not retryable or attempt >= self.max_retries:
+                break
+            time.sleep(self._backoff(attempt, retry_after))
+
+        logger.warning(f"Échec de l'envoi vers {url} après {result['attempts']} tentative(s): {result['error']}")
+        return result
+
+    def submit(self, url: str, payload: Dict[str, Any],
+               callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Future:
+        """
+        Envoie `payload` en arrière-plan
+
+        `callback` reçoit le résultat dans le thread d'envoi (il peut écrire en
+        base). Sans pool (`ADMIN_WEBHOOK_MAX_WORKERS = 0`), l'envoi est
+        synchrone.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            future = Future()
+            future.set_result(self._deliver(url, payload, callback, in_worker=False))
+            return future
+        return executor.submit(self._deliver, url, payload, callback, True)
+
+    def _deliver(self, url, payload, callback, in_worker):
+        try:
+            if in_worker:
+                close_old_connections()
+            result = self.post(url, payload)
+            if callback is not None:
+                callback(result)
+            return result
+        except Exception:
+            logger.exception(f"Erreur lors de l'envoi vers {url}")
+            raise
+        finally:
+            if in_worker:
+                connections.close_all()
+
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='admin-webhook',
+                    )
+        return self._executor
+
+    def shutdown(self, wait: bool = True):
+        """Attend (ou non) les envois en cours et libère le pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def get_webhook_delivery_service() -> WebhookDeliveryService:
+    """Retourne le service de livraison partagé du processus"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = WebhookDeliveryService()
+    return _service
@@ -4,6 +4,7 @@ Signaux pour l'Admin API
 from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from core.utils.bulk_signals import batched_receiver
 from .models import AdminLog
 import logging
 
@@ -11,27 +12,26 @@ logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-@receiver(post_save, sender=User)
-def user_post_save_admin_log(sender, instance, created, **kwargs):
-    """Log automatique des modifications d'utilisateur"""
-    if created:
-        AdminLog.objects.create(
-            admin_user=instance,  # L'utilisateur qui se crée
-            action='user_create',
+@batched_receiver(post_save, sender=User)
+def user_post_save_admin_log(sender, events):
+    """Log automatique des créations et modifications d'utilisateurs"""
+    logs = []
+    for event in events:
+        instance = event.instance
+        if event.created:
+            action, message = 'user_create', f'Utilisateur créé: {instance.email}'
+        else:
+            action, message = 'user_update', f'Utilisateur modifié: {instance.email}'
+        logs.append(AdminLog(
+            admin_user=instance,  # L'utilisateur créé ou modifié
+            action=action,
             target_model='User',
             target_id=str(instance.id),
-            message=f'Utilisateur créé: {instance.email}',
+            message=message,
+            details={'email': instance.email},
             level='info'
-        )
-    else:
-        AdminLog.objects.create(
-            admin_user=instance,  # L'utilisateur modifié
-            action='user_update',
-            target_model='User',
-            target_id=str(instance.id),
-            message=f'Utilisateur modifié: {instance.email}',
-            level='info'
-        )
+        ))
+    AdminLog.objects.bulk_create(logs)
 
 
 @receiver(post_delete, sender=User)
@@ -0,0 +1,121 @@
+"""
+Tests pour le planificateur des règles d'alerte système
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.admin_api.models import AlertRule, SystemAlert
+from apps.admin_api.services import AlertService, alert_scheduler
+from apps.admin_api.services.alert_scheduler import AlertScheduler
+from apps.admin_api.views import check_alerts
+
+User = get_user_model()
+
+
+def make_rule(user, name='cpu', alert_type='cpu', threshold=90, check_interval=300):
+    # bulk_create : les champs JSON vides ne passent pas full_clean()
+    return AlertRule.objects.bulk_create([AlertRule(
+        name=name,
+        alert_type=alert_type,
+        condition={},
+        threshold_value=threshold,
+        check_interval=check_interval,
+        created_by=user,
+    )])[0]
+
+
+class AlertSchedulerTestCase(TestCase):
+    """Tests pour AlertScheduler"""
+
+    def setUp(self):
+        self.user = User.objects.bulk_create([User(email='alerts@example.com', phone='+33600000010')])[0]
+        self.service = mock.Mock()
+        self.service.get_source_value.return_value = 50
+        self.scheduler = AlertScheduler(self.service, reload_interval=3600)
+
+    def make_rule(self, name='cpu', alert_type='cpu', threshold=90, check_interval=300):
+        return make_rule(self.user, name=name, alert_type=alert_type, threshold=threshold,
+                         check_interval=check_interval)
+
+    def test_rule_is_not_checked_before_its_interval(self):
+        """Une règle n'est réévaluée qu'une fois son `check_interval` écoulé"""
+        self.make_rule(check_interval=300)
+
+        self.scheduler.tick(now=1000)
+        self.scheduler.tick(now=1100)
+        self.scheduler.tick(now=1299)
+        self.assertEqual(self.service.get_source_value.call_count, 1)
+
+        self.scheduler.tick(now=1300)
+        self.assertEqual(self.service.get_source_value.call_count, 2)
+        self.assertEqual(self.scheduler.next_run_in(now=1300), 300)
+
+    def test_rules_follow_their_own_interval(self):
+        """Chaque règle a sa propre échéance"""
+        self.make_rule(name='cpu', alert_type='cpu', check_interval=60)
+        self.make_rule(name='disk', alert_type='disk', check_interval=600)
+
+        for now in range(1000, 1600, 30):
+            self.scheduler.tick(now=now)
+
+        sources = [call.args[0] for call in self.service.get_source_value.call_args_list]
+        self.assertEqual(sources.count('cpu'), 10)
+        self.assertEqual(sources.count('disk'), 1)
+
+    def test_source_is_computed_once_per_batch(self):
+        """Les règles dues d'une même source partagent le calcul de la valeur"""
+        self.make_rule(name='cpu warning', threshold=90)
+        self.make_rule(name='cpu critical', threshold=95)
+
+        self.scheduler.tick(now=1000)
+        self.service.get_source_value.assert_called_once_with('cpu')
+
+    def test_triggered_rule_enters_cooldown(self):
+        """Une règle déclenchée ne se redéclenche pas pendant son cooldown"""
+        rule = self.make_rule(threshold=10, check_interval=60)
+        self.service._trigger_alert.side_effect = lambda rule, value: SystemAlert.objects.bulk_create([SystemAlert(
+            alert_rule=rule, title=rule.name, message='', current_value=value, severity=rule.severity,
+        )])[0]
+
+        self.assertEqual(len(self.scheduler.tick(now=1000)), 1)
+        self.assertEqual(self.scheduler.tick(now=1060), [])
+        self.assertEqual(SystemAlert.objects.filter(alert_rule=rule).count(), 1)
+
+
+class CheckAllAlertsTestCase(TestCase):
+    """Tests pour AlertService.check_all_alerts et la commande run_alert_scheduler"""
+
+    def setUp(self):
+        user = User.objects.bulk_create([User(email='checks@example.com', phone='+33600000011')])[0]
+        make_rule(user)
+        patcher = mock.patch.object(alert_scheduler, '_scheduler', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_check_all_alerts_uses_the_shared_scheduler(self):
+        """Deux vérifications rapprochées n'évaluent la règle qu'une fois"""
+        with mock.patch.object(AlertService, 'get_source_value', return_value=50) as get_source_value:
+            AlertService().check_all_alerts()
+            AlertService().check_all_alerts()
+        get_source_value.assert_called_once_with('cpu')
+
+    def test_manual_check_evaluates_every_active_rule(self):
+        """La vérification manuelle n'attend pas l'échéance des règles"""
+        admin = User.objects.bulk_create([User(email='admin@example.com', phone='+33600000012', is_staff=True)])[0]
+        request = APIRequestFactory().post('/api/admin/alerts/check/')
+        force_authenticate(request, user=admin)
+
+        with mock.patch.object(AlertService, 'get_source_value', return_value=50) as get_source_value:
+            AlertService().check_all_alerts()
+            self.assertEqual(check_alerts(request).status_code, 200)
+        self.assertEqual(get_source_value.call_count, 2)
+
+    def test_command_once(self):
+        """`run_alert_scheduler --once` évalue les règles dues"""
+        with mock.patch.object(AlertService, 'get_source_value', return_value=50) as get_source_value:
+            call_command('run_alert_scheduler', '--once', stdout=mock.Mock())
+        get_source_value.assert_called_once_with('cpu')
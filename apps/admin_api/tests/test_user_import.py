@@ -0,0 +1,82 @@
+"""
+Tests pour l'import d'utilisateurs par l'API d'administration
+"""
+import os
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.admin_api.models import AdminAction, AdminLog
+from apps.admin_api.services import user_import_job
+from apps.admin_api.views import admin_user_import
+
+User = get_user_model()
+
+
+@override_settings(USER_IMPORT_HASH_WORKERS=-1)
+class AdminUserImportTestCase(TestCase):
+    """Tests pour admin_user_import"""
+
+    def setUp(self):
+        self.admin, self.member = User.objects.bulk_create([
+            User(email='admin@example.com', phone='+33600000070', is_staff=True),
+            User(email='membre@example.com', phone='+33600000071'),
+        ])
+        self.factory = APIRequestFactory()
+
+    def post(self, content=None, name='users.csv', user=None, **data):
+        if content is not None:
+            data['file'] = SimpleUploadedFile(name, content.encode(), content_type='text/csv')
+        request = self.factory.post('/api/admin/users/import/', data, format='multipart')
+        force_authenticate(request, user=user or self.admin)
+        with mock.patch.object(user_import_job, 'get_import_executor') as executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = admin_user_import(request)
+        if executor.return_value.submit.called:
+            # Exécution du job dans le thread du test
+            _, action_id, path, file_format = executor.return_value.submit.call_args.args
+            self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+            user_import_job.run_user_import(AdminAction.objects.get(pk=action_id), path, file_format)
+        return response
+
+    def test_import_runs_as_background_job(self):
+        response = self.post('email,first_name,language\nana@example.com,Ana,en\nbob@example.com,Bob,xx\n')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['job']['status'], 'pending')
+        action = AdminAction.objects.get(pk=response.data['job']['id'])
+        self.assertEqual((action.action_type, action.status), ('data_import', 'completed'))
+        self.assertEqual((action.result['created'], action.result['failed']), (1, 1))
+        self.assertEqual(action.result['errors'][0]['line'], 3)
+        self.assertEqual(User.objects.get(email='ana@example.com').language, 'en')
+
+        log = AdminLog.objects.get(action='user_import')
+        self.assertEqual(log.admin_user, self.admin)
+        self.assertEqual(log.level, 'warning')
+        self.assertEqual(log.details, {'created': 1, 'skipped': 0, 'failed': 1})
+
+    def test_import_jsonl_by_extension(self):
+        response = self.post('{"email": "ana@example.com"}\n', name='users.jsonl')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['job']['details']['format'], 'jsonl')
+        self.assertTrue(User.objects.filter(email='ana@example.com').exists())
+
+    def test_nothing_created(self):
+        response = self.post('email\nmembre@example.com\n')
+        self.assertEqual(AdminAction.objects.get(pk=response.data['job']['id']).result['skipped'], 1)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.post().status_code, 400)
+        response = self.post('nom\nAna\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.data['error'])
+        self.assertFalse(AdminAction.objects.filter(action_type='data_import').exists())
+        self.assertFalse(AdminLog.objects.filter(action='user_import').exists())
+
+    def test_staff_only(self):
+        response = self.post('email\nana@example.com\n', user=self.member)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(User.objects.filter(email='ana@example.com').exists())
@@ -0,0 +1,204 @@
+"""
+Tests pour la livraison HTTP des notifications d'alerte
+"""
+import threading
+import time
+from unittest import mock
+
+import requests
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.admin_api.models import AlertNotification, AlertRule, SystemAlert
+from apps.admin_api.services import AlertService, notification_service, webhook_delivery
+from apps.admin_api.services.webhook_delivery import CircuitBreaker, WebhookDeliveryService
+
+User = get_user_model()
+
+
+class StubResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class StubSession:
+    """Session HTTP factice : réponses (codes ou exceptions) dans l'ordre, puis 200"""
+
+    def __init__(self, responses=(), delay=0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None):
+        with self._lock:
+            self.calls.append(url)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            response = self.responses.pop(0) if self.responses else 200
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if isinstance(response, Exception):
+                raise response
+            return StubResponse(response)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class CircuitBreakerTestCase(SimpleTestCase):
+    """Tests pour CircuitBreaker"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(webhook_delivery.time, 'monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_single_probe_after_reset_timeout(self):
+        """Un seul appel d'essai est autorisé ; son succès referme le circuit"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now += 60
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now += 60
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+
+@override_settings(
+    ADMIN_WEBHOOK_MAX_RETRIES=3,
+    ADMIN_WEBHOOK_HOST_CONCURRENCY=2,
+    ADMIN_WEBHOOK_HOST_RATE=0,
+    ADMIN_WEBHOOK_CIRCUIT_FAILURE_THRESHOLD=5,
+)
+class WebhookDeliveryServiceTestCase(SimpleTestCase):
+    """Tests pour WebhookDeliveryService"""
+
+    def setUp(self):
+        patcher = mock.patch.object(WebhookDeliveryService, '_backoff', return_value=0)
+        self.backoff = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_service(self, session, max_workers=0):
+        return WebhookDeliveryService(max_workers=max_workers, session=session)
+
+    def test_transient_errors_are_retried(self):
+        """Erreurs de connexion et 5xx retentées avec backoff"""
+        session = StubSession([requests.ConnectionError('refusé'), 503])
+        result = self.make_service(session).post('https://hooks.example.com/a', {'text': 'alerte'})
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['attempts'], 3)
+        self.assertEqual(self.backoff.call_count, 2)
+
+    def test_client_errors_are_not_retried(self):
+        session = StubSession([400])
+        result = self.make_service(session).post('https://hooks.example.com/a', {})
+
+        self.assertFalse(result['success'])
+        self.assertEqual((result['attempts'], result['status_code'], result['error']), (1, 400, 'HTTP 400'))
+
+    def test_retries_are_capped(self):
+        session = StubSession([503] * 10)
+        result = self.make_service(session).post('https://hooks.example.com/a', {})
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['attempts'], 4)
+
+    def test_open_circuit_skips_calls(self):
+        """Après le seuil d'échecs, les appels vers l'URL ne partent plus"""
+        session = StubSession([500] * 5)
+        service = self.make_service(session)
+        service.max_retries = 0
+        for _ in range(5):
+            service.post('https://hooks.example.com/a', {})
+
+        result = service.post('https://hooks.example.com/a', {})
+        self.assertEqual(result['attempts'], 0)
+        self.assertIn('Circuit ouvert', result['error'])
+        self.assertEqual(len(session.calls), 5)
+        # Le disjoncteur est propre à l'URL
+        self.assertTrue(service.post('https://hooks.example.com/b', {})['success'])
+
+    def test_concurrency_is_limited_per_destination(self):
+        """Au plus ADMIN_WEBHOOK_HOST_CONCURRENCY requêtes simultanées par hôte"""
+        session = StubSession(delay=0.05)
+        service = self.make_service(session, max_workers=6)
+        self.addCleanup(service.shutdown)
+
+        futures = [service.submit('https://hooks.example.com/a', {}) for _ in range(6)]
+        self.assertTrue(all(future.result(timeout=5)['success'] for future in futures))
+        self.assertEqual(session.max_active, 2)
+
+        self.assertIs(
+            service._destination('https://hooks.example.com/a'),
+            service._destination('https://HOOKS.example.com/b'),
+        )
+        self.assertIsNot(
+            service._destination('https://hooks.example.com/a'),
+            service._destination('https://other.example.com/a'),
+        )
+
+
+class AlertHTTPNotificationTestCase(TestCase):
+    """Tests pour l'envoi des notifications HTTP après validation de la transaction"""
+
+    def setUp(self):
+        user = User.objects.bulk_create([User(email='webhooks@example.com', phone='+33600000012')])[0]
+        self.rule = AlertRule.objects.bulk_create([AlertRule(
+            name='cpu', alert_type='cpu', condition={}, threshold_value=90, created_by=user,
+            notification_channels=[{'type': 'webhook', 'recipient': 'https://hooks.example.com/a'}],
+        )])[0]
+        self.alert = SystemAlert.objects.bulk_create([SystemAlert(
+            alert_rule=self.rule, title='Alerte cpu', message='CPU à 95%', current_value=95, severity='high',
+        )])[0]
+        self.session = StubSession()
+        delivery = WebhookDeliveryService(max_workers=0, session=self.session)
+        patcher = mock.patch.object(notification_service, 'get_webhook_delivery_service', return_value=delivery)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_webhook_is_sent_on_commit(self):
+        """Rien ne part avant la validation ; le statut est enregistré après l'envoi"""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            AlertService()._send_notifications(self.alert, self.rule)
+
+        notification = AlertNotification.objects.get()
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(self.session.calls, [])
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        notification.refresh_from_db()
+        self.assertEqual(self.session.calls, ['https://hooks.example.com/a'])
+        self.assertEqual(notification.status, 'sent')
+        self.assertIsNotNone(notification.sent_at)
@@ -42,6 +42,7 @@ from .views import (
     admin_user_activate,
     admin_user_deactivate,
     admin_user_suspend,
+    admin_user_import,
     admin_user_stats,
     
     # AdminSystem views
@@ -128,6 +129,7 @@ urlpatterns = [
     path('users/<uuid:pk>/activate/', admin_user_activate, name='user-activate'),
     path('users/<uuid:pk>/deactivate/', admin_user_deactivate, name='user-deactivate'),
     path('users/<uuid:pk>/suspend/', admin_user_suspend, name='user-suspend'),
+    path('users/import/', admin_user_import, name='user-import'),
     path('users/stats/', admin_user_stats, name='user-stats'),
     
     # System Management
@@ -40,6 +40,7 @@ from .admin_user_views import (
     admin_user_activate,
     admin_user_deactivate,
     admin_user_suspend,
+    admin_user_import,
     admin_user_stats,
 )
 from .admin_system_views import (
@@ -124,6 +125,7 @@ __all__ = [
     'admin_user_activate',
     'admin_user_deactivate',
     'admin_user_suspend',
+    'admin_user_import',
     'admin_user_stats',
     
     # AdminSystem views
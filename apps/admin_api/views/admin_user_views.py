@@ -2,15 +2,20 @@
 Vues API pour la gestion des utilisateurs par l'admin
 """
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from core.permissions import IsStaffOrReadOnly
+from core.utils.helpers import get_client_ip
 from apps.authentication.serializers import UserSerializer
+from apps.authentication.services import BulkUserImporter, UserImportError
 from apps.admin_api.models import AdminAction, AdminLog
+from apps.admin_api.serializers import AdminActionSerializer
+from apps.admin_api.services import start_user_import
 
 User = get_user_model()
 
@@ -144,6 +149,32 @@ def admin_user_suspend(request, user_id):
         return Response({'error': 'Utilisateur non trouvé'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsStaffOrReadOnly])
+@parser_classes([MultiPartParser])
+def admin_user_import(request):
+    """Importer des utilisateurs en masse (fichier CSV ou JSONL)"""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Fichier requis (champ "file")'}, status=status.HTTP_400_BAD_REQUEST)
+
+    file_format = request.data.get('format') or BulkUserImporter.detect_format(upload.name)
+    try:
+        # Format et en-tête vérifiés tout de suite ; les lignes sont importées en arrière-plan
+        BulkUserImporter().validate(upload, file_format)
+    except UserImportError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    upload.seek(0)
+
+    action = start_user_import(
+        upload, file_format, request.user, ip_address=get_client_ip(request)
+    )
+    return Response({
+        'message': f"Import de {upload.name} lancé.",
+        'job': AdminActionSerializer(action).data,
+    }, status=status.HTTP_202_ACCEPTED)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsStaffOrReadOnly])
 def admin_user_stats(request):
@@ -134,7 +134,8 @@ def alert_statistics(request):
 def check_alerts(request):
     """Vérifier toutes les alertes (manuel)"""
     alert_service = AlertService()
-    alert_service.check_all_alerts()
+    # Vérification manuelle : toutes les règles actives, échéance atteinte ou non
+    alert_service.check_all_alerts(force=True)
     
     return Response({
         'message': 'Vérification des alertes terminée',
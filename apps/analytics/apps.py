@@ -12,4 +12,6 @@ class AnalyticsConfig(AppConfig):
     def ready(self):
         """Import des signals lors du démarrage de l'app"""
         import apps.analytics.signals
+        from apps.analytics.live import register_channels
+        register_channels()
 
@@ -0,0 +1,43 @@
+"""
+Canaux de diffusion en direct de l'app Analytics
+"""
+from django.core.exceptions import ValidationError
+
+from apps.monitoring.live.hub import DashboardTopic, hub
+
+
+def _authorize_dashboard(user, key):
+    """Vérifie l'accès à un tableau de bord analytique"""
+    from apps.analytics.models import AnalyticsDashboard
+
+    if user is None:
+        return False
+
+    try:
+        dashboard = AnalyticsDashboard.objects.get(id=key)
+    except (AnalyticsDashboard.DoesNotExist, ValueError, ValidationError):
+        return False
+
+    return (
+        dashboard.owner_id == user.id
+        or dashboard.is_public
+        or dashboard.shared_with.filter(id=user.id).exists()
+    )
+
+
+def _dashboard_topic(key):
+    """Construit le sujet d'un tableau de bord analytique"""
+    from apps.analytics.models import AnalyticsDashboard
+    from apps.analytics.views.dashboard_views import widget_engine
+
+    dashboard = AnalyticsDashboard.objects.get(id=key)
+
+    def producer():
+        return widget_engine.evaluate(dashboard.widgets.all())
+
+    return DashboardTopic(key, producer, interval=dashboard.refresh_interval)
+
+
+def register_channels():
+    """Enregistre les canaux de l'app Analytics"""
+    hub.register_channel('analytics.dashboard', _dashboard_topic, _authorize_dashboard)
@@ -6,8 +6,10 @@ import json
 import xlsxwriter
 import io
 import os
+import logging
 import time
 from datetime import datetime, timedelta
+from itertools import chain
 from django.db import connection
 from django.db import models
 from django.contrib.auth import get_user_model
@@ -21,6 +23,8 @@ from apps.analytics.services.analytics_service import AnalyticsService
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
 
 class ExportService:
     """Service pour l'export de données"""
@@ -153,6 +157,7 @@ class ExportService:
     def _get_security_events_data(self, export):
         """Récupère les données d'événements de sécurité"""
         from apps.security.models import SecurityEvent
+        from apps.monitoring.services.log_archive import get_log_archive
         
         query = SecurityEvent.objects.all()
         
@@ -163,16 +168,26 @@ class ExportService:
             query = query.filter(created_at__lte=export.date_range_end)
         
         # Appliquer les filtres
-        if export.filters:
-            if 'event_type' in export.filters:
-                query = query.filter(event_type=export.filters['event_type'])
-            if 'severity' in export.filters:
-                query = query.filter(severity=export.filters['severity'])
+        filters = export.filters or {}
+        if 'event_type' in filters:
+            query = query.filter(event_type=filters['event_type'])
+        if 'severity' in filters:
+            query = query.filter(severity=filters['severity'])
+        
+        # Événements déplacés vers l'archive froide
+        archived = self._archived_rows(
+            get_log_archive(),
+            SecurityEvent,
+            start=export.date_range_start,
+            end=export.date_range_end,
+            levels=[filters['severity']] if 'severity' in filters else None,
+            match=(lambda record: record['event_type'] == filters['event_type']) if 'event_type' in filters else None,
+        )
         
         columns = export.columns or ['id', 'event_type', 'severity', 'description', 'ip_address', 'user_agent', 'created_at']
         
         data = []
-        for event in query:
+        for event in chain(query, archived):
             row = {}
             for column in columns:
                 if hasattr(event, column):
@@ -244,8 +259,9 @@ class ExportService:
     def _get_api_logs_data(self, export):
         """Récupère les données de logs API"""
         from apps.monitoring.models import LogEntry
+        from apps.monitoring.services.log_archive import get_log_archive
         
-        query = LogEntry.objects.filter(source='api')
+        query = LogEntry.objects.filter(source='api').select_related('user', *LogEntry.DIMENSION_FIELDS)
         
         # Appliquer la plage de dates
         if export.date_range_start:
@@ -254,16 +270,28 @@ class ExportService:
             query = query.filter(created_at__lte=export.date_range_end)
         
         # Appliquer les filtres
-        if export.filters:
-            if 'level' in export.filters:
-                query = query.filter(level=export.filters['level'])
-            if 'method' in export.filters:
-                query = query.filter(method=export.filters['method'])
+        filters = export.filters or {}
+        if 'level' in filters:
+            query = query.filter(level=filters['level'])
+        if 'method' in filters:
+            query = query.filter(method=filters['method'])
+        
+        # Logs déplacés vers l'archive froide
+        archived = self._archived_rows(
+            get_log_archive(),
+            LogEntry,
+            start=export.date_range_start,
+            end=export.date_range_end,
+            levels=[filters['level']] if 'level' in filters else None,
+            match=lambda record: record['source'] == 'api' and (
+                'method' not in filters or record['method'] == filters['method']
+            ),
+        )
         
         columns = export.columns or ['id', 'level', 'message', 'user__email', 'ip_address', 'method', 'path', 'status_code', 'response_time', 'created_at']
         
         data = []
-        for log in query:
+        for log in chain(query, archived):
             row = {}
             for column in columns:
                 if '__' in column:
@@ -293,6 +321,25 @@ class ExportService:
             'total_count': len(data)
         }
     
+    def _archived_rows(self, archive, model, **criteria):
+        """
+        Instances archivées lues en flux, au plus `LOG_ARCHIVE_EXPORT_MAX_ROWS`
+        (0 : sans limite)
+        """
+        max_rows = getattr(settings, 'LOG_ARCHIVE_EXPORT_MAX_ROWS', 100000)
+        rows = archive.iter_search(model, **criteria)
+        if not max_rows:
+            yield from rows
+            return
+        for count, row in enumerate(rows):
+            if count == max_rows:
+                logger.warning(
+                    f"Export de {model._meta.label} limité à {max_rows} lignes archivées "
+                    f"(LOG_ARCHIVE_EXPORT_MAX_ROWS)"
+                )
+                return
+            yield row
+    
     def _get_custom_query_data(self, export):
         """Récupère les données via une requête personnalisée"""
         if not export.query:
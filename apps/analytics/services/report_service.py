@@ -209,7 +209,7 @@ class ReportService:
             created_at__lte=end_date,
             source='api',
             response_time__isnull=False
-        ).values('path').annotate(
+        ).values(path=models.F('path_ref__value')).annotate(
             avg_time=models.Avg('response_time'),
             count=models.Count('id')
         ).order_by('-avg_time')[:10]
@@ -236,7 +236,7 @@ class ReportService:
             created_at__gte=start_date,
             created_at__lte=end_date,
             source='api'
-        ).values('path', 'method').annotate(
+        ).values('method', path=models.F('path_ref__value')).annotate(
             count=models.Count('id'),
             avg_response_time=models.Avg('response_time')
         ).order_by('-count')[:20]
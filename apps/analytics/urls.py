@@ -29,6 +29,8 @@ from .views import (
     update_metric, delete_metric, bulk_update_metrics, metric_summary,
 )
 
+from apps.monitoring.live.sse import live_stream_view
+
 app_name = 'analytics'
 
 # URLs pour les rapports
@@ -59,6 +61,7 @@ dashboard_urls = [
     path('dashboards/<int:dashboard_id>/share/', share_dashboard, name='dashboard-share'),
     path('dashboards/<int:dashboard_id>/layout/', update_dashboard_layout, name='dashboard-layout'),
     path('dashboards/<int:dashboard_id>/duplicate/', duplicate_dashboard, name='dashboard-duplicate'),
+    path('dashboards/<str:key>/live/', live_stream_view, {'channel': 'analytics.dashboard'}, name='dashboard-live'),
     path('dashboards/summary/', dashboard_summary, name='dashboard-summary'),
     
     # Widgets
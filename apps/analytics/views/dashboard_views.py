@@ -14,9 +14,30 @@ from apps.analytics.serializers import (
     DashboardDataSerializer, DashboardShareSerializer, DashboardLayoutSerializer,
     DashboardSummarySerializer
 )
+from apps.monitoring.services import DashboardEngine
 # from apps.analytics.services import DashboardService  # Service supprimé
 
 
+def _compute_widget_data(widget):
+    """Calcule les données d'un widget"""
+    return {
+        'id': widget.id,
+        'name': widget.name,
+        'type': widget.widget_type,
+        'config': widget.config,
+        'data': []  # Données simulées pour l'instant
+    }
+
+
+# Les widgets sont chargés avec leur tableau de bord (`select_related`) : le
+# TTL ne coûte pas de requête par widget
+widget_engine = DashboardEngine(
+    compute=_compute_widget_data,
+    key_prefix='analytics_widget',
+    get_ttl=lambda widget: widget.refresh_interval or widget.dashboard.refresh_interval,
+)
+
+
 class AnalyticsDashboardListCreateView(generics.ListCreateAPIView):
     """Vue pour lister et créer des tableaux de bord"""
     serializer_class = AnalyticsDashboardSerializer
@@ -96,23 +117,12 @@ def dashboard_data(request, dashboard_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Récupérer les données des widgets
-        widgets = dashboard.widgets.all()
-        widgets_data = []
-        
-        for widget in widgets:
-            widget_data = {
-                'id': widget.id,
-                'name': widget.name,
-                'type': widget.widget_type,
-                'config': widget.config,
-                'data': []  # Données simulées pour l'instant
-            }
-            widgets_data.append(widget_data)
+        # Récupérer les données des widgets (cache par widget, calcul en parallèle)
+        widgets = dashboard.widgets.select_related('dashboard')
         
         data = {
             'dashboard': AnalyticsDashboardSerializer(dashboard).data,
-            'widgets': widgets_data
+            'widgets': widget_engine.evaluate(widgets)
         }
         
         return Response(data)
@@ -277,7 +287,7 @@ class DashboardWidgetDetailView(generics.RetrieveUpdateDestroyAPIView):
 def widget_data(request, widget_id):
     """Récupère les données d'un widget"""
     try:
-        widget = get_object_or_404(DashboardWidget, id=widget_id)
+        widget = get_object_or_404(DashboardWidget.objects.select_related('dashboard'), id=widget_id)
         
         # Vérifier les permissions
         user = request.user
@@ -289,13 +299,13 @@ def widget_data(request, widget_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Données simulées pour le widget
+        widget_payload = widget_engine.evaluate_one(widget)
         data = {
-            'widget_id': widget.id,
-            'name': widget.name,
-            'type': widget.widget_type,
-            'config': widget.config,
-            'data': []  # Données simulées pour l'instant
+            'widget_id': widget_payload['id'],
+            'name': widget_payload['name'],
+            'type': widget_payload['type'],
+            'config': widget_payload['config'],
+            'data': widget_payload['data']
         }
         
         return Response(data)
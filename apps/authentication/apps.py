@@ -12,6 +12,11 @@ class AuthenticationConfig(AppConfig):
     
     def ready(self):
         """Code exécuté au démarrage de l'application"""
-        # Import des signaux si nécessaire
-        pass
+        from django.db.models.signals import post_delete, post_save
+        from .services.user_snapshot import invalidate_user_snapshot
+        
+        # Invalidation des instantanés utilisés par JWTAuthentication
+        User = self.get_model('User')
+        post_save.connect(invalidate_user_snapshot, sender=User, dispatch_uid='user_snapshot_post_save')
+        post_delete.connect(invalidate_user_snapshot, sender=User, dispatch_uid='user_snapshot_post_delete')
 
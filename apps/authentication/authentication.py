@@ -0,0 +1,63 @@
+"""
+Authentification JWT de l'API
+"""
+from rest_framework_simplejwt.authentication import JWTAuthentication as SimpleJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .services.token_revocation import get_revocation_index
+from .services.user_snapshot import get_user_snapshots
+from .tokens import TOKEN_VERSION_CLAIM
+
+
+class JWTAuthentication(SimpleJWTAuthentication):
+    """
+    Authentification JWT sans requête pour un jeton valide
+
+    La révocation est vérifiée via le filtre des jetons révoqués et
+    l'utilisateur est résolu depuis son instantané (voir `UserSnapshotCache`).
+    Les jetons émis avant un changement de mot de passe (`token_version`) sont
+    refusés.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti and get_revocation_index().is_revoked(jti):
+            raise InvalidToken({
+                'detail': 'Le jeton a été révoqué.',
+                'code': 'token_revoked',
+            })
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Le jeton ne contient pas d'identifiant utilisateur.")
+
+        user = get_user_snapshots().get(user_id)
+        if user is None:
+            raise AuthenticationFailed('Utilisateur introuvable.', code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('Utilisateur inactif.', code='user_inactive')
+
+        token_version = validated_token.get(TOKEN_VERSION_CLAIM)
+        if token_version is not None and token_version != user.token_version:
+            raise AuthenticationFailed(
+                'Le mot de passe a été modifié depuis l\'émission du jeton.',
+                code='password_changed',
+            )
+
+        return user
+
+
+try:
+    from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+except ImportError:
+    pass
+else:
+    class JWTAuthenticationScheme(SimpleJWTScheme):
+        """Schéma OpenAPI de `JWTAuthentication`"""
+        target_class = 'apps.authentication.authentication.JWTAuthentication'
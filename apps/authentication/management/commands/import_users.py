@@ -0,0 +1,41 @@
+"""
+Commande d'import en masse d'utilisateurs (CSV ou JSONL)
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.authentication.services import BulkUserImporter, UserImportError
+
+
+class Command(BaseCommand):
+    help = "Crée des utilisateurs par lots à partir d'un fichier CSV ou JSONL ('-' pour l'entrée standard)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier à importer ('-' pour l'entrée standard)")
+        parser.add_argument('--format', choices=BulkUserImporter.FORMATS, default=None,
+                            help="Format du fichier (déduit de l'extension par défaut)")
+        parser.add_argument('--chunk-size', type=int, default=None, help="Utilisateurs écrits par lot")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Processus de hachage des mots de passe (0 = un par cœur, -1 = aucun)")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or BulkUserImporter.detect_format(path)
+        importer = BulkUserImporter(chunk_size=options['chunk_size'], workers=options['workers'])
+
+        try:
+            if path == '-':
+                result = importer.run(sys.stdin, file_format)
+            else:
+                with open(path, encoding='utf-8', newline='') as stream:
+                    result = importer.run(stream, file_format)
+        except (OSError, UserImportError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"Ligne {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} utilisateur(s) créé(s), {result['skipped']} ignoré(s), "
+            f"{result['failed']} en erreur"
+        ))
@@ -143,10 +143,11 @@ class TwoFactorAuth(models.Model):
         self.save(update_fields=['is_enabled'])
     
     def update_last_used(self):
-        """Met à jour la dernière utilisation"""
+        """Met à jour la dernière utilisation (écriture différée)"""
+        from core.utils.write_coalescer import get_write_coalescer
         from django.utils import timezone
         self.last_used = timezone.now()
-        self.save(update_fields=['last_used'])
+        get_write_coalescer().touch(self, 'last_used', self.last_used)
     
     @classmethod
     def create_for_user(cls, user):
@@ -98,6 +98,11 @@ class User(AbstractUser):
         verbose_name="Verrouillé jusqu'à",
         help_text="Date/heure jusqu'à laquelle le compte est verrouillé"
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Version des jetons",
+        help_text="Incrémentée à chaque changement de mot de passe : les jetons antérieurs sont refusés"
+    )
     
     # Métadonnées
     created_at = models.DateTimeField(
@@ -160,6 +165,35 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.email} ({self.get_full_name()})"
     
+    def set_password(self, raw_password):
+        """Change le mot de passe et invalide les jetons JWT émis auparavant"""
+        super().set_password(raw_password)
+        if not getattr(self, '_rehashing_password', False):
+            self.token_version = (self.token_version or 0) + 1
+    
+    def check_password(self, raw_password):
+        # Le re-hachage automatique (changement d'algorithme) n'est pas un
+        # changement de mot de passe : les jetons restent valides
+        self._rehashing_password = True
+        try:
+            return super().check_password(raw_password)
+        finally:
+            self._rehashing_password = False
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'password' in update_fields and 'token_version' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'token_version']
+        super().save(*args, **kwargs)
+    
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Instance reconstruite depuis un instantané (JWTAuthentication) : le
+        # premier champ différé lu charge tous les autres en une seule requête
+        if fields is not None and getattr(self, '_from_snapshot', False):
+            self._from_snapshot = False
+            fields = set(fields) | self.get_deferred_fields()
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+    
     def get_full_name(self):
         """Retourne le nom complet de l'utilisateur"""
         return f"{self.first_name} {self.last_name}".strip()
@@ -196,9 +230,10 @@ class User(AbstractUser):
         self.save(update_fields=['failed_login_attempts'])
     
     def update_last_activity(self):
-        """Met à jour la dernière activité"""
+        """Met à jour la dernière activité (écriture différée)"""
+        from core.utils.write_coalescer import get_write_coalescer
         self.last_activity = timezone.now()
-        self.save(update_fields=['last_activity'])
+        get_write_coalescer().touch(self, 'last_activity', self.last_activity)
     
     def has_2fa_enabled(self):
         """Vérifie si l'utilisateur a activé la 2FA"""
@@ -95,9 +95,10 @@ class UserSession(models.Model):
         self.save(update_fields=['is_active'])
     
     def update_activity(self):
-        """Met à jour la dernière activité"""
+        """Met à jour la dernière activité (écriture différée)"""
+        from core.utils.write_coalescer import get_write_coalescer
         self.last_activity = timezone.now()
-        self.save(update_fields=['last_activity'])
+        get_write_coalescer().touch(self, 'last_activity', self.last_activity)
     
     def extend_expiration(self, hours=24):
         """Prolonge l'expiration de la session"""
@@ -106,23 +107,25 @@ class UserSession(models.Model):
     
     def get_device_name(self):
         """Retourne un nom lisible pour le device"""
+        from core.utils.user_agent import parse_user_agent
+        
         device_info = self.device_info or {}
         
         # Essayer de construire un nom à partir des informations disponibles
-        parts = []
-        
-        if device_info.get('browser'):
-            parts.append(device_info['browser'])
-        
-        if device_info.get('os'):
-            parts.append(device_info['os'])
-        
-        if device_info.get('device_type'):
-            parts.append(device_info['device_type'])
+        parts = [
+            device_info[key] for key in ('browser', 'os', 'device_type')
+            if device_info.get(key)
+        ]
         
         if parts:
             return ' '.join(parts)
         
+        # Sessions sans analyse enregistrée : analyse du User Agent (mise en cache)
+        if self.user_agent:
+            device_name = parse_user_agent(self.user_agent).device_name
+            if device_name:
+                return device_name
+        
         # Fallback sur l'IP si pas d'autres infos
         return f"Device depuis {self.ip_address}"
     
@@ -156,47 +159,16 @@ class UserSession(models.Model):
     @classmethod
     def _extract_device_info(cls, request):
         """Extrait les informations du device depuis la requête"""
+        from core.utils.user_agent import parse_user_agent
+        
         user_agent = request.META.get('HTTP_USER_AGENT', '')
         
-        # Parsing basique du User Agent
+        # Analyse du User Agent (mise en cache par chaîne)
         device_info = {
             'user_agent': user_agent,
             'ip_address': cls._get_client_ip(request),
         }
-        
-        # Détection basique du navigateur
-        if 'Chrome' in user_agent:
-            device_info['browser'] = 'Chrome'
-        elif 'Firefox' in user_agent:
-            device_info['browser'] = 'Firefox'
-        elif 'Safari' in user_agent:
-            device_info['browser'] = 'Safari'
-        elif 'Edge' in user_agent:
-            device_info['browser'] = 'Edge'
-        else:
-            device_info['browser'] = 'Unknown'
-        
-        # Détection basique de l'OS
-        if 'Windows' in user_agent:
-            device_info['os'] = 'Windows'
-        elif 'Mac' in user_agent:
-            device_info['os'] = 'macOS'
-        elif 'Linux' in user_agent:
-            device_info['os'] = 'Linux'
-        elif 'Android' in user_agent:
-            device_info['os'] = 'Android'
-        elif 'iOS' in user_agent:
-            device_info['os'] = 'iOS'
-        else:
-            device_info['os'] = 'Unknown'
-        
-        # Détection du type de device
-        if 'Mobile' in user_agent or 'Android' in user_agent or 'iPhone' in user_agent:
-            device_info['device_type'] = 'Mobile'
-        elif 'Tablet' in user_agent or 'iPad' in user_agent:
-            device_info['device_type'] = 'Tablet'
-        else:
-            device_info['device_type'] = 'Desktop'
+        device_info.update(parse_user_agent(user_agent).as_dict())
         
         return device_info
     
@@ -1,5 +1,6 @@
 from .user_serializers import UserSerializer, UserRegistrationSerializer, UserLoginSerializer
 from .two_factor_serializers import TwoFactorSetupSerializer, TwoFactorVerifySerializer, TwoFactorDisableSerializer
+from .token_serializers import TokenRefreshSerializer
 
 __all__ = [
     'UserSerializer',
@@ -8,4 +9,5 @@ __all__ = [
     'TwoFactorSetupSerializer',
     'TwoFactorVerifySerializer',
     'TwoFactorDisableSerializer',
+    'TokenRefreshSerializer',
 ]
@@ -0,0 +1,14 @@
+"""
+Sérialiseurs pour les jetons JWT
+"""
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as SimpleJWTTokenRefreshSerializer
+
+from ..tokens import RefreshToken
+
+
+class TokenRefreshSerializer(SimpleJWTTokenRefreshSerializer):
+    """
+    Rafraîchissement (avec rotation) vérifiant et révoquant les jetons via
+    l'index des jetons révoqués
+    """
+    token_class = RefreshToken
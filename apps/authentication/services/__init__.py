@@ -0,0 +1,16 @@
+"""
+Services pour l'app authentication
+"""
+from .token_revocation import BloomFilter, TokenRevocationIndex, get_revocation_index
+from .user_import import BulkUserImporter, UserImportError
+from .user_snapshot import UserSnapshotCache, get_user_snapshots
+
+__all__ = [
+    'BloomFilter',
+    'TokenRevocationIndex',
+    'get_revocation_index',
+    'BulkUserImporter',
+    'UserImportError',
+    'UserSnapshotCache',
+    'get_user_snapshots',
+]
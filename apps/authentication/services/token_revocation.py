@@ -0,0 +1,287 @@
+"""
+Index des jetons JWT révoqués
+
+Les JTI présents dans `BlacklistedToken` sont indexés dans un filtre de Bloom
+local au processus. Un JTI absent du filtre n'est certainement pas révoqué :
+la vérification ne coûte aucune requête. Seuls les résultats positifs
+(révocation probable, ou faux positif) sont confirmés en base.
+
+Le filtre est synchronisé de façon incrémentale à partir du plus grand
+identifiant de `BlacklistedToken` déjà indexé, au plus une fois par
+`JWT_REVOCATION_REFRESH_INTERVAL` secondes. Il est persisté dans le cache sous
+forme de bitmap pour qu'un nouveau processus démarre sans relire la table, et
+reconstruit périodiquement sans les jetons expirés.
+
+Chaque révocation incrémente une version partagée dans le cache : les autres
+processus la comparent à chaque vérification et se synchronisent dès qu'elle
+change, sans attendre l'intervalle. Avec un cache propre au processus (LocMem,
+Dummy), cette version n'est pas vue des autres workers : chaque vérification
+est alors confirmée en base.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core.utils.helpers import is_shared_cache
+
+logger = logging.getLogger(__name__)
+
+FILTER_CACHE_KEY = 'jwt_revocation_filter'
+VERSION_CACHE_KEY = 'jwt_revocation_version'
+
+# Identifiants relus à chaque synchronisation : une transaction validée après
+# une autre d'identifiant supérieur n'est pas manquée (l'ajout est idempotent)
+RESCAN_OVERLAP = 100
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom sur un bitmap (`bytearray`)
+    """
+
+    def __init__(self, size: int, hash_count: int, bits: Optional[bytes] = None):
+        self.size = max(8, size)
+        self.hash_count = max(1, hash_count)
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> 'BloomFilter':
+        """Filtre dimensionné pour `capacity` éléments au taux de faux positifs `error_rate`"""
+        capacity = max(1, capacity)
+        size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        hash_count = round(size / capacity * math.log(2))
+        return cls(size, hash_count)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocationIndex:
+    """
+    Filtre des JTI révoqués, synchronisé avec `BlacklistedToken`
+    """
+
+    def __init__(self, shared_cache: bool = None):
+        self.shared_cache = shared_cache if shared_cache is not None else is_shared_cache()
+        self.capacity = getattr(settings, 'JWT_REVOCATION_FILTER_CAPACITY', 100000)
+        self.error_rate = getattr(settings, 'JWT_REVOCATION_FILTER_ERROR_RATE', 0.001)
+        self.refresh_interval = getattr(settings, 'JWT_REVOCATION_REFRESH_INTERVAL', 5)
+        self.rebuild_interval = getattr(settings, 'JWT_REVOCATION_REBUILD_INTERVAL', 86400)
+
+        self.filter: Optional[BloomFilter] = None
+        self.version = None
+        self.high_water = 0
+        self.item_count = 0
+        self.built_at = 0.0
+        self.last_refresh = 0.0
+        self.lock = threading.RLock()
+
+    # Vérification
+
+    def might_be_revoked(self, jti: str) -> bool:
+        """`False` : le jeton n'est certainement pas révoqué (aucune requête)"""
+        self.refresh()
+        return jti in self.filter
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Indique si le jeton est révoqué (requête seulement si le filtre le
+        suggère, ou à chaque fois si le cache n'est pas partagé)
+        """
+        if self.shared_cache and not self.might_be_revoked(jti):
+            return False
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    # Révocation
+
+    def add(self, jti: str):
+        """Indexe un JTI révoqué par ce processus sans attendre la synchronisation"""
+        self.refresh()
+        with self.lock:
+            self.filter.add(jti)
+
+    def revoke(self, token):
+        """
+        Révoque un jeton (rafraîchissement ou accès)
+
+        Le jeton est inscrit dans les tables de simplejwt, comme `blacklist()`,
+        puis ajouté au filtre. La version partagée est incrémentée après la
+        validation de la transaction : les autres processus se synchronisent à
+        leur vérification suivante.
+        """
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from rest_framework_simplejwt.utils import datetime_from_epoch
+        from ..models import User
+
+        jti = token[api_settings.JTI_CLAIM]
+        user_id = token.payload.get(api_settings.USER_ID_CLAIM)
+        outstanding, _ = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={
+                'user': User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first(),
+                'created_at': token.current_time,
+                'token': str(token),
+                'expires_at': datetime_from_epoch(token['exp']),
+            },
+        )
+        blacklisted, _ = BlacklistedToken.objects.get_or_create(token=outstanding)
+        self.add(jti)
+        transaction.on_commit(bump_revocation_version)
+        return blacklisted
+
+    # Synchronisation
+
+    def refresh(self, force: bool = False):
+        """Charge, synchronise ou reconstruit le filtre si nécessaire"""
+        now = time.time()
+        version = cache.get(VERSION_CACHE_KEY)
+        if not force and self._is_fresh(now, version):
+            return
+
+        with self.lock:
+            if not force and self._is_fresh(now, version):
+                return
+            self.last_refresh = now
+            self.version = version
+            try:
+                if self.filter is None:
+                    self._load()
+                if self.filter is None or self._needs_rebuild(now):
+                    self.rebuild()
+                elif self._sync():
+                    self._persist()
+            except Exception as e:
+                logger.error(f"Erreur lors de la synchronisation des jetons révoqués: {e}")
+                if self.filter is None:
+                    # Sans filtre, tout jeton est vérifié en base
+                    self.filter = _AlwaysMatch()
+
+    def _is_fresh(self, now: float, version) -> bool:
+        """Filtre chargé, synchronisé récemment et sans révocation signalée depuis"""
+        return (
+            self.filter is not None
+            and version == self.version
+            and now - self.last_refresh < self.refresh_interval
+        )
+
+    def rebuild(self):
+        """Reconstruit le filtre à partir des jetons révoqués non expirés"""
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        high_water = BlacklistedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        rows = BlacklistedToken.objects.filter(
+            id__lte=high_water, token__expires_at__gt=timezone.now()
+        ).values_list('token__jti', flat=True)
+
+        # Construit à part : un filtre incomplet donnerait de faux négatifs
+        bloom = BloomFilter.for_capacity(self.capacity, self.error_rate)
+        item_count = 0
+        for jti in rows.iterator():
+            bloom.add(jti)
+            item_count += 1
+
+        with self.lock:
+            self.filter = bloom
+            self.high_water = high_water
+            self.item_count = item_count
+            self.built_at = time.time()
+            # Révocations validées pendant la reconstruction
+            self._sync()
+            self._persist()
+
+    def _needs_rebuild(self, now: float) -> bool:
+        return (
+            isinstance(self.filter, _AlwaysMatch)
+            or self.item_count > self.capacity
+            or now - self.built_at >= self.rebuild_interval
+        )
+
+    def _sync(self) -> int:
+        """Indexe les révocations postérieures au dernier identifiant indexé"""
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        rows = BlacklistedToken.objects.filter(
+            id__gt=max(0, self.high_water - RESCAN_OVERLAP),
+            token__expires_at__gt=timezone.now(),
+        ).order_by('id').values_list('id', 'token__jti')
+        previous = self.high_water
+        self._add_rows(rows)
+        return self.high_water - previous
+
+    def _add_rows(self, rows: Iterable):
+        for row_id, jti in rows:
+            self.filter.add(jti)
+            if row_id > self.high_water:
+                self.high_water = row_id
+                self.item_count += 1
+
+    # Persistance
+
+    def _persist(self):
+        cache.set(FILTER_CACHE_KEY, {
+            'size': self.filter.size,
+            'hash_count': self.filter.hash_count,
+            'bits': bytes(self.filter.bits),
+            'high_water': self.high_water,
+            'item_count': self.item_count,
+            'built_at': self.built_at,
+        }, None)
+
+    def _load(self) -> bool:
+        state = cache.get(FILTER_CACHE_KEY)
+        if not state:
+            return False
+        self.filter = BloomFilter(state['size'], state['hash_count'], state['bits'])
+        self.high_water = state['high_water']
+        self.item_count = state['item_count']
+        self.built_at = state['built_at']
+        return True
+
+
+class _AlwaysMatch:
+    """Filtre de repli : toute vérification est confirmée en base"""
+
+    def add(self, item):
+        pass
+
+    def __contains__(self, item) -> bool:
+        return True
+
+
+def bump_revocation_version():
+    """Signale une révocation aux autres processus"""
+    cache.set(VERSION_CACHE_KEY, time.time(), None)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_revocation_index() -> TokenRevocationIndex:
+    """Retourne l'index des jetons révoqués du processus"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TokenRevocationIndex()
+    return _index
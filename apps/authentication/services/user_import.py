@@ -0,0 +1,335 @@
+"""
+Import en masse d'utilisateurs (CSV ou JSONL)
+
+Le fichier est lu en flux, ligne à ligne, et traité par lots de
+`USER_IMPORT_CHUNK_SIZE` enregistrements. Le hachage des mots de passe,
+volontairement coûteux, est réparti sur un `ProcessPoolExecutor` (un processus
+par cœur par défaut) : le lot suivant est haché pendant que le lot courant est
+écrit. Chaque lot est écrit dans une transaction par `bulk_create`, et les
+receivers `post_save` groupés de `User` (profil de sécurité, profil,
+préférences, journaux) sont appelés une fois pour tout le lot
+(`core.utils.bulk_signals`). Les receivers `post_save` ordinaires ne sont pas
+appelés pour les utilisateurs importés.
+
+Seuls les champs de `IMPORT_FIELDS` sont acceptés : les comptes staff ou
+superutilisateur ne sont pas créés par import. Chaque valeur est validée par
+le champ du modèle (longueur maximale, choix) : une ligne invalide est signalée
+avec son numéro. Si l'écriture d'un lot échoue malgré tout (ex. email créé
+entre-temps), ses lignes sont reprises une à une pour ne rejeter que les
+lignes fautives.
+"""
+import csv
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+
+from core.utils.bulk_signals import bulk_operation, send_bulk_created
+
+logger = logging.getLogger(__name__)
+
+# Champs acceptés dans le fichier d'import
+IMPORT_FIELDS = (
+    'email',
+    'password',
+    'first_name',
+    'last_name',
+    'phone',
+    'language',
+    'timezone',
+    'is_active',
+    'is_verified',
+)
+
+BOOLEAN_FIELDS = ('is_active', 'is_verified')
+TRUE_VALUES = ('1', 'true', 'yes', 'oui', 'y', 'o')
+
+# Erreurs détaillées conservées dans le résultat
+MAX_REPORTED_ERRORS = 100
+
+
+def _init_hasher():
+    """Initialise Django dans un processus de hachage démarré par `spawn`"""
+    import django
+    django.setup()
+
+
+def hash_passwords(passwords: List[Optional[str]]) -> List[str]:
+    """Hache une liste de mots de passe (exécuté dans un processus du pool)"""
+    return [make_password(password) for password in passwords]
+
+
+def _text_lines(stream) -> Iterator[str]:
+    for index, line in enumerate(stream):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if index == 0:
+            line = line.lstrip('\ufeff')
+        yield line
+
+
+class UserImportError(Exception):
+    """Fichier d'import illisible"""
+
+
+class BulkUserImporter:
+    """
+    Création d'utilisateurs par lots à partir d'un flux CSV ou JSONL
+    """
+
+    FORMATS = ('csv', 'jsonl')
+
+    def __init__(self, chunk_size: int = None, workers: int = None):
+        self.chunk_size = chunk_size or getattr(settings, 'USER_IMPORT_CHUNK_SIZE', 1000)
+        workers = workers if workers is not None else getattr(settings, 'USER_IMPORT_HASH_WORKERS', 0)
+        # 0 : un processus par cœur ; < 0 : hachage dans le processus courant
+        self.workers = workers if workers != 0 else (os.cpu_count() or 1)
+
+    # Lecture
+
+    @classmethod
+    def detect_format(cls, filename: str, default: str = 'csv') -> str:
+        """Format déduit de l'extension du fichier"""
+        extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+        if extension in ('jsonl', 'ndjson'):
+            return 'jsonl'
+        if extension == 'csv':
+            return 'csv'
+        return default
+
+    def read_records(self, stream, file_format: str) -> Iterator[tuple]:
+        """
+        Enregistrements du flux, sans le charger en mémoire
+
+        Args:
+            stream: Itérable de lignes (`str` ou `bytes` UTF-8), ex. fichier
+                ouvert ou `UploadedFile`
+
+        Yields:
+            tuple: (numéro de ligne, dict) ou (numéro de ligne, message d'erreur)
+        """
+        if file_format not in self.FORMATS:
+            raise UserImportError(f"Format d'import inconnu: {file_format}")
+
+        stream = _text_lines(stream)
+        if file_format == 'csv':
+            reader = csv.DictReader(stream)
+            if not reader.fieldnames or 'email' not in reader.fieldnames:
+                raise UserImportError("La colonne 'email' est obligatoire")
+            unknown = set(reader.fieldnames) - set(IMPORT_FIELDS)
+            if unknown:
+                raise UserImportError(f"Colonnes non autorisées: {', '.join(sorted(unknown))}")
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, f"JSON invalide: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, "Un objet JSON est attendu"
+                continue
+            yield line_number, record
+
+    def validate(self, stream, file_format: str):
+        """Vérifie le format et l'en-tête du flux (lève `UserImportError`)"""
+        next(self.read_records(stream, file_format), None)
+
+    def _clean(self, record: dict) -> dict:
+        """Valide et normalise un enregistrement"""
+        from ..models import User
+
+        unknown = {str(key) for key in record} - set(IMPORT_FIELDS)
+        if unknown:
+            raise ValidationError(f"Champs non autorisés: {', '.join(sorted(unknown))}")
+
+        email = User.objects.normalize_email((record.get('email') or '').strip())
+        if not email:
+            raise ValidationError("L'email est obligatoire")
+        validate_email(email)
+
+        data = {'email': email}
+        errors = []
+        for field in IMPORT_FIELDS[2:]:
+            value = record.get(field)
+            if value is None or value == '':
+                continue
+            if field in BOOLEAN_FIELDS:
+                if not isinstance(value, bool):
+                    value = str(value).strip().lower() in TRUE_VALUES
+            else:
+                # Longueur maximale et choix du champ (ex. `phone`, `language`)
+                try:
+                    value = User._meta.get_field(field).clean(str(value).strip(), None)
+                except ValidationError as e:
+                    errors.extend(f"{field}: {message}" for message in e.messages)
+                    continue
+            data[field] = value
+        if errors:
+            raise ValidationError(errors)
+
+        password = record.get('password')
+        data['password'] = str(password) if password not in (None, '') else None
+        return data
+
+    # Import
+
+    def run(self, stream, file_format: str) -> dict:
+        """
+        Importe les utilisateurs du flux
+
+        Returns:
+            dict: `created`, `skipped` (emails déjà existants ou en double),
+            `failed` et `errors` (numéro de ligne et message)
+        """
+        result = {'created': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+        records = self.read_records(stream, file_format)
+        # Emails déjà retenus : le lot suivant est préparé avant l'écriture du courant
+        seen = set()
+
+        executor = None
+        if self.workers > 0:
+            # `spawn` : pas de fork d'un processus serveur multithread (connexions, verrous)
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_hasher,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        try:
+            pending = None
+            for chunk in self._chunks(records):
+                rows = self._prepare(chunk, seen, result)
+                # Hachage du lot suivant pendant l'écriture du lot courant
+                submitted = (rows, self._submit_hashes(executor, rows))
+                if pending is not None:
+                    self._write(*pending, result)
+                pending = submitted
+            if pending is not None:
+                self._write(*pending, result)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        return result
+
+    def _chunks(self, records: Iterable) -> Iterator[list]:
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _prepare(self, chunk: list, seen: set, result: dict) -> list:
+        """Lignes valides du lot dont l'email n'existe pas encore"""
+        from ..models import User
+
+        rows = []
+        for line_number, record in chunk:
+            if isinstance(record, str):
+                self._error(result, line_number, record)
+                continue
+            try:
+                data = self._clean(record)
+            except ValidationError as e:
+                self._error(result, line_number, ' '.join(e.messages))
+                continue
+            if data['email'] in seen:
+                result['skipped'] += 1
+                continue
+            seen.add(data['email'])
+            rows.append((line_number, data))
+
+        if rows:
+            existing = set(User.objects.filter(
+                email__in=[data['email'] for _, data in rows]
+            ).values_list('email', flat=True))
+            if existing:
+                kept = [(n, data) for n, data in rows if data['email'] not in existing]
+                result['skipped'] += len(rows) - len(kept)
+                rows = kept
+        return rows
+
+    def _submit_hashes(self, executor, rows: list) -> List[Future]:
+        # Un mot de passe absent donne un mot de passe inutilisable (sans coût)
+        passwords = [data['password'] for _, data in rows]
+        if executor is None or not passwords:
+            future = Future()
+            future.set_result(hash_passwords(passwords))
+            return [future]
+
+        size = max(1, len(passwords) // (self.workers * 4))
+        return [
+            executor.submit(hash_passwords, passwords[start:start + size])
+            for start in range(0, len(passwords), size)
+        ]
+
+    def _write(self, rows: list, futures: List[Future], result: dict):
+        hashes = [hashed for future in futures for hashed in future.result()]
+        if not rows:
+            return
+        from ..models import User
+
+        users = []
+        for (_, data), hashed in zip(rows, hashes):
+            fields = {key: value for key, value in data.items() if key != 'password'}
+            users.append(User(password=hashed, **fields))
+
+        try:
+            self._create(users)
+        except DatabaseError as e:
+            # Ex. email créé entre la vérification et l'écriture : lignes reprises une à une
+            logger.warning(f"Lot d'utilisateurs repris ligne par ligne: {e}")
+            for (line_number, _), user in zip(rows, users):
+                user.pk = None
+                user._state.adding = True
+                try:
+                    self._create([user])
+                except DatabaseError as e:
+                    self._error(result, line_number, f"Utilisateur non importé: {e}")
+                    continue
+                result['created'] += 1
+            return
+        result['created'] += len(users)
+
+    def _create(self, users: list):
+        """Écrit des utilisateurs dans une transaction (tout ou rien)"""
+        from ..models import User
+
+        with transaction.atomic(), bulk_operation():
+            User.objects.bulk_create(users, batch_size=self.chunk_size)
+            self._assign_pks(users)
+            # Receivers `post_save` de `User` appelés une fois pour tout le lot
+            send_bulk_created(User, users)
+
+    @staticmethod
+    def _assign_pks(users: list):
+        """Clés des utilisateurs créés, sur une base qui ne les retourne pas à l'insertion"""
+        from ..models import User
+
+        if all(user.pk is not None for user in users):
+            return
+        ids = dict(User.objects.filter(
+            email__in=[user.email for user in users]
+        ).values_list('email', 'id'))
+        for user in users:
+            user.pk = ids[user.email]
+
+    @staticmethod
+    def _error(result: dict, line_number: int, message: str, count: int = 1):
+        result['failed'] += count
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'line': line_number, 'error': message})
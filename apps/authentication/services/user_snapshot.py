@@ -0,0 +1,152 @@
+"""
+Instantanés des utilisateurs authentifiés par JWT
+
+`JWTAuthentication` résout l'utilisateur d'un jeton à partir d'un instantané
+(champs lus à chaque requête : identité, statut, 2FA, version des jetons),
+conservé quelques secondes dans le processus et quelques minutes dans le cache
+partagé. Le second niveau n'est utilisé que si le cache par défaut est partagé
+entre processus (Redis, Memcached...) : un cache propre au processus (LocMem)
+ne serait pas invalidé par les autres workers. Une requête authentifiée ne charge donc plus la ligne `User`.
+L'instance retournée est un vrai `User` dont les autres champs sont différés :
+le premier accès à l'un d'eux les charge tous en une requête.
+
+L'instantané est invalidé à chaque enregistrement de l'utilisateur (sauf
+si seuls des champs absents de l'instantané sont modifiés), ce qui couvre le
+changement de mot de passe et `lock_account`. Les autres processus voient la
+modification au plus tard après `USER_SNAPSHOT_LOCAL_TTL` secondes.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+
+from core.utils.helpers import is_shared_cache
+
+# Champs conservés dans l'instantané
+SNAPSHOT_FIELDS = (
+    'id',
+    'email',
+    'first_name',
+    'last_name',
+    'is_active',
+    'is_staff',
+    'is_superuser',
+    'is_verified',
+    'two_factor_enabled',
+    'locked_until',
+    'language',
+    'timezone',
+    'email_notifications',
+    'token_version',
+)
+
+
+def _cache_key(user_id) -> str:
+    return f'user_snapshot:{user_id}'
+
+
+class UserSnapshotCache:
+    """
+    Cache à deux niveaux (processus, cache partagé) des instantanés utilisateur
+    """
+
+    def __init__(self, local_ttl: float = None, cache_ttl: int = None, use_cache: bool = None):
+        self.local_ttl = (
+            local_ttl if local_ttl is not None
+            else getattr(settings, 'USER_SNAPSHOT_LOCAL_TTL', 5)
+        )
+        self.cache_ttl = cache_ttl or getattr(settings, 'USER_SNAPSHOT_CACHE_TTL', 300)
+        # Sans cache partagé, seul le niveau local (TTL court) est utilisé
+        self.use_cache = use_cache if use_cache is not None else is_shared_cache()
+        self._local: Dict[str, Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """
+        Utilisateur reconstruit depuis son instantané
+
+        Returns:
+            User ou None si l'utilisateur n'existe pas
+        """
+        snapshot = self.get_snapshot(user_id)
+        if snapshot is None:
+            return None
+        return self.build_user(snapshot)
+
+    def get_snapshot(self, user_id) -> Optional[dict]:
+        """Instantané de l'utilisateur (processus, puis cache, puis base)"""
+        key = _cache_key(user_id)
+        now = time.monotonic()
+
+        entry = self._local.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        snapshot = cache.get(key) if self.use_cache else None
+        if snapshot is None:
+            snapshot = self._load(user_id)
+            if snapshot is None:
+                return None
+            if self.use_cache:
+                cache.set(key, snapshot, self.cache_ttl)
+
+        if self.local_ttl > 0:
+            with self._lock:
+                self._local[key] = (now + self.local_ttl, snapshot)
+        return snapshot
+
+    def invalidate(self, user_id):
+        """Oublie l'instantané d'un utilisateur"""
+        key = _cache_key(user_id)
+        with self._lock:
+            self._local.pop(key, None)
+        if self.use_cache:
+            cache.delete(key)
+
+    def clear_local(self):
+        """Vide le niveau local au processus"""
+        with self._lock:
+            self._local.clear()
+
+    @staticmethod
+    def build_user(snapshot: dict):
+        """`User` dont seuls les champs de l'instantané sont chargés"""
+        from ..models import User
+
+        # `from_db` attend les valeurs dans l'ordre des champs du modèle
+        field_names = [f.attname for f in User._meta.concrete_fields if f.attname in snapshot]
+        values = [snapshot[name] for name in field_names]
+        user = User.from_db(router.db_for_read(User), field_names, values)
+        user._from_snapshot = True
+        return user
+
+    @staticmethod
+    def _load(user_id) -> Optional[dict]:
+        from ..models import User
+
+        return User.objects.filter(pk=user_id).values(*SNAPSHOT_FIELDS).first()
+
+
+_snapshots = None
+_snapshots_lock = threading.Lock()
+
+
+def get_user_snapshots() -> UserSnapshotCache:
+    """Retourne le cache d'instantanés utilisateur du processus"""
+    global _snapshots
+    if _snapshots is None:
+        with _snapshots_lock:
+            if _snapshots is None:
+                _snapshots = UserSnapshotCache()
+    return _snapshots
+
+
+def invalidate_user_snapshot(sender, instance, update_fields=None, **kwargs):
+    """Receiver `post_save` / `post_delete` de `User`"""
+    if update_fields is not None and not set(update_fields) & set(SNAPSHOT_FIELDS):
+        # Ex. `update_last_activity` : l'instantané reste exact
+        return
+    get_user_snapshots().invalidate(instance.pk)
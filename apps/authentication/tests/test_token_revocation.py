@@ -0,0 +1,190 @@
+"""
+Tests pour l'index des jetons JWT révoqués
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.authentication import authentication, tokens
+from apps.authentication.authentication import JWTAuthentication
+from apps.authentication.services import BloomFilter, TokenRevocationIndex
+from apps.authentication.services.token_revocation import FILTER_CACHE_KEY
+from apps.authentication.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class BloomFilterTestCase(SimpleTestCase):
+    """Tests pour BloomFilter"""
+
+    def test_added_items_are_always_found(self):
+        bloom = BloomFilter.for_capacity(1000, 0.001)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        false_positives = sum(f'autre-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_bitmap_round_trip(self):
+        bloom = BloomFilter.for_capacity(100, 0.001)
+        bloom.add('jti-1')
+        copy = BloomFilter(bloom.size, bloom.hash_count, bytes(bloom.bits))
+        self.assertIn('jti-1', copy)
+        self.assertNotIn('jti-2', copy)
+
+
+class TokenRevocationIndexTestCase(TestCase):
+    """Tests pour TokenRevocationIndex"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.bulk_create([User(email='ana@example.com', phone='+33600000040')])[0]
+
+    def index(self, shared_cache=True):
+        index = TokenRevocationIndex(shared_cache=shared_cache)
+        # Sans signal de version, aucune synchronisation pendant le test
+        index.refresh_interval = 3600
+        return index
+
+    def blacklist(self, expires_at=None):
+        token = RefreshToken.for_user(self.user)
+        if expires_at is not None:
+            OutstandingToken.objects.filter(jti=token['jti']).update(expires_at=expires_at)
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        BlacklistedToken.objects.create(token=outstanding)
+        return token['jti']
+
+    def test_unrevoked_token_costs_no_query(self):
+        index = self.index()
+        revoked = self.blacklist()
+        index.refresh()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(index.is_revoked('inconnu'))
+        with self.assertNumQueries(1):
+            self.assertTrue(index.is_revoked(revoked))
+
+    def test_revoke_is_seen_by_other_processes(self):
+        index, peer = self.index(), self.index()
+        token = RefreshToken.for_user(self.user)
+        peer.refresh()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            index.revoke(token)
+
+        # La version partagée force la synchronisation avant l'intervalle
+        self.assertTrue(index.is_revoked(token['jti']))
+        self.assertTrue(peer.is_revoked(token['jti']))
+        with self.assertNumQueries(0):
+            self.assertFalse(peer.is_revoked('inconnu'))
+
+    def test_revoke_waits_for_the_commit(self):
+        index, peer = self.index(), self.index()
+        token = RefreshToken.for_user(self.user)
+        peer.refresh()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            index.revoke(token)
+        self.assertFalse(peer.is_revoked(token['jti']))
+
+        for callback in callbacks:
+            callback()
+        self.assertTrue(peer.is_revoked(token['jti']))
+
+    def test_process_local_cache_checks_the_database(self):
+        index = self.index(shared_cache=False)
+        index.refresh()
+        revoked = self.blacklist()
+
+        with self.assertNumQueries(1):
+            self.assertFalse(index.is_revoked('inconnu'))
+        self.assertTrue(index.is_revoked(revoked))
+
+    def test_filter_is_persisted_and_loaded(self):
+        index = self.index()
+        revoked = self.blacklist()
+        index.refresh()
+        self.assertEqual(cache.get(FILTER_CACHE_KEY)['high_water'], index.high_water)
+
+        # Un nouveau processus charge le bitmap puis ne relit que les nouvelles révocations
+        later = self.blacklist()
+        loaded = self.index()
+        with mock.patch.object(TokenRevocationIndex, 'rebuild') as rebuild:
+            loaded.refresh()
+        rebuild.assert_not_called()
+        self.assertEqual(loaded.item_count, 2)
+        self.assertTrue(loaded.might_be_revoked(revoked))
+        self.assertTrue(loaded.might_be_revoked(later))
+
+    def test_rebuild_drops_expired_tokens(self):
+        expired = self.blacklist(expires_at=timezone.now() - timedelta(days=1))
+        active = self.blacklist()
+        index = self.index()
+        index.rebuild()
+
+        self.assertEqual(index.item_count, 1)
+        self.assertTrue(index.might_be_revoked(active))
+        self.assertFalse(index.might_be_revoked(expired))
+
+    def test_periodic_rebuild(self):
+        index = self.index()
+        index.refresh()
+        index.rebuild_interval = 0
+        with mock.patch.object(TokenRevocationIndex, 'rebuild') as rebuild:
+            index.refresh(force=True)
+        rebuild.assert_called_once()
+
+    def test_database_errors_fall_back_to_confirmation(self):
+        index = self.index()
+        revoked = self.blacklist()
+        with mock.patch.object(TokenRevocationIndex, 'rebuild', side_effect=RuntimeError('base indisponible')):
+            index.refresh()
+
+        self.assertTrue(index.might_be_revoked('inconnu'))
+        self.assertFalse(index.is_revoked('inconnu'))
+        self.assertTrue(index.is_revoked(revoked))
+
+
+class RevokedTokenAuthenticationTestCase(TestCase):
+    """Refus des jetons révoqués par `JWTAuthentication` et `RefreshToken`"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.bulk_create([User(email='ana@example.com', phone='+33600000041')])[0]
+        self.index = TokenRevocationIndex(shared_cache=True)
+        for module in (authentication, tokens):
+            patcher = mock.patch.object(module, 'get_revocation_index', return_value=self.index)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_revoked_access_token_is_refused(self):
+        access = RefreshToken.for_user(self.user).access_token
+        auth = JWTAuthentication()
+        self.assertEqual(auth.get_validated_token(str(access).encode())['jti'], access['jti'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.index.revoke(access)
+
+        with self.assertRaises(InvalidToken) as raised:
+            auth.get_validated_token(str(access).encode())
+        self.assertEqual(raised.exception.detail['code'], 'token_revoked')
+
+    def test_blacklisted_refresh_token_is_refused(self):
+        refresh = RefreshToken.for_user(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh.blacklist()
+
+        with self.assertRaises(TokenError):
+            RefreshToken(str(refresh))
@@ -0,0 +1,184 @@
+"""
+Tests pour l'import en masse d'utilisateurs
+"""
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication.services import BulkUserImporter, UserImportError
+
+User = get_user_model()
+
+CSV_HEADER = 'email,password,first_name,last_name,phone,language,is_active\n'
+
+
+def csv_stream(*lines):
+    return io.StringIO(CSV_HEADER + ''.join(f'{line}\n' for line in lines))
+
+
+def jsonl_stream(*records):
+    return io.BytesIO(''.join(
+        record if isinstance(record, str) else json.dumps(record) + '\n'
+        for record in records
+    ).encode())
+
+
+class ReadRecordsTestCase(SimpleTestCase):
+    """Lecture des fichiers CSV et JSONL"""
+
+    def setUp(self):
+        self.importer = BulkUserImporter(workers=-1)
+
+    def test_detect_format(self):
+        self.assertEqual(BulkUserImporter.detect_format('users.jsonl'), 'jsonl')
+        self.assertEqual(BulkUserImporter.detect_format('users.NDJSON'), 'jsonl')
+        self.assertEqual(BulkUserImporter.detect_format('users.csv'), 'csv')
+        self.assertEqual(BulkUserImporter.detect_format('-'), 'csv')
+
+    def test_csv_columns_are_checked(self):
+        with self.assertRaises(UserImportError):
+            list(self.importer.read_records(io.StringIO('first_name\nAna\n'), 'csv'))
+        with self.assertRaises(UserImportError):
+            list(self.importer.read_records(io.StringIO('email,is_staff\na@example.com,1\n'), 'csv'))
+        with self.assertRaises(UserImportError):
+            list(self.importer.read_records(io.StringIO(''), 'xml'))
+
+    def test_jsonl_errors_keep_their_line_number(self):
+        records = list(self.importer.read_records(
+            jsonl_stream({'email': 'a@example.com'}, '\n', '{invalide\n', '[1]\n'), 'jsonl'
+        ))
+        self.assertEqual(records[0], (1, {'email': 'a@example.com'}))
+        self.assertEqual([line for line, _ in records], [1, 3, 4])
+        self.assertTrue(records[1][1].startswith('JSON invalide'))
+        self.assertEqual(records[2][1], 'Un objet JSON est attendu')
+
+    def test_byte_order_mark_is_ignored(self):
+        stream = io.BytesIO('﻿email\na@example.com\n'.encode())
+        self.assertEqual(list(self.importer.read_records(stream, 'csv')), [(2, {'email': 'a@example.com'})])
+
+
+class BulkUserImporterTestCase(TestCase):
+    """Tests pour BulkUserImporter"""
+
+    def setUp(self):
+        self.importer = BulkUserImporter(chunk_size=2, workers=-1)
+
+    def test_users_are_created_in_chunks(self):
+        result = self.importer.run(csv_stream(
+            'ana@example.com,secret-1,Ana,Martin,+33600000060,en,1',
+            'bob@example.com,,Bob,,,,0',
+            'CLAIRE@Example.com,secret-3,Claire,,,,',
+        ), 'csv')
+
+        self.assertEqual(result, {'created': 3, 'skipped': 0, 'failed': 0, 'errors': []})
+        ana = User.objects.get(email='ana@example.com')
+        self.assertTrue(ana.check_password('secret-1'))
+        self.assertEqual((ana.phone, ana.language, ana.is_active), ('+33600000060', 'en', True))
+        self.assertFalse(User.objects.get(email='bob@example.com').has_usable_password())
+        self.assertFalse(User.objects.get(email='bob@example.com').is_active)
+        self.assertTrue(User.objects.filter(email='CLAIRE@example.com').exists())
+
+    def test_existing_and_duplicate_emails_are_skipped(self):
+        User.objects.bulk_create([User(email='ana@example.com', phone='+33600000061')])
+
+        result = self.importer.run(jsonl_stream(
+            {'email': 'ana@example.com'},
+            {'email': 'bob@example.com'},
+            {'email': 'bob@example.com'},
+        ), 'jsonl')
+
+        self.assertEqual((result['created'], result['skipped'], result['failed']), (1, 2, 0))
+
+    def test_invalid_rows_are_reported_by_line(self):
+        result = self.importer.run(csv_stream(
+            'ana@example.com,,,,,,',
+            'pas-un-email,,,,,,',
+            ',,,,,,',
+            'bob@example.com,,,,+336000000600000000000,,',
+            'claire@example.com,,,,,xx,',
+            'david@example.com,,,,,français,',
+        ), 'csv')
+
+        self.assertEqual((result['created'], result['failed']), (1, 5))
+        errors = {error['line']: error['error'] for error in result['errors']}
+        self.assertEqual(sorted(errors), [3, 4, 5, 6, 7])
+        self.assertIn("L'email est obligatoire", errors[4])
+        self.assertTrue(errors[5].startswith('phone:'))
+        self.assertTrue(errors[6].startswith('language:'))
+        self.assertTrue(errors[7].startswith('language:'))
+        self.assertFalse(User.objects.filter(email__in=['bob@example.com', 'claire@example.com']).exists())
+
+    def test_unknown_fields_are_refused(self):
+        result = self.importer.run(jsonl_stream({'email': 'ana@example.com', 'is_superuser': True}), 'jsonl')
+        self.assertEqual(result['failed'], 1)
+        self.assertIn('is_superuser', result['errors'][0]['error'])
+        self.assertFalse(User.objects.exists())
+
+    def test_failed_chunk_is_retried_row_by_row(self):
+        original = BulkUserImporter._create
+
+        def create(importer, users):
+            # Email créé par un autre processus entre la vérification et l'écriture
+            if any(user.email == 'bob@example.com' for user in users):
+                raise IntegrityError('UNIQUE constraint failed: email')
+            return original(importer, users)
+
+        with mock.patch.object(BulkUserImporter, '_create', create):
+            result = self.importer.run(jsonl_stream(
+                {'email': 'ana@example.com'},
+                {'email': 'bob@example.com'},
+                {'email': 'claire@example.com'},
+            ), 'jsonl')
+
+        self.assertEqual((result['created'], result['failed']), (2, 1))
+        self.assertEqual(result['errors'][0]['line'], 2)
+        self.assertEqual(
+            set(User.objects.values_list('email', flat=True)),
+            {'ana@example.com', 'claire@example.com'}
+        )
+
+    def test_hashing_processes_are_spawned(self):
+        importer = BulkUserImporter(workers=2)
+        with mock.patch('apps.authentication.services.user_import.ProcessPoolExecutor') as executor:
+            importer.run(jsonl_stream(), 'jsonl')
+        self.assertEqual(executor.call_args.kwargs['mp_context'].get_start_method(), 'spawn')
+
+    def test_profiles_are_created_for_imported_users(self):
+        from apps.security.models import UserSecurity
+
+        self.importer.run(jsonl_stream({'email': 'ana@example.com'}, {'email': 'bob@example.com'}), 'jsonl')
+        self.assertEqual(UserSecurity.objects.filter(user__email__in=['ana@example.com', 'bob@example.com']).count(), 2)
+
+
+class ImportUsersCommandTestCase(TestCase):
+    """Tests pour la commande import_users"""
+
+    def write(self, content, suffix):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_import_file(self):
+        path = self.write('{"email": "ana@example.com"}\n{"email": "invalide"}\n', '.jsonl')
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        call_command('import_users', path, '--workers', '-1', stdout=stdout, stderr=stderr)
+
+        self.assertTrue(User.objects.filter(email='ana@example.com').exists())
+        self.assertIn('1 utilisateur(s) créé(s), 0 ignoré(s), 1 en erreur', stdout.getvalue())
+        self.assertIn('Ligne 2:', stderr.getvalue())
+
+    def test_unreadable_file(self):
+        with self.assertRaises(CommandError):
+            call_command('import_users', '/nonexistent/users.csv', '--workers', '-1')
+        with self.assertRaises(CommandError):
+            call_command('import_users', self.write('nom\nAna\n', '.csv'), '--workers', '-1')
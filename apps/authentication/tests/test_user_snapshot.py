@@ -0,0 +1,146 @@
+"""
+Tests pour la version des jetons et les instantanés des utilisateurs
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+
+from apps.authentication.authentication import JWTAuthentication
+from apps.authentication.services import user_snapshot
+from apps.authentication.services.user_snapshot import UserSnapshotCache, get_user_snapshots
+from apps.authentication.tokens import TOKEN_VERSION_CLAIM, RefreshToken
+
+User = get_user_model()
+
+
+class SnapshotTestCase(TestCase):
+    """Caches vidés entre les tests (cache traité comme partagé)"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(user_snapshot, '_snapshots', UserSnapshotCache(use_cache=True))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.bulk_create([User(email='ana@example.com', phone='+33600000050')])[0]
+
+
+class TokenVersionTestCase(SnapshotTestCase):
+    """Refus des jetons émis avant un changement de mot de passe"""
+
+    def change_password(self):
+        self.user.set_password('nouveau-mot-de-passe')
+        self.user.save(update_fields=['password'])
+
+    def test_set_password_bumps_token_version(self):
+        self.assertEqual(self.user.token_version, 0)
+        self.change_password()
+
+        self.assertEqual(self.user.token_version, 1)
+        # `update_fields=['password']` enregistre aussi la version
+        self.assertEqual(User.objects.get(pk=self.user.pk).token_version, 1)
+
+    def test_check_password_does_not_bump_token_version(self):
+        self.change_password()
+        self.assertTrue(self.user.check_password('nouveau-mot-de-passe'))
+        self.assertEqual(self.user.token_version, 1)
+
+    def test_tokens_carry_the_version(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.assertEqual(refresh[TOKEN_VERSION_CLAIM], 0)
+        self.assertEqual(refresh.access_token[TOKEN_VERSION_CLAIM], 0)
+
+    def test_old_access_token_is_refused(self):
+        auth = JWTAuthentication()
+        access = auth.get_validated_token(str(RefreshToken.for_user(self.user).access_token).encode())
+        self.assertEqual(auth.get_user(access).pk, self.user.pk)
+
+        self.change_password()
+
+        with self.assertRaises(AuthenticationFailed) as raised:
+            auth.get_user(access)
+        self.assertEqual(raised.exception.detail['code'], 'password_changed')
+
+        fresh = auth.get_validated_token(str(RefreshToken.for_user(self.user).access_token).encode())
+        self.assertEqual(auth.get_user(fresh).pk, self.user.pk)
+
+    def test_old_refresh_token_is_refused(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        RefreshToken(refresh)
+
+        self.change_password()
+
+        with self.assertRaises(TokenError):
+            RefreshToken(refresh)
+
+    def test_token_without_version_is_accepted(self):
+        # Jetons émis avant l'ajout de la version
+        access = RefreshToken.for_user(self.user).access_token
+        del access.payload[TOKEN_VERSION_CLAIM]
+        self.change_password()
+
+        self.assertEqual(JWTAuthentication().get_user(access).pk, self.user.pk)
+
+
+class UserSnapshotCacheTestCase(SnapshotTestCase):
+    """Tests pour UserSnapshotCache"""
+
+    def test_snapshot_is_loaded_once(self):
+        snapshots = UserSnapshotCache(local_ttl=60, use_cache=True)
+        with self.assertNumQueries(1):
+            snapshots.get(self.user.pk)
+        with self.assertNumQueries(0):
+            user = snapshots.get(self.user.pk)
+        self.assertEqual(user.email, 'ana@example.com')
+
+        # Un autre processus relit le cache partagé, pas la base
+        with self.assertNumQueries(0):
+            UserSnapshotCache(use_cache=True).get(self.user.pk)
+
+    def test_process_local_cache_is_not_used(self):
+        snapshots = UserSnapshotCache(local_ttl=60, use_cache=False)
+        with self.assertNumQueries(1):
+            snapshots.get(self.user.pk)
+        with self.assertNumQueries(0):
+            snapshots.get(self.user.pk)
+        self.assertIsNone(cache.get(user_snapshot._cache_key(self.user.pk)))
+
+        # Les autres processus relisent la base après `USER_SNAPSHOT_LOCAL_TTL`
+        with self.assertNumQueries(1):
+            UserSnapshotCache(use_cache=False).get(self.user.pk)
+
+    def test_deferred_fields_are_loaded_together(self):
+        user = UserSnapshotCache(local_ttl=0).get(self.user.pk)
+        self.assertIn('phone', user.get_deferred_fields())
+        self.assertNotIn('token_version', user.get_deferred_fields())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.phone, '+33600000050')
+            user.password
+        self.assertEqual(user.get_deferred_fields(), set())
+
+    def test_unknown_user(self):
+        self.assertIsNone(UserSnapshotCache().get(0))
+
+    def test_save_invalidates_the_snapshot(self):
+        snapshots = get_user_snapshots()
+        self.assertEqual(snapshots.get(self.user.pk).first_name, '')
+
+        self.user.first_name = 'Ana'
+        self.user.save()
+        self.assertIsNone(cache.get(user_snapshot._cache_key(self.user.pk)))
+        self.assertEqual(snapshots.get(self.user.pk).first_name, 'Ana')
+
+        self.user.set_password('nouveau-mot-de-passe')
+        self.user.save(update_fields=['password'])
+        self.assertEqual(snapshots.get(self.user.pk).token_version, 1)
+
+    def test_fields_outside_the_snapshot_keep_it(self):
+        snapshots = get_user_snapshots()
+        snapshots.get(self.user.pk)
+
+        self.user.phone = '+33600000051'
+        self.user.save(update_fields=['phone'])
+        self.assertIsNotNone(cache.get(user_snapshot._cache_key(self.user.pk)))
@@ -0,0 +1,51 @@
+"""
+Jetons JWT adossés à l'index des jetons révoqués et à la version des jetons
+de l'utilisateur
+"""
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken as SimpleJWTRefreshToken
+
+from .services.token_revocation import get_revocation_index
+
+# Version des jetons de l'utilisateur à l'émission (`User.token_version`)
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+class RefreshToken(SimpleJWTRefreshToken):
+    """
+    Jeton de rafraîchissement dont la vérification de révocation passe par le
+    filtre des jetons révoqués (aucune requête pour un jeton non révoqué)
+    """
+
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        # Copiée dans les jetons d'accès dérivés
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        self.check_token_version()
+
+    def check_token_version(self):
+        """Refuse un jeton émis avant le dernier changement de mot de passe"""
+        from .services.user_snapshot import get_user_snapshots
+
+        token_version = self.payload.get(TOKEN_VERSION_CLAIM)
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if token_version is None or user_id is None:
+            return
+        snapshot = get_user_snapshots().get_snapshot(user_id)
+        if snapshot is not None and snapshot['token_version'] != token_version:
+            raise TokenError("Le jeton est antérieur au dernier changement de mot de passe.")
+
+    def check_blacklist(self):
+        if get_revocation_index().is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError("Le jeton a été révoqué.")
+
+    def blacklist(self):
+        return get_revocation_index().revoke(self)
@@ -6,7 +6,6 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView as DRFTokenRefreshView
 from django.contrib.auth import login, logout
 from django.utils import timezone
@@ -16,7 +15,9 @@ from core.schemas.authentication_schemas import (
 )
 
 from ..models import User, UserSession
-from ..serializers import UserSerializer, UserRegistrationSerializer, UserLoginSerializer
+from ..serializers import UserSerializer, UserRegistrationSerializer, UserLoginSerializer, TokenRefreshSerializer
+from ..services.token_revocation import get_revocation_index
+from ..tokens import RefreshToken
 
 
 @register_schema
@@ -124,6 +125,10 @@ def user_logout(request):
             token = RefreshToken(refresh_token)
             token.blacklist()
         
+        # Révoquer le token d'accès utilisé pour la requête
+        if request.auth is not None:
+            get_revocation_index().revoke(request.auth)
+        
         # Désactiver la session actuelle
         session_key = request.session.session_key
         if session_key:
@@ -157,6 +162,7 @@ class TokenRefreshView(DRFTokenRefreshView):
     
     POST /api/auth/token/refresh/
     """
+    serializer_class = TokenRefreshSerializer
     
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
@@ -6,9 +6,9 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from ..models import TwoFactorAuth, UserSession
+from ..tokens import RefreshToken
 from ..serializers import (
     TwoFactorSetupSerializer,
     TwoFactorVerifySerializer,
@@ -7,6 +7,7 @@ from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 from apps.internationalization.models import Language, LanguagePreference
+from core.utils.write_coalescer import get_write_coalescer
 
 User = get_user_model()
 
@@ -248,7 +249,9 @@ class LanguageService:
         """
         language.translation_count += 1
         language.last_used = timezone.now()
-        language.save()
+        coalescer = get_write_coalescer()
+        coalescer.increment(language, 'translation_count')
+        coalescer.touch(language, 'last_used', language.last_used)
     
     def get_language_stats(self) -> dict:
         """
@@ -9,6 +9,7 @@ from django.contrib.auth import get_user_model
 from apps.internationalization.models import (
     Language, Translation, TranslationKey, TranslationRequest
 )
+from core.utils.write_coalescer import get_write_coalescer
 from .auto_translation_service import AutoTranslationService
 
 User = get_user_model()
@@ -230,10 +231,10 @@ class TranslationService:
                 is_active=True
             )
             
-            # Mettre à jour les statistiques
-            translation_key.usage_count += 1
-            translation_key.last_used = timezone.now()
-            translation_key.save()
+            # Mettre à jour les statistiques (écriture différée)
+            coalescer = get_write_coalescer()
+            coalescer.increment(translation_key, 'usage_count')
+            coalescer.touch(translation_key, 'last_used', timezone.now())
             
             return translation.translated_text
             
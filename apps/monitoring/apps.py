@@ -11,4 +11,6 @@ class MonitoringConfig(AppConfig):
     
     def ready(self):
         """Initialisation de l'app"""
-        import apps.monitoring.signals
\ No newline at end of file
+        import apps.monitoring.signals
+        from apps.monitoring.live.channels import register_channels
+        register_channels()
\ No newline at end of file
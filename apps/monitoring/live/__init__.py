@@ -0,0 +1,13 @@
+"""
+Diffusion en direct (SSE / WebSocket) pour le Monitoring App
+"""
+from .hub import LiveHub, Subscription, Topic, DashboardTopic, LogTailTopic, hub
+
+__all__ = [
+    'LiveHub',
+    'Subscription',
+    'Topic',
+    'DashboardTopic',
+    'LogTailTopic',
+    'hub',
+]
@@ -0,0 +1,141 @@
+"""
+Canaux de diffusion en direct du Monitoring App
+"""
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from apps.monitoring.live.hub import DashboardTopic, LogTailTopic, hub
+
+
+def _authorize_dashboard(user, key):
+    """Vérifie l'accès à un tableau de bord de monitoring"""
+    from apps.monitoring.services import DashboardService
+
+    if user is None:
+        return False
+    try:
+        return DashboardService().get_dashboard(key, user) is not None
+    except (ValueError, ValidationError):
+        return False
+
+
+def _dashboard_topic(key):
+    """Construit le sujet d'un tableau de bord de monitoring"""
+    from apps.monitoring.models import Dashboard
+    from apps.monitoring.services import DashboardService
+
+    dashboard = Dashboard.objects.get(id=key)
+    dashboard_service = DashboardService()
+
+    def producer():
+        return dashboard_service.get_dashboard_data(dashboard)['widgets']
+
+    return DashboardTopic(key, producer, interval=dashboard.refresh_interval)
+
+
+def _authorize_logs(user, key):
+    """Tout utilisateur authentifié peut suivre les logs (filtrés par abonné)"""
+    return user is not None
+
+
+def _serialize_log_entry(log):
+    return {
+        'kind': 'log',
+        'id': str(log.id),
+        'level': log.level,
+        'source': log.source,
+        'message': log.message,
+        'user_id': log.user_id,
+        'path': log.path,
+        'status_code': log.status_code,
+        'created_at': log.created_at.isoformat(),
+    }
+
+
+def _serialize_security_event(event):
+    return {
+        'kind': 'security_event',
+        'id': event.id,
+        'event_type': event.event_type,
+        'severity': event.severity,
+        'title': event.title,
+        'ip_address': event.ip_address,
+        'user_id': event.user_id,
+        'created_at': event.created_at.isoformat(),
+    }
+
+
+def _tail_logs(cursor):
+    """Retourne les entrées apparues depuis le curseur et le nouveau curseur
+
+    Le curseur est partagé par tous les abonnés : une seule requête par tick
+    et par table, quel que soit le nombre de lecteurs.
+    """
+    from django.utils import timezone
+    from apps.monitoring.models import LogEntry
+
+    batch_size = getattr(settings, 'LIVE_LOG_TAIL_BATCH_SIZE', 200)
+    with_security = django_apps.is_installed('apps.security')
+
+    if cursor is None:
+        # Premier tick : on ne rejoue pas l'historique
+        cursor = {'log_at': timezone.now(), 'log_ids': [], 'security_id': 0}
+        if with_security:
+            from apps.security.models import SecurityEvent
+            last_event = SecurityEvent.objects.order_by('-id').values_list('id', flat=True).first()
+            cursor['security_id'] = last_event or 0
+        return [], cursor
+
+    entries = []
+
+    logs = list(
+        LogEntry.objects.filter(created_at__gte=cursor['log_at'])
+        .exclude(id__in=cursor['log_ids'])
+        .select_related('path_ref')
+        .order_by('created_at')[:batch_size]
+    )
+    if logs:
+        last_at = logs[-1].created_at
+        cursor['log_ids'] = [log.id for log in logs if log.created_at == last_at]
+        cursor['log_at'] = last_at
+        entries.extend(_serialize_log_entry(log) for log in logs)
+
+    if with_security:
+        from apps.security.models import SecurityEvent
+
+        events = list(
+            SecurityEvent.objects.filter(id__gt=cursor['security_id'])
+            .order_by('id')[:batch_size]
+        )
+        if events:
+            cursor['security_id'] = events[-1].id
+            entries.extend(_serialize_security_event(event) for event in events)
+
+    return entries, cursor
+
+
+def _accept_log_entry(subscription, entry):
+    """Applique les droits et les filtres d'un abonné à une entrée"""
+    user = subscription.user
+    if not user.is_staff and entry['user_id'] != user.id:
+        return False
+
+    for field in ('kind', 'level', 'source', 'event_type', 'severity'):
+        allowed = subscription.filters.get(field)
+        if allowed and entry.get(field) not in allowed.split(','):
+            return False
+
+    return True
+
+
+def _logs_topic(key):
+    """Construit le sujet du flux de logs"""
+    interval = getattr(settings, 'LIVE_LOG_TAIL_INTERVAL', 2)
+    return LogTailTopic(key, _tail_logs, interval=interval, accept=_accept_log_entry)
+
+
+def register_channels():
+    """Enregistre les canaux du Monitoring App"""
+    hub.register_channel('monitoring.dashboard', _dashboard_topic, _authorize_dashboard)
+    hub.register_channel('monitoring.logs', _logs_topic, _authorize_logs)
@@ -0,0 +1,219 @@
+"""
+Hub de diffusion en direct (tableaux de bord et logs)
+
+Chaque sujet (un tableau de bord, le flux de logs...) possède une seule tâche
+asyncio qui calcule ses données une fois par tick et diffuse les changements à
+tous ses abonnés. Avec N lecteurs, le coût reste d'un calcul par tick.
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Abonnement d'un client à un sujet"""
+
+    def __init__(self, hub, key, user=None, filters=None, maxsize=100):
+        self.hub = hub
+        self.key = key
+        self.user = user
+        self.filters = filters or {}
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+
+    def push(self, event, data):
+        """Ajoute un message à la file du client"""
+        if self.closed:
+            return
+
+        try:
+            self.queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            # Client trop lent : on le déconnecte, il se reconnectera et
+            # recevra un nouvel instantané complet
+            self.closed = True
+            logger.warning(f"Abonné trop lent déconnecté du sujet {self.key}")
+
+    async def get(self, timeout=None):
+        """Attend le prochain message (None en cas de timeout)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        """Ferme l'abonnement"""
+        if not self.closed:
+            self.closed = True
+        self.hub.unsubscribe(self)
+
+
+class Topic:
+    """Sujet calculé périodiquement et diffusé à ses abonnés"""
+
+    def __init__(self, key, interval):
+        self.key = key
+        self.interval = max(interval, 1)
+        self.subscribers = set()
+        self.task = None
+
+    def add(self, subscription):
+        """Ajoute un abonné et démarre la boucle si nécessaire"""
+        self.subscribers.add(subscription)
+        self.on_subscribe(subscription)
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.run())
+
+    def remove(self, subscription):
+        """Retire un abonné"""
+        self.subscribers.discard(subscription)
+
+    def broadcast(self, event, data):
+        """Diffuse un message à tous les abonnés"""
+        for subscription in list(self.subscribers):
+            self.deliver(subscription, event, data)
+
+    def deliver(self, subscription, event, data):
+        """Remet un message à un abonné (surchargeable pour filtrer)"""
+        subscription.push(event, data)
+
+    async def run(self):
+        """Boucle de calcul : un calcul par tick, quel que soit le nombre d'abonnés"""
+        while self.subscribers:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception(f"Erreur lors du calcul du sujet {self.key}")
+            await asyncio.sleep(self.interval)
+
+    def on_subscribe(self, subscription):
+        """Envoie l'état courant à un nouvel abonné"""
+
+    async def tick(self):
+        """Calcule et diffuse les changements"""
+        raise NotImplementedError
+
+
+class DashboardTopic(Topic):
+    """Sujet diffusant les deltas des widgets d'un tableau de bord"""
+
+    def __init__(self, key, producer, interval):
+        super().__init__(key, interval)
+        self.producer = producer
+        self.widgets = None
+
+    def on_subscribe(self, subscription):
+        if self.widgets is not None:
+            subscription.push('snapshot', {'widgets': list(self.widgets.values())})
+
+    async def tick(self):
+        widgets = await sync_to_async(self.producer)()
+        current = {str(widget['id']): widget for widget in widgets}
+
+        if self.widgets is None:
+            self.widgets = current
+            self.broadcast('snapshot', {'widgets': widgets})
+            return
+
+        changed = [
+            widget for widget_id, widget in current.items()
+            if self.widgets.get(widget_id) != widget
+        ]
+        removed = [widget_id for widget_id in self.widgets if widget_id not in current]
+        self.widgets = current
+
+        if changed or removed:
+            self.broadcast('delta', {'widgets': changed, 'removed': removed})
+
+
+class LogTailTopic(Topic):
+    """Sujet diffusant les nouvelles entrées de log (curseur partagé entre abonnés)"""
+
+    def __init__(self, key, producer, interval, accept=None):
+        super().__init__(key, interval)
+        self.producer = producer
+        self.accept = accept
+        self.cursor = None
+
+    def deliver(self, subscription, event, data):
+        entries = [
+            entry for entry in data
+            if self.accept is None or self.accept(subscription, entry)
+        ]
+        if entries:
+            subscription.push(event, entries)
+
+    async def tick(self):
+        entries, self.cursor = await sync_to_async(self.producer)(self.cursor)
+        if entries:
+            self.broadcast('log', entries)
+
+
+class LiveChannel:
+    """Type de sujet exposé aux clients (ex: 'monitoring.dashboard')"""
+
+    def __init__(self, name, topic_factory, authorize):
+        self.name = name
+        self.topic_factory = topic_factory
+        self.authorize = authorize
+
+
+class LiveHub:
+    """Registre des canaux et des sujets actifs du processus"""
+
+    def __init__(self):
+        self.channels = {}
+        self.topics = {}
+
+    def register_channel(self, name, topic_factory, authorize):
+        """Enregistre un canal
+
+        topic_factory(key) construit le sujet ; authorize(user, key) est appelé
+        (de manière synchrone) avant chaque abonnement.
+        """
+        self.channels[name] = LiveChannel(name, topic_factory, authorize)
+
+    def get_channel(self, name):
+        """Retourne un canal enregistré (None s'il n'existe pas)"""
+        return self.channels.get(name)
+
+    async def subscribe(self, channel_name, key, user=None, filters=None):
+        """Abonne un client ; retourne None si le canal est inconnu ou l'accès refusé"""
+        channel = self.get_channel(channel_name)
+        if channel is None:
+            return None
+
+        allowed = await sync_to_async(channel.authorize)(user, key)
+        if not allowed:
+            return None
+
+        topic_key = f'{channel_name}:{key}'
+        topic = self.topics.get(topic_key)
+        if topic is None:
+            created = await sync_to_async(channel.topic_factory)(key)
+            # Un autre abonné a pu créer le sujet pendant la construction
+            topic = self.topics.setdefault(topic_key, created)
+            topic.key = topic_key
+
+        subscription = Subscription(self, topic_key, user=user, filters=filters)
+        topic.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Désabonne un client et libère le sujet s'il n'a plus d'abonnés"""
+        topic = self.topics.get(subscription.key)
+        if topic is None:
+            return
+
+        topic.remove(subscription)
+        if not topic.subscribers:
+            self.topics.pop(subscription.key, None)
+            if topic.task is not None:
+                topic.task.cancel()
+
+
+hub = LiveHub()
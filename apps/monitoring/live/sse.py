@@ -0,0 +1,94 @@
+"""
+Transport Server-Sent Events pour la diffusion en direct
+
+Nécessite un serveur ASGI (uvicorn, daphne...) : le flux est servi par une vue
+asynchrone qui lit la file de l'abonné sans bloquer de worker.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+
+from apps.monitoring.live.hub import hub
+
+# Paramètres de requête réservés au transport (les autres servent de filtres)
+RESERVED_PARAMS = {'token'}
+
+
+def _get_user_from_token(raw_token):
+    """Valide un jeton JWT d'accès et retourne l'utilisateur (None si invalide)"""
+    from apps.authentication.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed, TokenError
+
+    if not raw_token:
+        return None
+
+    authentication = JWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed, TokenError):
+        return None
+
+
+async def authenticate_token(raw_token):
+    """Version asynchrone de l'authentification par jeton"""
+    return await sync_to_async(_get_user_from_token)(raw_token)
+
+
+def get_raw_token(request):
+    """Extrait le jeton de l'en-tête Authorization ou du paramètre ?token=
+
+    EventSource ne permet pas d'envoyer d'en-têtes, d'où le paramètre.
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip()
+    return request.GET.get('token')
+
+
+def format_event(event, data):
+    """Formate un message au format text/event-stream"""
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f'event: {event}\ndata: {payload}\n\n'
+
+
+async def event_stream(subscription):
+    """Générateur asynchrone des messages d'un abonné"""
+    keepalive = getattr(settings, 'LIVE_KEEPALIVE_INTERVAL', 15)
+
+    try:
+        yield 'retry: 5000\n\n'
+        while not subscription.closed:
+            message = await subscription.get(timeout=keepalive)
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(*message)
+    finally:
+        subscription.close()
+
+
+async def live_stream_view(request, channel, key='all'):
+    """Vue SSE : /api/monitoring/live/<canal>/<clé>/"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    user = await authenticate_token(get_raw_token(request))
+    if user is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    filters = {
+        name: value for name, value in request.GET.items()
+        if name not in RESERVED_PARAMS
+    }
+    subscription = await hub.subscribe(channel, str(key), user=user, filters=filters)
+    if subscription is None:
+        return JsonResponse({'error': 'Channel not found or access denied'}, status=404)
+
+    response = StreamingHttpResponse(event_stream(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,77 @@
+"""
+Transport WebSocket pour la diffusion en direct
+
+Application ASGI brute montée par config/asgi.py sur /ws/live/<canal>/<clé>/.
+Le jeton JWT est passé en paramètre ?token=, les autres paramètres servent de
+filtres (comme pour le transport SSE).
+"""
+import asyncio
+import json
+from urllib.parse import parse_qsl
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.monitoring.live.hub import hub
+from apps.monitoring.live.sse import RESERVED_PARAMS, authenticate_token
+
+WEBSOCKET_PREFIX = '/ws/live/'
+
+
+class LiveWebSocketApp:
+    """Application ASGI servant les canaux en direct via WebSocket"""
+
+    async def __call__(self, scope, receive, send):
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        path = scope['path']
+        if not path.startswith(WEBSOCKET_PREFIX):
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+
+        parts = [part for part in path[len(WEBSOCKET_PREFIX):].split('/') if part]
+        if not parts:
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        channel = parts[0]
+        key = parts[1] if len(parts) > 1 else 'all'
+
+        params = dict(parse_qsl(scope.get('query_string', b'').decode()))
+        user = await authenticate_token(params.get('token'))
+        if user is None:
+            await send({'type': 'websocket.close', 'code': 4401})
+            return
+
+        filters = {name: value for name, value in params.items() if name not in RESERVED_PARAMS}
+        subscription = await hub.subscribe(channel, key, user=user, filters=filters)
+        if subscription is None:
+            await send({'type': 'websocket.close', 'code': 4403})
+            return
+
+        await send({'type': 'websocket.accept'})
+        sender = asyncio.ensure_future(self._forward(subscription, send))
+
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                # Les messages entrants (ping applicatif) sont ignorés
+        finally:
+            sender.cancel()
+            subscription.close()
+
+    async def _forward(self, subscription, send):
+        """Transmet les messages de l'abonné au client"""
+        while not subscription.closed:
+            message = await subscription.get()
+            if message is None:
+                continue
+            event, data = message
+            await send({
+                'type': 'websocket.send',
+                'text': json.dumps({'event': event, 'data': data}, cls=DjangoJSONEncoder),
+            })
+
+        await send({'type': 'websocket.close', 'code': 1013})
@@ -0,0 +1,31 @@
+"""
+Commande de déplacement des journaux anciens vers l'archive froide
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.monitoring.services.log_archive import ARCHIVED_MODELS, get_log_archive
+from core.utils.segment_archive import SegmentArchiveError
+
+
+class Command(BaseCommand):
+    help = "Déplace les logs, événements de sécurité et utilisations d'API anciens vers l'archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Âge minimal des lignes archivées, en jours (LOG_ARCHIVE_AFTER_DAYS par défaut)")
+        parser.add_argument('--model', action='append', choices=list(ARCHIVED_MODELS), dest='models',
+                            help="Modèle à archiver (tous par défaut, option répétable)")
+
+    def handle(self, *args, **options):
+        archive = get_log_archive()
+        models = [
+            model for model in archive.models()
+            if not options['models'] or model._meta.label in options['models']
+        ]
+
+        for model in models:
+            try:
+                archived = archive.archive(model, days=options['days'])
+            except (OSError, SegmentArchiveError) as e:
+                raise CommandError(f"{model._meta.label}: {e}")
+            self.stdout.write(self.style.SUCCESS(f"{model._meta.label}: {archived} ligne(s) archivée(s)"))
@@ -36,8 +36,6 @@ class MonitoringMiddleware(MiddlewareMixin):
                 user=user,
                 request=request,
                 metadata={
-                    'request_id': request.id,
-                    'user_agent': request.META.get('HTTP_USER_AGENT', ''),
                     'content_type': request.META.get('CONTENT_TYPE', ''),
                     'content_length': request.META.get('CONTENT_LENGTH', 0),
                 }
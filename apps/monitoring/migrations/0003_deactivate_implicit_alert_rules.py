@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def deactivate_implicit_rules(apps, schema_editor):
+    """Désactive les règles créées à la volée pour les seuils de métrique"""
+    AlertRule = apps.get_model('monitoring', 'AlertRule')
+    for rule in AlertRule.objects.filter(is_enabled=True).only('id', 'metadata', 'severity'):
+        if not (rule.metadata or {}).get('implicit'):
+            continue
+        AlertRule.objects.filter(id=rule.id).update(
+            is_enabled=False,
+            status='inactive',
+            # Seuil d'avertissement : gravité juste en dessous de 'critical'
+            severity='high' if rule.severity == 'medium' else rule.severity,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0002_alter_logentry_source'),
+    ]
+
+    operations = [
+        migrations.RunPython(deactivate_implicit_rules, migrations.RunPython.noop),
+    ]
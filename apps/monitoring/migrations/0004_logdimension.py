@@ -0,0 +1,192 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:39
+
+import hashlib
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Colonnes remplacées par une référence LogDimension : (ancienne colonne, référence, type)
+DIMENSION_COLUMNS = (
+    ('user_agent', 'user_agent_ref', 'user_agent'),
+    ('path', 'path_ref', 'path'),
+    ('app_name', 'app_ref', 'app'),
+    ('module_name', 'module_ref', 'module'),
+)
+
+PATH_PLACEHOLDERS = (
+    ('{id}', re.compile(r'^\d+$')),
+    ('{uuid}', re.compile(r'^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$')),
+    ('{token}', re.compile(r'^(?=.*\d)[\w-]{20,}$')),
+)
+
+
+def _split_path(path):
+    params = []
+    segments = path.split('?', 1)[0].split('/')
+    for index, segment in enumerate(segments):
+        for placeholder, pattern in PATH_PLACEHOLDERS:
+            if pattern.match(segment):
+                params.append(segment)
+                segments[index] = placeholder
+                break
+    return '/'.join(segments), params
+
+
+def _join_path(template, params):
+    """Chemin d'origine : segments remplacés restitués dans l'ordre"""
+    placeholders = {placeholder for placeholder, _ in PATH_PLACEHOLDERS}
+    params = iter(params or ())
+    segments = template.split('/')
+    for index, segment in enumerate(segments):
+        if segment in placeholders:
+            segments[index] = next(params, segment)
+    return '/'.join(segments)
+
+
+def populate_dimensions(apps, schema_editor):
+    """Reporte les anciennes colonnes dans LogDimension et retire leurs copies des métadonnées"""
+    LogEntry = apps.get_model('monitoring', 'LogEntry')
+    LogDimension = apps.get_model('monitoring', 'LogDimension')
+
+    ids = {}
+
+    def resolve(kind, value):
+        if not value:
+            return None
+        value = value[:2000]
+        if kind == 'path':
+            value = _split_path(value)[0]
+        key = (kind, value)
+        if key not in ids:
+            value_hash = hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+            ids[key] = LogDimension.objects.get_or_create(
+                kind=kind, value_hash=value_hash, defaults={'value': value}
+            )[0].pk
+        return ids[key]
+
+    columns = [column for column, _, _ in DIMENSION_COLUMNS]
+    fields = [ref for _, ref, _ in DIMENSION_COLUMNS] + ['metadata']
+    batch = []
+    for entry in LogEntry.objects.only('id', 'metadata', *columns).iterator(chunk_size=2000):
+        for column, ref, kind in DIMENSION_COLUMNS:
+            setattr(entry, f'{ref}_id', resolve(kind, getattr(entry, column)))
+        if isinstance(entry.metadata, dict):
+            for key in ('method', 'path', 'user_agent', 'ip_address'):
+                entry.metadata.pop(key, None)
+            path_params = _split_path(entry.path or '')[1]
+            if path_params:
+                entry.metadata['path_params'] = path_params
+        batch.append(entry)
+        if len(batch) >= 2000:
+            LogEntry.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        LogEntry.objects.bulk_update(batch, fields)
+
+
+def restore_columns(apps, schema_editor):
+    """
+    Recopie les valeurs des références LogDimension dans les anciennes colonnes
+
+    Le chemin d'origine est reconstruit à partir de son modèle et des segments
+    conservés dans `metadata['path_params']`, et les copies retirées des
+    métadonnées sont rétablies depuis les colonnes.
+    """
+    LogEntry = apps.get_model('monitoring', 'LogEntry')
+
+    refs = [ref for _, ref, _ in DIMENSION_COLUMNS]
+    columns = [column for column, _, _ in DIMENSION_COLUMNS]
+    fields = columns + ['metadata']
+    batch = []
+    for entry in LogEntry.objects.select_related(*refs).iterator(chunk_size=2000):
+        for column, ref, _ in DIMENSION_COLUMNS:
+            dimension = getattr(entry, ref)
+            setattr(entry, column, dimension.value if dimension else '')
+        if isinstance(entry.metadata, dict):
+            entry.path = _join_path(entry.path, entry.metadata.pop('path_params', None))
+            for key in ('method', 'path', 'user_agent', 'ip_address'):
+                value = getattr(entry, key)
+                if value:
+                    entry.metadata.setdefault(key, str(value))
+        batch.append(entry)
+        if len(batch) >= 2000:
+            LogEntry.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        LogEntry.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0003_deactivate_implicit_alert_rules'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogDimension',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('user_agent', 'User-Agent'), ('path', 'Modèle de chemin'), ('app', 'Application'), ('module', 'Module')], max_length=20)),
+                ('value', models.TextField()),
+                ('value_hash', models.CharField(max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'monitoring_log_dimension',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='logdimension',
+            constraint=models.UniqueConstraint(fields=('kind', 'value_hash'), name='unique_log_dimension_value'),
+        ),
+        migrations.AddField(
+            model_name='logentry',
+            name='app_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='monitoring.logdimension'),
+        ),
+        migrations.AddField(
+            model_name='logentry',
+            name='module_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='monitoring.logdimension'),
+        ),
+        migrations.AddField(
+            model_name='logentry',
+            name='path_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='monitoring.logdimension'),
+        ),
+        migrations.AddField(
+            model_name='logentry',
+            name='user_agent_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='monitoring.logdimension'),
+        ),
+        migrations.RunPython(populate_dimensions, restore_columns),
+        migrations.RemoveIndex(
+            model_name='logentry',
+            name='monitoring__app_nam_5a2baa_idx',
+        ),
+        migrations.RemoveField(
+            model_name='logentry',
+            name='app_name',
+        ),
+        migrations.RemoveField(
+            model_name='logentry',
+            name='module_name',
+        ),
+        migrations.RemoveField(
+            model_name='logentry',
+            name='path',
+        ),
+        migrations.RemoveField(
+            model_name='logentry',
+            name='user_agent',
+        ),
+        migrations.AddIndex(
+            model_name='logentry',
+            index=models.Index(fields=['app_ref', 'created_at'], name='monitoring__app_ref_14b77b_idx'),
+        ),
+    ]
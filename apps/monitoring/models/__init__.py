@@ -1,6 +1,7 @@
 """
 Modèles pour le Monitoring App
 """
+from .log_dimension import LogDimension
 from .log_entry import LogEntry
 from .metric import Metric, MetricValue
 from .alert import Alert, AlertRule, AlertNotification
@@ -9,7 +10,7 @@ from .system_health import SystemHealth, HealthCheck, HealthCheckResult
 from .dashboard import Dashboard, DashboardWidget
 
 __all__ = [
-    'LogEntry',
+    'LogDimension', 'LogEntry',
     'Metric', 'MetricValue',
     'Alert', 'AlertRule', 'AlertNotification',
     'PerformanceMetric', 'PerformanceReport',
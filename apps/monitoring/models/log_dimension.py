@@ -0,0 +1,45 @@
+"""
+Modèle pour les chaînes répétées des entrées de log
+"""
+import hashlib
+
+from django.db import models
+
+
+class LogDimension(models.Model):
+    """
+    Valeur répétée d'une entrée de log (User-Agent, modèle de chemin, app,
+    module), stockée une seule fois et référencée par identifiant
+    """
+
+    USER_AGENT = 'user_agent'
+    PATH = 'path'
+    APP = 'app'
+    MODULE = 'module'
+
+    KIND_CHOICES = [
+        (USER_AGENT, 'User-Agent'),
+        (PATH, 'Modèle de chemin'),
+        (APP, 'Application'),
+        (MODULE, 'Module'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    value = models.TextField()
+    # Empreinte de la valeur : index unique de taille fixe, quelle que soit la longueur
+    value_hash = models.CharField(max_length=32)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'monitoring_log_dimension'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value_hash'], name='unique_log_dimension_value'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.value[:100]}"
+
+    @staticmethod
+    def hash_value(value: str) -> str:
+        """Empreinte d'une valeur"""
+        return hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
@@ -4,10 +4,47 @@ Modèle pour les entrées de log structurées
 from django.db import models
 from django.contrib.auth import get_user_model
 from core.models import TimestampedModel
+from .log_dimension import LogDimension
 
 User = get_user_model()
 
 
+def _dimension_property(field_name, kind):
+    """
+    Accès par valeur à une référence `LogDimension` : la valeur affectée est
+    résolue en identifiant à l'enregistrement (`LogEntry.resolve_dimensions`)
+    et relue depuis le cache d'interning
+    """
+    def getter(self):
+        pending = self.__dict__.get('_pending_dimensions')
+        if pending and field_name in pending:
+            return pending[field_name][1]
+        field = self._meta.get_field(field_name)
+        if field.is_cached(self):
+            dimension = getattr(self, field_name)
+            return dimension.value if dimension is not None else ''
+        ref_id = getattr(self, f'{field_name}_id')
+        if ref_id is None:
+            return ''
+        from apps.monitoring.services.log_dimensions import get_log_dimensions
+        return get_log_dimensions().value(ref_id)
+
+    def setter(self, value):
+        self.__dict__.setdefault('_pending_dimensions', {})[field_name] = (kind, value or '')
+
+    return property(getter, setter)
+
+
+class LogEntryQuerySet(models.QuerySet):
+    """QuerySet résolvant les références LogDimension avant un `bulk_create`"""
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.resolve_dimensions()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class LogEntry(TimestampedModel):
     """Entrée de log structurée"""
     
@@ -38,21 +75,26 @@ class LogEntry(TimestampedModel):
     session_id = models.CharField(max_length=100, blank=True, db_index=True)
     request_id = models.CharField(max_length=100, blank=True, db_index=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    user_agent = models.TextField(blank=True)
     
     # Métadonnées structurées
     metadata = models.JSONField(default=dict, blank=True)
     tags = models.JSONField(default=list, blank=True)
     
+    # Chaînes répétées (User-Agent, modèle de chemin, app, module) : stockées
+    # une fois dans LogDimension et lues par les propriétés user_agent,
+    # path_template, app_name et module_name. `path` restitue le chemin complet
+    # (modèle + `metadata['path_params']`)
+    user_agent_ref = models.ForeignKey(LogDimension, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    path_ref = models.ForeignKey(LogDimension, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    app_ref = models.ForeignKey(LogDimension, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    module_ref = models.ForeignKey(LogDimension, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    
     # Contexte de l'application
-    app_name = models.CharField(max_length=50, blank=True, db_index=True)
-    module_name = models.CharField(max_length=100, blank=True)
     function_name = models.CharField(max_length=100, blank=True)
     line_number = models.PositiveIntegerField(null=True, blank=True)
     
     # Contexte de la requête
     method = models.CharField(max_length=10, blank=True)
-    path = models.CharField(max_length=500, blank=True)
     status_code = models.PositiveIntegerField(null=True, blank=True)
     response_time = models.FloatField(null=True, blank=True)
     
@@ -61,20 +103,72 @@ class LogEntry(TimestampedModel):
     exception_message = models.TextField(blank=True)
     stack_trace = models.TextField(blank=True)
     
+    objects = LogEntryQuerySet.as_manager()
+    
     class Meta:
         db_table = 'monitoring_log_entry'
         indexes = [
             models.Index(fields=['level', 'created_at']),
             models.Index(fields=['source', 'created_at']),
             models.Index(fields=['user', 'created_at']),
-            models.Index(fields=['app_name', 'created_at']),
+            models.Index(fields=['app_ref', 'created_at']),
             models.Index(fields=['created_at']),
         ]
         ordering = ['-created_at']
     
+    # Propriétés -> références à LogDimension (à passer à select_related pour une liste)
+    DIMENSION_PROPERTIES = {
+        'user_agent': 'user_agent_ref',
+        'path_template': 'path_ref',
+        'app_name': 'app_ref',
+        'module_name': 'module_ref',
+    }
+    DIMENSION_FIELDS = tuple(DIMENSION_PROPERTIES.values())
+    
+    user_agent = _dimension_property('user_agent_ref', LogDimension.USER_AGENT)
+    path_template = _dimension_property('path_ref', LogDimension.PATH)
+    app_name = _dimension_property('app_ref', LogDimension.APP)
+    module_name = _dimension_property('module_ref', LogDimension.MODULE)
+    
     def __str__(self):
         return f"[{self.level}] {self.source}: {self.message[:100]}"
     
+    @property
+    def path(self):
+        """Chemin complet de la requête (`/api/users/42/`)"""
+        from apps.monitoring.services.log_dimensions import join_path
+        return join_path(self.path_template, (self.metadata or {}).get('path_params'))
+    
+    @path.setter
+    def path(self, value):
+        # Modèle stocké dans LogDimension, identifiants dans les métadonnées
+        from apps.monitoring.services.log_dimensions import split_path
+        template, params = split_path(value or '')
+        self.path_template = template
+        metadata = {key: value for key, value in (self.metadata or {}).items() if key != 'path_params'}
+        if params:
+            metadata['path_params'] = params
+        self.metadata = metadata
+    
+    def resolve_dimensions(self):
+        """Résout les valeurs affectées aux propriétés en références LogDimension"""
+        pending = self.__dict__.pop('_pending_dimensions', None)
+        if not pending:
+            return
+        from apps.monitoring.services.log_dimensions import get_log_dimensions
+        dimensions = get_log_dimensions()
+        for field_name, (kind, value) in pending.items():
+            setattr(self, f'{field_name}_id', dimensions.resolve(kind, value))
+    
+    def save(self, *args, **kwargs):
+        self.resolve_dimensions()
+        super().save(*args, **kwargs)
+    
+    def full_clean(self, exclude=None, **kwargs):
+        """Les références LogDimension viennent du cache d'interning : pas de requête de validation"""
+        exclude = set(exclude or ()) | set(self.DIMENSION_FIELDS)
+        super().full_clean(exclude=exclude, **kwargs)
+    
     @property
     def is_error(self):
         """Vérifie si c'est une erreur"""
@@ -11,6 +11,12 @@ class LogEntrySerializer(serializers.ModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
     is_error = serializers.BooleanField(read_only=True)
     is_warning = serializers.BooleanField(read_only=True)
+    # Valeurs des références LogDimension
+    user_agent = serializers.CharField(required=False, allow_blank=True)
+    path = serializers.CharField(required=False, allow_blank=True, max_length=500)
+    path_template = serializers.CharField(read_only=True)
+    app_name = serializers.CharField(required=False, allow_blank=True, max_length=50)
+    module_name = serializers.CharField(required=False, allow_blank=True, max_length=100)
     
     class Meta:
         model = LogEntry
@@ -18,7 +24,7 @@ class LogEntrySerializer(serializers.ModelSerializer):
             'id', 'level', 'source', 'message', 'user', 'user_email',
             'session_id', 'request_id', 'ip_address', 'user_agent',
             'metadata', 'tags', 'app_name', 'module_name', 'function_name',
-            'line_number', 'method', 'path', 'status_code', 'response_time',
+            'line_number', 'method', 'path', 'path_template', 'status_code', 'response_time',
             'exception_type', 'exception_message', 'stack_trace',
             'is_error', 'is_warning', 'created_at', 'updated_at'
         ]
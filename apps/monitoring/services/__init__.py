@@ -7,6 +7,9 @@ from .alert_service import AlertService
 from .performance_service import PerformanceService
 from .health_service import HealthService
 from .dashboard_service import DashboardService
+from .dashboard_engine import DashboardEngine
+from .log_dimensions import LogDimensionCache, get_log_dimensions
+from .log_archive import LogArchive, get_log_archive
 
 __all__ = [
     'LoggingService',
@@ -15,6 +18,11 @@ __all__ = [
     'PerformanceService',
     'HealthService',
     'DashboardService',
+    'DashboardEngine',
+    'LogDimensionCache',
+    'get_log_dimensions',
+    'LogArchive',
+    'get_log_archive',
 ]
 
 
@@ -0,0 +1,434 @@
+"""
+Moteur d'évaluation des règles d'alerte en flux
+
+Les règles actives sont compilées en mémoire et indexées par métrique. Chaque
+observation met à jour des fenêtres glissantes incrémentales (avg, sum, count,
+rate, min, max, percentile sur N secondes) et une machine à états par règle
+(ok -> pending -> firing -> ok). Seules les transitions sont persistées : une
+règle qui reste en dépassement ne crée qu'une seule Alert.
+
+Configuration d'une règle (AlertRule.metadata) :
+    aggregation   'last' (défaut), 'avg', 'sum', 'count', 'rate', 'min', 'max', 'percentile'
+    window        taille de la fenêtre en secondes (défaut 60 si agrégation)
+    percentile    rang du percentile (défaut 95)
+    cooldown      délai minimal en secondes entre deux déclenchements
+    labels        labels que l'observation doit porter pour être prise en compte
+AlertRule.duration est la durée `for:` pendant laquelle la condition doit tenir.
+"""
+import bisect
+import logging
+import operator
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION_CACHE_KEY = 'monitoring_alert_rules_version'
+
+COMPARATORS = {
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'eq': operator.eq,
+    'neq': operator.ne,
+}
+
+# Règles implicites dérivées des seuils de Metric : le seuil d'avertissement
+# est le niveau juste en dessous du seuil critique ('warning' n'est pas une
+# gravité d'AlertRule)
+THRESHOLD_SEVERITIES = {
+    'warning_threshold': 'high',
+    'critical_threshold': 'critical',
+}
+
+
+def bump_rules_version():
+    """Invalide l'index compilé de tous les processus"""
+    cache.set(RULES_VERSION_CACHE_KEY, time.time(), None)
+
+
+class SlidingWindow:
+    """Fenêtre glissante temporelle mise à jour de manière incrémentale
+
+    add() et expire() sont en O(1) amorti : somme et compte courants, deques
+    monotones pour min/max. Seuls les percentiles maintiennent une liste triée
+    (recherche dichotomique, bornée par max_samples).
+    """
+
+    def __init__(self, seconds, max_samples=10000, track_extrema=False, track_sorted=False):
+        self.seconds = seconds
+        self.max_samples = max_samples
+        self.samples = deque()
+        self.total = 0.0
+        self.min_queue = deque() if track_extrema else None
+        self.max_queue = deque() if track_extrema else None
+        self.sorted_values = [] if track_sorted else None
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, timestamp, value):
+        """Ajoute une observation"""
+        self.samples.append((timestamp, value))
+        self.total += value
+
+        if self.min_queue is not None:
+            while self.min_queue and self.min_queue[-1][1] > value:
+                self.min_queue.pop()
+            self.min_queue.append((timestamp, value))
+            while self.max_queue and self.max_queue[-1][1] < value:
+                self.max_queue.pop()
+            self.max_queue.append((timestamp, value))
+
+        if self.sorted_values is not None:
+            bisect.insort(self.sorted_values, value)
+
+        if len(self.samples) > self.max_samples:
+            self._evict()
+        self.expire(timestamp)
+
+    def expire(self, now):
+        """Retire les observations sorties de la fenêtre"""
+        cutoff = now - self.seconds
+        while self.samples and self.samples[0][0] <= cutoff:
+            self._evict()
+
+    def _evict(self):
+        timestamp, value = self.samples.popleft()
+        self.total -= value
+
+        if self.min_queue is not None:
+            if self.min_queue and self.min_queue[0] == (timestamp, value):
+                self.min_queue.popleft()
+            if self.max_queue and self.max_queue[0] == (timestamp, value):
+                self.max_queue.popleft()
+
+        if self.sorted_values is not None:
+            index = bisect.bisect_left(self.sorted_values, value)
+            del self.sorted_values[index]
+
+    def aggregate(self, aggregation, percentile=95):
+        """Calcule l'agrégat courant (None si la fenêtre est vide)"""
+        if not self.samples:
+            return None
+
+        if aggregation == 'avg':
+            return self.total / len(self.samples)
+        if aggregation == 'sum':
+            return self.total
+        if aggregation == 'count':
+            return len(self.samples)
+        if aggregation == 'rate':
+            return self.total / self.seconds if self.seconds else self.total
+        if aggregation == 'min':
+            return self.min_queue[0][1]
+        if aggregation == 'max':
+            return self.max_queue[0][1]
+        if aggregation == 'percentile':
+            index = int(round((percentile / 100) * (len(self.sorted_values) - 1)))
+            return self.sorted_values[index]
+        return self.samples[-1][1]
+
+
+class CompiledRule:
+    """Règle compilée : prédicat, fenêtre et état"""
+
+    OK = 'ok'
+    PENDING = 'pending'
+    FIRING = 'firing'
+
+    def __init__(self, key, metric_id, condition, threshold, severity, name,
+                 rule_id=None, duration=0, aggregation='last', window=0,
+                 percentile=95, cooldown=0, labels=None, max_samples=10000):
+        self.key = key
+        self.metric_id = metric_id
+        self.rule_id = rule_id
+        self.name = name
+        self.condition = condition
+        self.compare = COMPARATORS[condition]
+        self.threshold = threshold
+        self.severity = severity
+        self.duration = duration
+        self.aggregation = aggregation
+        self.percentile = percentile
+        self.cooldown = cooldown
+        self.labels = labels or {}
+
+        self.window = None
+        if aggregation != 'last':
+            self.window = SlidingWindow(
+                window or 60,
+                max_samples=max_samples,
+                track_extrema=aggregation in ('min', 'max'),
+                track_sorted=aggregation == 'percentile',
+            )
+
+        # État de la machine
+        self.current = None
+        self.state = self.OK
+        self.pending_since = None
+        self.last_fired_at = None
+        self.alert_id = None
+
+    @property
+    def signature(self):
+        """Définition de la règle (l'état est conservé si elle ne change pas)"""
+        return (
+            self.condition, self.threshold, self.severity, self.duration,
+            self.aggregation, self.window.seconds if self.window else 0,
+            self.percentile, self.cooldown, tuple(sorted(self.labels.items())),
+        )
+
+    def matches(self, labels):
+        """Vérifie que l'observation porte les labels requis par la règle"""
+        return all((labels or {}).get(key) == value for key, value in self.labels.items())
+
+    def observe(self, timestamp, value):
+        """Met à jour la fenêtre et l'état ; retourne 'firing', 'resolved' ou None"""
+        if self.window is not None:
+            self.window.add(timestamp, value)
+            current = self.window.aggregate(self.aggregation, self.percentile)
+        else:
+            current = value
+        self.current = current
+
+        if current is not None and self.compare(current, self.threshold):
+            if self.state == self.OK:
+                self.state = self.PENDING
+                self.pending_since = timestamp
+
+            if self.state == self.PENDING and timestamp - self.pending_since >= self.duration:
+                in_cooldown = (
+                    self.last_fired_at is not None
+                    and timestamp - self.last_fired_at < self.cooldown
+                )
+                if not in_cooldown:
+                    self.state = self.FIRING
+                    self.last_fired_at = timestamp
+                    return 'firing'
+            return None
+
+        previous = self.state
+        self.state = self.OK
+        self.pending_since = None
+        return 'resolved' if previous == self.FIRING else None
+
+    def restore(self, other):
+        """Reprend l'état et la fenêtre d'une compilation précédente"""
+        self.window = other.window
+        self.state = other.state
+        self.pending_since = other.pending_since
+        self.last_fired_at = other.last_fired_at
+        self.alert_id = other.alert_id
+
+
+class AlertEngine:
+    """Index compilé des règles d'alerte, évalué à chaque observation"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.rules_by_metric = {}
+        self.version = None
+        self.last_version_check = 0
+        self.version_check_interval = getattr(settings, 'ALERT_ENGINE_VERSION_CHECK_INTERVAL', 5)
+        self.max_samples = getattr(settings, 'ALERT_ENGINE_MAX_WINDOW_SAMPLES', 10000)
+
+    def observe(self, metric, metric_value):
+        """Évalue les règles d'une métrique pour une nouvelle valeur
+
+        Retourne les alertes créées. Aucune requête n'est émise tant qu'aucune
+        règle ne change d'état.
+        """
+        self._ensure_compiled()
+
+        timestamp = metric_value.timestamp.timestamp()
+        transitions = []
+
+        with self.lock:
+            for rule in self.rules_by_metric.get(metric.id, ()):
+                if not rule.matches(metric_value.labels):
+                    continue
+                transition = rule.observe(timestamp, metric_value.value)
+                if transition:
+                    transitions.append((rule, transition))
+
+        alerts = []
+        for rule, transition in transitions:
+            if transition == 'firing':
+                alerts.append(self._fire(rule, metric, metric_value))
+            else:
+                self._resolve(rule)
+        return alerts
+
+    def invalidate(self):
+        """Force la recompilation au prochain appel"""
+        with self.lock:
+            self.version = None
+            self.last_version_check = 0
+
+    def _ensure_compiled(self):
+        """Recompile l'index si la version des règles a changé"""
+        now = time.time()
+        if self.version is not None and now - self.last_version_check < self.version_check_interval:
+            return
+
+        version = cache.get(RULES_VERSION_CACHE_KEY)
+        if version is None:
+            bump_rules_version()
+            version = cache.get(RULES_VERSION_CACHE_KEY)
+
+        with self.lock:
+            self.last_version_check = now
+            if version != self.version:
+                self._compile()
+                self.version = version
+
+    def _compile(self):
+        """Charge les règles actives et les seuils de métriques en mémoire"""
+        from apps.monitoring.models import Alert, AlertRule, Metric
+
+        previous = {
+            rule.key: rule
+            for rules in self.rules_by_metric.values()
+            for rule in rules
+        }
+        compiled = {}
+
+        for rule in AlertRule.objects.filter(is_enabled=True, status='active'):
+            metadata = rule.metadata or {}
+            if metadata.get('implicit'):
+                continue
+            aggregation = metadata.get('aggregation', 'last')
+            compiled_rule = CompiledRule(
+                key=f'rule:{rule.id}',
+                metric_id=rule.metric_id,
+                rule_id=rule.id,
+                name=rule.name,
+                condition=rule.condition,
+                threshold=rule.threshold,
+                severity=rule.severity,
+                duration=rule.duration,
+                aggregation=aggregation,
+                window=metadata.get('window', 0),
+                percentile=metadata.get('percentile', 95),
+                cooldown=metadata.get('cooldown', 0),
+                labels=metadata.get('labels'),
+                max_samples=self.max_samples,
+            )
+            compiled.setdefault(rule.metric_id, []).append(compiled_rule)
+
+        metrics = Metric.objects.filter(is_active=True).exclude(
+            warning_threshold__isnull=True, critical_threshold__isnull=True
+        )
+        for metric in metrics:
+            for field, severity in THRESHOLD_SEVERITIES.items():
+                threshold = getattr(metric, field)
+                if threshold is None:
+                    continue
+                compiled.setdefault(metric.id, []).append(CompiledRule(
+                    key=f'metric:{metric.id}:{field}',
+                    metric_id=metric.id,
+                    name=f'{metric.name}:{field}',
+                    condition='gt',
+                    threshold=threshold,
+                    severity=severity,
+                    max_samples=self.max_samples,
+                ))
+
+        # Conserver l'état des règles inchangées
+        for rules in compiled.values():
+            for rule in rules:
+                old = previous.get(rule.key)
+                if old is not None and old.signature == rule.signature:
+                    rule.restore(old)
+                    rule.rule_id = rule.rule_id or old.rule_id
+
+        # Reprendre les alertes en cours après un redémarrage
+        if not previous:
+            firing = dict(
+                Alert.objects.filter(status='firing')
+                .order_by('created_at')
+                .values_list('rule_id', 'id')
+            )
+            for rules in compiled.values():
+                for rule in rules:
+                    if rule.rule_id in firing:
+                        rule.state = CompiledRule.FIRING
+                        rule.alert_id = firing[rule.rule_id]
+
+        self.rules_by_metric = compiled
+
+    def _fire(self, rule, metric, metric_value):
+        """Persiste la transition vers l'état 'firing'"""
+        from apps.monitoring.services import AlertService
+
+        alert_rule = self._get_alert_rule(rule, metric)
+        value = rule.current
+        alert = AlertService().create_alert(
+            rule=alert_rule,
+            metric_value=metric_value,
+            severity=rule.severity,
+            message=f"Rule '{rule.name}' triggered: {value} {rule.condition} {rule.threshold}",
+            labels=metric_value.labels,
+            annotations={'aggregation': rule.aggregation, 'aggregated_value': value},
+        )
+        rule.alert_id = alert.id
+        return alert
+
+    def _resolve(self, rule):
+        """Persiste la transition vers l'état résolu"""
+        from apps.monitoring.models import Alert
+
+        if rule.alert_id is None:
+            return
+        Alert.objects.filter(id=rule.alert_id, status='firing').update(
+            status='resolved',
+            resolved_at=timezone.now(),
+        )
+        rule.alert_id = None
+
+    def _get_alert_rule(self, rule, metric):
+        """Retourne l'AlertRule associée (créée à la volée pour les seuils de métrique)
+
+        Les règles implicites ne servent qu'à rattacher les alertes des seuils :
+        elles sont créées désactivées pour ne pas s'ajouter aux règles configurées.
+        """
+        from apps.monitoring.models import AlertRule
+
+        if rule.rule_id is not None and not rule.key.startswith('metric:'):
+            return AlertRule.objects.get(id=rule.rule_id)
+
+        alert_rule, _ = AlertRule.objects.update_or_create(
+            name=rule.name,
+            metric=metric,
+            defaults={
+                'condition': rule.condition,
+                'threshold': rule.threshold,
+                'severity': rule.severity,
+                'status': 'inactive',
+                'is_enabled': False,
+                'metadata': {'implicit': True},
+            },
+        )
+        rule.rule_id = alert_rule.id
+        return alert_rule
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_alert_engine():
+    """Retourne le moteur d'alerte du processus"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AlertEngine()
+    return _engine
@@ -38,26 +38,14 @@ class AlertService:
         return alert
     
     def evaluate_alert_rules(self, metric_value):
-        """Évalue toutes les règles d'alerte pour une valeur de métrique"""
-        rules = AlertRule.objects.filter(
-            metric=metric_value.metric,
-            is_enabled=True,
-            status='active'
-        )
-        
-        triggered_alerts = []
+        """Évalue toutes les règles d'alerte pour une valeur de métrique
         
-        for rule in rules:
-            if rule.evaluate(metric_value):
-                alert = self.create_alert(
-                    rule=rule,
-                    metric_value=metric_value,
-                    severity=rule.severity,
-                    message=f"Rule '{rule.name}' triggered: {metric_value.value} {rule.condition} {rule.threshold}"
-                )
-                triggered_alerts.append(alert)
+        Délègue au moteur compilé, qui ne crée une alerte qu'au passage à
+        l'état 'firing' (fenêtres, durée `for:` et cooldown pris en compte).
+        """
+        from apps.monitoring.services.alert_engine import get_alert_engine
         
-        return triggered_alerts
+        return get_alert_engine().observe(metric_value.metric, metric_value)
     
     def acknowledge_alert(self, alert, user):
         """Acquitte une alerte"""
@@ -219,7 +207,10 @@ class AlertService:
     
     def _send_notifications(self, alert):
         """Envoie les notifications pour une alerte"""
-        from apps.monitoring.services import NotificationService
+        if not alert.rule.notification_channels:
+            return
+        
+        from apps.monitoring.services.notification_service import NotificationService
         
         notification_service = NotificationService()
         
@@ -0,0 +1,176 @@
+"""
+Moteur d'évaluation des widgets de tableau de bord
+
+Chaque widget est mis en cache sous sa propre clé, avec un TTL tiré de son
+intervalle de rafraîchissement. Les widgets absents du cache sont calculés en
+parallèle dans un pool de threads borné ; un widget expiré est servi tel quel
+pendant qu'un unique rafraîchissement (single-flight) le recalcule.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Résultat d'un rafraîchissement en arrière-plan qui n'a rien calculé
+_NOT_REFRESHED = object()
+
+
+def get_executor():
+    """Retourne le pool de threads partagé (None si l'évaluation est synchrone)"""
+    global _executor
+
+    max_workers = getattr(settings, 'DASHBOARD_ENGINE_MAX_WORKERS', 4)
+    if max_workers <= 0:
+        return None
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix='dashboard-engine',
+                )
+    return _executor
+
+
+class DashboardEngine:
+    """Évalue et met en cache les widgets d'un tableau de bord"""
+
+    # Requêtes en cours dans ce processus, partagées entre toutes les instances
+    _inflight = {}
+    _inflight_lock = threading.Lock()
+
+    def __init__(self, compute, key_prefix, get_ttl=None, default_ttl=30):
+        self.compute = compute
+        self.key_prefix = key_prefix
+        self.get_ttl = get_ttl
+        self.default_ttl = default_ttl
+        self.stale_ttl = getattr(settings, 'DASHBOARD_ENGINE_STALE_TTL', 300)
+        self.lock_timeout = getattr(settings, 'DASHBOARD_ENGINE_LOCK_TIMEOUT', 30)
+        self.wait_timeout = getattr(settings, 'DASHBOARD_ENGINE_WAIT_TIMEOUT', 5)
+
+    def get_cache_key(self, widget):
+        """Clé de cache d'un widget, versionnée par sa date de modification"""
+        updated_at = getattr(widget, 'updated_at', None)
+        version = int(updated_at.timestamp() * 1000) if updated_at else 0
+        return f'{self.key_prefix}_{widget.id}_{version}'
+
+    def get_widget_ttl(self, widget):
+        """Durée de fraîcheur d'un widget en secondes"""
+        ttl = self.get_ttl(widget) if self.get_ttl else None
+        return ttl or self.default_ttl
+
+    def evaluate(self, widgets):
+        """Évalue une liste de widgets et retourne leurs données dans l'ordre"""
+        widgets = list(widgets)
+        results = [None] * len(widgets)
+        pending = []
+
+        for index, widget in enumerate(widgets):
+            cache_key = self.get_cache_key(widget)
+            entry = cache.get(cache_key)
+
+            if entry is not None:
+                if entry['expires_at'] <= time.time():
+                    # Donnée périmée : servie immédiatement, rafraîchie en arrière-plan
+                    self._refresh(widget, cache_key, wait_for_lock=False)
+                results[index] = entry['data']
+            else:
+                pending.append((index, widget, cache_key, self._refresh(widget, cache_key, wait_for_lock=True)))
+
+        for index, widget, cache_key, future in pending:
+            data = future.result()
+            if data is _NOT_REFRESHED:
+                # Rafraîchissement en arrière-plan rejoint, mais abandonné
+                # (verrou tenu par un autre processus ou erreur)
+                data = self._wait_for_value(widget, cache_key)
+            results[index] = data
+
+        return results
+
+    def evaluate_one(self, widget):
+        """Évalue un seul widget"""
+        return self.evaluate([widget])[0]
+
+    def invalidate(self, widget):
+        """Supprime les données en cache d'un widget"""
+        cache.delete(self.get_cache_key(widget))
+
+    def _refresh(self, widget, cache_key, wait_for_lock):
+        """Lance (ou rejoint) le calcul d'un widget et retourne un Future"""
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            if future is not None:
+                return future
+
+            future = Future()
+            self._inflight[cache_key] = future
+
+        executor = get_executor()
+        if executor is None:
+            self._run(widget, cache_key, wait_for_lock, future, in_worker=False)
+        else:
+            executor.submit(self._run, widget, cache_key, wait_for_lock, future, in_worker=True)
+        return future
+
+    def _run(self, widget, cache_key, wait_for_lock, future, in_worker):
+        """Calcule un widget sous verrou single-flight partagé entre processus"""
+        lock_key = f'{cache_key}_lock'
+
+        try:
+            if in_worker:
+                close_old_connections()
+
+            if cache.add(lock_key, 1, self.lock_timeout):
+                try:
+                    future.set_result(self._compute_and_store(widget, cache_key))
+                finally:
+                    cache.delete(lock_key)
+            elif not wait_for_lock:
+                # Un autre processus rafraîchit déjà ce widget
+                future.set_result(_NOT_REFRESHED)
+            else:
+                future.set_result(self._wait_for_value(widget, cache_key))
+        except Exception as e:
+            if wait_for_lock:
+                future.set_exception(e)
+            else:
+                logger.exception(f"Erreur lors du rafraîchissement du widget {widget.id}")
+                future.set_result(_NOT_REFRESHED)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+            if in_worker:
+                connections.close_all()
+
+    def _wait_for_value(self, widget, cache_key):
+        """Attend le résultat calculé par un autre processus, puis calcule en dernier recours"""
+        deadline = time.time() + self.wait_timeout
+        while time.time() < deadline:
+            entry = cache.get(cache_key)
+            if entry is not None:
+                return entry['data']
+            time.sleep(0.05)
+
+        return self._compute_and_store(widget, cache_key)
+
+    def _compute_and_store(self, widget, cache_key):
+        """Calcule les données d'un widget et les met en cache"""
+        ttl = self.get_widget_ttl(widget)
+        data = self.compute(widget)
+
+        cache.set(
+            cache_key,
+            {'data': data, 'expires_at': time.time() + ttl},
+            ttl + self.stale_ttl,
+        )
+        return data
@@ -5,6 +5,7 @@ from django.utils import timezone
 from django.core.cache import cache
 from django.db.models import Count, Avg, Sum
 from apps.monitoring.models import Dashboard, DashboardWidget
+from apps.monitoring.services.dashboard_engine import DashboardEngine
 
 
 class DashboardService:
@@ -12,6 +13,11 @@ class DashboardService:
     
     def __init__(self):
         self.cache_timeout = 300  # 5 minutes
+        self.engine = DashboardEngine(
+            compute=self._get_widget_data,
+            key_prefix='monitoring_widget',
+            get_ttl=self._get_widget_refresh_interval,
+        )
     
     def create_dashboard(self, name, owner, description='', **kwargs):
         """Crée un nouveau tableau de bord"""
@@ -114,29 +120,26 @@ class DashboardService:
     
     def get_dashboard_data(self, dashboard):
         """Récupère les données d'un tableau de bord"""
-        cache_key = f'dashboard_data_{dashboard.id}'
-        data = cache.get(cache_key)
-        
-        if data is None:
-            widgets = dashboard.get_widgets()
-            data = {
-                'dashboard': {
-                    'id': dashboard.id,
-                    'name': dashboard.name,
-                    'description': dashboard.description,
-                    'refresh_interval': dashboard.refresh_interval,
-                    'created_at': dashboard.created_at.isoformat(),
-                },
-                'widgets': []
-            }
-            
-            for widget in widgets:
-                widget_data = self._get_widget_data(widget)
-                data['widgets'].append(widget_data)
-            
-            cache.set(cache_key, data, self.cache_timeout)
+        widgets = dashboard.get_widgets()
         
-        return data
+        return {
+            'dashboard': {
+                'id': dashboard.id,
+                'name': dashboard.name,
+                'description': dashboard.description,
+                'refresh_interval': dashboard.refresh_interval,
+                'created_at': dashboard.created_at.isoformat(),
+            },
+            'widgets': self.engine.evaluate(widgets),
+        }
+    
+    def get_widget_data(self, widget):
+        """Récupère les données d'un widget (mises en cache individuellement)"""
+        return self.engine.evaluate_one(widget)
+    
+    def _get_widget_refresh_interval(self, widget):
+        """Intervalle de rafraîchissement d'un widget, hérité du tableau de bord par défaut"""
+        return widget.config.get('refresh_interval') or widget.dashboard.refresh_interval
     
     def _get_widget_data(self, widget):
         """Récupère les données d'un widget"""
@@ -0,0 +1,236 @@
+"""
+Archivage froid des journaux (LogEntry, SecurityEvent, APIUsage)
+
+Les lignes plus anciennes que `LOG_ARCHIVE_AFTER_DAYS` jours sont déplacées
+de la base vers des segments compressés (`core.utils.segment_archive`) sous
+`LOG_ARCHIVE_ROOT`, puis supprimées de la base : les tables restent petites.
+Chaque ligne archivée est autonome (valeurs `LogDimension` comprises) et
+reste lisible sans base de données.
+
+`search` relit l'archive en instances non enregistrées du modèle : la
+recherche des logs fusionne ces instances avec les lignes de la base.
+`iter_search` les lit en flux, sans tri ni chargement complet, pour les
+exports. L'archivage est lancé par la commande `archive_logs`.
+"""
+import threading
+from datetime import timedelta
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from core.utils.segment_archive import SegmentStore
+from apps.monitoring.models import LogDimension
+
+# Modèles archivables -> champ indexé comme niveau
+ARCHIVED_MODELS = {
+    'monitoring.LogEntry': 'level',
+    'security.SecurityEvent': 'severity',
+    'api.APIUsage': 'status',
+}
+
+# Lignes supprimées par requête après l'écriture d'un segment
+DELETE_BATCH_SIZE = 500
+
+
+class LogArchive:
+    """
+    Déplacement des journaux anciens vers l'archive et lecture de l'archive
+    """
+
+    def __init__(self, root: str = None, after_days: int = None, codec: str = None,
+                 block_rows: int = None, segment_rows: int = None):
+        self.after_days = (
+            after_days if after_days is not None
+            else getattr(settings, 'LOG_ARCHIVE_AFTER_DAYS', 90)
+        )
+        self.store = SegmentStore(
+            root or getattr(settings, 'LOG_ARCHIVE_ROOT', settings.BASE_DIR / 'archive'),
+            codec=codec or getattr(settings, 'LOG_ARCHIVE_CODEC', 'zstd'),
+            block_rows=block_rows or getattr(settings, 'LOG_ARCHIVE_BLOCK_ROWS', 1000),
+            segment_rows=segment_rows or getattr(settings, 'LOG_ARCHIVE_SEGMENT_ROWS', 50000),
+        )
+
+    def models(self) -> list:
+        """Modèles archivables des apps installées"""
+        models = []
+        for label in ARCHIVED_MODELS:
+            try:
+                models.append(django_apps.get_model(label))
+            except LookupError:
+                continue
+        return models
+
+    def cutoff(self, days: int = None):
+        """Date avant laquelle les lignes sont archivées"""
+        return timezone.now() - timedelta(days=self.after_days if days is None else days)
+
+    # Archivage
+
+    def archive(self, model, days: int = None) -> int:
+        """
+        Archive les lignes de `model` plus anciennes que `days` jours
+
+        Chaque lot est écrit dans l'archive avant d'être supprimé de la base :
+        une interruption entre les deux laisse un doublon, ignoré à la lecture,
+        jamais une perte.
+
+        Returns:
+            int: Nombre de lignes archivées
+        """
+        cutoff = self.cutoff(days)
+        queryset = model.objects.filter(created_at__lt=cutoff).order_by('created_at', 'pk')
+        dimension_fields = getattr(model, 'DIMENSION_FIELDS', ())
+        if dimension_fields:
+            queryset = queryset.select_related(*dimension_fields)
+
+        archived = 0
+        while True:
+            rows = list(queryset[:self.store.segment_rows])
+            if not rows:
+                return archived
+            self.store.write(
+                model._meta.db_table,
+                [self.to_record(row) for row in rows],
+                level_key=ARCHIVED_MODELS[model._meta.label],
+                user_key='user_id',
+            )
+            pks = [row.pk for row in rows]
+            with transaction.atomic():
+                for start in range(0, len(pks), DELETE_BATCH_SIZE):
+                    model.objects.filter(pk__in=pks[start:start + DELETE_BATCH_SIZE]).delete()
+            archived += len(rows)
+
+    @staticmethod
+    def to_record(instance) -> dict:
+        """Enregistrement d'archive d'une instance (références LogDimension résolues)"""
+        record = {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+        for name, ref in getattr(instance, 'DIMENSION_PROPERTIES', {}).items():
+            record.pop(f'{ref}_id', None)
+            record[name] = getattr(instance, name)
+        return record
+
+    @staticmethod
+    def from_record(model, record: dict):
+        """Instance non enregistrée reconstruite depuis un enregistrement d'archive"""
+        values = {
+            field.attname: field.to_python(record[field.attname])
+            for field in model._meta.concrete_fields
+            if field.attname in record
+        }
+        instance = model(**values)
+        for name, ref in getattr(model, 'DIMENSION_PROPERTIES', {}).items():
+            value = record.get(name)
+            model._meta.get_field(ref).set_cached_value(
+                instance, LogDimension(value=value) if value else None
+            )
+        instance._state.adding = False
+        return instance
+
+    # Lecture
+
+    def search(self, model, start=None, end=None, levels: Iterable = None, user_ids: Iterable = None,
+               match: Callable[[dict], bool] = None, limit: Optional[int] = None) -> List:
+        """
+        Instances archivées correspondant aux critères, de la plus récente à la plus ancienne
+
+        Args:
+            levels: Valeurs du champ de niveau du modèle (`level`, `severity`, `status`)
+            match: Filtre appliqué à l'enregistrement brut (dict)
+            limit: Nombre maximal d'instances (seuls les segments utiles sont lus)
+        """
+        criteria = self._criteria(model, start, end, levels, user_ids, match)
+        table = model._meta.db_table
+        if limit is not None:
+            records = self.store.newest(table, limit, **criteria)
+        else:
+            records = self.store.scan(table, **criteria)
+
+        instances = list(self._instances(model, records))
+        if limit is None:
+            instances.sort(key=lambda instance: instance.created_at, reverse=True)
+        if instances and self._has_user(model):
+            prefetch_related_objects(instances, 'user')
+        return instances
+
+    def iter_search(self, model, start=None, end=None, levels: Iterable = None, user_ids: Iterable = None,
+                    match: Callable[[dict], bool] = None, chunk_size: int = 1000) -> Iterator:
+        """
+        Instances archivées correspondant aux critères, lues en flux (ordre des segments)
+
+        Rien n'est trié ni chargé en entier : seuls les identifiants déjà lus
+        sont conservés, et les utilisateurs sont préchargés par lots de
+        `chunk_size` instances.
+        """
+        records = self.store.scan(model._meta.db_table, **self._criteria(model, start, end, levels, user_ids, match))
+        instances = self._instances(model, records)
+        has_user = self._has_user(model)
+        while True:
+            chunk = list(islice(instances, chunk_size))
+            if not chunk:
+                return
+            if has_user:
+                prefetch_related_objects(chunk, 'user')
+            yield from chunk
+
+    @staticmethod
+    def _criteria(model, start, end, levels, user_ids, match) -> dict:
+        if user_ids is not None:
+            # Identifiants tels qu'écrits par l'encodeur JSON (UUID en chaîne)
+            user_ids = [user_id if isinstance(user_id, int) else str(user_id) for user_id in user_ids]
+        return {
+            'start': start,
+            'end': end,
+            'levels': levels,
+            'user_ids': user_ids,
+            'level_key': ARCHIVED_MODELS[model._meta.label],
+            'user_key': 'user_id',
+            'match': match,
+        }
+
+    def _instances(self, model, records: Iterable[dict]) -> Iterator:
+        """Instances des enregistrements, sans doublon"""
+        # Un lot archivé deux fois (interruption avant la suppression) n'est lu qu'une fois
+        pk_name = model._meta.pk.attname
+        seen = set()
+        for record in records:
+            pk = record.get(pk_name)
+            if pk in seen:
+                continue
+            seen.add(pk)
+            yield self.from_record(model, record)
+
+    @staticmethod
+    def _has_user(model) -> bool:
+        return any(field.name == 'user' for field in model._meta.concrete_fields)
+
+    def merge(self, model, rows: list, limit: Optional[int] = None, **criteria) -> list:
+        """
+        Lignes de la base complétées par les instances archivées correspondant
+        aux critères, de la plus récente à la plus ancienne
+        """
+        archived = self.search(model, limit=limit, **criteria)
+        if not archived:
+            return rows
+        seen = {row.pk for row in rows}
+        rows = rows + [instance for instance in archived if instance.pk not in seen]
+        rows.sort(key=lambda row: row.created_at, reverse=True)
+        return rows[:limit] if limit is not None else rows
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_log_archive() -> LogArchive:
+    """Retourne l'archive des journaux du processus"""
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = LogArchive()
+    return _archive
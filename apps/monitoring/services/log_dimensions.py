@@ -0,0 +1,172 @@
+"""
+Interning des chaînes répétées des entrées de log
+
+Les User-Agent, chemins, noms d'app et de module d'un `LogEntry` reviennent à
+l'identique sur des milliers de lignes : chacun est stocké une seule fois dans
+`LogDimension` et référencé par identifiant. Les chemins sont ramenés à leur
+modèle (`/api/users/42/` -> `/api/users/{id}/`) pour que les identifiants ne
+créent pas une dimension par ressource ; les segments remplacés sont conservés
+dans `metadata['path_params']` et `join_path` restitue le chemin d'origine.
+
+Le cache du processus associe (type, valeur) à l'identifiant et
+l'identifiant à la valeur, dans la limite de `LOG_DIMENSION_CACHE_SIZE`
+entrées (LRU). Une valeur créée dans une transaction n'est mise en cache
+qu'après sa validation : un identifiant annulé n'est jamais réutilisé.
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from apps.monitoring.models import LogDimension
+
+# Segments de chemin remplacés dans le modèle, testés dans l'ordre
+PATH_PLACEHOLDERS = (
+    ('{id}', re.compile(r'^\d+$')),
+    ('{uuid}', re.compile(r'^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$')),
+    # Jetons (réinitialisation, vérification...) : longs et contenant un chiffre
+    ('{token}', re.compile(r'^(?=.*\d)[\w-]{20,}$')),
+)
+
+# Longueur maximale d'une valeur stockée
+MAX_VALUE_LENGTH = 2000
+
+
+def split_path(path: str) -> Tuple[str, list]:
+    """
+    Modèle d'un chemin et valeurs des segments remplacés
+
+    Returns:
+        tuple: (modèle, liste des segments remplacés, dans l'ordre)
+    """
+    path = (path or '').split('?', 1)[0]
+    params = []
+    segments = path.split('/')
+    for index, segment in enumerate(segments):
+        for placeholder, pattern in PATH_PLACEHOLDERS:
+            if pattern.match(segment):
+                params.append(segment)
+                segments[index] = placeholder
+                break
+    return '/'.join(segments), params
+
+
+def path_template(path: str) -> str:
+    """Modèle d'un chemin (identifiants remplacés par `{id}`, `{uuid}`, `{token}`)"""
+    return split_path(path)[0]
+
+
+def join_path(template: str, params: Optional[Iterable[str]]) -> str:
+    """Chemin d'origine : segments remplacés restitués dans l'ordre (inverse de `split_path`)"""
+    placeholders = {placeholder for placeholder, _ in PATH_PLACEHOLDERS}
+    params = iter(params or ())
+    segments = (template or '').split('/')
+    for index, segment in enumerate(segments):
+        if segment in placeholders:
+            segments[index] = next(params, segment)
+    return '/'.join(segments)
+
+
+class LogDimensionCache:
+    """
+    Cache borné (type, valeur) <-> identifiant `LogDimension`
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = (
+            max_size if max_size is not None
+            else getattr(settings, 'LOG_DIMENSION_CACHE_SIZE', 10000)
+        )
+        self._ids: 'OrderedDict[Tuple[str, str], int]' = OrderedDict()
+        self._values: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, kind: str, value: Optional[str]) -> Optional[int]:
+        """
+        Identifiant de la valeur, créée si nécessaire
+
+        Returns:
+            int: Identifiant, ou None pour une valeur vide
+        """
+        if not value:
+            return None
+        value = str(value)[:MAX_VALUE_LENGTH]
+        if kind == LogDimension.PATH:
+            value = path_template(value)
+
+        key = (kind, value)
+        with self._lock:
+            dimension_id = self._ids.get(key)
+            if dimension_id is not None:
+                self._ids.move_to_end(key)
+                return dimension_id
+
+        dimension_id = self._get_or_create(kind, value)
+        transaction.on_commit(lambda: self._remember(key, dimension_id))
+        return dimension_id
+
+    def resolve_many(self, kind: str, values: Iterable[str]) -> Dict[str, int]:
+        """Identifiants de plusieurs valeurs : {valeur: identifiant}"""
+        return {value: self.resolve(kind, value) for value in set(values) if value}
+
+    def value(self, dimension_id: int) -> str:
+        """Valeur d'un identifiant"""
+        with self._lock:
+            value = self._values.get(dimension_id)
+        if value is not None:
+            return value
+
+        dimension = LogDimension.objects.filter(pk=dimension_id).values_list('kind', 'value').first()
+        if dimension is None:
+            return ''
+        kind, value = dimension
+        self._remember((kind, value), dimension_id)
+        return value
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._ids.clear()
+            self._values.clear()
+
+    def _get_or_create(self, kind: str, value: str) -> int:
+        value_hash = LogDimension.hash_value(value)
+        dimension_id = LogDimension.objects.filter(
+            kind=kind, value_hash=value_hash
+        ).values_list('id', flat=True).first()
+        if dimension_id is not None:
+            return dimension_id
+        try:
+            with transaction.atomic():
+                return LogDimension.objects.create(kind=kind, value=value, value_hash=value_hash).pk
+        except IntegrityError:
+            # Créée entre-temps par un autre processus
+            return LogDimension.objects.get(kind=kind, value_hash=value_hash).pk
+
+    def _remember(self, key: Tuple[str, str], dimension_id: int):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._ids[key] = dimension_id
+            self._ids.move_to_end(key)
+            self._values[dimension_id] = key[1]
+            while len(self._ids) > self.max_size:
+                _, evicted_id = self._ids.popitem(last=False)
+                self._values.pop(evicted_id, None)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_log_dimensions() -> LogDimensionCache:
+    """Retourne le cache de dimensions de log du processus"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LogDimensionCache()
+    return _cache
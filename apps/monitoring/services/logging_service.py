@@ -5,7 +5,42 @@ import logging
 import json
 from django.utils import timezone
 from django.core.cache import cache
+from django.db.models import Q
 from apps.monitoring.models import LogEntry
+from .log_archive import get_log_archive
+from .log_dimensions import join_path, split_path
+
+# Champs du contexte de requête stockés en colonnes : jamais recopiés dans les métadonnées
+REQUEST_CONTEXT_FIELDS = ('method', 'path', 'user_agent', 'ip_address', 'request_id', 'status_code', 'response_time')
+
+
+def clean_metadata(metadata):
+    """Nettoie les métadonnées pour la sérialisation JSON"""
+    if not isinstance(metadata, dict):
+        return {}
+    
+    clean = {}
+    for key, value in metadata.items():
+        # Convertir les clés en string
+        clean_key = str(key)
+        
+        # Nettoyer les valeurs
+        if value is None:
+            clean[clean_key] = None
+        elif isinstance(value, (str, int, float, bool)):
+            clean[clean_key] = value
+        elif isinstance(value, (list, tuple)):
+            clean[clean_key] = [
+                str(item) if not isinstance(item, (str, int, float, bool, type(None))) 
+                else item for item in value
+            ]
+        elif isinstance(value, dict):
+            clean[clean_key] = clean_metadata(value)
+        else:
+            # Convertir les autres types en string
+            clean[clean_key] = str(value)
+    
+    return clean
 
 
 class LoggingService:
@@ -17,14 +52,19 @@ class LoggingService:
     def log(self, level, message, source='system', user=None, **kwargs):
         """Enregistre un log structuré"""
         
-        # Extraction des métadonnées
-        metadata = kwargs.get('metadata', {})
+        # Extraction des métadonnées (copie : le dict de l'appelant n'est pas modifié)
+        metadata = dict(kwargs.get('metadata') or {})
         tags = kwargs.get('tags', [])
         
-        # Contexte de la requête
+        # Contexte de la requête : stocké en colonnes, retiré des métadonnées
+        context = {field: metadata.pop(field, None) for field in REQUEST_CONTEXT_FIELDS}
+        for field in REQUEST_CONTEXT_FIELDS:
+            if kwargs.get(field) is not None:
+                context[field] = kwargs[field]
+        
         request = kwargs.get('request')
         if request:
-            metadata.update({
+            context.update({
                 'method': getattr(request, 'method', ''),
                 'path': getattr(request, 'path', ''),
                 'user_agent': request.META.get('HTTP_USER_AGENT', ''),
@@ -33,10 +73,10 @@ class LoggingService:
             
             # Session et requête ID
             session_id = getattr(request, 'session', {}).get('session_key', '')
-            request_id = getattr(request, 'id', '')
+            request_id = getattr(request, 'id', '') or context['request_id'] or ''
         else:
             session_id = kwargs.get('session_id', '')
-            request_id = kwargs.get('request_id', '')
+            request_id = context['request_id'] or ''
         
         # Contexte de l'application
         app_name = kwargs.get('app_name', '')
@@ -49,12 +89,8 @@ class LoggingService:
         exception_message = kwargs.get('exception_message', '')
         stack_trace = kwargs.get('stack_trace', '')
         
-        # Performance
-        response_time = kwargs.get('response_time')
-        status_code = kwargs.get('status_code')
-        
         # Nettoyer les métadonnées pour la sérialisation JSON
-        clean_metadata = self._clean_metadata(metadata)
+        metadata = clean_metadata(metadata)
         
         # Création de l'entrée de log
         log_entry = LogEntry.objects.create(
@@ -64,18 +100,18 @@ class LoggingService:
             user=user,
             session_id=session_id,
             request_id=request_id,
-            ip_address=metadata.get('ip_address'),
-            user_agent=metadata.get('user_agent', ''),
-            metadata=clean_metadata,
+            ip_address=context['ip_address'] or None,
+            user_agent=context['user_agent'] or '',
+            metadata=metadata,
             tags=tags,
             app_name=app_name,
             module_name=module_name,
             function_name=function_name,
             line_number=line_number,
-            method=metadata.get('method', ''),
-            path=metadata.get('path', ''),
-            status_code=status_code,
-            response_time=response_time,
+            method=context['method'] or '',
+            path=context['path'] or '',
+            status_code=context['status_code'],
+            response_time=context['response_time'],
             exception_type=exception_type,
             exception_message=exception_message,
             stack_trace=stack_trace,
@@ -122,7 +158,7 @@ class LoggingService:
         return self.error(message, **kwargs)
     
     def get_logs(self, level=None, source=None, user=None, hours=24, limit=100):
-        """Récupère les logs avec filtres"""
+        """Récupère les logs avec filtres (base et archive), du plus récent au plus ancien"""
         from datetime import timedelta
         
         end_time = timezone.now()
@@ -140,7 +176,17 @@ class LoggingService:
         if user:
             queryset = queryset.filter(user=user)
         
-        return queryset.order_by('-created_at')[:limit]
+        queryset = queryset.select_related('user', *LogEntry.DIMENSION_FIELDS)
+        return get_log_archive().merge(
+            LogEntry,
+            list(queryset.order_by('-created_at')[:limit]),
+            limit=limit,
+            start=start_time,
+            end=end_time,
+            levels=[level] if level else None,
+            user_ids=[user.pk] if user else None,
+            match=(lambda record: record['source'] == source) if source else None,
+        )
     
     def get_log_statistics(self, hours=24):
         """Récupère les statistiques des logs"""
@@ -188,8 +234,8 @@ class LoggingService:
         
         return stats
     
-    def search_logs(self, query, level=None, source=None, hours=24, limit=100):
-        """Recherche dans les logs"""
+    def search_logs(self, query, level=None, source=None, user=None, hours=24, limit=100):
+        """Recherche dans les logs (base et archive), du plus récent au plus ancien"""
         from datetime import timedelta
         
         end_time = timezone.now()
@@ -200,20 +246,56 @@ class LoggingService:
             created_at__lte=end_time
         )
         
-        # Recherche textuelle
+        # Recherche textuelle (le chemin est cherché par modèle et par chemin complet)
         if query:
-            queryset = queryset.filter(
-                models.Q(message__icontains=query) |
-                models.Q(exception_message__icontains=query) |
-                models.Q(metadata__icontains=query)
+            condition = (
+                Q(message__icontains=query) |
+                Q(exception_message__icontains=query) |
+                Q(metadata__icontains=query) |
+                Q(path_ref__value__icontains=query)
             )
+            template, params = split_path(query)
+            if params:
+                condition |= Q(path_ref__value__icontains=template, metadata__path_params=params)
+            queryset = queryset.filter(condition)
         
         if level:
             queryset = queryset.filter(level=level)
         if source:
             queryset = queryset.filter(source=source)
+        if user:
+            queryset = queryset.filter(user=user)
+        
+        queryset = queryset.select_related('user', *LogEntry.DIMENSION_FIELDS)
+        return get_log_archive().merge(
+            LogEntry,
+            list(queryset.order_by('-created_at')[:limit]),
+            limit=limit,
+            start=start_time,
+            end=end_time,
+            levels=[level] if level else None,
+            user_ids=[user.pk] if user else None,
+            match=self._archive_match(query, source),
+        )
+    
+    @staticmethod
+    def _archive_match(query, source):
+        """Filtre des entrées archivées équivalent à celui de `search_logs`"""
+        query = (query or '').lower()
         
-        return queryset.order_by('-created_at')[:limit]
+        def match(record):
+            if source and record['source'] != source:
+                return False
+            if not query:
+                return True
+            metadata = record['metadata'] or {}
+            path = join_path(record['path_template'], metadata.get('path_params'))
+            return any(
+                query in (value or '').lower()
+                for value in (record['message'], record['exception_message'], record['path_template'], path)
+            ) or query in json.dumps(metadata).lower()
+        
+        return match
     
     def _get_client_ip(self, request):
         """Récupère l'IP du client"""
@@ -290,34 +372,6 @@ class StructuredLogger:
         
         return self.error(message, **kwargs)
     
-    def _clean_metadata(self, metadata):
-        """Nettoie les métadonnées pour la sérialisation JSON"""
-        if not isinstance(metadata, dict):
-            return {}
-        
-        clean_metadata = {}
-        for key, value in metadata.items():
-            # Convertir les clés en string
-            clean_key = str(key)
-            
-            # Nettoyer les valeurs
-            if value is None:
-                clean_metadata[clean_key] = None
-            elif isinstance(value, (str, int, float, bool)):
-                clean_metadata[clean_key] = value
-            elif isinstance(value, (list, tuple)):
-                clean_metadata[clean_key] = [
-                    str(item) if not isinstance(item, (str, int, float, bool, type(None))) 
-                    else item for item in value
-                ]
-            elif isinstance(value, dict):
-                clean_metadata[clean_key] = self._clean_metadata(value)
-            else:
-                # Convertir les autres types en string
-                clean_metadata[clean_key] = str(value)
-        
-        return clean_metadata
-    
     def _format_traceback(self, traceback):
         """Formate la traceback"""
         import traceback
@@ -237,28 +237,14 @@ class MetricsService:
             return deleted
     
     def _check_alert_thresholds(self, metric, metric_value):
-        """Vérifie les seuils d'alerte pour une métrique"""
-        from apps.monitoring.services import AlertService
+        """Vérifie les seuils et les règles d'alerte pour une métrique
         
-        alert_service = AlertService()
+        L'évaluation passe par le moteur compilé : aucune requête n'est émise
+        tant qu'aucune règle ne change d'état.
+        """
+        from apps.monitoring.services.alert_engine import get_alert_engine
         
-        # Vérifier le seuil d'avertissement
-        if metric.warning_threshold and metric_value.value > metric.warning_threshold:
-            alert_service.create_alert(
-                metric=metric,
-                metric_value=metric_value,
-                severity='warning',
-                message=f"Metric {metric.display_name} exceeded warning threshold: {metric_value.value} > {metric.warning_threshold}"
-            )
-        
-        # Vérifier le seuil critique
-        if metric.critical_threshold and metric_value.value > metric.critical_threshold:
-            alert_service.create_alert(
-                metric=metric,
-                metric_value=metric_value,
-                severity='critical',
-                message=f"Metric {metric.display_name} exceeded critical threshold: {metric_value.value} > {metric.critical_threshold}"
-            )
+        return get_alert_engine().observe(metric, metric_value)
     
     def _invalidate_metric_cache(self, metric_name):
         """Invalide le cache d'une métrique"""
@@ -5,27 +5,31 @@ from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
-from apps.monitoring.models import LogEntry, Metric, Alert, SystemHealth
+from core.utils.bulk_signals import batched_receiver
+from apps.monitoring.models import LogEntry, Metric, Alert, AlertRule, SystemHealth
 from apps.monitoring.services import LoggingService, MetricsService, AlertService
+from apps.monitoring.services.alert_engine import bump_rules_version
 
 User = get_user_model()
 
 
-@receiver(post_save, sender=User)
-def log_user_creation(sender, instance, created, **kwargs):
-    """Log la création d'un utilisateur"""
-    if created:
-        logging_service = LoggingService()
-        logging_service.info(
-            f"User created: {instance.email}",
+@batched_receiver(post_save, sender=User, created_only=True)
+def log_user_creation(sender, events):
+    """Log la création d'utilisateurs"""
+    LogEntry.objects.bulk_create([
+        LogEntry(
+            level='INFO',
             source='user',
-            user=instance,
+            message=f"User created: {event.instance.email}",
+            user=event.instance,
             metadata={
-                'user_id': instance.id,
-                'is_staff': instance.is_staff,
-                'is_superuser': instance.is_superuser,
+                'user_id': event.instance.id,
+                'is_staff': event.instance.is_staff,
+                'is_superuser': event.instance.is_superuser,
             }
         )
+        for event in events
+    ])
 
 
 @receiver(post_save, sender=LogEntry)
@@ -63,6 +67,15 @@ def metric_created(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender=AlertRule)
+@receiver(post_save, sender=Metric)
+@receiver(pre_delete, sender=AlertRule)
+@receiver(pre_delete, sender=Metric)
+def alert_rules_changed(sender, instance, **kwargs):
+    """Invalide l'index compilé des règles d'alerte"""
+    bump_rules_version()
+
+
 @receiver(post_save, sender=Alert)
 def alert_created(sender, instance, created, **kwargs):
     """Log la création d'une alerte"""
@@ -1,3 +1,655 @@
-from django.test import TestCase
+"""
+Tests pour l'app Monitoring
+"""
+import io
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, models, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.analytics.models import DataExport
+from apps.analytics.services import ExportService
+from apps.monitoring.live.hub import DashboardTopic, LiveHub
+from apps.monitoring.models import AlertRule, LogDimension, LogEntry, Metric
+from apps.monitoring.services import log_archive
+from apps.monitoring.services.alert_engine import THRESHOLD_SEVERITIES, AlertEngine, CompiledRule, SlidingWindow
+from apps.monitoring.services.dashboard_engine import DashboardEngine
+from apps.monitoring.services.log_archive import LogArchive
+from apps.monitoring.services.log_dimensions import LogDimensionCache, get_log_dimensions, split_path
+from apps.monitoring.services.logging_service import LoggingService
+from apps.monitoring.views.log_views import LogEntryFilter
+from apps.security.models import SecurityEvent
+
+
+def make_widget(widget_id, refresh_interval=30):
+    """Crée un widget factice"""
+    return SimpleNamespace(
+        id=widget_id,
+        refresh_interval=refresh_interval,
+        updated_at=datetime(2024, 1, 1, tzinfo=dt_timezone.utc),
+    )
+
+
+class DashboardEngineTestCase(SimpleTestCase):
+    """Tests pour le moteur d'évaluation des widgets"""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+        self.calls_lock = threading.Lock()
+        # Points de synchronisation optionnels du calcul
+        self.barrier = None
+        self.started = threading.Event()
+        self.release = None
+
+    def compute(self, widget):
+        with self.calls_lock:
+            self.calls.append(widget.id)
+        self.started.set()
+        if self.barrier is not None:
+            self.barrier.wait()
+        if self.release is not None:
+            self.assertTrue(self.release.wait(5))
+        return {'id': widget.id, 'value': len(self.calls)}
+
+    def make_engine(self):
+        return DashboardEngine(
+            compute=self.compute,
+            key_prefix='test_widget',
+            get_ttl=lambda widget: widget.refresh_interval,
+        )
+
+    def expire(self, engine, widget):
+        cache_key = engine.get_cache_key(widget)
+        entry = cache.get(cache_key)
+        entry['expires_at'] = time.time() - 1
+        cache.set(cache_key, entry)
+        return cache_key
+
+    def test_widgets_are_cached_individually(self):
+        """Chaque widget est calculé une fois puis servi depuis le cache"""
+        engine = self.make_engine()
+        widgets = [make_widget(1), make_widget(2)]
+
+        first = engine.evaluate(widgets)
+        second = engine.evaluate(widgets)
+
+        self.assertEqual([w['id'] for w in first], [1, 2])
+        self.assertEqual(first, second)
+        self.assertEqual(sorted(self.calls), [1, 2])
+
+    def test_misses_are_evaluated_concurrently(self):
+        """Les widgets absents du cache sont calculés en parallèle"""
+        engine = self.make_engine()
+        widgets = [make_widget(i) for i in range(4)]
+        # Un calcul séquentiel ne franchirait jamais la barrière
+        self.barrier = threading.Barrier(len(widgets), timeout=5)
+
+        data = engine.evaluate(widgets)
+
+        self.assertEqual([w['id'] for w in data], [0, 1, 2, 3])
+
+    def test_stale_data_is_served_while_refreshing(self):
+        """Une donnée expirée est servie pendant son recalcul"""
+        engine = self.make_engine()
+        widget = make_widget(1, refresh_interval=30)
+        engine.evaluate_one(widget)
+        cache_key = self.expire(engine, widget)
+
+        self.started.clear()
+        self.release = threading.Event()
+        stale = engine.evaluate_one(widget)
+        self.assertEqual(stale['value'], 1)
+
+        # Le recalcul est en cours (bloqué) : on récupère son Future puis on le libère
+        self.assertTrue(self.started.wait(5))
+        with DashboardEngine._inflight_lock:
+            future = DashboardEngine._inflight[cache_key]
+        self.release.set()
+        future.result(timeout=5)
+
+        self.assertEqual(engine.evaluate_one(widget)['value'], 2)
+
+    def test_concurrent_viewers_share_one_computation(self):
+        """Des lecteurs simultanés ne déclenchent qu'un seul calcul"""
+        engine = self.make_engine()
+        widget = make_widget(1)
+        self.release = threading.Event()
+
+        threads = [threading.Thread(target=engine.evaluate_one, args=(widget,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(self.started.wait(5))
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, [1])
+
+    @override_settings(DASHBOARD_ENGINE_MAX_WORKERS=0, DASHBOARD_ENGINE_WAIT_TIMEOUT=0)
+    def test_miss_joining_abandoned_refresh_computes_value(self):
+        """Un lecteur qui rejoint un rafraîchissement abandonné obtient quand même la donnée"""
+        engine = self.make_engine()
+        widget = make_widget(1)
+        cache_key = engine.get_cache_key(widget)
+
+        # Rafraîchissement d'arrière-plan abandonné : verrou tenu par un autre processus
+        cache.add(f'{cache_key}_lock', 1, 30)
+        abandoned = engine._refresh(widget, cache_key, wait_for_lock=False)
+
+        with mock.patch.object(engine, '_refresh', return_value=abandoned):
+            data = engine.evaluate_one(widget)
+
+        self.assertEqual(data, {'id': 1, 'value': 1})
+
+    @override_settings(DASHBOARD_ENGINE_MAX_WORKERS=0)
+    def test_synchronous_mode(self):
+        """Sans pool de threads, les widgets sont calculés dans le thread appelant"""
+        engine = self.make_engine()
+
+        data = engine.evaluate([make_widget(1), make_widget(2)])
+
+        self.assertEqual([w['id'] for w in data], [1, 2])
+
+
+class LiveHubTestCase(SimpleTestCase):
+    """Tests pour le hub de diffusion en direct"""
+
+    def setUp(self):
+        self.ticks = 0
+        self.hub = LiveHub()
+        self.hub.register_channel('test.dashboard', self.make_topic, lambda user, key: key != 'forbidden')
+
+    def produce(self):
+        self.ticks += 1
+        return [{'id': 1, 'value': self.ticks}, {'id': 2, 'value': 0}]
+
+    def make_topic(self, key):
+        return DashboardTopic(key, self.produce, interval=1)
+
+    async def test_one_computation_per_tick_for_all_subscribers(self):
+        """N abonnés partagent un seul calcul par tick"""
+        subscriptions = [await self.hub.subscribe('test.dashboard', '1') for _ in range(5)]
+
+        for subscription in subscriptions:
+            event, data = await subscription.get(timeout=2)
+            self.assertEqual(event, 'snapshot')
+            self.assertEqual(len(data['widgets']), 2)
+        self.assertEqual(self.ticks, 1)
+
+        event, data = await subscriptions[0].get(timeout=2)
+        self.assertEqual(event, 'delta')
+        self.assertEqual(data['widgets'], [{'id': 1, 'value': 2}])
+        self.assertEqual(self.ticks, 2)
+
+        for subscription in subscriptions:
+            subscription.close()
+        self.assertEqual(self.hub.topics, {})
+
+    async def test_access_denied(self):
+        """Un abonnement refusé retourne None"""
+        self.assertIsNone(await self.hub.subscribe('test.dashboard', 'forbidden'))
+        self.assertIsNone(await self.hub.subscribe('unknown', '1'))
+
+
+class SlidingWindowTestCase(SimpleTestCase):
+    """Tests pour les fenêtres glissantes incrémentales"""
+
+    def test_aggregates_follow_the_window(self):
+        """Les agrégats ne portent que sur les observations de la fenêtre"""
+        window = SlidingWindow(60, track_extrema=True, track_sorted=True)
+        for timestamp, value in [(0, 10), (15, 30), (20, 20), (70, 40)]:
+            window.add(timestamp, value)
+
+        # L'observation à t=0 est sortie de la fenêtre
+        self.assertEqual(len(window), 3)
+        self.assertEqual(window.aggregate('avg'), 30)
+        self.assertEqual(window.aggregate('sum'), 90)
+        self.assertEqual(window.aggregate('min'), 20)
+        self.assertEqual(window.aggregate('max'), 40)
+        self.assertEqual(window.aggregate('percentile', 50), 30)
+        self.assertEqual(window.aggregate('rate'), 1.5)
+
+    def test_max_samples_bound(self):
+        """La fenêtre est bornée en nombre d'observations"""
+        window = SlidingWindow(3600, max_samples=3)
+        for timestamp in range(10):
+            window.add(timestamp, 1)
+
+        self.assertEqual(len(window), 3)
+        self.assertEqual(window.aggregate('sum'), 3)
+
+
+class CompiledRuleTestCase(SimpleTestCase):
+    """Tests pour la machine à états des règles compilées"""
+
+    def make_rule(self, **kwargs):
+        return CompiledRule(
+            key='rule:1', metric_id=1, condition='gt', threshold=100,
+            severity='high', name='cpu', **kwargs
+        )
+
+    def test_fires_once_and_resolves(self):
+        """Une règle en dépassement continu ne déclenche qu'une transition"""
+        rule = self.make_rule()
+
+        transitions = [rule.observe(t, 150) for t in range(5)]
+        self.assertEqual(transitions, ['firing', None, None, None, None])
+        self.assertEqual(rule.observe(5, 50), 'resolved')
+        self.assertIsNone(rule.observe(6, 50))
+
+    def test_for_duration(self):
+        """La condition doit tenir pendant `duration` secondes"""
+        rule = self.make_rule(duration=30)
+
+        self.assertIsNone(rule.observe(0, 150))
+        self.assertIsNone(rule.observe(20, 150))
+        self.assertEqual(rule.observe(30, 150), 'firing')
+
+    def test_windowed_average(self):
+        """Un pic isolé ne déclenche pas une règle sur moyenne"""
+        rule = self.make_rule(aggregation='avg', window=60)
+
+        self.assertIsNone(rule.observe(0, 50))
+        self.assertIsNone(rule.observe(1, 140))
+        self.assertEqual(rule.observe(2, 200), 'firing')
+
+    def test_cooldown(self):
+        """Pas de nouveau déclenchement pendant le cooldown"""
+        rule = self.make_rule(cooldown=60)
+
+        self.assertEqual(rule.observe(0, 150), 'firing')
+        self.assertEqual(rule.observe(1, 50), 'resolved')
+        self.assertIsNone(rule.observe(2, 150))
+        self.assertEqual(rule.observe(61, 150), 'firing')
+
+
+class ImplicitAlertRuleTestCase(TestCase):
+    """Tests pour les règles créées à la volée pour les seuils de métrique"""
+
+    def test_threshold_rules_are_created_inactive(self):
+        """Une règle implicite ne s'active pas et garde la gravité du seuil"""
+        metric = Metric.objects.create(
+            name='cpu_usage', display_name='CPU', metric_type='gauge', warning_threshold=80,
+        )
+        rule = CompiledRule(
+            key=f'metric:{metric.id}:warning_threshold', metric_id=metric.id, condition='gt',
+            threshold=80, severity=THRESHOLD_SEVERITIES['warning_threshold'],
+            name='cpu_usage:warning_threshold',
+        )
+
+        alert_rule = AlertEngine()._get_alert_rule(rule, metric)
+
+        self.assertFalse(alert_rule.is_enabled)
+        self.assertEqual(alert_rule.status, 'inactive')
+        self.assertEqual(alert_rule.severity, 'high')
+        self.assertFalse(AlertRule.objects.filter(is_enabled=True, status='active').exists())
+
+
+class SplitPathTestCase(SimpleTestCase):
+    """Tests pour split_path"""
+
+    def test_identifiers_are_replaced_in_order(self):
+        self.assertEqual(
+            split_path('/api/users/42/sessions/3f2b8c4e-1d2a-4b3c-9d8e-7f6a5b4c3d2e/'),
+            ('/api/users/{id}/sessions/{uuid}/', ['42', '3f2b8c4e-1d2a-4b3c-9d8e-7f6a5b4c3d2e']),
+        )
+        self.assertEqual(
+            split_path('/api/auth/reset/Mq7xKz2vPw9rT4nB8cLd/?next=/'),
+            ('/api/auth/reset/{token}/', ['Mq7xKz2vPw9rT4nB8cLd']),
+        )
+
+    def test_plain_segments_are_kept(self):
+        self.assertEqual(split_path('/api/users/me/'), ('/api/users/me/', []))
+        # Segment long sans chiffre : un nom, pas un jeton
+        self.assertEqual(split_path('/api/notification-preferences/')[1], [])
+        self.assertEqual(split_path(None), ('', []))
+
+
+class LogDimensionCacheTestCase(TestCase):
+    """Tests pour LogDimensionCache"""
+
+    def setUp(self):
+        self.dimensions = LogDimensionCache(max_size=2)
+
+    def resolve(self, kind, value):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.dimensions.resolve(kind, value)
+
+    def test_values_are_interned(self):
+        first = self.resolve(LogDimension.PATH, '/api/users/42/')
+        self.assertEqual(self.resolve(LogDimension.PATH, '/api/users/7/'), first)
+        self.assertNotEqual(self.resolve(LogDimension.APP, '/api/users/{id}/'), first)
+        self.assertIsNone(self.resolve(LogDimension.APP, ''))
+
+        self.assertEqual(LogDimension.objects.get(pk=first).value, '/api/users/{id}/')
+        self.assertEqual(LogDimension.objects.filter(kind=LogDimension.PATH).count(), 1)
+
+    def test_cached_values_cost_no_query(self):
+        dimension_id = self.resolve(LogDimension.APP, 'users')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.dimensions.resolve(LogDimension.APP, 'users'), dimension_id)
+            self.assertEqual(self.dimensions.value(dimension_id), 'users')
+
+        # Un autre processus retrouve la valeur existante
+        other = LogDimensionCache()
+        self.assertEqual(other.resolve(LogDimension.APP, 'users'), dimension_id)
+        self.assertEqual(LogDimensionCache().value(dimension_id), 'users')
+
+    def test_least_recently_used_values_are_evicted(self):
+        first = self.resolve(LogDimension.APP, 'users')
+        self.resolve(LogDimension.APP, 'security')
+        self.resolve(LogDimension.APP, 'users')
+        self.resolve(LogDimension.APP, 'monitoring')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.dimensions.resolve(LogDimension.APP, 'users'), first)
+        with self.assertNumQueries(1):
+            self.dimensions.resolve(LogDimension.APP, 'security')
+
+    def test_rolled_back_values_are_not_cached(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            try:
+                with transaction.atomic():
+                    self.dimensions.resolve(LogDimension.APP, 'annulée')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertFalse(LogDimension.objects.filter(value='annulée').exists())
+        dimension_id = self.resolve(LogDimension.APP, 'annulée')
+        self.assertTrue(LogDimension.objects.filter(pk=dimension_id).exists())
+
+
+class LogEntryDimensionQueryTestCase(TestCase):
+    """Requêtes sur les valeurs des dimensions (`path_ref__value`, `app_ref__value`)"""
+
+    def setUp(self):
+        # Identifiants mis en cache par les tests précédents, annulés depuis
+        get_log_dimensions().clear()
+        self.addCleanup(get_log_dimensions().clear)
+        service = LoggingService()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users = service.info('Liste', source='api', app_name='users',
+                                      metadata={'path': '/api/users/42/', 'method': 'GET'})
+            self.security = service.info('Blocage', source='api', app_name='security',
+                                         metadata={'path': '/api/security/blocks/'})
+
+    def test_path_is_stored_as_template(self):
+        entry = LogEntry.objects.get(pk=self.users.pk)
+        self.assertEqual(entry.path_template, '/api/users/{id}/')
+        self.assertEqual(entry.path, '/api/users/42/')
+        self.assertEqual(entry.metadata['path_params'], ['42'])
+        self.assertNotIn('path', entry.metadata)
+        self.assertEqual(entry.app_name, 'users')
+
+    def test_dimensions_are_resolved_on_save(self):
+        with self.assertNumQueries(0):
+            entry = LogEntry(level='INFO', source='api', message='Détail', path='/api/users/7/', user_agent='curl/8')
+            self.assertEqual((entry.path, entry.path_template), ('/api/users/7/', '/api/users/{id}/'))
+        self.assertIsNone(entry.path_ref_id)
+
+        entry.save()
+        self.assertEqual(entry.path_ref_id, self.users.path_ref_id)
+        self.assertEqual(LogEntry.objects.get(pk=entry.pk).user_agent, 'curl/8')
+
+        LogEntry.objects.bulk_create([LogEntry(level='INFO', source='api', message='Lot', path='/api/users/8/')])
+        self.assertEqual(LogEntry.objects.get(message='Lot').path, '/api/users/8/')
+
+    def test_filters_on_dimension_values(self):
+        self.assertEqual(
+            list(LogEntry.objects.filter(path_ref__value='/api/users/{id}/').values_list('pk', flat=True)),
+            [self.users.pk],
+        )
+        filtered = LogEntryFilter({'app_name': 'security'}, queryset=LogEntry.objects.all()).qs
+        self.assertEqual([entry.pk for entry in filtered], [self.security.pk])
+
+    def search(self, query):
+        with mock.patch('apps.monitoring.services.logging_service.get_log_archive') as archive:
+            archive.return_value.merge.side_effect = lambda model, rows, **criteria: rows
+            return [entry.pk for entry in LoggingService().search_logs(query)]
+
+    def test_search_matches_templates_and_concrete_paths(self):
+        self.assertEqual(self.search('security/blocks'), [self.security.pk])
+        self.assertEqual(self.search('/api/users/{id}/'), [self.users.pk])
+        self.assertEqual(self.search('/api/users/42/'), [self.users.pk])
+        self.assertEqual(self.search('/api/users/43/'), [])
+
+    def test_grouping_by_path(self):
+        rows = LogEntry.objects.values(path=models.F('path_ref__value')).annotate(count=models.Count('id'))
+        self.assertEqual(
+            sorted((row['path'], row['count']) for row in rows),
+            [('/api/security/blocks/', 1), ('/api/users/{id}/', 1)],
+        )
+
+
+class LogDimensionMigrationTestCase(TransactionTestCase):
+    """Migration 0004 : report des colonnes dans LogDimension et retour arrière"""
+
+    before = [('monitoring', '0003_deactivate_implicit_alert_rules')]
+    after = [('monitoring', '0004_logdimension')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        get_log_dimensions().clear()
+
+    def test_raw_path_survives_a_round_trip(self):
+        apps = self.migrate(self.before)
+        entry_id = apps.get_model('monitoring', 'LogEntry').objects.create(
+            level='INFO', source='api', message='Détail', method='GET',
+            path='/api/users/42/tokens/Mq7xKz2vPw9rT4nB8cLd/', user_agent='Mozilla/5.0',
+            app_name='users', module_name='views', ip_address='10.0.0.1',
+            metadata={'path': '/api/users/42/tokens/Mq7xKz2vPw9rT4nB8cLd/', 'method': 'GET', 'trace': 1},
+        ).pk
+
+        apps = self.migrate(self.after)
+        entry = apps.get_model('monitoring', 'LogEntry').objects.select_related('path_ref').get(pk=entry_id)
+        self.assertEqual(entry.path_ref.value, '/api/users/{id}/tokens/{token}/')
+        self.assertEqual(entry.metadata, {'trace': 1, 'path_params': ['42', 'Mq7xKz2vPw9rT4nB8cLd']})
+
+        apps = self.migrate(self.before)
+        entry = apps.get_model('monitoring', 'LogEntry').objects.get(pk=entry_id)
+        self.assertEqual(entry.path, '/api/users/42/tokens/Mq7xKz2vPw9rT4nB8cLd/')
+        self.assertEqual((entry.user_agent, entry.app_name, entry.module_name), ('Mozilla/5.0', 'users', 'views'))
+        self.assertEqual(entry.metadata['path'], entry.path)
+        self.assertEqual(entry.metadata['method'], 'GET')
+        self.assertNotIn('path_params', entry.metadata)
+
+
+class LogArchiveTestCase(TestCase):
+    """Tests pour LogArchive et la commande archive_logs"""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.archive = LogArchive(root, after_days=30, codec='gzip', block_rows=2, segment_rows=3)
+        patcher = mock.patch.object(log_archive, '_archive', self.archive)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_log_dimensions().clear()
+        self.addCleanup(get_log_dimensions().clear)
+
+        self.user = get_user_model().objects.bulk_create([
+            get_user_model()(email='ana@example.com', phone='+33600000080')
+        ])[0]
+        self.now = timezone.now()
+        self.old = [self.entry(f'Ancien {i}', days=40 + i) for i in range(5)]
+        self.recent = self.entry('Récent', days=0.5)
+
+    def entry(self, message, days, level='INFO', path='/api/users/42/'):
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = LoggingService().log(level, message, source='api', user=self.user, app_name='users',
+                                         metadata={'path': path, 'method': 'GET'})
+        LogEntry.objects.filter(pk=entry.pk).update(created_at=self.now - timedelta(days=days))
+        return entry
+
+    def test_old_rows_are_moved_to_the_archive(self):
+        self.assertEqual(self.archive.archive(LogEntry), 5)
+
+        self.assertEqual(list(LogEntry.objects.values_list('pk', flat=True)), [self.recent.pk])
+        archived = self.archive.search(LogEntry)
+        self.assertEqual([entry.pk for entry in archived], [entry.pk for entry in self.old])
+        self.assertEqual(archived[0].path_template, '/api/users/{id}/')
+        self.assertEqual(archived[0].path, '/api/users/42/')
+        self.assertEqual(archived[0].app_name, 'users')
+        self.assertEqual(archived[0].metadata['path_params'], ['42'])
+        with self.assertNumQueries(0):
+            self.assertEqual(archived[0].user.email, 'ana@example.com')
+
+    def test_rows_are_deleted_only_after_the_write(self):
+        write = self.archive.store.write
+
+        def checked_write(table, records, **kwargs):
+            # Les lignes du lot sont encore en base pendant l'écriture
+            self.assertEqual(LogEntry.objects.filter(pk__in=[record['id'] for record in records]).count(),
+                             len(records))
+            return write(table, records, **kwargs)
+
+        with mock.patch.object(self.archive.store, 'write', side_effect=checked_write):
+            self.assertEqual(self.archive.archive(LogEntry), 5)
+
+        with mock.patch.object(self.archive.store, 'write', side_effect=OSError('disque plein')):
+            self.entry('Ancien 5', days=50)
+            with self.assertRaises(OSError):
+                self.archive.archive(LogEntry)
+        self.assertEqual(LogEntry.objects.count(), 2)
+
+    def test_duplicates_are_read_once(self):
+        # Interruption entre l'écriture et la suppression : le lot est archivé deux fois
+        records = [self.archive.to_record(entry) for entry in LogEntry.objects.filter(pk__in=[e.pk for e in self.old])]
+        self.archive.store.write(LogEntry._meta.db_table, records, level_key='level', user_key='user_id')
+        self.archive.archive(LogEntry)
+
+        self.assertEqual(len(self.archive.search(LogEntry)), 5)
+        self.assertEqual(len(self.archive.search(LogEntry, limit=10)), 5)
+        self.assertEqual(len(list(self.archive.iter_search(LogEntry, chunk_size=2))), 5)
+
+    def test_search_criteria(self):
+        error = self.entry('Erreur', days=45, level='ERROR')
+        self.archive.archive(LogEntry)
+
+        self.assertEqual([entry.pk for entry in self.archive.search(LogEntry, levels=['ERROR'])], [error.pk])
+        self.assertEqual([entry.pk for entry in self.archive.search(LogEntry, limit=2)],
+                         [self.old[0].pk, self.old[1].pk])
+        start = self.now - timedelta(days=42, hours=12)
+        self.assertEqual([entry.pk for entry in self.archive.search(LogEntry, start=start)],
+                         [self.old[0].pk, self.old[1].pk, self.old[2].pk])
+        self.assertEqual(self.archive.search(LogEntry, user_ids=[0]), [])
+        self.assertEqual(len(self.archive.search(LogEntry, user_ids=[self.user.pk])), 6)
+
+    def test_merge_keeps_database_rows_first(self):
+        self.archive.archive(LogEntry)
+        rows = list(LogEntry.objects.all())
+
+        merged = self.archive.merge(LogEntry, rows, limit=3)
+        self.assertEqual([entry.pk for entry in merged], [self.recent.pk, self.old[0].pk, self.old[1].pk])
+        self.assertEqual(len(self.archive.merge(LogEntry, rows)), 6)
+
+    def test_get_logs_and_search_logs_include_archived_rows(self):
+        self.entry('Autre chemin', days=60, path='/api/security/blocks/')
+        self.archive.archive(LogEntry)
+        service = LoggingService()
+
+        logs = service.get_logs(hours=24 * 90)
+        self.assertIsInstance(logs, list)
+        self.assertEqual(len(logs), 7)
+        self.assertEqual(logs[0].pk, self.recent.pk)
+
+        results = service.search_logs('security/blocks', hours=24 * 90)
+        self.assertIsInstance(results, list)
+        self.assertEqual([entry.message for entry in results], ['Autre chemin'])
+        self.assertEqual(service.get_logs(hours=24), [LogEntry.objects.get(pk=self.recent.pk)])
+
+        # Chemin complet : modèle et identifiants des entrées archivées
+        self.entry('Autre utilisateur', days=60, path='/api/users/7/')
+        self.archive.archive(LogEntry)
+        results = service.search_logs('/api/users/7/', hours=24 * 90)
+        self.assertEqual([entry.message for entry in results], ['Autre utilisateur'])
+
+    def test_archive_logs_command(self):
+        stdout = io.StringIO()
+        call_command('archive_logs', '--days', '30', '--model', 'monitoring.LogEntry', stdout=stdout)
+
+        self.assertIn('monitoring.LogEntry: 5 ligne(s) archivée(s)', stdout.getvalue())
+        self.assertEqual(LogEntry.objects.count(), 1)
+
+
+class ExportArchivedRowsTestCase(TestCase):
+    """Lignes archivées dans les exports de l'app Analytics"""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.archive = LogArchive(root, after_days=30, codec='gzip', block_rows=2, segment_rows=2)
+        patcher = mock.patch.object(log_archive, '_archive', self.archive)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_log_dimensions().clear()
+        self.addCleanup(get_log_dimensions().clear)
+
+        old = timezone.now() - timedelta(days=40)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                LoggingService().info(f'Ancien {i}', source='api', metadata={'method': 'GET', 'path': '/api/'})
+            LoggingService().info('Tâche', source='system')
+        LogEntry.objects.update(created_at=old)
+        for i in range(3):
+            SecurityEvent.create_event('suspicious_activity', f'Événement {i}', '', '10.0.0.1', severity='high')
+        SecurityEvent.objects.update(created_at=old)
+        self.archive.archive(LogEntry)
+        self.archive.archive(SecurityEvent)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LoggingService().info('Récent', source='api', metadata={'method': 'POST', 'path': '/api/'})
+        SecurityEvent.create_event('suspicious_activity', 'Récent', '', '10.0.0.2', severity='low')
+
+    def export(self, data_source, **filters):
+        return DataExport(name='Export', data_source=data_source, filters=filters, columns=[])
+
+    def test_api_logs_include_archived_rows(self):
+        result = ExportService()._get_api_logs_data(self.export('api_logs'))
+        self.assertEqual(result['total_count'], 4)
+        self.assertEqual([row['message'] for row in result['data']][0], 'Récent')
+        self.assertEqual({row['message'] for row in result['data'][1:]}, {'Ancien 0', 'Ancien 1', 'Ancien 2'})
+
+        result = ExportService()._get_api_logs_data(self.export('api_logs', method='POST'))
+        self.assertEqual([row['message'] for row in result['data']], ['Récent'])
+
+    def test_security_events_include_archived_rows(self):
+        result = ExportService()._get_security_events_data(self.export('security_events'))
+        self.assertEqual(result['total_count'], 4)
+
+        result = ExportService()._get_security_events_data(self.export('security_events', severity='high'))
+        self.assertEqual(result['total_count'], 3)
+        self.assertEqual({row['ip_address'] for row in result['data']}, {'10.0.0.1'})
+
+    @override_settings(LOG_ARCHIVE_EXPORT_MAX_ROWS=1)
+    def test_archived_rows_are_bounded(self):
+        with self.assertLogs('apps.analytics.services.export_service', 'WARNING'):
+            result = ExportService()._get_api_logs_data(self.export('api_logs'))
+        self.assertEqual(result['total_count'], 2)
+
+        with mock.patch.object(self.archive, 'search') as search, \
+                self.assertLogs('apps.analytics.services.export_service', 'WARNING'):
+            result = ExportService()._get_security_events_data(self.export('security_events'))
+        self.assertEqual(result['total_count'], 2)
+        # L'archive est lue en flux, jamais chargée en entier
+        search.assert_not_called()
@@ -41,6 +41,7 @@ from .views import (
     reorder_widgets_view, clone_dashboard_view, user_dashboards_view,
     public_dashboards_view, dashboard_statistics_view, widget_data_view,
 )
+from .live.sse import live_stream_view
 
 app_name = 'monitoring'
 
@@ -133,6 +134,11 @@ urlpatterns = [
     path('widgets/', DashboardWidgetListCreateView.as_view(), name='widget-list-create'),
     path('widgets/<int:pk>/', DashboardWidgetRetrieveUpdateView.as_view(), name='widget-retrieve-update'),
     path('widgets/<int:widget_id>/data/', widget_data_view, name='widget-data'),
+    
+    # Live URLs (Server-Sent Events, nécessite un serveur ASGI)
+    path('live/logs/', live_stream_view, {'channel': 'monitoring.logs'}, name='live-logs'),
+    path('live/dashboards/<str:key>/', live_stream_view, {'channel': 'monitoring.dashboard'}, name='live-dashboard'),
+    path('live/<str:channel>/<str:key>/', live_stream_view, name='live-stream'),
 ]
 
 
@@ -285,7 +285,7 @@ def widget_data_view(request, widget_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        data = dashboard_service._get_widget_data(widget)
+        data = dashboard_service.get_widget_data(widget)
         
         return Response(data)
         
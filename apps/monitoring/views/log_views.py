@@ -5,6 +5,7 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from django_filters import rest_framework as filters
 from django_filters.rest_framework import DjangoFilterBackend
 from django.http import HttpResponse
 import csv
@@ -16,13 +17,22 @@ from apps.monitoring.services import LoggingService
 from core.permissions import IsStaffOrReadOnly
 
 
+class LogEntryFilter(filters.FilterSet):
+    """Filtres des entrées de log"""
+    app_name = filters.CharFilter(field_name='app_ref__value')
+    
+    class Meta:
+        model = LogEntry
+        fields = ['level', 'source', 'user', 'app_name', 'created_at']
+
+
 class LogEntryListCreateView(generics.ListCreateAPIView):
     """Vue pour lister et créer des entrées de log"""
-    queryset = LogEntry.objects.all()
+    queryset = LogEntry.objects.select_related('user', *LogEntry.DIMENSION_FIELDS)
     serializer_class = LogEntrySerializer
     permission_classes = [IsAuthenticated, IsStaffOrReadOnly]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['level', 'source', 'user', 'app_name', 'created_at']
+    filterset_class = LogEntryFilter
     
     def get_queryset(self):
         """Filtre les logs selon les permissions"""
@@ -37,7 +47,7 @@ class LogEntryListCreateView(generics.ListCreateAPIView):
 
 class LogEntryRetrieveView(generics.RetrieveAPIView):
     """Vue pour récupérer une entrée de log spécifique"""
-    queryset = LogEntry.objects.all()
+    queryset = LogEntry.objects.select_related('user', *LogEntry.DIMENSION_FIELDS)
     serializer_class = LogEntrySerializer
     permission_classes = [IsAuthenticated, IsStaffOrReadOnly]
     
@@ -66,27 +76,25 @@ class LogEntrySearchView(generics.ListAPIView):
         hours = int(self.request.query_params.get('hours', 24))
         limit = int(self.request.query_params.get('limit', 100))
         
+        # Filtrer selon les permissions
+        user = None if self.request.user.is_staff else self.request.user
+        
         if query:
-            logs = logging_service.search_logs(
+            return logging_service.search_logs(
                 query=query,
                 level=level,
                 source=source,
+                user=user,
                 hours=hours,
                 limit=limit
             )
-        else:
-            logs = logging_service.get_logs(
-                level=level,
-                source=source,
-                hours=hours,
-                limit=limit
-            )
-        
-        # Filtrer selon les permissions
-        if not self.request.user.is_staff:
-            logs = logs.filter(user=self.request.user)
-        
-        return logs
+        return logging_service.get_logs(
+            level=level,
+            source=source,
+            user=user,
+            hours=hours,
+            limit=limit
+        )
 
 
 @api_view(['GET'])
@@ -113,18 +121,15 @@ def log_export_view(request):
     hours = int(request.query_params.get('hours', 24))
     format_type = request.query_params.get('format', 'csv')
     
-    # Récupérer les logs
+    # Récupérer les logs (filtrés selon les permissions)
     logs = logging_service.get_logs(
         level=level,
         source=source,
+        user=None if request.user.is_staff else request.user,
         hours=hours,
         limit=10000  # Limite pour l'export
     )
     
-    # Filtrer selon les permissions
-    if not request.user.is_staff:
-        logs = logs.filter(user=request.user)
-    
     if format_type == 'csv':
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="logs_export.csv"'
@@ -0,0 +1,45 @@
+"""
+Commande de lancement d'un worker de l'outbox des notifications
+"""
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services.outbox import NotificationOutbox
+
+
+class Command(BaseCommand):
+    help = "Envoie les notifications en attente de l'outbox (avec nouvelles tentatives)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Traiter un seul lot puis s'arrêter")
+        parser.add_argument('--batch-size', type=int, default=None, help="Nombre de notifications réservées par lot")
+        parser.add_argument('--concurrency', type=int, default=None, help="Envois simultanés par canal (0 = séquentiel)")
+        parser.add_argument('--poll-interval', type=float, default=None, help="Intervalle de vérification du signal de réveil (secondes)")
+
+    def handle(self, *args, **options):
+        outbox = NotificationOutbox(
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+        )
+
+        if options['once']:
+            count = outbox.run_once()
+            outbox.shutdown()
+            self.stdout.write(self.style.SUCCESS(f"{count} notification(s) traitée(s)"))
+            return
+
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write("Arrêt du worker demandé...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        self.stdout.write(self.style.SUCCESS(f"Worker outbox démarré ({outbox.worker_id})"))
+        outbox.run_forever(poll_interval=options['poll_interval'], stop_event=stop_event)
+        outbox.shutdown()
+        self.stdout.write(self.style.SUCCESS("Worker outbox arrêté"))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_alter_emailnotification_from_email_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS'), ('push', 'Push'), ('in_app', 'In-App')], max_length=20, verbose_name='Type de notification')),
+                ('subject', models.CharField(blank=True, max_length=200, verbose_name='Sujet')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('completed', 'Terminé'), ('failed', 'Échoué')], default='pending', max_length=20, verbose_name='Statut')),
+                ('error_message', models.TextField(blank=True, verbose_name="Message d'erreur")),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='Nombre de destinataires')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Notifications créées')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='Notifications envoyées')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Notifications échouées')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Démarré le')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminé le')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de dernière modification')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notification_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Créé par')),
+                ('template', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='notifications.notificationtemplate', verbose_name='Template')),
+            ],
+            options={
+                'verbose_name': 'Envoi en masse',
+                'verbose_name_plural': 'Envois en masse',
+                'db_table': 'notifications_notification_job',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
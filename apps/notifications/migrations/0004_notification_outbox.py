@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notificationjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='last_error',
+            field=models.TextField(blank=True, verbose_name='Dernière erreur'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Réservée le'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='locked_by',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Réservée par'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, help_text="Date à partir de laquelle l'outbox peut retenter l'envoi", null=True, verbose_name='Prochaine tentative'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='status',
+            field=models.CharField(choices=[('pending', 'En attente'), ('processing', "En cours d'envoi"), ('sent', 'Envoyé'), ('delivered', 'Livré'), ('failed', 'Échoué'), ('dead', 'Abandonné'), ('cancelled', 'Annulé')], default='pending', max_length=20, verbose_name='Statut'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='notificatio_status_444bb6_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='category',
+            field=models.CharField(blank=True, help_text="Les notifications d'une même catégorie peuvent être regroupées en résumé", max_length=50, verbose_name='Catégorie'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='status',
+            field=models.CharField(choices=[('pending', 'En attente'), ('buffered', 'En cours de regroupement'), ('processing', "En cours d'envoi"), ('sent', 'Envoyé'), ('delivered', 'Livré'), ('failed', 'Échoué'), ('dead', 'Abandonné'), ('cancelled', 'Annulé')], default='pending', max_length=20, verbose_name='Statut'),
+        ),
+        migrations.AlterField(
+            model_name='notificationlog',
+            name='action',
+            field=models.CharField(choices=[('created', 'Créée'), ('sent', 'Envoyée'), ('delivered', 'Livrée'), ('failed', 'Échouée'), ('retry', 'Nouvelle tentative'), ('digested', 'Regroupée'), ('cancelled', 'Annulée')], max_length=20, verbose_name='Action'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'notification_type', 'category', 'status'], name='notificatio_user_id_2ce3cc_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_user_managers'),
+        ('notifications', '0005_notification_digest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationInbox',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_inbox', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='Nombre total')),
+                ('unread_count', models.PositiveIntegerField(default=0, verbose_name='Non lues')),
+                ('email_count', models.PositiveIntegerField(default=0, verbose_name='Emails')),
+                ('sms_count', models.PositiveIntegerField(default=0, verbose_name='SMS')),
+                ('push_count', models.PositiveIntegerField(default=0, verbose_name='Push')),
+                ('in_app_count', models.PositiveIntegerField(default=0, verbose_name='In-App')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de dernière modification')),
+            ],
+            options={
+                'verbose_name': 'Boîte de réception',
+                'verbose_name_plural': 'Boîtes de réception',
+                'db_table': 'notifications_notification_inbox',
+            },
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Lu le'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notificatio_user_id_90f3d6_idx'),
+        ),
+    ]
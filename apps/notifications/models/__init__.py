@@ -2,6 +2,8 @@ from .notification import Notification, NotificationTemplate, NotificationLog
 from .email_notification import EmailNotification, EmailTemplate
 from .sms_notification import SMSNotification
 from .push_notification import PushNotification, PushToken
+from .notification_job import NotificationJob
+from .notification_inbox import NotificationInbox
 
 __all__ = [
     'Notification',
@@ -12,6 +14,8 @@ __all__ = [
     'SMSNotification',
     'PushNotification',
     'PushToken',
+    'NotificationJob',
+    'NotificationInbox',
 ]
 
 
@@ -79,36 +79,20 @@ class EmailTemplate(models.Model):
     
     def render_subject(self, context=None):
         """Rend le sujet avec le contexte"""
-        if not context:
-            context = {}
-        
-        subject = self.subject
-        for key, value in context.items():
-            subject = subject.replace(f'{{{key}}}', str(value))
-        
-        return subject
+        from ..services.template_renderer import compile_placeholders
+        return compile_placeholders(self.subject).render(context)
     
     def render_html_content(self, context=None):
         """Rend le contenu HTML avec le contexte"""
-        if not context:
-            context = {}
-        
-        html_content = self.html_content
-        for key, value in context.items():
-            html_content = html_content.replace(f'{{{key}}}', str(value))
-        
-        return html_content
+        from ..services.template_renderer import compile_placeholders
+        return compile_placeholders(self.html_content).render(context)
     
     def render_text_content(self, context=None):
-        """Rend le contenu texte avec le contexte"""
-        if not context:
-            context = {}
-        
-        text_content = self.text_content or self.html_content
-        for key, value in context.items():
-            text_content = text_content.replace(f'{{{key}}}', str(value))
-        
-        return text_content
+        """Rend le contenu texte avec le contexte (dérivé du HTML si absent)"""
+        from ..services.template_renderer import compile_placeholders
+        if self.text_content:
+            return compile_placeholders(self.text_content).render(context)
+        return compile_placeholders(self.html_content).render_text(context)
 
 
 class EmailNotification(models.Model):
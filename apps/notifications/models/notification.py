@@ -86,25 +86,13 @@ class NotificationTemplate(models.Model):
     
     def render_content(self, context=None):
         """Rend le contenu du template avec le contexte fourni"""
-        if not context:
-            context = {}
-        
-        content = self.content
-        for key, value in context.items():
-            content = content.replace(f'{{{key}}}', str(value))
-        
-        return content
+        from ..services.template_renderer import compile_placeholders
+        return compile_placeholders(self.content).render(context)
     
     def render_html_content(self, context=None):
         """Rend le contenu HTML du template avec le contexte fourni"""
-        if not context:
-            context = {}
-        
-        html_content = self.html_content or self.content
-        for key, value in context.items():
-            html_content = html_content.replace(f'{{{key}}}', str(value))
-        
-        return html_content
+        from ..services.template_renderer import compile_placeholders
+        return compile_placeholders(self.html_content or self.content).render(context)
 
 
 class Notification(models.Model):
@@ -167,9 +155,12 @@ class Notification(models.Model):
         max_length=20,
         choices=[
             ('pending', 'En attente'),
+            ('buffered', 'En cours de regroupement'),
+            ('processing', 'En cours d\'envoi'),
             ('sent', 'Envoyé'),
             ('delivered', 'Livré'),
             ('failed', 'Échoué'),
+            ('dead', 'Abandonné'),
             ('cancelled', 'Annulé'),
         ],
         default='pending',
@@ -186,6 +177,12 @@ class Notification(models.Model):
         default='normal',
         verbose_name="Priorité"
     )
+    category = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Catégorie",
+        help_text="Les notifications d'une même catégorie peuvent être regroupées en résumé"
+    )
     
     # Planification
     scheduled_at = models.DateTimeField(
@@ -203,6 +200,11 @@ class Notification(models.Model):
         blank=True,
         verbose_name="Livré le"
     )
+    read_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Lu le"
+    )
     
     # Métadonnées
     context = models.JSONField(
@@ -228,6 +230,28 @@ class Notification(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(10)],
         verbose_name="Nombre maximum de tentatives"
     )
+    next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Prochaine tentative",
+        help_text="Date à partir de laquelle l'outbox peut retenter l'envoi"
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name="Dernière erreur"
+    )
+    
+    # Outbox (réservation par un worker)
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Réservée par"
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Réservée le"
+    )
     
     # Métadonnées
     created_at = models.DateTimeField(
@@ -249,6 +273,9 @@ class Notification(models.Model):
             models.Index(fields=['notification_type', 'status']),
             models.Index(fields=['scheduled_at']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['user', 'notification_type', 'category', 'status']),
+            models.Index(fields=['user', '-created_at', '-id']),
         ]
     
     def __str__(self):
@@ -314,6 +341,7 @@ class NotificationLog(models.Model):
             ('delivered', 'Livrée'),
             ('failed', 'Échouée'),
             ('retry', 'Nouvelle tentative'),
+            ('digested', 'Regroupée'),
             ('cancelled', 'Annulée'),
         ],
         verbose_name="Action"
@@ -0,0 +1,71 @@
+"""
+Modèle des compteurs de la boîte de réception des notifications
+"""
+
+from django.db import models
+from django.conf import settings
+
+
+class NotificationInbox(models.Model):
+    """
+    Compteurs dénormalisés des notifications d'un utilisateur
+
+    Tenus à jour par les chemins de création, de lecture et de suppression
+    (voir `NotificationInboxService`) pour éviter un COUNT par requête.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_inbox',
+        verbose_name="Utilisateur"
+    )
+    total_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Nombre total"
+    )
+    unread_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Non lues"
+    )
+    email_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Emails"
+    )
+    sms_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="SMS"
+    )
+    push_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Push"
+    )
+    in_app_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="In-App"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Date de dernière modification"
+    )
+
+    class Meta:
+        verbose_name = "Boîte de réception"
+        verbose_name_plural = "Boîtes de réception"
+        db_table = 'notifications_notification_inbox'
+
+    def __str__(self):
+        return f"Boîte de {self.user_id} - {self.unread_count} non lue(s)"
+
+    def to_counters(self):
+        """Compteurs au format de l'API"""
+        return {
+            'total': self.total_count,
+            'unread': self.unread_count,
+            'by_type': {
+                'email': self.email_count,
+                'sms': self.sms_count,
+                'push': self.push_count,
+                'in_app': self.in_app_count,
+            },
+        }
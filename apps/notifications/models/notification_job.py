@@ -0,0 +1,141 @@
+"""
+Modèle pour les envois de notifications en masse
+"""
+
+from django.db import models
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+
+class NotificationJob(models.Model):
+    """
+    Modèle pour le suivi d'un envoi de notifications en masse
+    """
+    notification_type = models.CharField(
+        max_length=20,
+        choices=[
+            ('email', 'Email'),
+            ('sms', 'SMS'),
+            ('push', 'Push'),
+            ('in_app', 'In-App'),
+        ],
+        verbose_name="Type de notification"
+    )
+    subject = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Sujet"
+    )
+    template = models.ForeignKey(
+        'notifications.NotificationTemplate',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Template"
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notification_jobs',
+        verbose_name="Créé par"
+    )
+
+    # Statut
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('pending', 'En attente'),
+            ('running', 'En cours'),
+            ('completed', 'Terminé'),
+            ('failed', 'Échoué'),
+        ],
+        default='pending',
+        verbose_name="Statut"
+    )
+    error_message = models.TextField(
+        blank=True,
+        verbose_name="Message d'erreur"
+    )
+
+    # Progression
+    total_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Nombre de destinataires"
+    )
+    created_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Notifications créées"
+    )
+    sent_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Notifications envoyées"
+    )
+    failed_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Notifications échouées"
+    )
+
+    # Métadonnées
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Démarré le"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Terminé le"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Date de dernière modification"
+    )
+
+    class Meta:
+        verbose_name = "Envoi en masse"
+        verbose_name_plural = "Envois en masse"
+        db_table = 'notifications_notification_job'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Envoi {self.get_notification_type_display()} ({self.status}) - {self.total_count} destinataires"
+
+    @property
+    def progress(self):
+        """Pourcentage de notifications traitées"""
+        if not self.total_count:
+            return 100.0 if self.status == 'completed' else 0.0
+        processed = self.sent_count + self.failed_count
+        return round(min(processed / self.total_count, 1) * 100, 2)
+
+    def mark_as_running(self):
+        """Marque l'envoi comme démarré"""
+        self.status = 'running'
+        self.started_at = timezone.now()
+        self.save(update_fields=['status', 'started_at', 'updated_at'])
+
+    def mark_as_finished(self, error_message=''):
+        """Marque l'envoi comme terminé (ou échoué si une erreur est fournie)"""
+        self.status = 'failed' if error_message else 'completed'
+        self.error_message = error_message
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'error_message', 'finished_at', 'updated_at'])
+
+    def increment(self, **counters):
+        """Incrémente atomiquement les compteurs de progression"""
+        counters = {field: value for field, value in counters.items() if value}
+        if not counters:
+            return
+        NotificationJob.objects.filter(pk=self.pk).update(
+            updated_at=timezone.now(),
+            **{field: F(field) + value for field, value in counters.items()}
+        )
+        for field, value in counters.items():
+            setattr(self, field, getattr(self, field) + value)
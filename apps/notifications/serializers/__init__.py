@@ -2,6 +2,7 @@ from .notification_serializers import (
     NotificationSerializer,
     NotificationTemplateSerializer,
     NotificationLogSerializer,
+    NotificationJobSerializer,
     NotificationCreateSerializer,
     NotificationStatsSerializer,
 )
@@ -28,6 +29,7 @@ __all__ = [
     'NotificationSerializer',
     'NotificationTemplateSerializer',
     'NotificationLogSerializer',
+    'NotificationJobSerializer',
     'NotificationCreateSerializer',
     'NotificationStatsSerializer',
     'EmailNotificationSerializer',
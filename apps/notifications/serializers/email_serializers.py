@@ -4,6 +4,7 @@ Sérialiseurs pour les notifications email
 
 from rest_framework import serializers
 from ..models import EmailNotification, EmailTemplate
+from .notification_serializers import BulkAudienceSerializer
 
 
 class EmailTemplateSerializer(serializers.ModelSerializer):
@@ -169,15 +170,10 @@ class EmailSendSerializer(serializers.Serializer):
         return value.strip()
 
 
-class EmailBulkSendSerializer(serializers.Serializer):
+class EmailBulkSendSerializer(BulkAudienceSerializer):
     """
     Sérialiseur pour l'envoi d'emails en masse
     """
-    user_ids = serializers.ListField(
-        child=serializers.IntegerField(),
-        required=True,
-        min_length=1
-    )
     subject = serializers.CharField(max_length=200, required=True)
     content = serializers.CharField(required=True)
     template_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
@@ -193,20 +189,6 @@ class EmailBulkSendSerializer(serializers.Serializer):
     )
     scheduled_at = serializers.DateTimeField(required=False, allow_null=True)
     
-    def validate_user_ids(self, value):
-        """Valide les IDs des utilisateurs"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        # Vérifier que tous les utilisateurs existent
-        existing_users = User.objects.filter(id__in=value).values_list('id', flat=True)
-        missing_ids = set(value) - set(existing_users)
-        
-        if missing_ids:
-            raise serializers.ValidationError(f"Utilisateurs non trouvés: {list(missing_ids)}")
-        
-        return value
-    
     def validate_subject(self, value):
         """Valide le sujet"""
         if len(value.strip()) < 5:
@@ -4,7 +4,7 @@ Sérialiseurs pour les notifications générales
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from ..models import Notification, NotificationTemplate, NotificationLog
+from ..models import Notification, NotificationTemplate, NotificationLog, NotificationJob
 
 User = get_user_model()
 
@@ -75,9 +75,11 @@ class NotificationSerializer(serializers.ModelSerializer):
             'status_display',
             'priority',
             'priority_display',
+            'category',
             'scheduled_at',
             'sent_at',
             'delivered_at',
+            'read_at',
             'context',
             'metadata',
             'retry_count',
@@ -95,6 +97,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             'notification_type_display',
             'sent_at',
             'delivered_at',
+            'read_at',
             'retry_count',
             'created_at',
             'updated_at',
@@ -151,6 +154,36 @@ class NotificationLogSerializer(serializers.ModelSerializer):
         ]
 
 
+class NotificationJobSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur pour les envois en masse
+    """
+    template_name = serializers.CharField(source='template.name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = NotificationJob
+        fields = [
+            'id',
+            'notification_type',
+            'subject',
+            'template_name',
+            'status',
+            'status_display',
+            'total_count',
+            'created_count',
+            'sent_count',
+            'failed_count',
+            'progress',
+            'error_message',
+            'started_at',
+            'finished_at',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
 class NotificationCreateSerializer(serializers.Serializer):
     """
     Sérialiseur pour la création de notifications
@@ -179,6 +212,7 @@ class NotificationCreateSerializer(serializers.Serializer):
         default='normal'
     )
     scheduled_at = serializers.DateTimeField(required=False, allow_null=True)
+    category = serializers.CharField(max_length=50, required=False, allow_blank=True)
     recipient_email = serializers.EmailField(required=False, allow_blank=True)
     recipient_phone = serializers.CharField(max_length=20, required=False, allow_blank=True)
     
@@ -206,6 +240,78 @@ class NotificationCreateSerializer(serializers.Serializer):
         return data
 
 
+class BulkAudienceSerializer(serializers.Serializer):
+    """
+    Sérialiseur de base des envois en masse : destinataires par identifiants,
+    par groupes et/ou par rôles (au moins une source)
+    """
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        default=list
+    )
+    group_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        default=list
+    )
+    role_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        default=list
+    )
+    
+    @staticmethod
+    def _check_ids(model, value, label):
+        existing = model.objects.filter(id__in=value).values_list('id', flat=True)
+        missing_ids = set(value) - set(existing)
+        if missing_ids:
+            raise serializers.ValidationError(f"{label} non trouvés: {sorted(missing_ids)}")
+        return value
+    
+    def validate_user_ids(self, value):
+        """Valide les IDs des utilisateurs"""
+        return self._check_ids(User, value, "Utilisateurs")
+    
+    def validate_group_ids(self, value):
+        """Valide les IDs des groupes"""
+        if not value:
+            return value
+        from ..services.targeting import _get_permissions_model
+        return self._check_ids(_get_permissions_model('Group'), value, "Groupes")
+    
+    def validate_role_ids(self, value):
+        """Valide les IDs des rôles"""
+        if not value:
+            return value
+        from ..services.targeting import _get_permissions_model
+        return self._check_ids(_get_permissions_model('Role'), value, "Rôles")
+    
+    def validate(self, data):
+        """Validation globale"""
+        if not (data.get('user_ids') or data.get('group_ids') or data.get('role_ids')):
+            raise serializers.ValidationError(
+                "Au moins un destinataire est requis (user_ids, group_ids ou role_ids)."
+            )
+        return data
+    
+    def get_audience(self):
+        """
+        Audience dédoublonnée de l'envoi, lue en flux par le fan-out
+
+        Les `user_ids` explicites sont ciblés même inactifs ; seuls les membres
+        inactifs des groupes et rôles sont écartés.
+        """
+        from ..services.targeting import NotificationAudience
+        data = self.validated_data
+        return NotificationAudience(
+            groups=data.get('group_ids', []),
+            roles=data.get('role_ids', []),
+            user_ids=data.get('user_ids', []),
+            include_inactive_user_ids=True,
+        )
+
+
 class NotificationStatsSerializer(serializers.Serializer):
     """
     Sérialiseur pour les statistiques de notifications
@@ -4,6 +4,7 @@ Sérialiseurs pour les notifications push
 
 from rest_framework import serializers
 from ..models import PushNotification, PushToken
+from .notification_serializers import BulkAudienceSerializer
 
 
 class PushTokenSerializer(serializers.ModelSerializer):
@@ -221,15 +222,10 @@ class PushSendSerializer(serializers.Serializer):
         return data
 
 
-class PushBulkSendSerializer(serializers.Serializer):
+class PushBulkSendSerializer(BulkAudienceSerializer):
     """
     Sérialiseur pour l'envoi de notifications push en masse
     """
-    user_ids = serializers.ListField(
-        child=serializers.IntegerField(),
-        required=True,
-        min_length=1
-    )
     title = serializers.CharField(max_length=100, required=True)
     body = serializers.CharField(max_length=200, required=True)
     data = serializers.JSONField(required=False, default=dict)
@@ -246,20 +242,6 @@ class PushBulkSendSerializer(serializers.Serializer):
     )
     scheduled_at = serializers.DateTimeField(required=False, allow_null=True)
     
-    def validate_user_ids(self, value):
-        """Valide les IDs des utilisateurs"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        # Vérifier que tous les utilisateurs existent
-        existing_users = User.objects.filter(id__in=value).values_list('id', flat=True)
-        missing_ids = set(value) - set(existing_users)
-        
-        if missing_ids:
-            raise serializers.ValidationError(f"Utilisateurs non trouvés: {list(missing_ids)}")
-        
-        return value
-    
     def validate_title(self, value):
         """Valide le titre"""
         if len(value.strip()) < 3:
@@ -4,6 +4,7 @@ Sérialiseurs pour les notifications SMS
 
 from rest_framework import serializers
 from ..models import SMSNotification
+from .notification_serializers import BulkAudienceSerializer
 
 
 class SMSNotificationSerializer(serializers.ModelSerializer):
@@ -149,15 +150,10 @@ class SMSSendSerializer(serializers.Serializer):
         return data
 
 
-class SMSBulkSendSerializer(serializers.Serializer):
+class SMSBulkSendSerializer(BulkAudienceSerializer):
     """
     Sérialiseur pour l'envoi de SMS en masse
     """
-    user_ids = serializers.ListField(
-        child=serializers.IntegerField(),
-        required=True,
-        min_length=1
-    )
     message = serializers.CharField(max_length=1600, required=True)
     priority = serializers.ChoiceField(
         choices=[
@@ -170,20 +166,6 @@ class SMSBulkSendSerializer(serializers.Serializer):
     )
     scheduled_at = serializers.DateTimeField(required=False, allow_null=True)
     
-    def validate_user_ids(self, value):
-        """Valide les IDs des utilisateurs"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        # Vérifier que tous les utilisateurs existent
-        existing_users = User.objects.filter(id__in=value).values_list('id', flat=True)
-        missing_ids = set(value) - set(existing_users)
-        
-        if missing_ids:
-            raise serializers.ValidationError(f"Utilisateurs non trouvés: {list(missing_ids)}")
-        
-        return value
-    
     def validate_message(self, value):
         """Valide le message"""
         if len(value.strip()) < 5:
@@ -196,9 +178,12 @@ class SMSBulkSendSerializer(serializers.Serializer):
     
     def validate(self, data):
         """Validation globale"""
+        data = super().validate(data)
         user_ids = data.get('user_ids')
         
-        # Vérifier que tous les utilisateurs ont un numéro de téléphone
+        # Vérifier que tous les utilisateurs désignés explicitement ont un
+        # numéro de téléphone (les membres des groupes et rôles sans numéro
+        # sont comptés en échec par le fan-out)
         from django.contrib.auth import get_user_model
         User = get_user_model()
         
@@ -1,13 +1,31 @@
 from .email_service import EmailService
+from .mail_transport import BulkMailTransport, get_mail_transport
 from .sms_service import SMSService
 from .push_service import PushService
 from .notification_service import NotificationService
+from .fanout_service import NotificationFanoutService
+from .outbox import NotificationOutbox
+from .digest import NotificationDigester
+from .inbox import NotificationInboxService, get_inbox_service
+from .targeting import NotificationAudience
+from .template_renderer import TemplateRenderer, get_template_renderer, html_to_text
 
 __all__ = [
     'EmailService',
+    'BulkMailTransport',
+    'get_mail_transport',
     'SMSService',
     'PushService',
     'NotificationService',
+    'NotificationFanoutService',
+    'NotificationOutbox',
+    'NotificationDigester',
+    'NotificationInboxService',
+    'get_inbox_service',
+    'NotificationAudience',
+    'TemplateRenderer',
+    'get_template_renderer',
+    'html_to_text',
 ]
 
 
@@ -0,0 +1,164 @@
+"""
+Regroupement des notifications en résumés
+
+Les notifications portant une catégorie sont accumulées par (utilisateur,
+canal, catégorie) dans une seule notification au statut `buffered` pendant
+une fenêtre configurable. À l'échéance, la notification est rendue comme un
+résumé des éléments reçus puis remise à l'outbox (`pending`) : une seule ligne
+de canal et un seul appel fournisseur par fenêtre, au lieu d'un par élément.
+Les notifications critiques (priorités de `NOTIFICATION_DIGEST_BYPASS_PRIORITIES`)
+sont envoyées immédiatement.
+"""
+
+import logging
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.html import escape
+
+from ..models import Notification, NotificationLog
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ORDER = {'low': 0, 'normal': 1, 'high': 2, 'urgent': 3}
+
+
+def digest_window(category: str) -> int:
+    """Durée (secondes) de la fenêtre de regroupement d'une catégorie"""
+    windows = getattr(settings, 'NOTIFICATION_DIGEST_WINDOWS', {})
+    return windows.get(category, getattr(settings, 'NOTIFICATION_DIGEST_WINDOW', 300))
+
+
+def should_digest(category: Optional[str], priority: str) -> bool:
+    """Indique si une notification doit être regroupée plutôt qu'envoyée"""
+    if not category or not getattr(settings, 'NOTIFICATION_DIGEST_ENABLED', True):
+        return False
+    if priority in getattr(settings, 'NOTIFICATION_DIGEST_BYPASS_PRIORITIES', ['urgent']):
+        return False
+    return digest_window(category) > 0
+
+
+class NotificationDigester:
+    """
+    Accumulation et rendu des résumés de notifications
+    """
+
+    def __init__(self, max_items: int = None, batch_size: int = None):
+        self.max_items = max_items or getattr(settings, 'NOTIFICATION_DIGEST_MAX_ITEMS', 50)
+        self.batch_size = batch_size or getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', 100)
+
+    def add(self, user, notification_type: str, category: str, subject: str = "",
+            content: str = "", priority: str = "normal", **kwargs) -> Notification:
+        """
+        Ajoute un élément au résumé ouvert de (utilisateur, canal, catégorie)
+
+        Args:
+            subject: Sujet déjà rendu de l'élément
+            content: Contenu déjà rendu de l'élément
+            **kwargs: Champs de la notification (destinataire...) utilisés à la
+                création du résumé
+
+        Returns:
+            Notification: Notification résumé (au statut `buffered`)
+        """
+        now = timezone.now()
+        item = {'subject': subject, 'content': content, 'priority': priority, 'created_at': now.isoformat()}
+
+        with transaction.atomic():
+            digest = (
+                Notification.objects.select_for_update()
+                .filter(
+                    user=user, notification_type=notification_type, category=category,
+                    status='buffered', scheduled_at__gt=now
+                )
+                .order_by('created_at')
+                .first()
+            )
+
+            if digest is None:
+                digest = Notification.objects.create(
+                    user=user,
+                    notification_type=notification_type,
+                    category=category,
+                    subject=subject,
+                    content=content,
+                    priority=priority,
+                    status='buffered',
+                    scheduled_at=now + timedelta(seconds=digest_window(category)),
+                    context={'digest_items': [item], 'digest_count': 1},
+                    **kwargs
+                )
+                return digest
+
+            items = digest.context.get('digest_items', [])
+            if len(items) < self.max_items:
+                items.append(item)
+            digest.context = {
+                **digest.context,
+                'digest_items': items,
+                'digest_count': digest.context.get('digest_count', len(items)) + 1,
+            }
+            if PRIORITY_ORDER.get(priority, 1) > PRIORITY_ORDER.get(digest.priority, 1):
+                digest.priority = priority
+            digest.save(update_fields=['context', 'priority', 'updated_at'])
+        return digest
+
+    def flush_due(self, now=None) -> List[Notification]:
+        """
+        Rend les résumés dont la fenêtre est écoulée et les remet à l'outbox
+
+        Returns:
+            List[Notification]: Résumés prêts à être envoyés
+        """
+        now = now or timezone.now()
+        with transaction.atomic():
+            digests = list(
+                Notification.objects.select_for_update()
+                .filter(status='buffered', scheduled_at__lte=now)
+                .order_by('scheduled_at')[:self.batch_size]
+            )
+            for digest in digests:
+                self.render(digest)
+                digest.status = 'pending'
+                digest.updated_at = now
+            Notification.objects.bulk_update(
+                digests, ['subject', 'content', 'html_content', 'status', 'updated_at']
+            )
+            NotificationLog.objects.bulk_create([
+                NotificationLog(
+                    notification=digest,
+                    action='digested',
+                    message=f"Résumé de {digest.context.get('digest_count', 1)} notification(s) prêt à l'envoi",
+                )
+                for digest in digests
+            ])
+        return digests
+
+    def render(self, notification: Notification):
+        """Rend le sujet et le contenu d'un résumé à partir de ses éléments"""
+        items = notification.context.get('digest_items', [])
+        count = notification.context.get('digest_count', len(items))
+        if count <= 1:
+            return
+
+        notification.subject = f"{count} notifications ({notification.category})"
+        lines, html_lines = [], []
+        for item in items:
+            created_at = parse_datetime(item.get('created_at', ''))
+            time = timezone.localtime(created_at).strftime('%H:%M') if created_at else ''
+            title = item.get('subject') or ''
+            lines.append(f"- [{time}] {title} : {item.get('content', '')}" if title
+                         else f"- [{time}] {item.get('content', '')}")
+            html_lines.append(
+                f"<li><strong>{escape(time)}</strong> {escape(title)} {escape(item.get('content', ''))}</li>"
+            )
+        if count > len(items):
+            lines.append(f"... et {count - len(items)} autre(s)")
+            html_lines.append(f"<li>... et {count - len(items)} autre(s)</li>")
+
+        notification.content = '\n'.join(lines)
+        notification.html_content = f"<ul>{''.join(html_lines)}</ul>"
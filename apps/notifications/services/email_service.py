@@ -3,14 +3,24 @@ Service pour l'envoi d'emails via SendGrid
 """
 
 import sendgrid
-from sendgrid.helpers.mail import Mail, Email, To, Content
+from sendgrid.helpers.mail import Mail, Email, To, Content, Personalization, CustomArg
 from django.conf import settings
-from django.core.mail import send_mail as django_send_mail
-from typing import Dict, Any
+from django.core.mail import EmailMultiAlternatives
+from django.utils import timezone
+from typing import Dict, Any, List
 import logging
 
+from .mail_transport import get_mail_transport
+
 logger = logging.getLogger(__name__)
 
+# Nombre maximal de personnalisations par appel à l'API SendGrid
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+
+# Argument personnalisé renvoyé par le webhook d'événements SendGrid : le
+# `sg_message_id` est partagé par tous les destinataires d'un envoi groupé
+SENDGRID_EMAIL_ID_ARG = 'email_notification_id'
+
 
 class EmailService:
     """
@@ -67,6 +77,9 @@ class EmailService:
                 html_content=html_content
             )
             
+            if email_notification.pk is not None:
+                mail.add_custom_arg(CustomArg(SENDGRID_EMAIL_ID_ARG, str(email_notification.pk)))
+            
             # Ajouter les pièces jointes si présentes
             if email_notification.attachments:
                 for attachment in email_notification.attachments:
@@ -92,32 +105,169 @@ class EmailService:
     
     def _send_via_django(self, email_notification) -> Dict[str, Any]:
         """
-        Envoie un email via Django SMTP
+        Envoie un email via Django SMTP (connexion mutualisée)
+        """
+        return get_mail_transport().send(self._build_message(email_notification))
+    
+    def _build_message(self, email_notification) -> EmailMultiAlternatives:
+        """
+        Construit le message Django d'une notification email
+        """
+        from_email = email_notification.from_email
+        if email_notification.from_name:
+            from_email = f"{email_notification.from_name} <{from_email}>"
+        
+        message = EmailMultiAlternatives(
+            subject=email_notification.subject,
+            body=email_notification.text_content,
+            from_email=from_email,
+            to=[email_notification.to_email],
+            reply_to=[email_notification.reply_to] if email_notification.reply_to else None
+        )
+        if email_notification.html_content:
+            message.attach_alternative(email_notification.html_content, "text/html")
+        return message
+    
+    def send_email_batch(self, email_notifications: list) -> List[Dict[str, Any]]:
+        """
+        Envoie un lot d'emails
+        
+        Via SendGrid, les emails de même contenu partagent un seul appel API
+        (une personnalisation par destinataire) ; via SMTP, les messages sont
+        répartis sur les connexions mutualisées.
+        
+        Returns:
+            List[Dict]: Un résultat par email, dans l'ordre d'entrée
         """
+        if not email_notifications:
+            return []
+        
         try:
-            # Envoyer l'email
-            django_send_mail(
-                subject=email_notification.subject,
-                message=email_notification.text_content,
-                from_email=email_notification.from_email,
-                recipient_list=[email_notification.to_email],
-                html_message=email_notification.html_content,
-                fail_silently=False
+            if self.sendgrid_client:
+                return self._send_batch_via_sendgrid(email_notifications)
+            messages = [self._build_message(email) for email in email_notifications]
+            return get_mail_transport().send_messages(messages)
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de l'envoi du lot d'emails: {str(e)}")
+            return [{'success': False, 'error': str(e)} for _ in email_notifications]
+    
+    def _send_batch_via_sendgrid(self, email_notifications: list) -> List[Dict[str, Any]]:
+        """
+        Regroupe les emails de même contenu en appels SendGrid multi-destinataires
+        """
+        results = [None] * len(email_notifications)
+        groups = {}
+        
+        for index, email in enumerate(email_notifications):
+            if email.attachments:
+                # Les pièces jointes restent envoyées individuellement
+                results[index] = self._send_via_sendgrid(email)
+                continue
+            key = (
+                email.from_email, email.from_name, email.reply_to,
+                email.subject, email.html_content, email.text_content
             )
+            groups.setdefault(key, []).append(index)
+        
+        for indexes in groups.values():
+            for start in range(0, len(indexes), SENDGRID_MAX_PERSONALIZATIONS):
+                chunk = indexes[start:start + SENDGRID_MAX_PERSONALIZATIONS]
+                result = self._send_personalized_via_sendgrid(
+                    [email_notifications[index] for index in chunk]
+                )
+                for index in chunk:
+                    results[index] = result
+        
+        return results
+    
+    def _send_personalized_via_sendgrid(self, email_notifications: list) -> Dict[str, Any]:
+        """
+        Envoie un même contenu à plusieurs destinataires en un appel SendGrid
+        """
+        first = email_notifications[0]
+        try:
+            mail = Mail(
+                from_email=Email(first.from_email, first.from_name),
+                subject=first.subject,
+                plain_text_content=Content("text/plain", first.text_content),
+                html_content=Content("text/html", first.html_content)
+            )
+            if first.reply_to:
+                mail.reply_to = first.reply_to
+            
+            # Une personnalisation par destinataire : chacun ne voit que son adresse,
+            # et ses événements webhook portent l'identifiant de son email
+            for email_notification in email_notifications:
+                personalization = Personalization()
+                personalization.add_to(To(email_notification.to_email, email_notification.to_name))
+                if email_notification.pk is not None:
+                    personalization.add_custom_arg(CustomArg(SENDGRID_EMAIL_ID_ARG, str(email_notification.pk)))
+                mail.add_personalization(personalization)
+            
+            response = self.sendgrid_client.send(mail)
             
             return {
                 'success': True,
-                'provider': 'django_smtp'
+                'message_id': response.headers.get('X-Message-Id'),
+                'status_code': response.status_code,
+                'provider': 'sendgrid'
             }
             
         except Exception as e:
-            logger.error(f"Erreur Django SMTP: {str(e)}")
+            logger.error(f"Erreur SendGrid: {str(e)}")
             return {
                 'success': False,
                 'error': str(e),
-                'provider': 'django_smtp'
+                'provider': 'sendgrid'
             }
     
+    def process_sendgrid_events(self, events: list) -> int:
+        """
+        Reporte les événements du webhook SendGrid sur les emails envoyés
+        
+        Chaque événement est rattaché à son email par l'argument personnalisé
+        `email_notification_id`. Sans cet argument (envoi antérieur), le
+        `sg_message_id` n'est utilisé que s'il désigne un seul email : dans un
+        envoi groupé, il est commun à tous les destinataires.
+        
+        Args:
+            events: Événements du webhook (liste de dicts JSON)
+            
+        Returns:
+            int: Nombre d'emails mis à jour
+        """
+        from ..models import EmailNotification, Notification
+        
+        latest = {}
+        unmatched = 0
+        for event in sorted(events, key=lambda event: event.get('timestamp') or 0):
+            email_id = event.get(SENDGRID_EMAIL_ID_ARG)
+            if not email_id and event.get('sg_message_id'):
+                message_id = event['sg_message_id'].split('.')[0]
+                ids = list(EmailNotification.objects.filter(
+                    sendgrid_message_id=message_id
+                ).values_list('id', flat=True)[:2])
+                email_id = ids[0] if len(ids) == 1 else None
+            if not email_id or not event.get('event'):
+                unmatched += 1
+                continue
+            latest[str(email_id)] = event['event']
+        
+        emails = list(EmailNotification.objects.filter(pk__in=list(latest)).only('id', 'notification_id'))
+        for email in emails:
+            email.sendgrid_status = latest[str(email.pk)][:20]
+        EmailNotification.objects.bulk_update(emails, ['sendgrid_status'])
+        
+        delivered = [email.notification_id for email in emails if email.sendgrid_status == 'delivered']
+        if delivered:
+            Notification.objects.filter(id__in=delivered, status='sent').update(
+                status='delivered', delivered_at=timezone.now(), updated_at=timezone.now()
+            )
+        if unmatched:
+            logger.warning(f"{unmatched} événement(s) SendGrid sans email correspondant")
+        return len(emails)
+    
     def send_bulk_emails(self, email_notifications: list) -> Dict[str, Any]:
         """
         Envoie plusieurs emails en lot
@@ -128,9 +278,8 @@ class EmailService:
             'errors': []
         }
         
-        for email_notification in email_notifications:
-            result = self.send_email(email_notification)
-            
+        batch_results = self.send_email_batch(email_notifications)
+        for email_notification, result in zip(email_notifications, batch_results):
             if result['success']:
                 results['success_count'] += 1
             else:
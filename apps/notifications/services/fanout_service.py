@@ -0,0 +1,494 @@
+"""
+Pipeline d'envoi de notifications en masse
+
+Le template est résolu une seule fois et rendu une fois par langue, les lignes
+`Notification` et les lignes de canal sont créées par `bulk_create` par lots, et
+l'envoi réseau est confié à un pool de threads par canal dont la concurrence est
+configurable. La progression est suivie sur un `NotificationJob`.
+"""
+
+import itertools
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone, translation
+
+from ..models import (
+    Notification, NotificationTemplate, NotificationLog, NotificationJob,
+    EmailNotification, SMSNotification, PushNotification, PushToken
+)
+from .email_service import EmailService
+from .sms_service import SMSService
+from .push_service import PushService
+from .inbox import get_inbox_service
+from .outbox import compute_backoff
+from .targeting import NotificationAudience
+from .template_renderer import get_notification_template
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Champs utilisateur nécessaires à la création des notifications
+RECIPIENT_FIELDS = ('id', 'email', 'phone', 'first_name', 'last_name', 'language')
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_channel_executor(channel: str) -> ThreadPoolExecutor:
+    """
+    Retourne le pool de threads d'envoi d'un canal (ou des jobs pour 'job')
+    """
+    with _executors_lock:
+        executor = _executors.get(channel)
+        if executor is None:
+            setting_name = f'NOTIFICATION_FANOUT_{channel.upper()}_WORKERS'
+            max_workers = max(1, getattr(settings, setting_name, 4))
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=f'notifications-{channel}'
+            )
+            _executors[channel] = executor
+        return executor
+
+
+def _chunked(iterable: Iterable, size: int):
+    """Découpe un itérable en listes de taille `size`"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class NotificationFanoutService:
+    """
+    Service d'envoi de notifications en masse
+    """
+
+    def __init__(self, email_service=None, sms_service=None, push_service=None):
+        self.email_service = email_service or EmailService()
+        self.sms_service = sms_service or SMSService()
+        self.push_service = push_service or PushService()
+        self.chunk_size = getattr(settings, 'NOTIFICATION_FANOUT_CHUNK_SIZE', 1000)
+
+    def start(
+        self,
+        recipients: Iterable,
+        notification_type: str,
+        subject: str = "",
+        content: str = "",
+        template_name: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        priority: str = "normal",
+        scheduled_at: Optional[timezone.datetime] = None,
+        created_by=None,
+    ) -> NotificationJob:
+        """
+        Crée un job d'envoi en masse et l'exécute en arrière-plan
+
+        Le job démarre après la validation de la transaction courante ; la
+        progression est consultable sur l'instance `NotificationJob` retournée.
+        """
+        template = self.get_template(template_name, notification_type)
+        if isinstance(recipients, QuerySet):
+            recipients = NotificationAudience(querysets=[recipients], include_inactive=True)
+
+        if isinstance(recipients, NotificationAudience):
+            # Les identifiants sont lus en flux par le job, sans être matérialisés
+            recipient_ids = recipients
+            total_count = recipients.count()
+        else:
+            recipient_ids = [getattr(recipient, 'pk', recipient) for recipient in recipients]
+            total_count = len(recipient_ids)
+
+        job = NotificationJob.objects.create(
+            notification_type=notification_type,
+            subject=subject,
+            template=template,
+            created_by=created_by,
+            total_count=total_count,
+        )
+
+        def submit():
+            get_channel_executor('job').submit(
+                self._run_in_background, job.pk, recipient_ids, template,
+                subject, content, context, priority, scheduled_at
+            )
+
+        transaction.on_commit(submit)
+        return job
+
+    def _run_in_background(self, job_id, recipient_ids, template, subject, content,
+                           context, priority, scheduled_at):
+        """Exécute un job dans un thread du pool (connexion DB propre au thread)"""
+        close_old_connections()
+        try:
+            job = NotificationJob.objects.get(pk=job_id)
+            self.run(
+                job, recipient_ids, subject=subject, content=content, template=template,
+                context=context, priority=priority, scheduled_at=scheduled_at
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de l'envoi en masse {job_id}: {str(e)}")
+        finally:
+            connection.close()
+
+    def get_template(self, template_name: Optional[str], notification_type: str) -> Optional[NotificationTemplate]:
+        """Résout le template une seule fois pour tout l'envoi"""
+        if not template_name:
+            return None
+        template = get_notification_template(template_name, notification_type)
+        if template is None:
+            logger.warning(f"Template {template_name} non trouvé pour {notification_type}")
+        return template
+
+    def run(
+        self,
+        job: NotificationJob,
+        recipients: Iterable,
+        subject: str = "",
+        content: str = "",
+        template: Optional[NotificationTemplate] = None,
+        context: Optional[Dict[str, Any]] = None,
+        priority: str = "normal",
+        scheduled_at: Optional[timezone.datetime] = None,
+        collect: bool = False,
+    ) -> List[Notification]:
+        """
+        Exécute un envoi en masse de manière synchrone
+
+        Args:
+            job: Job de suivi de la progression
+            recipients: Utilisateurs, identifiants d'utilisateurs ou audience
+                (`NotificationAudience`, lue en flux)
+            collect: Retourner les notifications créées
+
+        Returns:
+            List[Notification]: Notifications créées si `collect`, sinon liste vide
+        """
+        context = context or {}
+        rendered = {}
+        collected = []
+
+        job.mark_as_running()
+        try:
+            for chunk in _chunked(recipients, self.chunk_size):
+                users = self._load_users(chunk)
+                notifications = self._create_notifications(
+                    job, users, subject, content, template, context, priority,
+                    scheduled_at, rendered
+                )
+                job.increment(created_count=len(notifications))
+
+                if not scheduled_at:
+                    sent, failed = self._dispatch(job.notification_type, notifications, rendered)
+                    job.increment(sent_count=sent, failed_count=failed)
+
+                if collect:
+                    collected.extend(notifications)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'envoi en masse {job.pk}: {str(e)}")
+            job.mark_as_finished(error_message=str(e))
+            raise
+
+        job.mark_as_finished()
+        return collected
+
+    def _load_users(self, chunk: list) -> list:
+        """Charge les utilisateurs d'un lot en une requête"""
+        if all(isinstance(item, User) for item in chunk):
+            return chunk
+        ids = [getattr(item, 'pk', item) for item in chunk]
+        return list(User.objects.filter(id__in=ids).only(*RECIPIENT_FIELDS))
+
+    def _render(self, template, subject, content, context, locale) -> Dict[str, str]:
+        """Rend le contenu pour une langue"""
+        with translation.override(locale):
+            if template:
+                return {
+                    'subject': subject or template.subject,
+                    'content': template.render_content(context),
+                    'html_content': template.render_html_content(context),
+                }
+            return {'subject': subject, 'content': content, 'html_content': content}
+
+    def _create_notifications(self, job, users, subject, content, template, context,
+                              priority, scheduled_at, rendered) -> List[Notification]:
+        """Crée les notifications d'un lot (et leurs logs) par `bulk_create`"""
+        notification_type = job.notification_type
+        notifications = []
+        now = timezone.now()
+
+        # Les notifications envoyées par le job sont réservées à son nom pour
+        # que les workers de l'outbox ne les envoient pas une seconde fois ;
+        # les notifications planifiées restent en attente pour l'outbox
+        reservation = {} if scheduled_at else {
+            'status': 'processing', 'locked_by': f'job:{job.pk}', 'locked_at': now
+        }
+
+        for user in users:
+            locale = getattr(user, 'language', None) or settings.LANGUAGE_CODE
+            if locale not in rendered:
+                rendered[locale] = self._render(template, subject, content, context, locale)
+
+            notification = Notification(
+                user=user,
+                notification_type=notification_type,
+                template=template,
+                subject=rendered[locale]['subject'][:200],
+                # Contenu rendu dans la langue du destinataire, comme pour un envoi unitaire
+                content=rendered[locale]['content'],
+                priority=priority,
+                scheduled_at=scheduled_at,
+                context=context,
+                recipient_email=user.email if notification_type == 'email' else '',
+                recipient_phone=(user.phone or '') if notification_type == 'sms' else '',
+                metadata={'job_id': job.pk, 'locale': locale},
+                **reservation
+            )
+            notifications.append(notification)
+
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=self.chunk_size)
+            NotificationLog.objects.bulk_create([
+                NotificationLog(
+                    notification=notification,
+                    action='created',
+                    message=f"Notification {notification_type} créée",
+                    details={'job_id': job.pk}
+                )
+                for notification in notifications
+            ], batch_size=self.chunk_size)
+            # bulk_create n'émet pas post_save : compteurs mis à jour par utilisateur
+            get_inbox_service().record_created(notifications)
+
+        return notifications
+
+    def _dispatch(self, notification_type: str, notifications: List[Notification], rendered) -> tuple:
+        """Envoie un lot de notifications et retourne (envoyées, échouées)"""
+        if notification_type == 'email':
+            deliveries = self._prepare_emails(notifications, rendered)
+            send = self.email_service.send_email
+        elif notification_type == 'sms':
+            deliveries = self._prepare_sms(notifications, rendered)
+            send = self.sms_service.send_sms
+        elif notification_type == 'push':
+            deliveries = self._prepare_push(notifications, rendered)
+            send = self.push_service.send_push
+        else:
+            logger.error(f"Type de notification non supporté: {notification_type}")
+            self._record_results(notification_type, [], [(n, {'error': 'Type non supporté'}) for n in notifications])
+            return 0, len(notifications)
+
+        # Notifications sans destination (pas d'email, de téléphone ou de token)
+        missing = [
+            (notification, {'error': 'Aucun destinataire'})
+            for notification in notifications
+            if notification.pk not in deliveries
+        ]
+
+        items = [(n, targets) for n, targets in deliveries.values()]
+        if notification_type == 'email':
+            # Envoi groupé : connexions SMTP mutualisées ou personnalisations SendGrid
+            batch = self.email_service.send_email_batch([targets[0] for _, targets in items])
+            results = [self._item_result([result]) for result in batch]
+        elif notification_type == 'push':
+            # Envoi multicast FCM pour tous les appareils du lot
+            flat = [target for _, targets in items for target in targets]
+            batch = iter(self.push_service.send_multicast(flat))
+            results = [
+                self._item_result([next(batch) for _ in targets])
+                for _, targets in items
+            ]
+        else:
+            executor = get_channel_executor(notification_type)
+            results = list(executor.map(lambda item: self._send_item(send, *item), items))
+
+        succeeded = []
+        failed = list(missing)
+        for (notification, targets), result in zip(items, results):
+            if result['success']:
+                succeeded.append((notification, targets, result))
+            else:
+                failed.append((notification, result))
+
+        self._record_results(notification_type, succeeded, failed)
+        return len(succeeded), len(failed)
+
+    def _send_item(self, send, notification, targets) -> Dict[str, Any]:
+        """Envoie une notification à toutes ses cibles (exécuté dans le pool)"""
+        return self._item_result([send(target) for target in targets])
+
+    def _item_result(self, results) -> Dict[str, Any]:
+        """Agrège les résultats d'envoi d'une notification"""
+        successes = [result for result in results if result.get('success')]
+        if successes:
+            return {'success': True, 'results': results, 'success_count': len(successes)}
+        return {
+            'success': False,
+            'results': results,
+            'error': results[0].get('error', 'Erreur inconnue') if results else 'Aucune cible'
+        }
+
+    def _prepare_emails(self, notifications, rendered) -> Dict[Any, tuple]:
+        emails = []
+        for notification in notifications:
+            if not notification.recipient_email:
+                continue
+            user = notification.user
+            content = rendered[notification.metadata['locale']]
+            emails.append(EmailNotification(
+                notification=notification,
+                to_email=notification.recipient_email,
+                to_name=f"{user.first_name} {user.last_name}".strip(),
+                subject=notification.subject,
+                html_content=content['html_content'],
+                text_content=content['content'],
+                context=notification.context
+            ))
+        EmailNotification.objects.bulk_create(emails, batch_size=self.chunk_size)
+        return {email.notification.pk: (email.notification, [email]) for email in emails}
+
+    def _prepare_sms(self, notifications, rendered) -> Dict[Any, tuple]:
+        messages = [
+            SMSNotification(
+                notification=notification,
+                to_phone=notification.recipient_phone,
+                message=rendered[notification.metadata['locale']]['content'][:1600],
+                context=notification.context
+            )
+            for notification in notifications
+            if notification.recipient_phone
+        ]
+        SMSNotification.objects.bulk_create(messages, batch_size=self.chunk_size)
+        return {sms.notification.pk: (sms.notification, [sms]) for sms in messages}
+
+    def _prepare_push(self, notifications, rendered) -> Dict[Any, tuple]:
+        tokens_by_user = defaultdict(list)
+        tokens = PushToken.objects.filter(
+            user_id__in=[notification.user_id for notification in notifications],
+            is_active=True
+        ).select_related('user').order_by(F('last_used_at').desc(nulls_last=True))
+        for token in tokens:
+            tokens_by_user[token.user_id].append(token)
+
+        deliveries = {}
+        rows = []
+        for notification in notifications:
+            user_tokens = tokens_by_user.get(notification.user_id)
+            if not user_tokens:
+                continue
+            content = rendered[notification.metadata['locale']]
+            data = notification.context.get('data', {})
+            # Une ligne persistée pour le token principal, des copies en mémoire
+            # pour les autres appareils de l'utilisateur
+            targets = [
+                PushNotification(
+                    notification=notification,
+                    push_token=token,
+                    title=notification.subject[:100],
+                    body=content['content'][:200],
+                    data=data,
+                    context=notification.context
+                )
+                for token in user_tokens
+            ]
+            rows.append(targets[0])
+            deliveries[notification.pk] = (notification, targets)
+
+        PushNotification.objects.bulk_create(rows, batch_size=self.chunk_size)
+        return deliveries
+
+    def _record_results(self, notification_type, succeeded, failed):
+        """Enregistre les résultats d'un lot avec des mises à jour groupées"""
+        now = timezone.now()
+
+        with transaction.atomic():
+            if succeeded:
+                Notification.objects.filter(
+                    pk__in=[notification.pk for notification, _, _ in succeeded]
+                ).update(status='sent', sent_at=now, locked_by='', locked_at=None, updated_at=now)
+                self._record_channel_results(notification_type, succeeded, now)
+            if failed:
+                Notification.objects.filter(
+                    pk__in=[notification.pk for notification, _ in failed]
+                ).update(
+                    status='failed',
+                    retry_count=F('retry_count') + 1,
+                    # Nouvelle tentative par l'outbox après le premier palier de backoff
+                    next_attempt_at=now + compute_backoff(1),
+                    locked_by='',
+                    locked_at=None,
+                    updated_at=now
+                )
+
+            logs = [
+                NotificationLog(
+                    notification=notification,
+                    action='sent',
+                    message=f"Notification {notification_type} envoyée",
+                    details={'success_count': result.get('success_count', 1)}
+                )
+                for notification, _, result in succeeded
+            ] + [
+                NotificationLog(
+                    notification=notification,
+                    action='failed',
+                    message=f"Échec envoi {notification_type}: {result.get('error', 'Erreur inconnue')}",
+                    details={'error': result.get('error', '')}
+                )
+                for notification, result in failed
+            ]
+            NotificationLog.objects.bulk_create(logs, batch_size=self.chunk_size)
+
+        for notification, _, _ in succeeded:
+            notification.status = 'sent'
+            notification.sent_at = now
+        for notification, _ in failed:
+            notification.status = 'failed'
+            notification.retry_count += 1
+
+    def _record_channel_results(self, notification_type, succeeded, now):
+        """Reporte les identifiants fournisseur sur les lignes de canal"""
+        if notification_type == 'email':
+            emails = []
+            for _, targets, result in succeeded:
+                email = targets[0]
+                email.sendgrid_message_id = result['results'][0].get('message_id') or ''
+                emails.append(email)
+            EmailNotification.objects.bulk_update(emails, ['sendgrid_message_id'], batch_size=self.chunk_size)
+
+        elif notification_type == 'sms':
+            messages = []
+            for _, targets, result in succeeded:
+                sms = targets[0]
+                sms.twilio_sid = result['results'][0].get('sid') or ''
+                sms.twilio_status = result['results'][0].get('status') or ''
+                messages.append(sms)
+            SMSNotification.objects.bulk_update(messages, ['twilio_sid', 'twilio_status'], batch_size=self.chunk_size)
+
+        elif notification_type == 'push':
+            rows = []
+            used_tokens = []
+            for _, targets, result in succeeded:
+                row = targets[0]
+                first = result['results'][0]
+                row.fcm_message_id = first.get('message_id') or ''
+                row.fcm_status = first.get('status') or ''
+                rows.append(row)
+                used_tokens.extend(
+                    target.push_token_id
+                    for target, target_result in zip(targets, result['results'])
+                    if target_result.get('success')
+                )
+            PushNotification.objects.bulk_update(rows, ['fcm_message_id', 'fcm_status'], batch_size=self.chunk_size)
+            PushToken.objects.filter(pk__in=used_tokens).update(last_used_at=now, updated_at=now)
@@ -0,0 +1,240 @@
+"""
+Boîte de réception des notifications
+
+Les compteurs (total, non lues, par type) sont dénormalisés dans
+`NotificationInbox` et mis à jour par incréments `F()` lors de la création, de
+la lecture et de la suppression des notifications. Ils sont servis depuis le
+cache : l'interrogation du badge ne coûte qu'un accès cache. La liste est
+paginée par curseur sur (created_at, id) : le coût d'une page ne dépend pas de
+sa profondeur.
+"""
+
+import base64
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import Notification, NotificationInbox
+
+logger = logging.getLogger(__name__)
+
+TYPE_FIELDS = {
+    'email': 'email_count',
+    'sms': 'sms_count',
+    'push': 'push_count',
+    'in_app': 'in_app_count',
+}
+
+
+class InvalidCursor(ValueError):
+    """Curseur de pagination invalide"""
+
+
+def encode_cursor(notification: Notification) -> str:
+    """Curseur opaque positionné après `notification`"""
+    raw = f'{notification.created_at.isoformat()}|{notification.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    """Retourne (created_at, id) d'un curseur"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError(cursor)
+        return created_at, int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+
+
+class NotificationInboxService:
+    """
+    Service de la boîte de réception (compteurs et liste paginée)
+    """
+
+    def __init__(self):
+        self.cache_ttl = getattr(settings, 'NOTIFICATION_INBOX_CACHE_TTL', 300)
+
+    @staticmethod
+    def cache_key(user_id) -> str:
+        return f'notifications_inbox_{user_id}'
+
+    # Compteurs
+
+    def get_counters(self, user) -> Dict:
+        """Compteurs de l'utilisateur (un accès cache quand ils sont chauds)"""
+        user_id = getattr(user, 'pk', user)
+        key = self.cache_key(user_id)
+        counters = cache.get(key)
+        if counters is None:
+            inbox = NotificationInbox.objects.filter(user_id=user_id).first() or self.rebuild(user_id)
+            counters = inbox.to_counters()
+            cache.set(key, counters, self.cache_ttl)
+        return counters
+
+    def rebuild(self, user_id) -> NotificationInbox:
+        """Recalcule les compteurs d'un utilisateur depuis les notifications"""
+        return self.rebuild_many([user_id])[user_id]
+
+    def rebuild_many(self, user_ids: Iterable) -> Dict[int, NotificationInbox]:
+        """Recalcule les compteurs de plusieurs utilisateurs (une requête agrégée)"""
+        user_ids = list(user_ids)
+        aggregates = {
+            row.pop('user_id'): row
+            for row in Notification.objects.filter(user_id__in=user_ids).values('user_id').annotate(
+                total_count=Count('id'),
+                unread_count=Count('id', filter=Q(read_at__isnull=True)),
+                **{
+                    field: Count('id', filter=Q(notification_type=notification_type))
+                    for notification_type, field in TYPE_FIELDS.items()
+                }
+            ).order_by()
+        }
+        inboxes = {
+            user_id: NotificationInbox(user_id=user_id, **aggregates.get(user_id, {}))
+            for user_id in user_ids
+        }
+        NotificationInbox.objects.bulk_create(
+            inboxes.values(),
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['total_count', 'unread_count', *TYPE_FIELDS.values()],
+        )
+        self._invalidate(user_ids)
+        return inboxes
+
+    def _apply(self, user_ids: list, deltas: Dict[str, int]):
+        """Applique les mêmes incréments aux compteurs de plusieurs utilisateurs"""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas or not user_ids:
+            return
+        updated = NotificationInbox.objects.filter(user_id__in=user_ids).update(
+            **{
+                # Les compteurs ne descendent jamais sous zéro
+                field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+                for field, delta in deltas.items()
+            },
+            updated_at=timezone.now()
+        )
+        if updated < len(user_ids):
+            # Premières notifications (ou compteurs absents) : recalcul complet
+            existing = set(
+                NotificationInbox.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True)
+            ) if updated else set()
+            self.rebuild_many([user_id for user_id in user_ids if user_id not in existing])
+        self._invalidate(user_ids)
+
+    def _invalidate(self, user_ids: list):
+        keys = [self.cache_key(user_id) for user_id in user_ids]
+        cache.delete_many(keys)
+        # Une lecture concurrente a pu remettre en cache les anciennes valeurs
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    def record_created(self, notifications: Iterable[Notification]):
+        """
+        Comptabilise des notifications créées
+
+        Les utilisateurs ayant les mêmes incréments sont mis à jour ensemble :
+        un envoi en masse ne coûte qu'une mise à jour par lot.
+        """
+        deltas = {}
+        for notification in notifications:
+            user_deltas = deltas.setdefault(notification.user_id, Counter())
+            user_deltas['total_count'] += 1
+            user_deltas[TYPE_FIELDS.get(notification.notification_type, 'in_app_count')] += 1
+            if notification.read_at is None:
+                user_deltas['unread_count'] += 1
+
+        groups = defaultdict(list)
+        for user_id, user_deltas in deltas.items():
+            groups[tuple(sorted(user_deltas.items()))].append(user_id)
+        for user_deltas, user_ids in groups.items():
+            self._apply(user_ids, dict(user_deltas))
+
+    def record_deleted(self, notification: Notification):
+        """Décompte une notification supprimée"""
+        self._apply([notification.user_id], {
+            'total_count': -1,
+            TYPE_FIELDS.get(notification.notification_type, 'in_app_count'): -1,
+            'unread_count': -1 if notification.read_at is None else 0,
+        })
+
+    # Lecture
+
+    def mark_as_read(self, notification: Notification) -> bool:
+        """Marque une notification comme lue ; retourne False si elle l'était déjà"""
+        now = timezone.now()
+        with transaction.atomic():
+            updated = Notification.objects.filter(pk=notification.pk, read_at__isnull=True).update(
+                read_at=now, updated_at=now
+            )
+            if updated:
+                self._apply([notification.user_id], {'unread_count': -1})
+        if updated:
+            notification.read_at = now
+        return bool(updated)
+
+    def mark_all_as_read(self, user) -> int:
+        """Marque toutes les notifications de l'utilisateur comme lues"""
+        now = timezone.now()
+        with transaction.atomic():
+            updated = Notification.objects.filter(user=user, read_at__isnull=True).update(
+                read_at=now, updated_at=now
+            )
+            if updated:
+                self._apply([user.pk], {'unread_count': -updated})
+        return updated
+
+    # Liste
+
+    def list_notifications(
+        self,
+        user,
+        notification_type: Optional[str] = None,
+        status: Optional[str] = None,
+        unread: bool = False,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+    ) -> Tuple[List[Notification], Optional[str]]:
+        """
+        Page de notifications, de la plus récente à la plus ancienne
+
+        Returns:
+            Tuple[List[Notification], Optional[str]]: (notifications, curseur suivant)
+        """
+        queryset = Notification.objects.filter(user=user).select_related('user', 'template')
+        if notification_type:
+            queryset = queryset.filter(notification_type=notification_type)
+        if status:
+            queryset = queryset.filter(status=status)
+        if unread:
+            queryset = queryset.filter(read_at__isnull=True)
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        notifications = list(queryset.order_by('-created_at', '-id')[:page_size + 1])
+        next_cursor = None
+        if len(notifications) > page_size:
+            notifications = notifications[:page_size]
+            next_cursor = encode_cursor(notifications[-1])
+        return notifications, next_cursor
+
+
+_inbox_service = NotificationInboxService()
+
+
+def get_inbox_service() -> NotificationInboxService:
+    """Retourne le service de boîte de réception du processus"""
+    return _inbox_service
@@ -0,0 +1,179 @@
+"""
+Transport SMTP mutualisé pour l'envoi d'emails
+
+Les connexions du backend email Django (SMTP authentifié + TLS) sont ouvertes
+une fois puis réutilisées d'un message à l'autre au lieu d'un handshake par
+email. Les envois en masse sont répartis par lots sur plusieurs connexions en
+parallèle ; une connexion coupée par le serveur est rouverte et le message
+retenté une fois.
+"""
+
+import logging
+import queue
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Erreurs indiquant une connexion inutilisable (à rouvrir)
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPConnectionPool:
+    """
+    Pool de connexions du backend email Django
+    """
+
+    def __init__(self, size: int = None, backend: str = None):
+        self.size = max(1, size or getattr(settings, 'EMAIL_SMTP_POOL_SIZE', 4))
+        self.backend = backend
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _new_connection(self):
+        return get_connection(backend=self.backend, fail_silently=False)
+
+    @contextmanager
+    def connection(self):
+        """Emprunte une connexion ouverte du pool"""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            connection = self._new_connection() if can_create else self._idle.get()
+
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def reconnect(self, connection):
+        """Ferme puis rouvre une connexion"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+        connection.open()
+
+    def close(self):
+        """Ferme toutes les connexions inactives du pool"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                connection.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+
+
+class BulkMailTransport:
+    """
+    Envoi de messages Django (EmailMessage / EmailMultiAlternatives) sur des
+    connexions mutualisées
+    """
+
+    def __init__(self, pool_size: int = None, batch_size: int = None, backend: str = None):
+        self.pool = SMTPConnectionPool(size=pool_size, backend=backend)
+        self.batch_size = max(1, batch_size or getattr(settings, 'EMAIL_SMTP_BATCH_SIZE', 100))
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool.size,
+                    thread_name_prefix='smtp-transport'
+                )
+            return self._executor
+
+    def send(self, message) -> Dict[str, Any]:
+        """Envoie un message sur une connexion du pool"""
+        return self.send_messages([message])[0]
+
+    def send_messages(self, messages: list) -> List[Dict[str, Any]]:
+        """
+        Envoie des messages par lots répartis sur les connexions du pool
+
+        Returns:
+            List[Dict]: Un résultat par message, dans l'ordre d'entrée
+        """
+        if not messages:
+            return []
+
+        batches = [
+            messages[i:i + self.batch_size]
+            for i in range(0, len(messages), self.batch_size)
+        ]
+        if len(batches) == 1:
+            return self._send_batch(batches[0])
+
+        results = []
+        for batch_results in self._get_executor().map(self._send_batch, batches):
+            results.extend(batch_results)
+        return results
+
+    def _send_batch(self, messages: list) -> List[Dict[str, Any]]:
+        """Envoie un lot de messages sur une même connexion"""
+        results = []
+        with self.pool.connection() as connection:
+            for message in messages:
+                results.append(self._send_one(connection, message))
+        return results
+
+    def _send_one(self, connection, message) -> Dict[str, Any]:
+        for attempt in range(2):
+            try:
+                if attempt:
+                    self.pool.reconnect(connection)
+                else:
+                    # Ouvre la connexion si nécessaire ; ne fait rien si elle l'est déjà
+                    connection.open()
+                sent = connection.send_messages([message])
+                if sent:
+                    return {'success': True, 'provider': 'django_smtp'}
+                return {'success': False, 'error': 'Message non envoyé', 'provider': 'django_smtp'}
+            except (*CONNECTION_ERRORS, smtplib.SMTPResponseException) as e:
+                # 421 : le serveur ferme la connexion (limite de session, inactivité)
+                if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code != 421:
+                    logger.error(f"Erreur Django SMTP: {str(e)}")
+                    return {'success': False, 'error': str(e), 'provider': 'django_smtp'}
+                if attempt:
+                    logger.error(f"Connexion SMTP perdue: {str(e)}")
+                    return {'success': False, 'error': str(e), 'provider': 'django_smtp'}
+                logger.warning(f"Connexion SMTP interrompue, reconnexion: {str(e)}")
+            except Exception as e:
+                logger.error(f"Erreur Django SMTP: {str(e)}")
+                return {'success': False, 'error': str(e), 'provider': 'django_smtp'}
+
+    def close(self):
+        """Ferme les connexions du pool"""
+        self.pool.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_mail_transport() -> BulkMailTransport:
+    """Retourne le transport partagé du processus"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = BulkMailTransport()
+    return _transport
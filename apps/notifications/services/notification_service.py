@@ -4,22 +4,79 @@ Service principal pour la gestion des notifications
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
 from django.utils import timezone
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 import logging
+import threading
+import time
 
 from ..models import (
-    Notification, NotificationTemplate, NotificationLog,
+    Notification, NotificationLog, NotificationJob,
     EmailNotification, SMSNotification, PushNotification
 )
 from .email_service import EmailService
 from .sms_service import SMSService
 from .push_service import PushService
+from .template_renderer import get_notification_template
+from .digest import NotificationDigester, should_digest
+from .inbox import get_inbox_service
+from .targeting import NotificationAudience
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
+_digest_timer = None
+_digest_timer_due = None
+_digest_timer_lock = threading.Lock()
+
+
+def schedule_digest_flush(delay: float):
+    """
+    Envoie les résumés échus après `delay` secondes (mode inline, sans worker
+    de l'outbox pour les remettre à l'envoi)
+
+    Un seul timer est en attente par processus : il est conservé s'il se
+    déclenche avant l'échéance demandée, et reprogrammé après chaque envoi
+    pour le prochain résumé ouvert.
+    """
+    global _digest_timer, _digest_timer_due
+    delay = max(0.0, delay)
+    due = time.monotonic() + delay
+    with _digest_timer_lock:
+        if _digest_timer is not None:
+            if _digest_timer_due <= due:
+                return
+            _digest_timer.cancel()
+        _digest_timer = threading.Timer(delay, _flush_digests_in_background)
+        _digest_timer.daemon = True
+        _digest_timer_due = due
+        _digest_timer.start()
+
+
+def _flush_digests_in_background():
+    """Envoie les résumés échus depuis le timer (connexion DB propre au thread)"""
+    global _digest_timer
+    with _digest_timer_lock:
+        if _digest_timer is threading.current_thread():
+            _digest_timer = None
+    close_old_connections()
+    try:
+        NotificationService().flush_digests()
+        next_due = (
+            Notification.objects.filter(status='buffered')
+            .order_by('scheduled_at').values_list('scheduled_at', flat=True).first()
+        )
+        if next_due is not None:
+            schedule_digest_flush((next_due - timezone.now()).total_seconds())
+    except Exception as e:
+        logger.error(f"Erreur lors de l'envoi des résumés: {str(e)}")
+    finally:
+        connection.close()
+
+
 class NotificationService:
     """
     Service principal pour la gestion des notifications
@@ -29,6 +86,7 @@ class NotificationService:
         self.email_service = EmailService()
         self.sms_service = SMSService()
         self.push_service = PushService()
+        self.digester = NotificationDigester()
     
     def send_notification(
         self,
@@ -40,6 +98,7 @@ class NotificationService:
         context: Optional[Dict[str, Any]] = None,
         priority: str = "normal",
         scheduled_at: Optional[timezone.datetime] = None,
+        category: Optional[str] = None,
         **kwargs
     ) -> Notification:
         """
@@ -54,25 +113,41 @@ class NotificationService:
             context: Contexte pour le rendu du template
             priority: Priorité de la notification
             scheduled_at: Date de planification
+            category: Catégorie ; les notifications d'une même catégorie sont
+                regroupées en un résumé par fenêtre (sauf priorité critique)
             **kwargs: Arguments supplémentaires
             
         Returns:
-            Notification: Instance de la notification créée
+            Notification: Instance de la notification créée (ou résumé en cours)
         """
         context = context or {}
         
         # Récupérer le template si spécifié
         template = None
         if template_name:
-            try:
-                template = NotificationTemplate.objects.get(
-                    name=template_name,
-                    notification_type=notification_type,
-                    is_active=True
-                )
-            except NotificationTemplate.DoesNotExist:
+            template = get_notification_template(template_name, notification_type)
+            if template is None:
                 logger.warning(f"Template {template_name} non trouvé pour {notification_type}")
         
+        from .outbox import outbox_enabled
+
+        # Regrouper avec les notifications récentes de la même catégorie
+        if not scheduled_at and should_digest(category, priority):
+            digest = self.digester.add(
+                user=user,
+                notification_type=notification_type,
+                category=category,
+                subject=subject or (template.subject if template else ''),
+                content=template.render_content(context) if template else content,
+                priority=priority,
+                **kwargs
+            )
+            if not outbox_enabled() and digest.context.get('digest_count') == 1:
+                # Nouveau résumé : envoi à l'échéance de sa fenêtre (sans worker)
+                delay = (digest.scheduled_at - timezone.now()).total_seconds()
+                transaction.on_commit(lambda: schedule_digest_flush(delay))
+            return digest
+        
         # Créer la notification
         notification = Notification.objects.create(
             user=user,
@@ -82,6 +157,7 @@ class NotificationService:
             content=content,
             priority=priority,
             scheduled_at=scheduled_at,
+            category=category or '',
             context=context,
             **kwargs
         )
@@ -93,9 +169,9 @@ class NotificationService:
             message=f"Notification {notification_type} créée"
         )
         
-        # Envoyer immédiatement si pas de planification
+        # Envoyer immédiatement si pas de planification (par l'outbox si activée)
         if not scheduled_at:
-            self._send_notification(notification)
+            self.dispatch(notification)
         
         return notification
     
@@ -163,7 +239,7 @@ class NotificationService:
     
     def send_bulk_notifications(
         self,
-        users: List[User],
+        users: Union[List[User], NotificationAudience],
         notification_type: str,
         subject: str = "",
         content: str = "",
@@ -172,22 +248,65 @@ class NotificationService:
         **kwargs
     ) -> List[Notification]:
         """
-        Envoie des notifications en masse
+        Envoie des notifications en masse (de manière synchrone)
+        
+        Le template est rendu une fois par langue, les lignes sont créées par
+        lots et l'envoi est parallélisé par canal (voir NotificationFanoutService).
+        `users` peut être une `NotificationAudience` (groupes, rôles...), lue en flux.
         """
-        notifications = []
-        for user in users:
-            notification = self.send_notification(
-                user=user,
-                notification_type=notification_type,
-                subject=subject,
-                content=content,
-                template_name=template_name,
-                context=context,
-                **kwargs
-            )
-            notifications.append(notification)
+        fanout = self.get_fanout_service()
+        template = fanout.get_template(template_name, notification_type)
+        job = NotificationJob.objects.create(
+            notification_type=notification_type,
+            subject=subject,
+            template=template,
+            created_by=kwargs.pop('created_by', None),
+            total_count=users.count() if isinstance(users, NotificationAudience) else len(users),
+        )
+        return fanout.run(
+            job,
+            users,
+            subject=subject,
+            content=content,
+            template=template,
+            context=context,
+            collect=True,
+            **kwargs
+        )
+    
+    def start_bulk_notifications(
+        self,
+        users,
+        notification_type: str,
+        subject: str = "",
+        content: str = "",
+        template_name: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> NotificationJob:
+        """
+        Lance un envoi en masse en arrière-plan et retourne son job de suivi
         
-        return notifications
+        `users` peut être une liste, un queryset ou une `NotificationAudience`.
+        """
+        return self.get_fanout_service().start(
+            users,
+            notification_type,
+            subject=subject,
+            content=content,
+            template_name=template_name,
+            context=context,
+            **kwargs
+        )
+    
+    def get_fanout_service(self):
+        """Retourne le pipeline d'envoi en masse partageant les services de canal"""
+        from .fanout_service import NotificationFanoutService
+        return NotificationFanoutService(
+            email_service=self.email_service,
+            sms_service=self.sms_service,
+            push_service=self.push_service
+        )
     
     def _send_notification(self, notification: Notification):
         """
@@ -219,18 +338,21 @@ class NotificationService:
         Envoie une notification email
         """
         try:
-            # Créer l'email notification
-            email_notification = EmailNotification.objects.create(
-                notification=notification,
-                to_email=notification.recipient_email,
-                to_name=f"{notification.user.first_name} {notification.user.last_name}".strip(),
-                subject=notification.render_content(),
-                html_content=notification.render_html_content(),
-                context=notification.context
-            )
-            
-            # Préparer le contenu
-            email_notification.prepare_content()
+            # Créer l'email notification (ou reprendre celle d'une tentative précédente)
+            email_notification = EmailNotification.objects.filter(notification=notification).first()
+            if email_notification is None:
+                email_notification = EmailNotification.objects.create(
+                    notification=notification,
+                    to_email=notification.recipient_email,
+                    to_name=f"{notification.user.first_name} {notification.user.last_name}".strip(),
+                    subject=notification.subject,
+                    html_content=notification.render_html_content(),
+                    text_content=notification.render_content(),
+                    context=notification.context
+                )
+                
+                # Préparer le contenu
+                email_notification.prepare_content()
             
             # Envoyer via le service email
             result = self.email_service.send_email(email_notification)
@@ -265,13 +387,15 @@ class NotificationService:
         Envoie une notification SMS
         """
         try:
-            # Créer la SMS notification
-            sms_notification = SMSNotification.objects.create(
-                notification=notification,
-                to_phone=notification.recipient_phone,
-                message=notification.render_content(),
-                context=notification.context
-            )
+            # Créer la SMS notification (ou reprendre celle d'une tentative précédente)
+            sms_notification = SMSNotification.objects.filter(notification=notification).first()
+            if sms_notification is None:
+                sms_notification = SMSNotification.objects.create(
+                    notification=notification,
+                    to_phone=notification.recipient_phone,
+                    message=notification.render_content(),
+                    context=notification.context
+                )
             
             # Envoyer via le service SMS
             result = self.sms_service.send_sms(sms_notification)
@@ -310,45 +434,53 @@ class NotificationService:
         try:
             # Récupérer les tokens push de l'utilisateur
             from ..models import PushToken
-            push_tokens = PushToken.objects.filter(
+            push_tokens = list(PushToken.objects.filter(
                 user=notification.user,
                 is_active=True
-            )
+            ).select_related('user'))
             
-            if not push_tokens.exists():
+            if not push_tokens:
                 logger.warning(f"Aucun token push actif pour l'utilisateur {notification.user.email}")
                 notification.mark_as_failed()
                 return
             
-            # Envoyer à tous les tokens
-            success_count = 0
-            for push_token in push_tokens:
-                try:
-                    # Créer la push notification
-                    push_notification = PushNotification.objects.create(
-                        notification=notification,
-                        push_token=push_token,
-                        title=notification.subject,
-                        body=notification.render_content(),
-                        data=notification.context.get('data', {}),
-                        context=notification.context
-                    )
-                    
-                    # Envoyer via le service push
-                    result = self.push_service.send_push(push_notification)
-                    
-                    if result['success']:
-                        success_count += 1
-                        push_notification.update_fcm_status(
-                            message_id=result.get('message_id', ''),
-                            status=result.get('status', '')
-                        )
-                        push_token.mark_as_used()
-                    else:
-                        logger.error(f"Échec envoi push pour token {push_token.id}: {result.get('error')}")
-                        
-                except Exception as e:
-                    logger.error(f"Erreur lors de l'envoi push pour token {push_token.id}: {str(e)}")
+            # Une ligne persistée pour le token principal, des copies en mémoire
+            # pour les autres appareils ; un seul envoi multicast pour tous
+            body = notification.render_content()
+            targets = [
+                PushNotification(
+                    notification=notification,
+                    push_token=push_token,
+                    title=notification.subject,
+                    body=body,
+                    data=notification.context.get('data', {}),
+                    context=notification.context
+                )
+                for push_token in push_tokens
+            ]
+            previous = PushNotification.objects.filter(notification=notification).values_list('pk', flat=True).first()
+            if previous:
+                targets[0].pk = previous
+            targets[0].save()
+            results = self.push_service.send_multicast(targets)
+            
+            successes = [
+                (target, result) for target, result in zip(targets, results) if result['success']
+            ]
+            for target, result in zip(targets, results):
+                if not result['success']:
+                    logger.error(f"Échec envoi push pour token {target.push_token.id}: {result.get('error')}")
+            
+            success_count = len(successes)
+            if successes:
+                result = successes[0][1]
+                targets[0].update_fcm_status(
+                    message_id=result.get('message_id', ''),
+                    status=result.get('status', '')
+                )
+                PushToken.objects.filter(
+                    pk__in=[target.push_token.pk for target, _ in successes]
+                ).update(last_used_at=timezone.now())
             
             if success_count > 0:
                 notification.mark_as_sent()
@@ -371,15 +503,53 @@ class NotificationService:
             notification.mark_as_failed()
             raise
     
+    def dispatch(self, notification: Notification):
+        """
+        Déclenche l'envoi d'une notification
+        
+        En mode outbox, la notification reste en attente et sera envoyée par un
+        worker une fois la transaction validée ; sinon elle est envoyée en ligne.
+        """
+        from .outbox import outbox_enabled, notify_workers
+        if outbox_enabled():
+            notify_workers()
+        else:
+            self._send_notification(notification)
+    
+    def flush_digests(self) -> int:
+        """
+        Envoie les résumés dont la fenêtre de regroupement est écoulée
+        
+        Returns:
+            int: Nombre de résumés envoyés
+        """
+        digests = self.digester.flush_due()
+        for digest in digests:
+            self.dispatch(digest)
+        return len(digests)
+    
     def retry_failed_notifications(self, max_retries: int = 3):
         """
         Retente l'envoi des notifications échouées
+        
+        Les notifications sont remises dans l'outbox pour un envoi immédiat par
+        les workers (ou renvoyées en ligne si l'outbox est désactivée).
         """
+        from .outbox import outbox_enabled, notify_workers
+        
         failed_notifications = Notification.objects.filter(
             status='failed',
             retry_count__lt=max_retries
         )
         
+        if outbox_enabled():
+            count = failed_notifications.filter(retry_count__lt=F('max_retries')).update(
+                next_attempt_at=timezone.now()
+            )
+            notify_workers()
+            return count
+        
+        count = 0
         for notification in failed_notifications:
             if notification.can_retry():
                 self._send_notification(notification)
@@ -388,6 +558,8 @@ class NotificationService:
                     action='retry',
                     message=f"Tentative {notification.retry_count + 1}"
                 )
+                count += 1
+        return count
     
     def get_user_notifications(
         self,
@@ -409,12 +581,11 @@ class NotificationService:
         
         return list(queryset.order_by('-created_at')[:limit])
     
-    def mark_notification_as_read(self, notification: Notification):
+    def mark_notification_as_read(self, notification: Notification) -> bool:
         """
-        Marque une notification comme lue
+        Marque une notification comme lue (et met à jour les compteurs)
         """
-        # Cette fonctionnalité peut être étendue selon les besoins
-        pass
+        return get_inbox_service().mark_as_read(notification)
 
 
 
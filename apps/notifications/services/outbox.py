@@ -0,0 +1,245 @@
+"""
+Outbox transactionnelle des notifications
+
+Les notifications sont d'abord enregistrées en base (`status='pending'`) dans la
+transaction qui les crée ; aucun envoi n'a lieu pendant la requête HTTP. Des
+workers (commande `run_notification_worker`) réservent les notifications dues
+avec `SELECT ... FOR UPDATE SKIP LOCKED` (ou une réservation optimiste sous
+SQLite), les envoient avec une concurrence bornée par canal, puis planifient
+les nouvelles tentatives avec un backoff exponentiel et une gigue aléatoire.
+Une notification qui épuise ses tentatives passe au statut `dead`.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import Notification, NotificationLog
+
+logger = logging.getLogger(__name__)
+
+# Clé de cache signalant aux workers l'arrivée de nouvelles notifications
+WAKEUP_CACHE_KEY = 'notifications_outbox_wakeup'
+
+CHANNELS = ('email', 'sms', 'push', 'in_app')
+
+
+def outbox_enabled() -> bool:
+    """Indique si les notifications sont envoyées par l'outbox (et non en ligne)"""
+    return getattr(settings, 'NOTIFICATION_DELIVERY_MODE', 'inline') == 'outbox'
+
+
+def notify_workers():
+    """Réveille les workers après la validation de la transaction courante"""
+    transaction.on_commit(lambda: cache.set(WAKEUP_CACHE_KEY, time.time(), None))
+
+
+def compute_backoff(retry_count: int) -> timedelta:
+    """
+    Délai avant la prochaine tentative : exponentiel, plafonné, avec gigue
+    (la moitié du délai est fixe, l'autre moitié aléatoire)
+    """
+    base = getattr(settings, 'NOTIFICATION_OUTBOX_BACKOFF_BASE', 30)
+    cap = getattr(settings, 'NOTIFICATION_OUTBOX_BACKOFF_MAX', 3600)
+    delay = min(cap, base * (2 ** max(0, retry_count - 1)))
+    return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+
+def requeue(notification: Notification):
+    """Remet une notification dans l'outbox pour un envoi immédiat"""
+    notification.status = 'pending'
+    notification.next_attempt_at = None
+    notification.save(update_fields=['status', 'next_attempt_at', 'updated_at'])
+    notify_workers()
+
+
+class NotificationOutbox:
+    """
+    Worker de l'outbox des notifications
+    """
+
+    def __init__(self, service=None, worker_id: str = None, batch_size: int = None, concurrency: int = None):
+        if service is None:
+            from .notification_service import NotificationService
+            service = NotificationService()
+        self.service = service
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        self.batch_size = batch_size or getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', 100)
+        self.lock_timeout = getattr(settings, 'NOTIFICATION_OUTBOX_LOCK_TIMEOUT', 600)
+        self.concurrency = concurrency
+        self._executors = {}
+
+    def _get_executor(self, channel: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(channel)
+        if executor is None:
+            if self.concurrency is not None:
+                max_workers = self.concurrency
+            else:
+                max_workers = getattr(settings, f'NOTIFICATION_OUTBOX_{channel.upper()}_CONCURRENCY', 4)
+            executor = ThreadPoolExecutor(
+                max_workers=max(1, max_workers),
+                thread_name_prefix=f'outbox-{channel}'
+            )
+            self._executors[channel] = executor
+        return executor
+
+    def due_queryset(self, now):
+        """Notifications prêtes à être envoyées"""
+        return Notification.objects.filter(
+            Q(status='pending') & (Q(scheduled_at__isnull=True) | Q(scheduled_at__lte=now))
+            | Q(status='failed', retry_count__lt=F('max_retries'), next_attempt_at__lte=now)
+        )
+
+    def claim(self, now=None) -> List[Notification]:
+        """Réserve un lot de notifications dues pour ce worker"""
+        now = now or timezone.now()
+        due = self.due_queryset(now).order_by('created_at')
+
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                ids = list(
+                    due.select_for_update(skip_locked=True).values_list('id', flat=True)[:self.batch_size]
+                )
+                if ids:
+                    Notification.objects.filter(id__in=ids).update(
+                        status='processing', locked_by=self.worker_id, locked_at=now, updated_at=now
+                    )
+        else:
+            # Réservation optimiste : seule la première mise à jour d'une ligne
+            # encore due aboutit (les écritures SQLite sont sérialisées). La mise
+            # à jour revérifie les conditions d'échéance : une ligne reprise et
+            # replanifiée entre-temps par un autre worker n'est pas réservée.
+            ids = list(due.values_list('id', flat=True)[:self.batch_size])
+            if ids:
+                self.due_queryset(now).filter(id__in=ids).update(
+                    status='processing', locked_by=self.worker_id, locked_at=now, updated_at=now
+                )
+
+        if not ids:
+            return []
+        return list(
+            Notification.objects.filter(id__in=ids, status='processing', locked_by=self.worker_id, locked_at=now)
+            .select_related('user', 'template')
+        )
+
+    def release_stale(self, now=None) -> int:
+        """Libère les réservations de workers arrêtés en cours de lot"""
+        now = now or timezone.now()
+        return Notification.objects.filter(
+            status='processing',
+            locked_at__lt=now - timedelta(seconds=self.lock_timeout)
+        ).update(status='pending', locked_by='', locked_at=None, updated_at=now)
+
+    def process(self, notifications: List[Notification]):
+        """Envoie les notifications réservées, en parallèle par canal"""
+        if self.concurrency == 0:
+            for notification in notifications:
+                self._deliver(notification, in_worker=False)
+            return
+
+        futures = [
+            self._get_executor(notification.notification_type if notification.notification_type in CHANNELS else 'email')
+            .submit(self._deliver, notification)
+            for notification in notifications
+        ]
+        wait(futures)
+
+    def _deliver(self, notification: Notification, in_worker: bool = True):
+        if in_worker:
+            close_old_connections()
+        try:
+            self.service._send_notification(notification)
+        except Exception as e:
+            logger.error(f"Erreur outbox pour la notification {notification.id}: {str(e)}")
+            notification.status = 'failed'
+            notification.last_error = str(e)
+        self._after_attempt(notification)
+
+    def _after_attempt(self, notification: Notification):
+        """Planifie la tentative suivante ou passe la notification en lettre morte"""
+        now = timezone.now()
+        fields = ['locked_by', 'locked_at', 'updated_at']
+        notification.locked_by = ''
+        notification.locked_at = None
+
+        if notification.status == 'processing':
+            # Aucun résultat enregistré par le canal : considérer comme un échec
+            notification.status = 'failed'
+            notification.retry_count += 1
+            fields += ['status', 'retry_count']
+
+        if notification.status == 'failed':
+            if not notification.last_error:
+                last_log = notification.logs.filter(action='failed').order_by('-created_at').first()
+                notification.last_error = last_log.message if last_log else ''
+            if notification.retry_count >= notification.max_retries:
+                notification.status = 'dead'
+                notification.next_attempt_at = None
+                NotificationLog.log_action(
+                    notification=notification,
+                    action='failed',
+                    message=f"Abandon après {notification.retry_count} tentative(s)",
+                    details={'error': notification.last_error}
+                )
+            else:
+                notification.next_attempt_at = now + compute_backoff(notification.retry_count)
+            fields += ['status', 'next_attempt_at', 'last_error']
+
+        notification.save(update_fields=list(dict.fromkeys(fields)))
+
+    def run_once(self) -> int:
+        """Traite un lot ; retourne le nombre de notifications traitées"""
+        self.release_stale()
+        # Les résumés échus redeviennent des notifications en attente
+        self.service.digester.flush_due()
+        notifications = self.claim()
+        if notifications:
+            self.process(notifications)
+        return len(notifications)
+
+    def run_forever(self, poll_interval: float = None, idle_interval: float = None, stop_event=None):
+        """
+        Boucle du worker
+
+        Sans réveil signalé, la base n'est interrogée que toutes les
+        `idle_interval` secondes (notifications planifiées et nouvelles
+        tentatives) ; le signal de réveil est vérifié toutes les
+        `poll_interval` secondes dans le cache.
+        """
+        poll_interval = poll_interval or getattr(settings, 'NOTIFICATION_OUTBOX_POLL_INTERVAL', 1)
+        idle_interval = idle_interval or getattr(settings, 'NOTIFICATION_OUTBOX_IDLE_INTERVAL', 15)
+        stop_event = stop_event or threading.Event()
+        last_seen_wakeup = None
+        last_scan = 0
+
+        while not stop_event.is_set():
+            wakeup = cache.get(WAKEUP_CACHE_KEY)
+            if wakeup != last_seen_wakeup or time.time() - last_scan >= idle_interval:
+                last_seen_wakeup = wakeup
+                last_scan = time.time()
+                try:
+                    # Enchaîner les lots tant que l'outbox n'est pas vide
+                    while self.run_once() >= self.batch_size and not stop_event.is_set():
+                        pass
+                except Exception as e:
+                    logger.error(f"Erreur du worker outbox {self.worker_id}: {str(e)}")
+                finally:
+                    close_old_connections()
+            stop_event.wait(poll_interval)
+
+    def shutdown(self):
+        """Arrête les pools d'envoi"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
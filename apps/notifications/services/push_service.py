@@ -2,13 +2,60 @@
 Service pour l'envoi de notifications push via Firebase Cloud Messaging
 """
 
+import json
 import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from django.conf import settings
-from typing import Dict, Any
+from django.utils import timezone
+from typing import Dict, Any, List
 import logging
 
+from core.utils.rate_limiter import RateLimiter
+
 logger = logging.getLogger(__name__)
 
+# Erreurs FCM indiquant un token définitivement invalide
+INVALID_TOKEN_ERRORS = ('NotRegistered', 'InvalidRegistration', 'MismatchSenderId')
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_push_session() -> requests.Session:
+    """
+    Retourne la session HTTP partagée (connexions keep-alive mutualisées)
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = getattr(settings, 'PUSH_MAX_CONCURRENCY', 8)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_push_rate_limiter() -> RateLimiter:
+    """
+    Retourne le limiteur de débit FCM du processus (partagé par toutes les
+    instances de `PushService`)
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(getattr(settings, 'PUSH_MAX_REQUESTS_PER_SECOND', 50))
+    return _rate_limiter
+
 
 class PushService:
     """
@@ -17,7 +64,11 @@ class PushService:
     
     def __init__(self):
         self.fcm_server_key = getattr(settings, 'FCM_SERVER_KEY', None)
-        self.fcm_url = 'https://fcm.googleapis.com/fcm/send'
+        self.fcm_url = getattr(settings, 'FCM_URL', 'https://fcm.googleapis.com/fcm/send')
+        self.multicast_limit = getattr(settings, 'FCM_MULTICAST_LIMIT', 500)
+        self.max_concurrency = max(1, getattr(settings, 'PUSH_MAX_CONCURRENCY', 8))
+        self.rate_limiter = get_push_rate_limiter()
+        self.session = get_push_session()
     
     def send_push(self, push_notification) -> Dict[str, Any]:
         """
@@ -66,7 +117,7 @@ class PushService:
             }
             
             # Envoyer la requête
-            response = requests.post(
+            response = self.session.post(
                 self.fcm_url,
                 headers=headers,
                 json=payload,
@@ -75,6 +126,9 @@ class PushService:
             
             if response.status_code == 200:
                 result = response.json()
+                error = result.get('results', [{}])[0].get('error')
+                if error in INVALID_TOKEN_ERRORS:
+                    self.deactivate_tokens([push_notification.push_token.token])
                 if result.get('success') == 1:
                     return {
                         'success': True,
@@ -136,9 +190,7 @@ class PushService:
             'errors': []
         }
         
-        for push_notification in push_notifications:
-            result = self.send_push(push_notification)
-            
+        for push_notification, result in zip(push_notifications, self.send_multicast(push_notifications)):
             if result['success']:
                 results['success_count'] += 1
             else:
@@ -150,6 +202,129 @@ class PushService:
         
         return results
     
+    def send_multicast(self, push_notifications: list) -> List[Dict[str, Any]]:
+        """
+        Envoie des notifications push par requêtes multicast FCM
+        
+        Les notifications de même contenu sont regroupées par lots de
+        `FCM_MULTICAST_LIMIT` tokens (`registration_ids`), envoyés en parallèle
+        sous un plafond de requêtes par seconde. Les tokens signalés invalides
+        par FCM sont désactivés en une requête.
+        
+        Returns:
+            List[Dict]: Un résultat par notification, dans l'ordre d'entrée
+        """
+        if not push_notifications:
+            return []
+        
+        if not self.fcm_server_key:
+            return [self._send_via_mock(push_notification) for push_notification in push_notifications]
+        
+        groups = {}
+        for index, push_notification in enumerate(push_notifications):
+            key = self._payload_key(push_notification)
+            groups.setdefault(key, []).append(index)
+        
+        batches = []
+        for indexes in groups.values():
+            for start in range(0, len(indexes), self.multicast_limit):
+                batches.append(indexes[start:start + self.multicast_limit])
+        
+        def send_batch(indexes):
+            return indexes, self._send_multicast_batch([push_notifications[i] for i in indexes])
+        
+        results = [None] * len(push_notifications)
+        invalid_tokens = []
+        if len(batches) == 1:
+            batch_results = [send_batch(batches[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                batch_results = list(executor.map(send_batch, batches))
+        
+        for indexes, (token_results, batch_invalid) in batch_results:
+            invalid_tokens.extend(batch_invalid)
+            for index, result in zip(indexes, token_results):
+                results[index] = result
+        
+        if invalid_tokens:
+            self.deactivate_tokens(invalid_tokens)
+        
+        return results
+    
+    def _payload_key(self, push_notification):
+        return json.dumps([
+            push_notification.title, push_notification.body,
+            push_notification.sound, push_notification.badge,
+            push_notification.data
+        ], sort_keys=True, default=str)
+    
+    def _send_multicast_batch(self, push_notifications: list):
+        """
+        Envoie une requête multicast et retourne (résultats, tokens invalides)
+        """
+        first = push_notifications[0]
+        tokens = [push_notification.push_token.token for push_notification in push_notifications]
+        payload = {
+            'registration_ids': tokens,
+            'notification': {
+                'title': first.title,
+                'body': first.body,
+                'sound': first.sound,
+                'badge': first.badge
+            },
+            'data': first.data
+        }
+        headers = {
+            'Authorization': f'key={self.fcm_server_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        try:
+            self.rate_limiter.acquire()
+            response = self.session.post(self.fcm_url, headers=headers, json=payload, timeout=30)
+            
+            if response.status_code != 200:
+                error = f'HTTP {response.status_code}: {response.text}'
+                return [{'success': False, 'error': error, 'provider': 'fcm'} for _ in tokens], []
+            
+            token_results = response.json().get('results', [])
+            
+        except Exception as e:
+            logger.error(f"Erreur FCM multicast: {str(e)}")
+            return [{'success': False, 'error': str(e), 'provider': 'fcm'} for _ in tokens], []
+        
+        results = []
+        invalid_tokens = []
+        for index, token in enumerate(tokens):
+            token_result = token_results[index] if index < len(token_results) else {}
+            if token_result.get('message_id'):
+                results.append({
+                    'success': True,
+                    'message_id': token_result['message_id'],
+                    'status': 'sent',
+                    'provider': 'fcm'
+                })
+            else:
+                error = token_result.get('error', 'Réponse FCM incomplète')
+                if error in INVALID_TOKEN_ERRORS:
+                    invalid_tokens.append(token)
+                results.append({'success': False, 'error': error, 'provider': 'fcm'})
+        
+        return results, invalid_tokens
+    
+    def deactivate_tokens(self, tokens: list) -> int:
+        """
+        Désactive en une requête les tokens refusés par FCM
+        """
+        from ..models import PushToken
+        count = PushToken.objects.filter(token__in=tokens, is_active=True).update(
+            is_active=False,
+            updated_at=timezone.now()
+        )
+        if count:
+            logger.info(f"{count} token(s) push invalide(s) désactivé(s)")
+        return count
+    
     def send_to_topic(self, topic: str, title: str, body: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Envoie une notification push à un topic
@@ -175,7 +350,7 @@ class PushService:
             }
             
             # Envoyer la requête
-            response = requests.post(
+            response = self.session.post(
                 self.fcm_url,
                 headers=headers,
                 json=payload,
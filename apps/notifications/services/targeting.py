@@ -0,0 +1,146 @@
+"""
+Ciblage des envois en masse
+
+Une audience combine des groupes et des rôles de l'app permissions, des
+querysets d'utilisateurs et des identifiants. Les identifiants des
+destinataires sont lus en flux (`values_list(...).iterator()`) sans charger
+d'instances `User`, et dédoublonnés entre sources qui se recouvrent par un
+bitmap d'identifiants (un bit par utilisateur) : la mémoire reste bornée
+quelle que soit la taille de l'audience.
+"""
+
+import logging
+from typing import Iterable, Iterator, List
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class UserIdBitmap:
+    """
+    Ensemble compact d'identifiants entiers positifs (un bit par identifiant)
+    """
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._count = 0
+
+    def add(self, user_id: int) -> bool:
+        """Ajoute un identifiant ; retourne False s'il était déjà présent"""
+        index, mask = user_id >> 3, 1 << (user_id & 7)
+        if index >= len(self._bits):
+            # Croissance géométrique pour amortir les réallocations
+            self._bits.extend(bytes(max(index + 1 - len(self._bits), len(self._bits))))
+        if self._bits[index] & mask:
+            return False
+        self._bits[index] |= mask
+        self._count += 1
+        return True
+
+    def __contains__(self, user_id: int) -> bool:
+        index = user_id >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (user_id & 7)))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def _get_permissions_model(name: str):
+    if not apps.is_installed('apps.permissions'):
+        raise ValueError("Le ciblage par groupe ou par rôle nécessite l'app permissions")
+    return apps.get_model('permissions', name)
+
+
+def _ids(items: Iterable) -> List[int]:
+    return [getattr(item, 'pk', item) for item in items]
+
+
+class NotificationAudience:
+    """
+    Audience d'un envoi en masse (groupes, rôles, querysets et utilisateurs)
+
+    Les utilisateurs inactifs sont écartés des groupes, rôles et querysets
+    (sauf `include_inactive`). Les utilisateurs désignés par identifiant sont
+    ciblés tels quels, comme avant l'introduction des audiences, sauf
+    `include_inactive_user_ids=False`.
+    """
+
+    def __init__(self, groups: Iterable = (), roles: Iterable = (), querysets: Iterable[QuerySet] = (),
+                 user_ids: Iterable[int] = (), include_inactive: bool = False,
+                 include_inactive_user_ids: bool = True, chunk_size: int = None):
+        self.group_ids = _ids(groups)
+        self.role_ids = _ids(roles)
+        self.querysets = list(querysets)
+        self.user_ids = _ids(user_ids)
+        self.include_inactive = include_inactive
+        self.include_inactive_user_ids = include_inactive or include_inactive_user_ids
+        self.chunk_size = chunk_size or getattr(settings, 'NOTIFICATION_FANOUT_CHUNK_SIZE', 1000)
+
+    def sources(self) -> List[QuerySet]:
+        """Requêtes `values_list` des identifiants de chaque source"""
+        user_filter = {} if self.include_inactive else {'user__is_active': True}
+        sources = []
+
+        if self.group_ids:
+            GroupMembership = _get_permissions_model('GroupMembership')
+            sources.append(
+                GroupMembership.objects.filter(
+                    group_id__in=self.group_ids, group__is_active=True, is_active=True, **user_filter
+                ).values_list('user_id', flat=True)
+            )
+
+        if self.role_ids:
+            UserRole = _get_permissions_model('UserRole')
+            GroupMembership = _get_permissions_model('GroupMembership')
+            now = timezone.now()
+            # Rôles attribués directement...
+            sources.append(
+                UserRole.objects.filter(role_id__in=self.role_ids, is_active=True, **user_filter)
+                .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+                .values_list('user_id', flat=True)
+            )
+            # ... ou hérités d'un groupe
+            sources.append(
+                GroupMembership.objects.filter(
+                    group__grouprole__role_id__in=self.role_ids, group__is_active=True,
+                    is_active=True, **user_filter
+                ).values_list('user_id', flat=True)
+            )
+
+        for queryset in self.querysets:
+            if not self.include_inactive:
+                queryset = queryset.filter(is_active=True)
+            sources.append(queryset.values_list('pk', flat=True))
+
+        if self.user_ids:
+            queryset = User.objects.filter(pk__in=self.user_ids)
+            if not self.include_inactive_user_ids:
+                queryset = queryset.filter(is_active=True)
+            sources.append(queryset.values_list('pk', flat=True))
+
+        return sources
+
+    def __iter__(self) -> Iterator[int]:
+        """Identifiants des destinataires, sans doublon, lus en flux"""
+        seen = UserIdBitmap()
+        for source in self.sources():
+            for user_id in source.iterator(chunk_size=self.chunk_size):
+                if seen.add(user_id):
+                    yield user_id
+
+    def count(self) -> int:
+        """Nombre de destinataires distincts (une requête)"""
+        sources = self.sources()
+        if not sources:
+            return 0
+        condition = Q()
+        for source in sources:
+            condition |= Q(pk__in=source)
+        return User.objects.filter(condition).count()
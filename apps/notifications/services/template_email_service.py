@@ -2,10 +2,11 @@
 Service d'envoi d'emails avec templates
 """
 import logging
-from django.core.mail import send_mail, EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
 from ..models import EmailNotification, EmailTemplate
+from .mail_transport import get_mail_transport
+from .template_renderer import get_template_renderer, html_to_text
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +35,11 @@ class TemplateEmailService:
         try:
             # Si un template est spécifié, l'utiliser
             if template_name and context:
-                html_message = self._render_template(template_name, context)
+                html_message, text_message = self._render_email(
+                    template_name, context, getattr(user, 'language', None)
+                )
                 if not message:
-                    message = self._extract_text_from_html(html_message)
+                    message = text_message
             
             # Créer l'enregistrement de notification
             from ..models import Notification
@@ -58,24 +61,23 @@ class TemplateEmailService:
                 text_content=message
             )
             
-            # Envoyer l'email
+            # En mode outbox, l'envoi est confié aux workers après validation
+            from .outbox import outbox_enabled, notify_workers
+            if outbox_enabled():
+                notify_workers()
+                logger.info(f"Email pour {to_email} placé dans l'outbox")
+                return True
+            
+            # Envoyer l'email (connexion SMTP mutualisée)
+            email = EmailMultiAlternatives(
+                subject=subject,
+                body=message,
+                from_email=self.from_email,
+                to=[to_email]
+            )
             if html_message:
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=message,
-                    from_email=self.from_email,
-                    to=[to_email]
-                )
                 email.attach_alternative(html_message, "text/html")
-                result = email.send()
-            else:
-                result = send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=self.from_email,
-                    recipient_list=[to_email],
-                    fail_silently=False
-                )
+            result = get_mail_transport().send(email)['success']
             
             # Mettre à jour le statut
             if result:
@@ -120,8 +122,10 @@ class TemplateEmailService:
                 'current_year': 2025
             })
             
-            # Rendre le template
-            html_message = self._render_template(template_name, context)
+            # Rendre le template (HTML et version texte précalculée)
+            html_message, text_message = self._render_email(
+                template_name, context, getattr(user, 'language', None)
+            )
             
             # Déterminer le sujet selon le template
             subject = self._get_template_subject(template_name, context)
@@ -129,7 +133,7 @@ class TemplateEmailService:
             return self.send_email(
                 to_email=to_email,
                 subject=subject,
-                message=self._extract_text_from_html(html_message),
+                message=text_message,
                 html_message=html_message,
                 user=user
             )
@@ -222,23 +226,37 @@ class TemplateEmailService:
         }
         return self.send_template_email(user.email, '2fa_enabled', context, user)
     
-    def _render_template(self, template_name, context):
+    def _render_email(self, template_name, context, locale=None):
         """
-        Rend un template HTML
+        Rend un template email compilé (mis en cache par nom et langue)
         
         Args:
             template_name (str): Nom du template
             context (dict): Contexte pour le template
+            locale (str): Langue du destinataire (optionnel)
         
         Returns:
-            str: HTML rendu
+            tuple: (HTML rendu, texte rendu)
         """
         try:
-            template_path = f'emails/{template_name}.html'
-            return render_to_string(template_path, context)
+            return get_template_renderer().render(template_name, context, locale)
         except Exception as e:
             logger.error(f"Erreur lors du rendu du template '{template_name}': {str(e)}")
-            return f"<p>Erreur lors du rendu du template: {str(e)}</p>"
+            html_message = f"<p>Erreur lors du rendu du template: {str(e)}</p>"
+            return html_message, self._extract_text_from_html(html_message)
+    
+    def _render_template(self, template_name, context, locale=None):
+        """
+        Rend un template HTML
+        
+        Args:
+            template_name (str): Nom du template
+            context (dict): Contexte pour le template
+        
+        Returns:
+            str: HTML rendu
+        """
+        return self._render_email(template_name, context, locale)[0]
     
     def _get_template_subject(self, template_name, context):
         """Retourne le sujet approprié selon le template"""
@@ -263,12 +281,4 @@ class TemplateEmailService:
         Returns:
             str: Texte extrait
         """
-        try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            return soup.get_text()
-        except ImportError:
-            # Si BeautifulSoup n'est pas disponible, retourner le HTML
-            return html_content
-        except Exception:
-            return html_content
+        return html_to_text(html_content)
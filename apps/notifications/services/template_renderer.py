@@ -0,0 +1,389 @@
+"""
+Rendu compilé des templates de notifications
+
+Les templates sont compilés une fois puis mis en cache :
+
+- templates en base (`{variable}`) : découpés en parties statiques et variables ;
+- templates email fichiers (`emails/<langue>/<nom>.html`) : compilés par
+  (nom, langue) et recompilés quand leur version (date de modification du
+  fichier, vérifiée en DEBUG) change.
+
+La version texte est précalculée à partir des parties statiques du HTML : les
+balises de template sont remplacées par des marqueurs, le HTML est converti en
+texte une seule fois, puis les balises sont réinsérées dans un template texte.
+Lorsque ce n'est pas possible (héritage, balise de bloc dans un attribut...),
+le HTML rendu est converti par un convertisseur HTML → texte en flux.
+
+Les lignes `NotificationTemplate` / `EmailTemplate` sont mises en cache dans
+le processus et invalidées à l'enregistrement (voir `signals.py`).
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import TemplateSyntaxError, engines
+from django.template.base import tag_re
+from django.template.loader import select_template
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+# Marqueurs (zone Unicode privée) remplaçant les balises pendant la conversion
+SENTINEL_START = '\ue000'
+SENTINEL_END = '\ue001'
+SENTINEL_RE = re.compile(f'{SENTINEL_START}(\\d+){SENTINEL_END}')
+
+PLACEHOLDER_RE = re.compile(r'\{([^{}]+)\}')
+WHITESPACE_RE = re.compile(r'\s+')
+
+SKIP_TAGS = {'head', 'style', 'script', 'title', 'template'}
+PARAGRAPH_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'ul', 'ol', 'blockquote', 'hr', 'pre'}
+LINE_TAGS = {'div', 'tr', 'section', 'article', 'header', 'footer', 'center', 'dl', 'dt', 'dd'}
+
+# Balises qui empêchent le précalcul du texte (le HTML vient d'un autre template)
+UNSUPPORTED_TEXT_TAGS = ('extends', 'include')
+
+TEMPLATE_CACHE_GENERATION_KEY = 'notifications_template_cache_generation'
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Convertisseur HTML → texte en un seul passage, sans arbre DOM"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+        self._href = None
+        self._link_start = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag == 'br':
+            self.parts.append('\n')
+        elif tag == 'li':
+            self.parts.append('\n- ')
+        elif tag in PARAGRAPH_TAGS:
+            self.parts.append('\n\n')
+        elif tag in LINE_TAGS:
+            self.parts.append('\n')
+        elif tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._link_start = len(self.parts)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in PARAGRAPH_TAGS:
+            self.parts.append('\n\n')
+        elif tag in LINE_TAGS:
+            self.parts.append('\n')
+        elif tag in ('td', 'th'):
+            self.parts.append(' ')
+        elif tag == 'a' and self._href:
+            # Conserver l'URL des liens (réinitialisation, confirmation...)
+            text = ''.join(self.parts[self._link_start:]).strip()
+            if self._href.startswith(('http://', 'https://')) and self._href != text:
+                self.parts.append(f' ({self._href})')
+            self._href = None
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(WHITESPACE_RE.sub(' ', data))
+
+    def get_text(self) -> str:
+        return normalize_text(''.join(self.parts))
+
+
+def normalize_text(text: str) -> str:
+    """Normalise les espaces et sauts de ligne d'un texte extrait"""
+    text = re.sub(r'[ \t]*\n[ \t]*', '\n', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return re.sub(r' {2,}', ' ', text).strip()
+
+
+def html_to_text(html_content: str) -> str:
+    """
+    Convertit du HTML en texte brut (alternative text/plain des emails)
+
+    Args:
+        html_content: Contenu HTML
+
+    Returns:
+        str: Texte extrait
+    """
+    if not html_content:
+        return ''
+    parser = _HTMLTextExtractor()
+    try:
+        parser.feed(html_content)
+        parser.close()
+    except Exception:
+        return html_content
+    return parser.get_text()
+
+
+def _text_with_sentinels(source: str, tokens: list) -> Optional[str]:
+    """
+    Convertit en texte un source HTML dont les balises de template ont été
+    remplacées par des marqueurs ; retourne None si une balise a été perdue
+    """
+    text = html_to_text(source)
+    kept = [int(index) for index in SENTINEL_RE.findall(text)]
+    required = [index for index, token in enumerate(tokens) if token[1]]
+    if [index for index in kept if tokens[index][1]] != required:
+        return None
+    return text
+
+
+class PlaceholderTemplate:
+    """
+    Template `{variable}` compilé (templates de notifications en base)
+
+    Les variables absentes du contexte sont laissées telles quelles.
+    """
+
+    def __init__(self, source: str):
+        self.source = source or ''
+        self.parts = PLACEHOLDER_RE.split(self.source)
+        self._text_parts = None
+
+    def render(self, context: Optional[Dict[str, Any]] = None) -> str:
+        return self._render_parts(self.parts, context or {})
+
+    @staticmethod
+    def _render_parts(parts: list, context: Dict[str, Any]) -> str:
+        # Les index impairs sont les noms de variables
+        return ''.join(
+            part if index % 2 == 0
+            else str(context[part]) if part in context else f'{{{part}}}'
+            for index, part in enumerate(parts)
+        )
+
+    def render_text(self, context: Optional[Dict[str, Any]] = None) -> str:
+        """Rend la version texte (précalculée) de ce template HTML"""
+        context = context or {}
+        if self._text_parts is None:
+            self._text_parts = self._compile_text() or False
+        if self._text_parts is False:
+            return html_to_text(self.render(context))
+        return normalize_text(self._render_parts(self._text_parts, context))
+
+    def _compile_text(self) -> Optional[list]:
+        """
+        Version texte précalculée ; None si un marqueur de variable a été
+        perdu (attribut, `<style>`...) : le texte est alors dérivé du HTML
+        rendu à chaque appel
+        """
+        names = self.parts[1::2]
+        source = ''.join(
+            part if index % 2 == 0 else f'{SENTINEL_START}{index // 2}{SENTINEL_END}'
+            for index, part in enumerate(self.parts)
+        )
+        text = html_to_text(source)
+        if [int(index) for index in SENTINEL_RE.findall(text)] != list(range(len(names))):
+            return None
+        parts = SENTINEL_RE.split(text)
+        for index in range(1, len(parts), 2):
+            parts[index] = names[int(parts[index])]
+        return parts
+
+
+@lru_cache(maxsize=512)
+def compile_placeholders(source: str) -> PlaceholderTemplate:
+    """Compile (une fois par contenu) un template `{variable}`"""
+    return PlaceholderTemplate(source)
+
+
+class CompiledEmailTemplate:
+    """
+    Template email fichier compilé avec sa version texte précalculée
+    """
+
+    def __init__(self, template, locale: Optional[str] = None):
+        self.html_template = template
+        self.locale = locale
+        self.origin = getattr(template.origin, 'name', None)
+        self.version = self._get_version(self.origin)
+        self.text_template = self._compile_text(template.template.source)
+
+    @staticmethod
+    def _get_version(origin) -> Optional[float]:
+        try:
+            return os.path.getmtime(origin) if origin else None
+        except OSError:
+            return None
+
+    def is_stale(self) -> bool:
+        return self._get_version(self.origin) != self.version
+
+    def _compile_text(self, source: str):
+        tokens = []
+
+        def replace(match):
+            token = match.group(0)
+            # Seules les balises de bloc doivent survivre à la conversion
+            tokens.append((token, token.startswith('{%')))
+            return f'{SENTINEL_START}{len(tokens) - 1}{SENTINEL_END}'
+
+        marked = tag_re.sub(replace, source)
+        if any(is_block and token[2:-2].split()[:1] in ([tag] for tag in UNSUPPORTED_TEXT_TAGS)
+               for token, is_block in tokens):
+            return None
+
+        text = _text_with_sentinels(marked, tokens)
+        if text is None:
+            return None
+
+        text_source = SENTINEL_RE.sub(lambda match: tokens[int(match.group(1))][0], text)
+        try:
+            return engines['django'].from_string(f'{{% autoescape off %}}{text_source}{{% endautoescape %}}')
+        except TemplateSyntaxError as e:
+            logger.warning(f"Version texte non précalculée pour {self.origin}: {str(e)}")
+            return None
+
+    def render(self, context: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Rend le template
+
+        Returns:
+            Tuple[str, str]: (HTML, texte)
+        """
+        with translation.override(self.locale) if self.locale else nullcontext():
+            html = self.html_template.render(context)
+            if self.text_template is not None:
+                text = normalize_text(self.text_template.render(context))
+            else:
+                text = html_to_text(html)
+        return html, text
+
+
+class TemplateRenderer:
+    """
+    Cache des templates email compilés par (nom, langue, version)
+    """
+
+    def __init__(self):
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def get(self, template_name: str, locale: Optional[str] = None) -> CompiledEmailTemplate:
+        key = (template_name, locale)
+        compiled = self._templates.get(key)
+        if compiled is not None and not (settings.DEBUG and compiled.is_stale()):
+            return compiled
+
+        candidates = [f'emails/{template_name}.html']
+        if locale:
+            candidates.insert(0, f'emails/{locale}/{template_name}.html')
+        compiled = CompiledEmailTemplate(select_template(candidates), locale)
+        with self._lock:
+            self._templates[key] = compiled
+        return compiled
+
+    def render(self, template_name: str, context: Dict[str, Any], locale: Optional[str] = None) -> Tuple[str, str]:
+        """Rend un template email ; retourne (HTML, texte)"""
+        return self.get(template_name, locale).render(context)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+class TemplateRowCache:
+    """
+    Cache dans le processus des lignes de templates actifs
+
+    L'invalidation locale est immédiate ; les autres processus la voient via
+    une génération partagée dans le cache Django, relue au plus toutes les
+    `sync_interval` secondes.
+    """
+
+    def __init__(self, ttl: int = None, sync_interval: float = None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'NOTIFICATION_TEMPLATE_CACHE_TTL', 300)
+        self.sync_interval = (
+            sync_interval if sync_interval is not None
+            else getattr(settings, 'NOTIFICATION_TEMPLATE_CACHE_SYNC_INTERVAL', 1)
+        )
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._generation = None
+        self._synced_at = 0
+
+    def _sync(self, now: float):
+        if now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        generation = cache.get(TEMPLATE_CACHE_GENERATION_KEY)
+        if generation != self._generation:
+            with self._lock:
+                self._entries.clear()
+                self._generation = generation
+
+    def get(self, model, **lookup):
+        """Retourne la ligne active correspondant à `lookup` (ou None)"""
+        now = time.monotonic()
+        self._sync(now)
+        key = (model._meta.label, tuple(sorted(lookup.items())))
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        instance = model.objects.filter(is_active=True, **lookup).first()
+        with self._lock:
+            self._entries[key] = (instance, now + self.ttl)
+        return instance
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+        cache.set(TEMPLATE_CACHE_GENERATION_KEY, uuid.uuid4().hex, None)
+        self._generation = cache.get(TEMPLATE_CACHE_GENERATION_KEY)
+
+
+_renderer = TemplateRenderer()
+_row_cache = None
+_row_cache_lock = threading.Lock()
+
+
+def get_template_renderer() -> TemplateRenderer:
+    """Retourne le cache de templates email du processus"""
+    return _renderer
+
+
+def get_template_row_cache() -> TemplateRowCache:
+    """Retourne le cache de lignes de templates du processus"""
+    global _row_cache
+    if _row_cache is None:
+        with _row_cache_lock:
+            if _row_cache is None:
+                _row_cache = TemplateRowCache()
+    return _row_cache
+
+
+def get_notification_template(name: str, notification_type: str):
+    """Template de notification actif, depuis le cache du processus"""
+    from ..models import NotificationTemplate
+    return get_template_row_cache().get(NotificationTemplate, name=name, notification_type=notification_type)
+
+
+def get_email_template(name: str):
+    """Template email actif, depuis le cache du processus"""
+    from ..models import EmailTemplate
+    return get_template_row_cache().get(EmailTemplate, name=name)
+
+
+def invalidate_template_cache():
+    """Invalide le cache des lignes de templates (tous processus)"""
+    get_template_row_cache().invalidate()
@@ -6,7 +6,9 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
-from .models import Notification, NotificationLog
+from .models import EmailTemplate, Notification, NotificationLog, NotificationTemplate
+from .services.inbox import get_inbox_service
+from .services.template_renderer import invalidate_template_cache
 
 User = get_user_model()
 
@@ -22,6 +24,7 @@ def log_notification_creation(sender, instance, created, **kwargs):
             action='created',
             message=f"Notification {instance.notification_type} créée"
         )
+        get_inbox_service().record_created([instance])
 
 
 @receiver(post_delete, sender=Notification)
@@ -29,8 +32,18 @@ def log_notification_deletion(sender, instance, **kwargs):
     """
     Enregistre la suppression d'une notification
     """
-    # Note: Cette fonctionnalité peut être étendue selon les besoins
-    pass
-
+    # Suppression en cascade d'un utilisateur : ses compteurs disparaissent aussi
+    if isinstance(kwargs.get('origin'), User):
+        return
+    get_inbox_service().record_deleted(instance)
 
 
+@receiver(post_save, sender=NotificationTemplate)
+@receiver(post_delete, sender=NotificationTemplate)
+@receiver(post_save, sender=EmailTemplate)
+@receiver(post_delete, sender=EmailTemplate)
+def invalidate_cached_templates(sender, instance, **kwargs):
+    """
+    Invalide le cache des templates après modification
+    """
+    invalidate_template_cache()
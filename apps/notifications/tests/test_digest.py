@@ -0,0 +1,155 @@
+"""
+Tests pour le regroupement des notifications en résumés
+"""
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.notifications.models import Notification, SMSNotification
+from apps.notifications.services import NotificationOutbox, NotificationService
+from apps.notifications.services import notification_service
+
+from .test_fanout import StubSMSService
+from .utils import create_user
+
+
+@override_settings(NOTIFICATION_DELIVERY_MODE='outbox', NOTIFICATION_DIGEST_WINDOW=300)
+class NotificationDigestTestCase(TestCase):
+    """Tests pour NotificationDigester"""
+
+    def setUp(self):
+        self.user = create_user('digest@example.com', '+33600000002')
+        self.sms_service = StubSMSService()
+        self.service = NotificationService()
+        self.service.sms_service = self.sms_service
+        self.outbox = NotificationOutbox(service=self.service, worker_id='test', concurrency=0)
+
+    def notify(self, content, priority='normal', category='security'):
+        return self.service.send_notification(
+            user=self.user, notification_type='sms', subject='Alerte', content=content,
+            priority=priority, category=category, recipient_phone=self.user.phone
+        )
+
+    def expire_window(self):
+        Notification.objects.filter(status='buffered').update(scheduled_at=timezone.now())
+
+    def test_burst_is_sent_as_one_digest(self):
+        """Les notifications d'une fenêtre sont envoyées en un seul message"""
+        for i in range(5):
+            self.notify(f'Connexion échouée #{i}')
+
+        digest = Notification.objects.get()
+        self.assertEqual(digest.status, 'buffered')
+        self.assertEqual(digest.context['digest_count'], 5)
+
+        # Fenêtre non écoulée : rien n'est envoyé
+        self.outbox.run_once()
+        self.assertEqual(self.sms_service.sent, [])
+
+        self.expire_window()
+        self.outbox.run_once()
+
+        digest.refresh_from_db()
+        self.assertEqual(digest.status, 'sent')
+        self.assertEqual(digest.subject, '5 notifications (security)')
+        self.assertEqual(len(self.sms_service.sent), 1)
+        message = SMSNotification.objects.get().message
+        self.assertIn('Connexion échouée #0', message)
+        self.assertIn('Connexion échouée #4', message)
+
+    def test_urgent_notifications_bypass_digest(self):
+        """Les notifications critiques ne sont pas retardées"""
+        self.notify('Compte bloqué', priority='urgent')
+        self.notify('Connexion échouée')
+
+        self.assertEqual(
+            sorted(Notification.objects.values_list('status', flat=True)),
+            ['buffered', 'pending']
+        )
+
+    def test_new_window_after_flush(self):
+        """Une notification arrivant après l'échéance ouvre un nouveau résumé"""
+        self.notify('Premier')
+        self.expire_window()
+        self.notify('Second')
+
+        self.assertEqual(self.service.flush_digests(), 1)
+        self.assertEqual(Notification.objects.filter(status='buffered').count(), 1)
+        self.assertEqual(Notification.objects.get(status='pending').content, 'Premier')
+
+
+@override_settings(NOTIFICATION_DELIVERY_MODE='inline', NOTIFICATION_DIGEST_WINDOW=300)
+class InlineDigestTestCase(TestCase):
+    """Tests pour les résumés en mode inline (sans worker de l'outbox)"""
+
+    def setUp(self):
+        self.user = create_user('inline@example.com', '+33600000004')
+        self.sms_service = StubSMSService()
+        self.service = NotificationService()
+        self.service.sms_service = self.sms_service
+        # Timer des résumés propre à chaque test
+        patcher = mock.patch.object(notification_service, '_digest_timer', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def notify(self, content, category='security'):
+        return self.service.send_notification(
+            user=self.user, notification_type='sms', subject='Alerte', content=content,
+            category=category, recipient_phone=self.user.phone
+        )
+
+    def test_flush_is_scheduled_at_window_end(self):
+        """L'ouverture d'un résumé programme son envoi à l'échéance de la fenêtre"""
+        with mock.patch.object(notification_service, 'schedule_digest_flush') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.notify('Connexion échouée #0')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.notify('Connexion échouée #1')
+
+        schedule.assert_called_once()
+        self.assertAlmostEqual(schedule.call_args.args[0], 300, delta=5)
+        self.assertEqual(Notification.objects.get().context['digest_count'], 2)
+
+    def test_single_timer_per_process(self):
+        """Un timer déjà programmé plus tôt est réutilisé"""
+        with mock.patch.object(notification_service.threading, 'Timer') as timer:
+            notification_service.schedule_digest_flush(300)
+            notification_service.schedule_digest_flush(400)
+            timer.assert_called_once_with(300, notification_service._flush_digests_in_background)
+            timer.return_value.start.assert_called_once()
+
+            # Échéance plus proche : le timer en attente est remplacé
+            notification_service.schedule_digest_flush(60)
+        timer.return_value.cancel.assert_called_once()
+        self.assertEqual(timer.call_args.args[0], 60)
+
+    def test_send_does_not_flush_digests(self):
+        """Les résumés échus sont laissés au timer, pas à l'envoi suivant"""
+        with mock.patch.object(notification_service, 'schedule_digest_flush'):
+            self.notify('Premier')
+            Notification.objects.filter(status='buffered').update(scheduled_at=timezone.now())
+            with mock.patch.object(NotificationService, 'flush_digests') as flush:
+                self.notify('Deuxième')
+        flush.assert_not_called()
+        self.assertEqual(self.sms_service.sent, [])
+
+    def test_timer_flushes_due_digests_and_reschedules(self):
+        """Le timer envoie les résumés échus puis se reprogramme pour le suivant"""
+        with mock.patch.object(notification_service, 'schedule_digest_flush'):
+            self.notify('Premier')
+            self.notify('Deuxième')
+            Notification.objects.filter(status='buffered').update(scheduled_at=timezone.now())
+            self.notify('Troisième', category='billing')
+
+        with mock.patch.object(notification_service, 'NotificationService', return_value=self.service), \
+                mock.patch.object(notification_service, 'connection'), \
+                mock.patch.object(notification_service, 'schedule_digest_flush') as schedule:
+            notification_service._flush_digests_in_background()
+
+        digest = Notification.objects.get(status='sent')
+        self.assertEqual(digest.subject, '2 notifications (security)')
+        self.assertEqual(len(self.sms_service.sent), 1)
+        self.assertEqual(Notification.objects.get(status='buffered').content, 'Troisième')
+        schedule.assert_called_once()
+        self.assertAlmostEqual(schedule.call_args.args[0], 300, delta=5)
@@ -0,0 +1,108 @@
+"""
+Tests pour le pipeline d'envoi de notifications en masse
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.notifications.models import Notification, NotificationJob, NotificationLog, NotificationTemplate
+from apps.notifications.services import NotificationService
+
+from .utils import create_users
+
+User = get_user_model()
+
+
+class StubSMSService:
+    """Service SMS factice"""
+
+    def __init__(self, fail_phones=()):
+        self.sent = []
+        self.fail_phones = set(fail_phones)
+
+    def send_sms(self, sms_notification):
+        if sms_notification.to_phone in self.fail_phones:
+            return {'success': False, 'error': 'numéro invalide'}
+        self.sent.append(sms_notification.to_phone)
+        return {'success': True, 'sid': f'SM{len(self.sent)}', 'status': 'queued'}
+
+
+class NotificationFanoutTestCase(TestCase):
+    """Tests pour NotificationFanoutService"""
+
+    def make_users(self, count, prefix='user'):
+        return create_users(*(
+            User(
+                email=f'{prefix}{i}@example.com',
+                phone=f'+3360000{i:04d}',
+                language='en' if i % 2 else 'fr',
+            )
+            for i in range(count)
+        ))
+
+    def send(self, users, sms_service=None, **kwargs):
+        service = NotificationService()
+        service.sms_service = sms_service or StubSMSService()
+        return service.send_bulk_notifications(users=users, notification_type='sms', **kwargs)
+
+    def test_bulk_send_tracks_job_progress(self):
+        """Les notifications sont créées, envoyées et comptées sur le job"""
+        users = self.make_users(4)
+        sms_service = StubSMSService(fail_phones=['+33600000003'])
+
+        notifications = self.send(users, sms_service=sms_service, content='Maintenance ce soir')
+
+        job = NotificationJob.objects.get()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.total_count, job.created_count), (4, 4))
+        self.assertEqual((job.sent_count, job.failed_count), (3, 1))
+        self.assertEqual(job.progress, 100.0)
+        self.assertEqual(len(sms_service.sent), 3)
+        self.assertEqual(Notification.objects.filter(status='sent').count(), 3)
+        self.assertEqual(Notification.objects.get(status='failed').retry_count, 1)
+        self.assertEqual(NotificationLog.objects.filter(action='created').count(), 4)
+        self.assertEqual(len(notifications), 4)
+
+    def test_template_rendered_once_per_locale(self):
+        """Le template est rendu une fois par langue, pas par destinataire"""
+        NotificationTemplate.objects.create(
+            name='maintenance', notification_type='sms', content='Maintenance à {heure}'
+        )
+        users = self.make_users(6)
+
+        with mock.patch.object(
+            NotificationTemplate, 'render_content', autospec=True,
+            side_effect=lambda template, context=None: 'Maintenance à 22h'
+        ) as render:
+            self.send(users, template_name='maintenance', context={'heure': '22h'})
+
+        self.assertEqual(render.call_count, 2)
+        self.assertEqual(
+            set(Notification.objects.values_list('sms_notification__message', flat=True)),
+            {'Maintenance à 22h'}
+        )
+
+    def test_notifications_store_rendered_content(self):
+        """Les notifications conservent le contenu rendu, pas le contenu brut"""
+        NotificationTemplate.objects.create(
+            name='maintenance', notification_type='sms', content='Maintenance à {heure}'
+        )
+        users = self.make_users(2)
+
+        self.send(users, template_name='maintenance', content='brut', context={'heure': '22h'})
+
+        self.assertEqual(set(Notification.objects.values_list('content', flat=True)), {'Maintenance à 22h'})
+
+    def test_query_count_does_not_grow_with_recipients(self):
+        """Le nombre de requêtes est indépendant du nombre de destinataires"""
+        counts = []
+        for prefix, count in [('small', 3), ('large', 30)]:
+            users = self.make_users(count, prefix=prefix)
+            with CaptureQueriesContext(connection) as queries:
+                self.send(users, content='Bonjour')
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
@@ -0,0 +1,98 @@
+"""
+Tests pour la boîte de réception des notifications
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.notifications.models import Notification, NotificationInbox
+from apps.notifications.services import NotificationService, get_inbox_service
+from apps.notifications.views import notification_list
+
+from .test_fanout import StubSMSService
+from .utils import create_user
+
+
+@override_settings(NOTIFICATION_DELIVERY_MODE='outbox')
+class NotificationInboxTestCase(TestCase):
+    """Tests pour NotificationInboxService"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('inbox@example.com', '+33600000003')
+        self.service = NotificationService()
+        self.service.sms_service = StubSMSService()
+        self.inbox = get_inbox_service()
+
+    def notify(self, notification_type='in_app', content='Bonjour'):
+        return self.service.send_notification(
+            user=self.user, notification_type=notification_type, content=content,
+            recipient_phone=self.user.phone
+        )
+
+    def test_counters_follow_create_read_and_delete(self):
+        first = self.notify()
+        self.notify(notification_type='sms')
+        self.service.send_bulk_notifications(users=[self.user], notification_type='sms', content='Maintenance')
+
+        counters = self.inbox.get_counters(self.user)
+        self.assertEqual((counters['total'], counters['unread']), (3, 3))
+        self.assertEqual(counters['by_type'], {'email': 0, 'sms': 2, 'push': 0, 'in_app': 1})
+
+        self.assertTrue(self.service.mark_notification_as_read(first))
+        self.assertFalse(self.service.mark_notification_as_read(first))
+        self.assertEqual(self.inbox.get_counters(self.user)['unread'], 2)
+
+        first.delete()
+        self.assertEqual(self.inbox.mark_all_as_read(self.user), 2)
+
+        counters = self.inbox.get_counters(self.user)
+        self.assertEqual((counters['total'], counters['unread'], counters['by_type']['in_app']), (2, 0, 0))
+        # Les compteurs incrémentaux correspondent à un recalcul complet
+        self.assertEqual(self.inbox.rebuild(self.user.pk).to_counters(), counters)
+
+    def test_badge_poll_is_a_cache_hit(self):
+        self.notify()
+        self.inbox.get_counters(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            counters = self.inbox.get_counters(self.user)
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(counters['unread'], 1)
+
+    def get_list(self, params):
+        request = APIRequestFactory().get('/api/notifications/', params)
+        force_authenticate(request, user=self.user)
+        return notification_list(request)
+
+    def test_keyset_pagination_walks_all_pages(self):
+        Notification.objects.bulk_create([
+            Notification(user=self.user, notification_type='in_app', content=f'n{i}') for i in range(7)
+        ])
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': 3, **({'cursor': cursor} if cursor else {})}
+            response = self.get_list(params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['id'] for item in response.data['notifications'])
+            cursor = response.data['pagination']['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(seen, list(
+            Notification.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True)
+        ))
+        self.assertEqual(len(seen), 7)
+
+        response = self.get_list({'cursor': 'invalide'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_missing_counters_are_rebuilt(self):
+        self.notify()
+        NotificationInbox.objects.all().delete()
+        cache.clear()
+
+        self.assertEqual(self.inbox.get_counters(self.user)['total'], 1)
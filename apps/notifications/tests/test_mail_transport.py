@@ -0,0 +1,207 @@
+"""
+Tests pour le transport SMTP mutualisé
+"""
+import socketserver
+import threading
+from unittest import mock
+
+from django.core.mail import EmailMultiAlternatives
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.notifications.models import EmailNotification, Notification
+from apps.notifications.services import BulkMailTransport, EmailService
+
+from .utils import create_user
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Serveur SMTP minimal : accepte tout sauf les destinataires `refused@`"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply('220 stub ESMTP')
+
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(' ', 1)[0].upper()
+
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 stub')
+            elif command == 'RCPT' and 'refused@' in line:
+                self.reply('550 refused')
+            elif command == 'DATA':
+                self.reply('354 go ahead')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                with server.lock:
+                    server.messages += 1
+                    drop = server.drop_after and server.messages == server.drop_after
+                if drop:
+                    # Coupe la connexion après le message (timeout serveur simulé)
+                    self.reply('421 closing')
+                    return
+                self.reply('250 queued')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubSMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self.drop_after = None
+
+
+class BulkMailTransportTestCase(SimpleTestCase):
+    """Tests pour BulkMailTransport contre un serveur SMTP local"""
+
+    def setUp(self):
+        self.server = StubSMTPServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        smtp_settings = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.server.server_address[1],
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+        )
+        smtp_settings.enable()
+        self.addCleanup(smtp_settings.disable)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_messages(self, count, refused=()):
+        return [
+            EmailMultiAlternatives(
+                subject='Test',
+                body='Bonjour',
+                from_email='noreply@example.com',
+                to=['refused@example.com' if i in refused else f'user{i}@example.com']
+            )
+            for i in range(count)
+        ]
+
+    def test_connections_are_reused(self):
+        """Un lot de messages n'ouvre qu'une connexion par connexion du pool"""
+        transport = BulkMailTransport(pool_size=2, batch_size=10)
+
+        results = transport.send_messages(self.make_messages(20))
+        transport.send(self.make_messages(1)[0])
+        transport.close()
+
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(self.server.messages, 21)
+        self.assertLessEqual(self.server.connections, 2)
+
+    def test_refused_recipient_does_not_fail_the_batch(self):
+        """Un destinataire refusé n'échoue que son propre message"""
+        transport = BulkMailTransport(pool_size=1, batch_size=10)
+
+        results = transport.send_messages(self.make_messages(3, refused={1}))
+        transport.close()
+
+        self.assertEqual([result['success'] for result in results], [True, False, True])
+
+    def test_reconnects_after_disconnect(self):
+        """Une connexion coupée par le serveur est rouverte"""
+        self.server.drop_after = 1
+        transport = BulkMailTransport(pool_size=1, batch_size=10)
+
+        results = transport.send_messages(self.make_messages(3))
+        transport.close()
+
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(self.server.connections, 2)
+
+
+class SendGridBatchTestCase(SimpleTestCase):
+    """Tests pour l'envoi groupé via SendGrid"""
+
+    def make_email(self, to_email, subject='Maintenance', pk=None):
+        return mock.Mock(
+            pk=pk, to_email=to_email, to_name='', from_email='noreply@example.com', from_name='',
+            reply_to='', subject=subject, html_content='<p>Bonjour</p>', text_content='Bonjour',
+            attachments=[]
+        )
+
+    def test_same_content_uses_one_api_call(self):
+        """Les emails de même contenu partagent un appel avec personnalisations"""
+        service = EmailService()
+        service.sendgrid_client = mock.Mock()
+        service.sendgrid_client.send.return_value = mock.Mock(status_code=202, headers={'X-Message-Id': 'abc'})
+
+        emails = [self.make_email(f'user{i}@example.com', pk=i) for i in range(5)]
+        emails.append(self.make_email('other@example.com', subject='Autre'))
+        results = service.send_email_batch(emails)
+
+        self.assertEqual(service.sendgrid_client.send.call_count, 2)
+        mail = service.sendgrid_client.send.call_args_list[0].args[0]
+        personalizations = mail.get()['personalizations']
+        self.assertEqual(len(personalizations), 5)
+        # Chaque destinataire porte l'identifiant de son email (webhook)
+        self.assertEqual(
+            sorted((p['to'][0]['email'], p['custom_args']['email_notification_id']) for p in personalizations),
+            [(f'user{i}@example.com', str(i)) for i in range(5)]
+        )
+        self.assertTrue(all(result['success'] for result in results))
+
+
+class SendGridEventTestCase(TestCase):
+    """Tests pour le rattachement des événements du webhook SendGrid"""
+
+    def setUp(self):
+        user = create_user('webhook@example.com')
+        self.emails = []
+        for to_email in ('ana@example.com', 'bob@example.com'):
+            notification = Notification.objects.create(
+                user=user, notification_type='email', subject='Maintenance', status='sent'
+            )
+            self.emails.append(EmailNotification.objects.create(
+                notification=notification, to_email=to_email, subject='Maintenance',
+                html_content='<p>Bonjour</p>', sendgrid_message_id='abc'
+            ))
+
+    def test_events_are_matched_by_custom_arg(self):
+        """Un envoi groupé partage son message_id : seul l'argument désigne l'email"""
+        ana, bob = self.emails
+        count = EmailService().process_sendgrid_events([
+            {'event': 'processed', 'sg_message_id': 'abc.filter1', 'email_notification_id': str(bob.pk), 'timestamp': 1},
+            {'event': 'delivered', 'sg_message_id': 'abc.filter0', 'email_notification_id': str(ana.pk), 'timestamp': 2},
+            {'event': 'bounce', 'sg_message_id': 'abc.filter1', 'email_notification_id': str(bob.pk), 'timestamp': 3},
+            # Sans argument, `abc` désigne deux emails : événement ignoré
+            {'event': 'open', 'sg_message_id': 'abc.filter0', 'timestamp': 4},
+        ])
+
+        self.assertEqual(count, 2)
+        ana.refresh_from_db()
+        bob.refresh_from_db()
+        self.assertEqual((ana.sendgrid_status, bob.sendgrid_status), ('delivered', 'bounce'))
+        self.assertEqual(Notification.objects.get(pk=ana.notification_id).status, 'delivered')
+        self.assertEqual(Notification.objects.get(pk=bob.notification_id).status, 'sent')
+
+    def test_unique_message_id_is_used_without_custom_arg(self):
+        ana, bob = self.emails
+        EmailNotification.objects.filter(pk=bob.pk).update(sendgrid_message_id='def')
+
+        EmailService().process_sendgrid_events([{'event': 'delivered', 'sg_message_id': 'def.filter0'}])
+        bob.refresh_from_db()
+        self.assertEqual(bob.sendgrid_status, 'delivered')
@@ -0,0 +1,111 @@
+"""
+Tests pour l'outbox des notifications
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.notifications.models import Notification
+from apps.notifications.services import NotificationOutbox, NotificationService
+
+from .test_fanout import StubSMSService
+from .utils import create_user
+
+
+@override_settings(NOTIFICATION_DELIVERY_MODE='outbox')
+class NotificationOutboxTestCase(TestCase):
+    """Tests pour NotificationOutbox"""
+
+    def setUp(self):
+        self.user = create_user('outbox@example.com', '+33600000001')
+        self.sms_service = StubSMSService()
+        self.service = NotificationService()
+        self.service.sms_service = self.sms_service
+        self.outbox = NotificationOutbox(service=self.service, worker_id='test', concurrency=0)
+
+    def create_notification(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.service.send_notification(
+                user=self.user, notification_type='sms', content='Bonjour',
+                recipient_phone=self.user.phone, **kwargs
+            )
+
+    def test_send_is_deferred_to_worker(self):
+        """La requête ne fait qu'enregistrer la notification ; le worker l'envoie"""
+        notification = self.create_notification()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(self.sms_service.sent, [])
+
+        self.assertEqual(self.outbox.run_once(), 1)
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'sent')
+        self.assertEqual(notification.locked_by, '')
+        self.assertEqual(self.sms_service.sent, ['+33600000001'])
+        self.assertEqual(self.outbox.run_once(), 0)
+
+    def test_claimed_notifications_are_not_claimed_twice(self):
+        """Une notification réservée n'est pas reprise par un autre worker"""
+        self.create_notification()
+        other = NotificationOutbox(service=self.service, worker_id='other', concurrency=0)
+
+        self.assertEqual(len(self.outbox.claim()), 1)
+        self.assertEqual(other.claim(), [])
+
+    def test_rescheduled_notification_is_not_claimed(self):
+        """Une ligne replanifiée entre la lecture et la réservation garde son backoff"""
+        notification = self.create_notification()
+        due_queryset = self.outbox.due_queryset
+        reads = []
+
+        def rescheduled_after_read(now):
+            if reads:
+                # Un autre worker a réservé, échoué et replanifié la notification
+                Notification.objects.filter(pk=notification.pk).update(
+                    status='failed', retry_count=1, next_attempt_at=now + timedelta(minutes=5)
+                )
+            reads.append(now)
+            return due_queryset(now)
+
+        with mock.patch.object(self.outbox, 'due_queryset', side_effect=rescheduled_after_read):
+            self.assertEqual(self.outbox.claim(), [])
+
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.locked_by), ('failed', ''))
+
+    def test_failed_send_is_retried_with_backoff(self):
+        """Un échec est replanifié plus tard puis abandonné après max_retries"""
+        self.sms_service.fail_phones.add('+33600000001')
+        notification = self.create_notification()
+        notification.max_retries = 2
+        notification.save(update_fields=['max_retries'])
+
+        self.outbox.run_once()
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.retry_count), ('failed', 1))
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+        self.assertIn('numéro invalide', notification.last_error)
+
+        # Pas de nouvelle tentative avant l'échéance du backoff
+        self.assertEqual(self.outbox.run_once(), 0)
+
+        Notification.objects.filter(pk=notification.pk).update(next_attempt_at=timezone.now())
+        self.outbox.run_once()
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.retry_count), ('dead', 2))
+        self.assertIsNone(notification.next_attempt_at)
+
+    def test_stale_locks_are_released(self):
+        """Les réservations d'un worker arrêté sont libérées après expiration"""
+        notification = self.create_notification()
+        self.outbox.claim()
+        Notification.objects.filter(pk=notification.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=self.outbox.lock_timeout + 1)
+        )
+
+        self.assertEqual(self.outbox.release_stale(), 1)
+        self.assertEqual(self.outbox.run_once(), 1)
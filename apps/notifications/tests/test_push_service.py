@@ -0,0 +1,83 @@
+"""
+Tests pour l'envoi multicast des notifications push
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import TestCase
+
+from apps.notifications.models import PushNotification, PushToken
+from apps.notifications.services import PushService
+
+from .utils import create_user
+
+
+class StubFCMHandler(BaseHTTPRequestHandler):
+    """API FCM factice : les tokens `bad-` sont inconnus"""
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.batches.append(len(payload['registration_ids']))
+
+        results = [
+            {'error': 'NotRegistered'} if token.startswith('bad-') else {'message_id': f'm-{token}'}
+            for token in payload['registration_ids']
+        ]
+        body = json.dumps({'results': results}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PushMulticastTestCase(TestCase):
+    """Tests pour PushService.send_multicast contre un serveur HTTP local"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubFCMHandler)
+        self.server.batches = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.service = PushService()
+        self.service.fcm_server_key = 'test-key'
+        self.service.fcm_url = f'http://127.0.0.1:{self.server.server_address[1]}/fcm/send'
+
+    def make_notifications(self, count, bad=()):
+        user = create_user('push@example.com')
+        tokens = PushToken.objects.bulk_create([
+            PushToken(user=user, token=f'bad-{i}' if i in bad else f'tok-{i}', device_type='android')
+            for i in range(count)
+        ])
+        return [
+            PushNotification(push_token=token, title='Alerte', body='Maintenance', data={})
+            for token in tokens
+        ]
+
+    def test_tokens_are_batched_by_multicast_limit(self):
+        """Les tokens sont envoyés par lots de FCM_MULTICAST_LIMIT"""
+        results = self.service.send_multicast(self.make_notifications(1200))
+
+        self.assertEqual(sorted(self.server.batches), [200, 500, 500])
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(results[0]['message_id'], 'm-tok-0')
+
+    def test_invalid_tokens_are_deactivated(self):
+        """Les tokens NotRegistered sont désactivés en une requête"""
+        results = self.service.send_multicast(self.make_notifications(10, bad={2, 7}))
+
+        self.assertEqual([i for i, result in enumerate(results) if not result['success']], [2, 7])
+        self.assertEqual(
+            sorted(PushToken.objects.filter(is_active=False).values_list('token', flat=True)),
+            ['bad-2', 'bad-7']
+        )
+
+    def test_rate_limiter_is_shared_between_instances(self):
+        """Toutes les instances de PushService partagent le même budget FCM"""
+        self.assertIs(PushService().rate_limiter, self.service.rate_limiter)
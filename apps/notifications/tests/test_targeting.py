@@ -0,0 +1,165 @@
+"""
+Tests pour le ciblage des envois en masse par groupes et rôles
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.notifications.models import Notification, NotificationJob
+from apps.notifications.serializers import SMSBulkSendSerializer
+from apps.notifications.services import NotificationAudience, NotificationService
+from apps.notifications.services.targeting import UserIdBitmap
+from apps.notifications.views import email_bulk_send, push_bulk_send, sms_bulk_send
+from apps.permissions.models import Group, GroupMembership, GroupRole, Role, UserRole
+
+from .test_fanout import StubSMSService
+from .utils import create_user, create_users
+
+User = get_user_model()
+
+
+class UserIdBitmapTestCase(TestCase):
+    """Tests pour UserIdBitmap"""
+
+    def test_add_and_contains(self):
+        bitmap = UserIdBitmap()
+        self.assertTrue(bitmap.add(3))
+        self.assertTrue(bitmap.add(1000))
+        self.assertFalse(bitmap.add(3))
+        self.assertIn(1000, bitmap)
+        self.assertNotIn(4, bitmap)
+        self.assertNotIn(10 ** 6, bitmap)
+        self.assertEqual(len(bitmap), 2)
+
+
+class NotificationAudienceTestCase(TestCase):
+    """Tests pour NotificationAudience"""
+
+    def setUp(self):
+        self.users = create_users(*(
+            User(email=f'member{i}@example.com', phone=f'+3361000{i:04d}')
+            for i in range(6)
+        ))
+        self.inactive = create_user('inactive@example.com', '+33619999999', is_active=False)
+
+        self.staff = Group.objects.create(name='Équipe', description='Équipe')
+        self.support = Group.objects.create(name='Support', description='Support')
+        self.managers = Role.objects.create(name='Managers', description='Managers')
+
+        # users[0..2] dans l'équipe, users[2..3] au support (users[2] dans les deux)
+        GroupMembership.objects.bulk_create(
+            [GroupMembership(group=self.staff, user=user) for user in self.users[:3]]
+            + [GroupMembership(group=self.support, user=user) for user in self.users[2:4]]
+            + [GroupMembership(group=self.staff, user=self.inactive)]
+        )
+        # Rôle direct pour users[0] et users[4], expiré pour users[5], hérité par le support
+        UserRole.objects.bulk_create([
+            UserRole(role=self.managers, user=self.users[0]),
+            UserRole(role=self.managers, user=self.users[4]),
+            UserRole(role=self.managers, user=self.users[5], expires_at=timezone.now() - timedelta(days=1)),
+        ])
+        GroupRole.objects.create(group=self.support, role=self.managers)
+
+    def ids(self, *indexes):
+        return {self.users[i].pk for i in indexes}
+
+    def test_overlapping_sources_are_deduplicated(self):
+        """Un membre de plusieurs sources n'est ciblé qu'une fois"""
+        audience = NotificationAudience(
+            groups=[self.staff, self.support], roles=[self.managers], user_ids=[self.users[1].pk]
+        )
+
+        recipient_ids = list(audience)
+
+        self.assertEqual(len(recipient_ids), len(set(recipient_ids)))
+        self.assertEqual(set(recipient_ids), self.ids(0, 1, 2, 3, 4))
+        self.assertEqual(audience.count(), 5)
+
+    def test_roles_include_group_inheritance_and_skip_expired(self):
+        """Un rôle cible ses titulaires directs et les membres des groupes qui l'ont"""
+        audience = NotificationAudience(roles=[self.managers.pk])
+
+        self.assertEqual(set(audience), self.ids(0, 2, 3, 4))
+        self.assertEqual(audience.count(), 4)
+
+    def test_bulk_send_to_groups(self):
+        """L'envoi en masse accepte une audience et ne notifie chaque membre qu'une fois"""
+        service = NotificationService()
+        service.sms_service = StubSMSService()
+        audience = NotificationAudience(groups=[self.staff, self.support])
+
+        service.send_bulk_notifications(users=audience, notification_type='sms', content='Réunion à 10h')
+
+        job = NotificationJob.objects.get()
+        self.assertEqual((job.total_count, job.created_count, job.sent_count), (4, 4, 4))
+        self.assertEqual(
+            set(Notification.objects.values_list('user_id', flat=True)), self.ids(0, 1, 2, 3)
+        )
+        self.assertEqual(len(service.sms_service.sent), 4)
+
+    def test_serializer_builds_audience(self):
+        """Le sérialiseur d'envoi en masse accepte des groupes et des rôles"""
+        serializer = SMSBulkSendSerializer(data={'group_ids': [self.support.pk], 'message': 'Réunion à 10h'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(set(serializer.get_audience()), self.ids(2, 3))
+
+        serializer = SMSBulkSendSerializer(data={'message': 'Réunion à 10h'})
+        self.assertFalse(serializer.is_valid())
+
+        serializer = SMSBulkSendSerializer(data={'role_ids': [0], 'message': 'Réunion à 10h'})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('role_ids', serializer.errors)
+
+    def test_explicit_user_ids_keep_inactive_users(self):
+        """Les identifiants explicites ciblent aussi les inactifs, pas les groupes"""
+        serializer = SMSBulkSendSerializer(data={
+            'group_ids': [self.staff.pk], 'user_ids': [self.inactive.pk], 'message': 'Réunion à 10h'
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(set(serializer.get_audience()), self.ids(0, 1, 2) | {self.inactive.pk})
+
+        self.assertEqual(set(NotificationAudience(groups=[self.staff])), self.ids(0, 1, 2))
+        audience = NotificationAudience(user_ids=[self.inactive.pk], include_inactive_user_ids=False)
+        self.assertEqual(list(audience), [])
+
+
+class BulkSendPermissionTestCase(TestCase):
+    """Les envois en masse sont réservés au staff"""
+
+    REQUESTS = (
+        (email_bulk_send, '/api/notifications/emails/bulk-send/', {'subject': 'Réunion du lundi', 'content': 'Réunion à 10h en salle A'}),
+        (sms_bulk_send, '/api/notifications/sms/bulk-send/', {'message': 'Réunion à 10h'}),
+        (push_bulk_send, '/api/notifications/push/bulk-send/', {'title': 'Réunion', 'body': 'À 10h'}),
+    )
+
+    def setUp(self):
+        self.admin = create_user('admin@example.com', '+33619000001', is_staff=True)
+        self.member = create_user('membre@example.com', '+33619000002')
+        self.group = Group.objects.create(name='Tous', description='Tous')
+        GroupMembership.objects.create(group=self.group, user=self.member)
+        self.factory = APIRequestFactory()
+
+    def post(self, view, path, data, user):
+        request = self.factory.post(path, {**data, 'group_ids': [self.group.pk]}, format='json')
+        force_authenticate(request, user=user)
+        return view(request)
+
+    def test_plain_user_is_refused(self):
+        with mock.patch.object(NotificationService, 'start_bulk_notifications') as start:
+            for view, path, data in self.REQUESTS:
+                with self.subTest(path=path):
+                    self.assertEqual(self.post(view, path, data, self.member).status_code, 403)
+        start.assert_not_called()
+
+    def test_staff_can_target_groups(self):
+        job = NotificationJob.objects.create(notification_type='sms', created_by=self.admin)
+        with mock.patch.object(NotificationService, 'start_bulk_notifications', return_value=job) as start:
+            for view, path, data in self.REQUESTS:
+                with self.subTest(path=path):
+                    self.assertEqual(self.post(view, path, data, self.admin).status_code, 202)
+        self.assertEqual(start.call_count, 3)
+        self.assertEqual(list(start.call_args.kwargs['users']), [self.member.pk])
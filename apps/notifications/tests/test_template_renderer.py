@@ -0,0 +1,101 @@
+"""
+Tests pour le rendu compilé des templates
+"""
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.notifications.models import EmailTemplate, NotificationTemplate
+from apps.notifications.services import TemplateRenderer, html_to_text
+from apps.notifications.services.template_renderer import (
+    compile_placeholders, get_notification_template, invalidate_template_cache
+)
+
+
+class HTMLToTextTestCase(SimpleTestCase):
+    """Tests pour le convertisseur HTML → texte"""
+
+    def test_converts_blocks_lists_and_links(self):
+        html = (
+            '<html><head><style>p { color: red; }</style></head><body>'
+            '<h1>Titre</h1><p>Bonjour&nbsp;Ana &amp; co,<br>ligne 2</p>'
+            '<ul><li>un</li><li>deux</li></ul>'
+            '<a href="https://example.com/reset">Réinitialiser</a>'
+            '</body></html>'
+        )
+
+        self.assertEqual(
+            html_to_text(html),
+            'Titre\n\nBonjour Ana & co,\nligne 2\n\n- un\n- deux\n\nRéinitialiser (https://example.com/reset)'
+        )
+
+
+class CompiledTemplateTestCase(SimpleTestCase):
+    """Tests pour les templates compilés"""
+
+    def test_placeholders_render_like_replace(self):
+        template = compile_placeholders('Bonjour {name}, {unknown} {count}')
+
+        self.assertEqual(template.render({'name': 'Ana', 'count': 3}), 'Bonjour Ana, {unknown} 3')
+        self.assertIs(compile_placeholders('Bonjour {name}, {unknown} {count}'), template)
+
+    def test_precomputed_text_matches_rendered_html(self):
+        """La version texte précalculée équivaut à la conversion du HTML rendu"""
+        renderer = TemplateRenderer()
+        context = {
+            'user': {'first_name': 'Ana', 'email': 'ana@example.com'},
+            'site_name': 'Plateforme',
+            'alert_type': 'Connexion <inhabituelle>',
+            'recommended_actions': ['Changer le mot de passe', 'Révoquer les sessions'],
+        }
+
+        compiled = renderer.get('security_alert')
+        html, text = renderer.render('security_alert', context)
+
+        self.assertIsNotNone(compiled.text_template)
+        self.assertIs(renderer.get('security_alert'), compiled)
+        self.assertEqual(text, html_to_text(html))
+        self.assertIn('- Révoquer les sessions', text)
+        self.assertIn('Connexion <inhabituelle>', text)
+
+    def test_html_placeholder_template_text(self):
+        template = compile_placeholders('<p>Bonjour <b>{name}</b></p><p>Code : {code}</p>')
+
+        self.assertEqual(template.render_text({'name': 'Ana', 'code': '1234'}), 'Bonjour Ana\n\nCode : 1234')
+
+    def test_lost_placeholder_falls_back_to_rendered_html(self):
+        """Une variable perdue par la conversion texte désactive le précalcul"""
+        template = compile_placeholders('<p>Bonjour {name}</p><a href="{url}">Confirmer</a>')
+        context = {'name': 'Ana', 'url': 'https://example.com/confirm'}
+
+        self.assertIsNone(template._compile_text())
+        self.assertEqual(template.render_text(context), html_to_text(template.render(context)))
+        self.assertEqual(template.render_text(context), 'Bonjour Ana\n\nConfirmer (https://example.com/confirm)')
+
+
+class TemplateRowCacheTestCase(TestCase):
+    """Tests pour le cache des lignes de templates"""
+
+    def setUp(self):
+        invalidate_template_cache()
+        self.template = NotificationTemplate.objects.create(
+            name='maintenance', notification_type='sms', content='Maintenance à {heure}'
+        )
+
+    def test_rows_are_cached_until_saved(self):
+        get_notification_template('maintenance', 'sms')
+        with CaptureQueriesContext(connection) as queries:
+            cached = get_notification_template('maintenance', 'sms')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(cached.content, 'Maintenance à {heure}')
+
+        self.template.content = 'Maintenance ce soir à {heure}'
+        self.template.save()
+
+        self.assertEqual(get_notification_template('maintenance', 'sms').content, 'Maintenance ce soir à {heure}')
+
+    def test_email_template_text_derived_from_html(self):
+        template = EmailTemplate(name='bienvenue', subject='Bienvenue {name}', html_content='<h1>Bienvenue {name}</h1>')
+
+        self.assertEqual(template.render_subject({'name': 'Ana'}), 'Bienvenue Ana')
+        self.assertEqual(template.render_text_content({'name': 'Ana'}), 'Bienvenue Ana')
@@ -0,0 +1,21 @@
+"""
+Utilisateurs de test partagés par les tests des notifications
+"""
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def create_users(*users):
+    """
+    Enregistre des utilisateurs de test par `bulk_create`
+
+    Les signaux post_save (profil de sécurité, préférences, email de bienvenue)
+    ne sont pas déclenchés : ces tests ne portent pas sur leurs effets.
+    """
+    return User.objects.bulk_create(users)
+
+
+def create_user(email, phone='', **fields):
+    """Enregistre un utilisateur de test (voir `create_users`)"""
+    return create_users(User(email=email, phone=phone, **fields))[0]
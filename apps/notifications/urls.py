@@ -6,14 +6,19 @@ from django.urls import path
 from .views import (
     # Notifications générales
     notification_list,
+    notification_counts,
     notification_detail,
     notification_create,
     notification_stats,
     notification_retry,
     notification_cancel,
+    notification_mark_read,
+    notification_mark_all_read,
+    notification_delete,
     notification_logs,
     notification_templates,
     notification_template_detail,
+    notification_job_detail,
     
     # Notifications email
     email_notification_list,
@@ -52,11 +57,16 @@ urlpatterns = [
     path('', notification_list, name='notification_list'),
     path('create/', notification_create, name='notification_create'),
     path('stats/', notification_stats, name='notification_stats'),
+    path('counts/', notification_counts, name='notification_counts'),
+    path('read-all/', notification_mark_all_read, name='notification_mark_all_read'),
     path('templates/', notification_templates, name='notification_templates'),
     path('templates/<int:template_id>/', notification_template_detail, name='notification_template_detail'),
+    path('jobs/<int:job_id>/', notification_job_detail, name='notification_job_detail'),
     path('<int:notification_id>/', notification_detail, name='notification_detail'),
     path('<int:notification_id>/retry/', notification_retry, name='notification_retry'),
     path('<int:notification_id>/cancel/', notification_cancel, name='notification_cancel'),
+    path('<int:notification_id>/read/', notification_mark_read, name='notification_mark_read'),
+    path('<int:notification_id>/delete/', notification_delete, name='notification_delete'),
     path('<int:notification_id>/logs/', notification_logs, name='notification_logs'),
     
     # Notifications email
@@ -1,13 +1,18 @@
 from .notification_views import (
     notification_list,
+    notification_counts,
     notification_detail,
     notification_create,
     notification_stats,
     notification_retry,
     notification_cancel,
+    notification_mark_read,
+    notification_mark_all_read,
+    notification_delete,
     notification_logs,
     notification_templates,
     notification_template_detail,
+    notification_job_detail,
 )
 from .email_views import (
     email_notification_list,
@@ -41,14 +46,19 @@ from .push_views import (
 
 __all__ = [
     'notification_list',
+    'notification_counts',
     'notification_detail',
     'notification_create',
     'notification_stats',
     'notification_retry',
     'notification_cancel',
+    'notification_mark_read',
+    'notification_mark_all_read',
+    'notification_delete',
     'notification_logs',
     'notification_templates',
     'notification_template_detail',
+    'notification_job_detail',
     'email_notification_list',
     'email_notification_detail',
     'email_send',
@@ -11,13 +11,15 @@ from django.contrib.auth import get_user_model
 from django.db.models import Count, Q
 from django.utils import timezone
 
-from ..models import Notification, NotificationTemplate, NotificationLog
+from ..models import Notification, NotificationTemplate, NotificationLog, NotificationJob
 from ..serializers import (
     NotificationSerializer,
+    NotificationJobSerializer,
     NotificationCreateSerializer,
     NotificationStatsSerializer,
 )
-from ..services import NotificationService
+from ..services import NotificationService, get_inbox_service
+from ..services.inbox import InvalidCursor
 
 User = get_user_model()
 
@@ -28,42 +30,67 @@ def notification_list(request):
     """
     Liste les notifications de l'utilisateur connecté
     
-    GET /api/notifications/
+    GET /api/notifications/?cursor=...&page_size=20
+    
+    Pagination par curseur : `next_cursor` de la réponse donne la page suivante.
     """
     # Paramètres de filtrage
     notification_type = request.GET.get('type')
     status_filter = request.GET.get('status')
-    page = int(request.GET.get('page', 1))
-    page_size = int(request.GET.get('page_size', 20))
-    
-    # Construire la requête
-    notifications = Notification.objects.filter(user=request.user)
+    unread = request.GET.get('unread', '').lower() in ('1', 'true')
+    page_size = max(1, min(int(request.GET.get('page_size', 20)), 100))
+    
+    inbox = get_inbox_service()
+    try:
+        notifications, next_cursor = inbox.list_notifications(
+            request.user,
+            notification_type=notification_type,
+            status=status_filter,
+            unread=unread,
+            cursor=request.GET.get('cursor'),
+            page_size=page_size,
+        )
+    except InvalidCursor:
+        return Response({
+            'error': 'Curseur de pagination invalide.'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    if notification_type:
-        notifications = notifications.filter(notification_type=notification_type)
+    serializer = NotificationSerializer(notifications, many=True, context={'request': request})
     
+    # Total issu des compteurs dénormalisés (filtres par statut exclus)
+    counters = inbox.get_counters(request.user)
     if status_filter:
-        notifications = notifications.filter(status=status_filter)
-    
-    # Pagination
-    start = (page - 1) * page_size
-    end = start + page_size
-    notifications_page = notifications.order_by('-created_at')[start:end]
-    
-    serializer = NotificationSerializer(notifications_page, many=True, context={'request': request})
+        total = None
+    elif unread:
+        total = counters['unread'] if not notification_type else None
+    elif notification_type:
+        total = counters['by_type'].get(notification_type, 0)
+    else:
+        total = counters['total']
     
     return Response({
         'notifications': serializer.data,
         'pagination': {
-            'page': page,
             'page_size': page_size,
-            'total': notifications.count(),
-            'has_next': end < notifications.count(),
-            'has_previous': page > 1,
+            'total': total,
+            'unread': counters['unread'],
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None,
         }
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_counts(request):
+    """
+    Compteurs de notifications (badge) de l'utilisateur connecté
+    
+    GET /api/notifications/counts/
+    """
+    return Response(get_inbox_service().get_counters(request.user), status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def notification_detail(request, notification_id):
@@ -104,6 +131,7 @@ def notification_create(request):
             context=data.get('context', {}),
             priority=data.get('priority', 'normal'),
             scheduled_at=data.get('scheduled_at'),
+            category=data.get('category'),
             recipient_email=data.get('recipient_email'),
             recipient_phone=data.get('recipient_phone')
         )
@@ -124,17 +152,23 @@ def notification_stats(request):
     
     GET /api/notifications/stats/
     """
-    # Statistiques pour l'utilisateur connecté
-    user_notifications = Notification.objects.filter(user=request.user)
+    # Compteurs dénormalisés + une seule requête agrégée pour les statuts
+    counters = get_inbox_service().get_counters(request.user)
+    by_status = Notification.objects.filter(user=request.user).aggregate(
+        sent=Count('id', filter=Q(status='sent')),
+        failed=Count('id', filter=Q(status='failed')),
+        pending=Count('id', filter=Q(status='pending')),
+    )
     
     stats = {
-        'total_notifications': user_notifications.count(),
-        'sent_notifications': user_notifications.filter(status='sent').count(),
-        'failed_notifications': user_notifications.filter(status='failed').count(),
-        'pending_notifications': user_notifications.filter(status='pending').count(),
-        'email_notifications': user_notifications.filter(notification_type='email').count(),
-        'sms_notifications': user_notifications.filter(notification_type='sms').count(),
-        'push_notifications': user_notifications.filter(notification_type='push').count(),
+        'total_notifications': counters['total'],
+        'unread_notifications': counters['unread'],
+        'sent_notifications': by_status['sent'],
+        'failed_notifications': by_status['failed'],
+        'pending_notifications': by_status['pending'],
+        'email_notifications': counters['by_type']['email'],
+        'sms_notifications': counters['by_type']['sms'],
+        'push_notifications': counters['by_type']['push'],
     }
     
     # Calculer le taux de succès
@@ -162,9 +196,12 @@ def notification_retry(request, notification_id):
             'error': 'Cette notification ne peut pas être retentée.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Retenter l'envoi via le service
-    notification_service = NotificationService()
-    notification_service._send_notification(notification)
+    # Retenter l'envoi via l'outbox (ou en ligne si elle est désactivée)
+    from ..services.outbox import outbox_enabled, requeue
+    if outbox_enabled():
+        requeue(notification)
+    else:
+        NotificationService()._send_notification(notification)
     
     return Response({
         'message': 'Tentative de renvoi effectuée.',
@@ -194,6 +231,55 @@ def notification_cancel(request, notification_id):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def notification_mark_read(request, notification_id):
+    """
+    Marque une notification comme lue
+    
+    POST /api/notifications/{notification_id}/read/
+    """
+    notification = get_object_or_404(Notification, id=notification_id, user=request.user)
+    get_inbox_service().mark_as_read(notification)
+    
+    return Response({
+        'message': 'Notification marquée comme lue.',
+        'notification': NotificationSerializer(notification, context={'request': request}).data
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def notification_mark_all_read(request):
+    """
+    Marque toutes les notifications de l'utilisateur comme lues
+    
+    POST /api/notifications/read-all/
+    """
+    count = get_inbox_service().mark_all_as_read(request.user)
+    
+    return Response({
+        'message': f'{count} notification(s) marquée(s) comme lue(s).',
+        'count': count
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def notification_delete(request, notification_id):
+    """
+    Supprime une notification de la boîte de réception
+    
+    DELETE /api/notifications/{notification_id}/delete/
+    """
+    notification = get_object_or_404(Notification, id=notification_id, user=request.user)
+    notification.delete()
+    
+    return Response({
+        'message': 'Notification supprimée avec succès.'
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def notification_logs(request, notification_id):
@@ -255,4 +341,14 @@ def notification_template_detail(request, template_id):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_job_detail(request, job_id):
+    """
+    Récupère la progression d'un envoi en masse
+    
+    GET /api/notifications/jobs/{job_id}/
+    """
+    job = get_object_or_404(NotificationJob, id=job_id, created_by=request.user)
+    serializer = NotificationJobSerializer(job, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_200_OK)
@@ -9,6 +9,8 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 
+from core.permissions import IsStaffOrReadOnly
+
 from ..models import PushNotification, PushToken
 from ..serializers import (
     PushNotificationSerializer,
@@ -16,6 +18,7 @@ from ..serializers import (
     PushBulkSendSerializer,
     PushTokenSerializer,
     PushTokenCreateSerializer,
+    NotificationJobSerializer,
 )
 from ..services import NotificationService
 
@@ -121,7 +124,7 @@ def push_send(request):
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsStaffOrReadOnly])
 def push_bulk_send(request):
     """
     Envoie des notifications push en masse
@@ -133,32 +136,26 @@ def push_bulk_send(request):
     if serializer.is_valid():
         data = serializer.validated_data
         
-        # Récupérer les utilisateurs
-        users = User.objects.filter(id__in=data['user_ids'])
+        # Destinataires : utilisateurs, groupes et rôles (dédoublonnés en flux)
+        users = serializer.get_audience()
         
         # Envoyer les notifications push via le service
         notification_service = NotificationService()
-        notifications = notification_service.send_bulk_notifications(
+        job = notification_service.start_bulk_notifications(
             users=users,
             notification_type='push',
             subject=data['title'],
             content=data['body'],
             context={'data': data.get('data', {})},
             priority=data.get('priority', 'normal'),
-            scheduled_at=data.get('scheduled_at')
+            scheduled_at=data.get('scheduled_at'),
+            created_by=request.user
         )
         
         return Response({
-            'message': f'{len(notifications)} notifications push envoyées avec succès.',
-            'notifications_count': len(notifications),
-            'notifications': [
-                {
-                    'id': n.id,
-                    'user_email': n.user.email,
-                    'status': n.status
-                } for n in notifications
-            ]
-        }, status=status.HTTP_201_CREATED)
+            'message': f'Envoi de {job.total_count} notifications push lancé.',
+            'job': NotificationJobSerializer(job, context={'request': request}).data
+        }, status=status.HTTP_202_ACCEPTED)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
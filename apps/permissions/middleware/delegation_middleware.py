@@ -94,7 +94,7 @@ class DelegationMiddleware(MiddlewareMixin):
         # Trouver une délégation utilisable
         usable_delegation = None
         for delegation in delegations:
-            if delegation.can_use(request):
+            if delegation.can_use(request) and delegation.use():
                 usable_delegation = delegation
                 break
         
@@ -105,9 +105,6 @@ class DelegationMiddleware(MiddlewareMixin):
                 'code': 'DELEGATION_NOT_USABLE'
             }, status=403)
         
-        # Utiliser la délégation
-        usable_delegation.use()
-        
         # Marquer la requête comme utilisant une délégation
         request.delegation_used = True
         request.delegation_source = f"{usable_delegation.delegator.email} -> {usable_delegation.delegatee.email}"
@@ -151,7 +148,7 @@ class DelegationMiddleware(MiddlewareMixin):
         # Trouver une délégation utilisable
         usable_delegation = None
         for delegation in delegations:
-            if delegation.can_use(request):
+            if delegation.can_use(request) and delegation.use():
                 usable_delegation = delegation
                 break
         
@@ -162,9 +159,6 @@ class DelegationMiddleware(MiddlewareMixin):
                 'code': 'ROLE_DELEGATION_NOT_USABLE'
             }, status=403)
         
-        # Utiliser la délégation
-        usable_delegation.use()
-        
         # Marquer la requête comme utilisant une délégation
         request.delegation_used = True
         request.delegation_source = f"{usable_delegation.delegator.email} -> {usable_delegation.delegatee.email}"
@@ -2,6 +2,7 @@
 Modèles pour la délégation de permissions
 """
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 from django.utils import timezone
 
@@ -137,10 +138,25 @@ class PermissionDelegation(models.Model):
     def use(self):
         """
         Utilise la délégation (incrémente le compteur)
+        
+        L'incrément est conditionnel et atomique en base : la limite
+        `max_uses` est respectée quel que soit le nombre de processus.
+        
+        Returns:
+            bool: False si la limite d'utilisations est atteinte
         """
-        if self.max_uses:
-            self.current_uses += 1
-            self.save(update_fields=['current_uses'])
+        if not self.max_uses:
+            return True
+        
+        updated = type(self).objects.filter(
+            pk=self.pk, current_uses__lt=self.max_uses
+        ).update(current_uses=F('current_uses') + 1)
+        if not updated:
+            self.current_uses = self.max_uses
+            return False
+        
+        self.current_uses += 1
+        return True
     
     def get_remaining_uses(self):
         """
@@ -335,10 +351,25 @@ class RoleDelegation(models.Model):
     def use(self):
         """
         Utilise la délégation (incrémente le compteur)
+        
+        L'incrément est conditionnel et atomique en base : la limite
+        `max_uses` est respectée quel que soit le nombre de processus.
+        
+        Returns:
+            bool: False si la limite d'utilisations est atteinte
         """
-        if self.max_uses:
-            self.current_uses += 1
-            self.save(update_fields=['current_uses'])
+        if not self.max_uses:
+            return True
+        
+        updated = type(self).objects.filter(
+            pk=self.pk, current_uses__lt=self.max_uses
+        ).update(current_uses=F('current_uses') + 1)
+        if not updated:
+            self.current_uses = self.max_uses
+            return False
+        
+        self.current_uses += 1
+        return True
     
     def get_remaining_uses(self):
         """
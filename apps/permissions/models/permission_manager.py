@@ -268,6 +268,17 @@ class PermissionManager(models.Model):
             }
         )
         return manager
+    
+    @classmethod
+    def bulk_create_for_users(cls, users, batch_size=None):
+        """
+        Crée en une requête les profils de gestionnaire manquants d'une liste d'utilisateurs
+        """
+        return cls.objects.bulk_create(
+            [cls(user=user, is_active=False) for user in users],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
 
 
 
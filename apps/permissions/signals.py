@@ -2,18 +2,17 @@
 Signaux pour l'app permissions
 """
 from django.db.models.signals import post_save, pre_delete
-from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from core.utils.bulk_signals import batched_receiver
 from .models import PermissionManager
 
 User = get_user_model()
 
 
-@receiver(post_save, sender=User)
-def create_permission_manager_profile(sender, instance, created, **kwargs):
-    """Crée automatiquement un profil de gestionnaire de permissions lors de la création d'un utilisateur"""
-    if created:
-        PermissionManager.get_or_create_for_user(instance)
+@batched_receiver(post_save, sender=User, created_only=True)
+def create_permission_manager_profile(sender, events):
+    """Crée automatiquement un profil de gestionnaire de permissions lors de la création d'utilisateurs"""
+    PermissionManager.bulk_create_for_users([event.instance for event in events])
 
 
 
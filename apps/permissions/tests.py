@@ -1,3 +1,52 @@
+"""
+Tests pour l'app Permissions
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.permissions.models import Permission, PermissionDelegation
+
+User = get_user_model()
+
+
+class PermissionDelegationUseTestCase(TestCase):
+    """Limite d'utilisations des délégations"""
+
+    def setUp(self):
+        delegator, delegatee = User.objects.bulk_create([
+            User(email='ana@example.com', phone='+33600000090'),
+            User(email='bob@example.com', phone='+33600000091'),
+        ])
+        permission = Permission.objects.bulk_create([
+            Permission(name='Voir les rapports', codename='view_report', app_label='analytics',
+                       model='report', action='view')
+        ])[0]
+        self.delegation = PermissionDelegation.objects.bulk_create([
+            PermissionDelegation(delegator=delegator, delegatee=delegatee, permission=permission,
+                                 end_date=timezone.now() + timedelta(days=1), max_uses=2)
+        ])[0]
+
+    def test_uses_are_counted_in_the_database(self):
+        self.assertTrue(self.delegation.use())
+        self.assertEqual(PermissionDelegation.objects.get(pk=self.delegation.pk).current_uses, 1)
+        self.assertEqual(self.delegation.get_remaining_uses(), 1)
+
+    def test_limit_is_shared_between_processes(self):
+        # Une autre copie de la délégation (autre processus) consomme les utilisations
+        other = PermissionDelegation.objects.get(pk=self.delegation.pk)
+        self.assertTrue(other.use())
+        self.assertTrue(other.use())
+
+        self.assertTrue(self.delegation.can_use())
+        self.assertFalse(self.delegation.use())
+        self.assertFalse(self.delegation.can_use())
+        self.assertEqual(PermissionDelegation.objects.get(pk=self.delegation.pk).current_uses, 2)
 
-# Create your tests here.
+    def test_unlimited_delegation(self):
+        PermissionDelegation.objects.filter(pk=self.delegation.pk).update(max_uses=None)
+        self.delegation.max_uses = None
+        with self.assertNumQueries(0):
+            self.assertTrue(self.delegation.use())
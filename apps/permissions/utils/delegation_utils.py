@@ -32,8 +32,7 @@ def has_delegated_permission(user, permission_codename, request=None):
     delegations = PermissionDelegation.get_active_delegations(user, permission)
     
     for delegation in delegations:
-        if delegation.can_use(request):
-            delegation.use()
+        if delegation.can_use(request) and delegation.use():
             return True
     
     return False
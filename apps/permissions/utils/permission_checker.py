@@ -474,8 +474,7 @@ def _has_delegated_permission(user, permission, request):
     delegations = PermissionDelegation.get_active_delegations(user, permission)
     
     for delegation in delegations:
-        if delegation.can_use(request):
-            delegation.use()
+        if delegation.can_use(request) and delegation.use():
             return True
     
     return False
@@ -493,7 +492,7 @@ def _has_delegated_permission_detailed(user, permission, request):
     delegations = PermissionDelegation.get_active_delegations(user, permission)
     
     for delegation in delegations:
-        if delegation.can_use(request):
+        if delegation.can_use(request) and delegation.use():
             result['has_permission'] = True
             result['details'].append({
                 'delegator': delegation.delegator.username,
@@ -502,7 +501,6 @@ def _has_delegated_permission_detailed(user, permission, request):
                 'remaining_uses': delegation.get_remaining_uses(),
                 'remaining_time': delegation.get_remaining_time()
             })
-            delegation.use()
             break
     
     return result
@@ -4,7 +4,8 @@ Middleware pour le blocage d'IP
 import logging
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
-from ..models import IPBlock, LoginAttempt
+from ..models import IPBlock
+from ..services import get_failure_counters
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +50,8 @@ class IPBlockingMiddleware(MiddlewareMixin):
         """
         ip_address = getattr(request, 'client_ip', self._get_client_ip(request))
         
-        # Vérifier les tentatives de connexion échouées
-        failed_attempts = LoginAttempt.get_failed_attempts_count(ip_address, minutes=15)
+        # Vérifier les tentatives de connexion échouées (compteurs du cache, sans requête)
+        failed_attempts = get_failure_counters().get_failed_attempts_count(ip_address, minutes=15)
         
         if failed_attempts >= 5:  # Configurable
             return {
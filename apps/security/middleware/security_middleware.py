@@ -5,7 +5,9 @@ import logging
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
 from django.conf import settings
-from ..models import SecurityEvent, IPBlock, UserSecurity
+from ..models import SecurityEvent, IPBlock, UserSecurity, SecurityRule
+from ..services.event_ingestion import get_event_ingestor
+from ..services.request_inspection import get_request_inspector
 from ..utils.security_utils import get_client_ip, get_geolocation
 
 logger = logging.getLogger(__name__)
@@ -43,6 +45,18 @@ class SecurityMiddleware(MiddlewareMixin):
             request.client_country = ''
             request.client_city = ''
         
+        # Règles de sécurité évaluées sur la requête (une action block_ip la refuse)
+        if self._evaluate_security_rules(request):
+            logger.warning(f"Requête bloquée par une règle de sécurité - IP: {ip_address}")
+            return JsonResponse({
+                'error': 'Accès refusé',
+                'message': 'Votre adresse IP a été bloquée pour des raisons de sécurité.'
+            }, status=403)
+        
+        # Inspection des paramètres et du corps (SECURITY_REQUEST_INSPECTION_ENABLED)
+        if getattr(settings, 'SECURITY_REQUEST_INSPECTION_ENABLED', False):
+            self._inspect_request(request)
+        
         return None
     
     def process_response(self, request, response):
@@ -57,12 +71,12 @@ class SecurityMiddleware(MiddlewareMixin):
     
     def _log_security_event(self, request, response):
         """
-        Enregistre un événement de sécurité
+        Enregistre un événement de sécurité (agrégé et écrit par lots)
         """
         try:
             event_data = request.security_event
             
-            SecurityEvent.create_event(
+            get_event_ingestor().ingest(
                 event_type=event_data.get('event_type'),
                 title=event_data.get('title'),
                 description=event_data.get('description'),
@@ -77,29 +91,56 @@ class SecurityMiddleware(MiddlewareMixin):
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement de l'événement de sécurité: {str(e)}")
     
+    def _evaluate_security_rules(self, request):
+        """
+        Évalue les règles de sécurité actives applicables aux requêtes
+        (`SecurityRule.REQUEST_RULE_TYPES`) sur le contexte de la requête
+        
+        Returns:
+            bool: True si une règle a bloqué l'IP du client
+        """
+        context = {
+            'event': 'request',
+            'ip_address': request.client_ip,
+            'path': request.path,
+            'method': request.method,
+            'country': request.client_country,
+            'city': request.client_city,
+            'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+        }
+        try:
+            triggered = SecurityRule.evaluate_rules(context, rule_type=SecurityRule.REQUEST_RULE_TYPES)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'évaluation des règles de sécurité: {str(e)}")
+            return False
+        return any(
+            result['action'] == 'block_ip'
+            for triggered_rule in triggered
+            for result in triggered_rule['actions_results']
+        )
+    
     def _check_suspicious_activity(self, request):
         """
         Détecte les activités suspectes
         """
-        suspicious_indicators = []
-        
-        # Vérifier les headers suspects
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        if not user_agent or len(user_agent) < 10:
-            suspicious_indicators.append('User-Agent manquant ou suspect')
-        
-        # Vérifier les tentatives de SQL injection
-        query_params = request.GET.dict()
-        for key, value in query_params.items():
-            if any(keyword in value.lower() for keyword in ['union', 'select', 'drop', 'delete', 'insert']):
-                suspicious_indicators.append(f'Possible injection SQL dans le paramètre {key}')
-        
-        # Vérifier les tentatives de XSS
-        for key, value in query_params.items():
-            if any(tag in value.lower() for tag in ['<script>', '<iframe>', 'javascript:']):
-                suspicious_indicators.append(f'Possible XSS dans le paramètre {key}')
-        
-        return suspicious_indicators
-
-
-
+        return get_request_inspector().inspect(request)['indicators']
+    
+    def _inspect_request(self, request):
+        """
+        Inspecte la requête et prépare un événement de sécurité si elle est suspecte
+        """
+        result = get_request_inspector().inspect(request)
+        request.security_inspection = result
+        if result['is_suspicious'] and not hasattr(request, 'security_event'):
+            request.security_event = {
+                'event_type': SecurityEvent.SUSPICIOUS_ACTIVITY,
+                'title': 'Requête suspecte détectée',
+                'description': ', '.join(result['indicators']),
+                'user': None,
+                'severity': SecurityEvent.MEDIUM,
+                'metadata': {
+                    'path': request.path,
+                    'risk_score': result['risk_score'],
+                    'matches': result['matches'],
+                },
+            }
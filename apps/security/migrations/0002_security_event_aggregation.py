@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='securityevent',
+            name='aggregation_key',
+            field=models.CharField(blank=True, db_index=True, max_length=40, verbose_name="Clé d'agrégation"),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='first_seen_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Première occurrence'),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Dernière occurrence'),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='occurrence_count',
+            field=models.PositiveIntegerField(default=1, verbose_name="Nombre d'occurrences"),
+        ),
+    ]
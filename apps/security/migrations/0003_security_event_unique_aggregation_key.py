@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_duplicate_windows(apps, schema_editor):
+    """Fusionne les lignes d'une même fenêtre écrites par des processus concurrents"""
+    SecurityEvent = apps.get_model('security', 'SecurityEvent')
+    duplicates = (
+        SecurityEvent.objects.exclude(aggregation_key='')
+        .values('aggregation_key')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+        .values_list('aggregation_key', flat=True)
+    )
+    for key in list(duplicates):
+        rows = list(SecurityEvent.objects.filter(aggregation_key=key).order_by('id'))
+        kept, others = rows[0], rows[1:]
+        for row in others:
+            kept.occurrence_count += row.occurrence_count
+            if row.first_seen_at and (not kept.first_seen_at or row.first_seen_at < kept.first_seen_at):
+                kept.first_seen_at = row.first_seen_at
+            if row.last_seen_at and (not kept.last_seen_at or row.last_seen_at > kept.last_seen_at):
+                kept.last_seen_at = row.last_seen_at
+        SecurityEvent.objects.filter(id=kept.id).update(
+            occurrence_count=kept.occurrence_count,
+            first_seen_at=kept.first_seen_at,
+            last_seen_at=kept.last_seen_at,
+        )
+        SecurityEvent.objects.filter(id__in=[row.id for row in others]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0002_security_event_aggregation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_windows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='securityevent',
+            constraint=models.UniqueConstraint(condition=models.Q(('aggregation_key', ''), _negated=True), fields=('aggregation_key',), name='security_event_unique_aggregation_key'),
+        ),
+    ]
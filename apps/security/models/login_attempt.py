@@ -3,12 +3,14 @@ Modèle pour les tentatives de connexion
 """
 from django.db import models
 from django.conf import settings
-from django.utils import timezone
 
 
 class LoginAttempt(models.Model):
     """
     Modèle pour enregistrer les tentatives de connexion
+
+    Piste d'audit uniquement : les compteurs d'échecs et l'état de blocage
+    sont tenus dans le cache (voir FailureCounterService).
     """
     # Utilisateur (peut être null si tentative avec email inexistant)
     user = models.ForeignKey(
@@ -98,43 +100,26 @@ class LoginAttempt(models.Model):
     @classmethod
     def get_failed_attempts_count(cls, ip_address, email=None, minutes=15):
         """
-        Compte les tentatives échouées récentes
+        Compte les tentatives échouées récentes (compteurs du cache, sans requête)
         """
-        since = timezone.now() - timezone.timedelta(minutes=minutes)
-        queryset = cls.objects.filter(
-            ip_address=ip_address,
-            status__in=[cls.FAILED, cls.BLOCKED],
-            created_at__gte=since
-        )
-        
-        if email:
-            queryset = queryset.filter(email=email)
-        
-        return queryset.count()
+        from ..services import get_failure_counters
+        return get_failure_counters().get_failed_attempts_count(ip_address, email, minutes=minutes)
     
     @classmethod
     def is_ip_blocked(cls, ip_address, minutes=60):
         """
-        Vérifie si une IP est bloquée
+        Vérifie si une IP est bloquée (état tenu dans le cache)
         """
-        since = timezone.now() - timezone.timedelta(minutes=minutes)
-        return cls.objects.filter(
-            ip_address=ip_address,
-            status=cls.BLOCKED,
-            created_at__gte=since
-        ).exists()
+        from ..services import get_failure_counters
+        return get_failure_counters().is_ip_blocked(ip_address, minutes=minutes)
     
     @classmethod
     def is_user_locked(cls, user, minutes=30):
         """
-        Vérifie si un utilisateur est verrouillé
+        Vérifie si un utilisateur est verrouillé (état tenu dans le cache)
         """
-        since = timezone.now() - timezone.timedelta(minutes=minutes)
-        return cls.objects.filter(
-            user=user,
-            status=cls.LOCKED,
-            created_at__gte=since
-        ).exists()
+        from ..services import get_failure_counters
+        return get_failure_counters().is_user_locked(user, minutes=minutes)
     
     @classmethod
     def record_attempt(cls, email, ip_address, user_agent, status, user=None, 
@@ -139,6 +139,28 @@ class SecurityEvent(models.Model):
         verbose_name="Actions prises"
     )
     
+    # Agrégation des occurrences identiques (voir SecurityEventIngestor)
+    aggregation_key = models.CharField(
+        max_length=40,
+        blank=True,
+        db_index=True,
+        verbose_name="Clé d'agrégation"
+    )
+    occurrence_count = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Nombre d'occurrences"
+    )
+    first_seen_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Première occurrence"
+    )
+    last_seen_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Dernière occurrence"
+    )
+    
     # Métadonnées
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -160,6 +182,14 @@ class SecurityEvent(models.Model):
             models.Index(fields=['ip_address', 'created_at']),
             models.Index(fields=['status', 'created_at']),
         ]
+        constraints = [
+            # Une seule ligne par fenêtre agrégée, même écrite par plusieurs processus
+            models.UniqueConstraint(
+                fields=['aggregation_key'],
+                condition=~models.Q(aggregation_key=''),
+                name='security_event_unique_aggregation_key',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.get_event_type_display()} - {self.title}"
@@ -171,6 +201,20 @@ class SecurityEvent(models.Model):
         """
         Crée un nouvel événement de sécurité
         """
+        event = cls.build_event(
+            event_type, title, description, ip_address, user=user, severity=severity,
+            user_agent=user_agent, country=country, city=city, metadata=metadata
+        )
+        event.save()
+        return event
+    
+    @classmethod
+    def build_event(cls, event_type, title, description, ip_address, 
+                    user=None, severity=None, user_agent=None, 
+                    country=None, city=None, metadata=None):
+        """
+        Construit un événement de sécurité sans l'enregistrer
+        """
         # Déterminer la gravité par défaut selon le type
         if severity is None:
             severity_map = {
@@ -190,7 +234,8 @@ class SecurityEvent(models.Model):
             }
             severity = severity_map.get(event_type, cls.MEDIUM)
         
-        return cls.objects.create(
+        now = timezone.now()
+        return cls(
             user=user,
             event_type=event_type,
             severity=severity,
@@ -200,7 +245,9 @@ class SecurityEvent(models.Model):
             user_agent=user_agent or '',
             country=country or '',
             city=city or '',
-            metadata=metadata or {}
+            metadata=metadata or {},
+            first_seen_at=now,
+            last_seen_at=now
         )
     
     def add_action(self, action, details=None):
@@ -38,6 +38,9 @@ class SecurityRule(models.Model):
         (TIME_BASED, 'Basé sur le temps'),
     ]
     
+    # Types de règles évalués sur chaque requête (SecurityMiddleware)
+    REQUEST_RULE_TYPES = (RATE_LIMIT, IP_BLOCKING, SUSPICIOUS_ACTIVITY, GEOGRAPHIC, TIME_BASED)
+    
     rule_type = models.CharField(
         max_length=20,
         choices=RULE_TYPE_CHOICES,
@@ -116,28 +119,23 @@ class SecurityRule(models.Model):
     
     def trigger(self):
         """
-        Marque la règle comme déclenchée
+        Marque la règle comme déclenchée (écriture différée)
         """
+        from core.utils.write_coalescer import get_write_coalescer
         self.times_triggered += 1
         self.last_triggered = timezone.now()
-        self.save(update_fields=['times_triggered', 'last_triggered'])
+        coalescer = get_write_coalescer()
+        coalescer.increment(self, 'times_triggered')
+        coalescer.touch(self, 'last_triggered', self.last_triggered)
     
     def is_condition_met(self, context):
         """
         Vérifie si les conditions de la règle sont remplies
-        """
-        # Implémentation basique - à étendre selon les besoins
-        for key, expected_value in self.conditions.items():
-            if key not in context:
-                return False
-            
-            actual_value = context[key]
-            
-            # Comparaison simple
-            if actual_value != expected_value:
-                return False
         
-        return True
+        Voir `apps.security.services.rule_engine` pour les opérateurs disponibles.
+        """
+        from ..services.rule_engine import compile_conditions
+        return compile_conditions(self.conditions)(context)
     
     def execute_actions(self, context):
         """
@@ -160,15 +158,17 @@ class SecurityRule(models.Model):
                 results.append({'action': 'block_ip', 'result': block})
             
             elif action_type == 'send_alert':
-                from .security_event import SecurityEvent
-                event = SecurityEvent.create_event(
+                # Événement agrégé et écrit par lots (voir services.event_ingestion)
+                from ..services.event_ingestion import get_event_ingestor
+                key = get_event_ingestor().ingest(
                     event_type='suspicious_activity',
                     title=action_params.get('title', 'Règle de sécurité déclenchée'),
                     description=action_params.get('description', ''),
                     ip_address=context.get('ip_address'),
-                    severity=action_params.get('severity', 'medium')
+                    severity=action_params.get('severity', 'medium'),
+                    metadata={'rule': self.name}
                 )
-                results.append({'action': 'send_alert', 'result': event})
+                results.append({'action': 'send_alert', 'result': key})
             
             elif action_type == 'log_event':
                 # Log simple
@@ -189,22 +189,14 @@ class SecurityRule(models.Model):
         return queryset.order_by('-priority')
     
     @classmethod
-    def evaluate_rules(cls, context):
+    def evaluate_rules(cls, context, rule_type=None):
         """
         Évalue toutes les règles actives contre un contexte donné
-        """
-        triggered_rules = []
         
-        for rule in cls.get_active_rules():
-            if rule.is_condition_met(context):
-                rule.trigger()
-                actions_results = rule.execute_actions(context)
-                triggered_rules.append({
-                    'rule': rule,
-                    'actions_results': actions_results
-                })
-        
-        return triggered_rules
-
-
-
+        Les règles sont compilées et mises en cache par processus ; seules
+        celles dont les clés de conditions sont présentes dans le contexte sont
+        évaluées, et les déclenchements sont comptabilisés par lots.
+        `rule_type` accepte un type ou une liste de types.
+        """
+        from ..services.rule_engine import get_rule_engine
+        return get_rule_engine().evaluate(context, rule_type=rule_type)
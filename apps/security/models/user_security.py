@@ -192,22 +192,24 @@ class UserSecurity(models.Model):
         
         # Ajouter l'appareil aux appareils connus
         if user_agent:
-            device_info = {
-                'user_agent': user_agent,
-                'ip_address': ip_address,
-                'first_seen': timezone.now().isoformat(),
-                'last_seen': timezone.now().isoformat()
-            }
+            from core.utils.user_agent import parse_user_agent
             
-            # Vérifier si l'appareil existe déjà
-            device_exists = False
-            for device in self.known_devices:
-                if device.get('user_agent') == user_agent:
-                    device['last_seen'] = timezone.now().isoformat()
-                    device_exists = True
-                    break
+            parsed = parse_user_agent(user_agent)
             
-            if not device_exists:
+            # Vérifier si l'appareil existe déjà
+            device = self._find_known_device(user_agent, parsed.fingerprint)
+            if device is not None:
+                device['last_seen'] = timezone.now().isoformat()
+                device.setdefault('fingerprint', parsed.fingerprint)
+            else:
+                device_info = {
+                    'user_agent': user_agent,
+                    'fingerprint': parsed.fingerprint,
+                    'ip_address': ip_address,
+                    'first_seen': timezone.now().isoformat(),
+                    'last_seen': timezone.now().isoformat()
+                }
+                device_info.update(parsed.as_dict())
                 self.known_devices.append(device_info)
                 # Garder seulement les 20 derniers appareils
                 if len(self.known_devices) > 20:
@@ -272,10 +274,21 @@ class UserSecurity(models.Model):
         """
         Vérifie si l'appareil est connu
         """
+        if not user_agent:
+            return False
+        from core.utils.user_agent import parse_user_agent
+        
+        return self._find_known_device(user_agent, parse_user_agent(user_agent).fingerprint) is not None
+    
+    def _find_known_device(self, user_agent, fingerprint):
+        """Appareil connu correspondant au User Agent (empreinte, ou chaîne pour les anciennes entrées)"""
         for device in self.known_devices:
-            if device.get('user_agent') == user_agent:
-                return True
-        return False
+            if device.get('fingerprint'):
+                if device['fingerprint'] == fingerprint:
+                    return device
+            elif device.get('user_agent') == user_agent:
+                return device
+        return None
     
     def get_security_score(self):
         """
@@ -308,17 +321,33 @@ class UserSecurity(models.Model):
         """
         profile, created = cls.objects.get_or_create(
             user=user,
-            defaults={
-                'status': cls.ACTIVE,
-                'require_2fa': False,
-                'allow_multiple_sessions': True,
-                'max_concurrent_sessions': 5,
-                'email_notifications': True,
-                'sms_notifications': False,
-                'push_notifications': True,
-            }
+            defaults=cls.default_values()
         )
         return profile
+    
+    @classmethod
+    def bulk_create_for_users(cls, users, batch_size=None):
+        """
+        Crée en une requête les profils de sécurité manquants d'une liste d'utilisateurs
+        """
+        return cls.objects.bulk_create(
+            [cls(user=user, **cls.default_values()) for user in users],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+    
+    @classmethod
+    def default_values(cls):
+        """Valeurs d'un nouveau profil de sécurité"""
+        return {
+            'status': cls.ACTIVE,
+            'require_2fa': False,
+            'allow_multiple_sessions': True,
+            'max_concurrent_sessions': 5,
+            'email_notifications': True,
+            'sms_notifications': False,
+            'push_notifications': True,
+        }
 
 
 
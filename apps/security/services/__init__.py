@@ -0,0 +1,21 @@
+"""
+Services pour l'app security
+"""
+from .sliding_window import SlidingWindowCounter
+from .event_ingestion import SecurityEventIngestor, get_event_ingestor
+from .failure_counters import FailureCounterService, get_failure_counters
+from .rule_engine import SecurityRuleEngine, compile_conditions, get_rule_engine
+from .request_inspection import RequestInspector, get_request_inspector
+
+__all__ = [
+    'SlidingWindowCounter',
+    'SecurityEventIngestor',
+    'get_event_ingestor',
+    'FailureCounterService',
+    'get_failure_counters',
+    'SecurityRuleEngine',
+    'compile_conditions',
+    'get_rule_engine',
+    'RequestInspector',
+    'get_request_inspector',
+]
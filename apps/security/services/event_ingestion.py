@@ -0,0 +1,325 @@
+"""
+Ingestion des événements de sécurité
+
+Les événements identiques (type, IP, utilisateur) d'une même fenêtre de temps
+sont agrégés en mémoire en une seule ligne `SecurityEvent` portant un nombre
+d'occurrences et les dates de première et dernière occurrence. Le tampon est
+écrit par lots (à la taille maximale ou à intervalle régulier) : une rafale
+d'événements identiques, par exemple une attaque par bourrage d'identifiants,
+coûte une écriture par fenêtre au lieu d'une par tentative. Les échecs de
+connexion des profils `UserSecurity` sont cumulés de la même façon et appliqués
+par incréments `F()`.
+
+L'ingesteur du processus est vidé par un thread toutes les
+`SECURITY_EVENT_FLUSH_INTERVAL` secondes (même sans nouvel événement) et à
+l'arrêt du processus. Un lot dont l'écriture échoue est remis dans le tampon
+et retenté, au plus `SECURITY_EVENT_MAX_RETRIES` fois.
+
+La clé d'agrégation est unique en base : si deux processus écrivent la même
+fenêtre, le second incrémente la ligne du premier au lieu d'en créer une autre.
+"""
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..models import SecurityEvent, UserSecurity
+
+logger = logging.getLogger(__name__)
+
+
+class SecurityEventIngestor:
+    """
+    Agrégation et écriture par lots des événements de sécurité
+    """
+
+    def __init__(self, window: int = None, batch_size: int = None, flush_interval: float = None,
+                 max_retries: int = None):
+        self.window = window or getattr(settings, 'SECURITY_EVENT_AGGREGATION_WINDOW', 60)
+        self.batch_size = batch_size or getattr(settings, 'SECURITY_EVENT_BATCH_SIZE', 500)
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else getattr(settings, 'SECURITY_EVENT_FLUSH_INTERVAL', 5)
+        )
+        self.max_retries = (
+            max_retries if max_retries is not None
+            else getattr(settings, 'SECURITY_EVENT_MAX_RETRIES', 3)
+        )
+        self._events: Dict[str, dict] = {}
+        # user_id -> [utilisateur, échecs, dernier échec, tentatives d'écriture]
+        self._user_failures: Dict[int, list] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._stop_event = threading.Event()
+
+    def aggregation_key(self, event_type: str, ip_address: str, user_id, window_start: int) -> str:
+        """Clé d'agrégation d'un événement : (type, IP, utilisateur, fenêtre)"""
+        raw = f'{event_type}|{ip_address}|{user_id or ""}|{window_start}'
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def ingest(self, event_type, title, description, ip_address, user=None, severity=None,
+               user_agent=None, country=None, city=None, metadata=None) -> str:
+        """
+        Enregistre un événement (mêmes arguments que `SecurityEvent.create_event`)
+
+        Returns:
+            str: Clé d'agrégation de l'événement
+        """
+        now = timezone.now()
+        window_start = int(now.timestamp() // self.window) * self.window
+        key = self.aggregation_key(event_type, ip_address, getattr(user, 'pk', None), window_start)
+
+        with self._lock:
+            event = self._events.get(key)
+            if event is None:
+                self._events[key] = {
+                    'fields': {
+                        'user': user,
+                        'event_type': event_type,
+                        'severity': severity,
+                        'title': title,
+                        'description': description,
+                        'ip_address': ip_address,
+                        'user_agent': user_agent,
+                        'country': country,
+                        'city': city,
+                    },
+                    'metadata': dict(metadata or {}),
+                    'count': 1,
+                    'first_seen_at': now,
+                    'last_seen_at': now,
+                }
+            else:
+                event['count'] += 1
+                event['last_seen_at'] = now
+                # Les métadonnées reflètent la dernière occurrence
+                event['metadata'].update(metadata or {})
+            should_flush = self._should_flush()
+
+        if should_flush:
+            self.flush()
+        return key
+
+    def record_failed_login(self, user, at=None):
+        """Cumule un échec de connexion sur le profil de sécurité de l'utilisateur"""
+        with self._lock:
+            entry = self._user_failures.setdefault(user.pk, [user, 0, None, 0])
+            entry[1] += 1
+            entry[2] = at or timezone.now()
+            should_flush = self._should_flush()
+        if should_flush:
+            self.flush()
+
+    def discard_failed_logins(self, user):
+        """Oublie les échecs non écrits (connexion réussie : le compteur repart de zéro)"""
+        with self._lock:
+            self._user_failures.pop(user.pk, None)
+
+    def has_pending(self) -> bool:
+        """Indique si des événements ou échecs attendent d'être écrits"""
+        with self._lock:
+            return bool(self._events or self._user_failures)
+
+    def _should_flush(self) -> bool:
+        return (
+            len(self._events) + len(self._user_failures) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self) -> int:
+        """
+        Écrit les événements et échecs en attente
+
+        Returns:
+            int: Nombre d'événements agrégés écrits
+        """
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, {}
+                user_failures, self._user_failures = self._user_failures, {}
+                self._last_flush = time.monotonic()
+
+            if not events and not user_failures:
+                return 0
+            try:
+                with transaction.atomic():
+                    self._write_events(events)
+                    self._write_user_failures(user_failures)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'écriture des événements de sécurité: {e}")
+                self._requeue(events, user_failures)
+                return 0
+        return len(events)
+
+    def _requeue(self, events: Dict[str, dict], user_failures: Dict[int, list]):
+        """Remet un lot en échec dans le tampon (abandonné après `max_retries` tentatives)"""
+        dropped = 0
+        with self._lock:
+            for key, event in events.items():
+                event['attempts'] = event.get('attempts', 0) + 1
+                if event['attempts'] > self.max_retries:
+                    dropped += 1
+                    continue
+                pending = self._events.get(key)
+                if pending is not None:
+                    # Occurrences reçues pendant l'écriture du lot
+                    event['count'] += pending['count']
+                    event['last_seen_at'] = pending['last_seen_at']
+                    event['metadata'].update(pending['metadata'])
+                self._events[key] = event
+
+            for user_id, entry in user_failures.items():
+                entry[3] += 1
+                if entry[3] > self.max_retries:
+                    dropped += 1
+                    continue
+                pending = self._user_failures.get(user_id)
+                if pending is not None:
+                    entry[1] += pending[1]
+                    entry[2] = pending[2]
+                self._user_failures[user_id] = entry
+
+        if dropped:
+            logger.error(
+                f"{dropped} événement(s) de sécurité abandonné(s) après {self.max_retries} tentative(s) d'écriture"
+            )
+
+    # Écriture périodique
+
+    def start(self):
+        """Démarre le thread qui vide le tampon toutes les `flush_interval` secondes"""
+        if self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._stop_event.clear()
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name='security-event-flusher', daemon=True
+            )
+            self._flusher.start()
+
+    def stop(self):
+        """Arrête le thread d'écriture et écrit les événements en attente"""
+        self._stop_event.set()
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.join()
+        self.flush()
+
+    def _run_flusher(self):
+        while not self._stop_event.wait(self.flush_interval):
+            if not self.has_pending():
+                continue
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Erreur lors de l'écriture périodique des événements de sécurité")
+            finally:
+                connections.close_all()
+
+    def _write_events(self, events: Dict[str, dict]):
+        if not events:
+            return
+        existing = self._existing_events(list(events))
+
+        updated, created = [], []
+        for key, event in events.items():
+            row = existing.get(key)
+            if row is not None:
+                # Fenêtre déjà écrite (lot précédent ou autre processus)
+                row.occurrence_count = F('occurrence_count') + event['count']
+                row.last_seen_at = event['last_seen_at']
+                row.metadata = {**row.metadata, **event['metadata']}
+                row.updated_at = timezone.now()
+                updated.append(row)
+                continue
+
+            fields = event['fields']
+            row = SecurityEvent.build_event(metadata=event['metadata'], **fields)
+            row.aggregation_key = key
+            row.occurrence_count = event['count']
+            row.first_seen_at = event['first_seen_at']
+            row.last_seen_at = event['last_seen_at']
+            created.append(row)
+
+        if updated:
+            SecurityEvent.objects.bulk_update(
+                updated, ['occurrence_count', 'last_seen_at', 'metadata', 'updated_at']
+            )
+        if created:
+            try:
+                with transaction.atomic():
+                    SecurityEvent.objects.bulk_create(created)
+            except IntegrityError:
+                # Fenêtre créée entre-temps par un autre processus (clé unique)
+                for row in created:
+                    self._upsert_event(row)
+
+    @staticmethod
+    def _existing_events(keys) -> Dict[str, SecurityEvent]:
+        """Lignes déjà écrites des fenêtres du lot"""
+        return {event.aggregation_key: event for event in SecurityEvent.objects.filter(aggregation_key__in=keys)}
+
+    @staticmethod
+    def _upsert_event(row: SecurityEvent):
+        """Incrémente la ligne de la fenêtre par `F()`, ou la crée si elle n'existe pas"""
+        updated = SecurityEvent.objects.filter(aggregation_key=row.aggregation_key).update(
+            occurrence_count=F('occurrence_count') + row.occurrence_count,
+            last_seen_at=Greatest('last_seen_at', Value(row.last_seen_at)),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            row.save()
+
+    def _write_user_failures(self, user_failures: Dict[int, list]):
+        threshold = getattr(settings, 'MAX_LOGIN_ATTEMPTS', 5)
+        for user, count, last_failed_at, _ in user_failures.values():
+            updated = UserSecurity.objects.filter(user=user).update(
+                failed_login_attempts=F('failed_login_attempts') + count,
+                last_failed_login=last_failed_at,
+            )
+            if not updated:
+                UserSecurity.get_or_create_for_user(user)
+                UserSecurity.objects.filter(user=user).update(
+                    failed_login_attempts=F('failed_login_attempts') + count,
+                    last_failed_login=last_failed_at,
+                )
+
+        if not user_failures:
+            return
+        # Verrouillage des profils ayant atteint le seuil
+        to_lock = UserSecurity.objects.filter(
+            user_id__in=list(user_failures), failed_login_attempts__gte=threshold
+        ).exclude(status=UserSecurity.LOCKED).select_related('user')
+        for profile in to_lock:
+            profile.lock_user("Trop de tentatives de connexion échouées")
+
+
+_ingestor = None
+_ingestor_lock = threading.Lock()
+
+
+def get_event_ingestor() -> SecurityEventIngestor:
+    """Retourne l'ingesteur d'événements du processus"""
+    global _ingestor
+    if _ingestor is None:
+        with _ingestor_lock:
+            if _ingestor is None:
+                _ingestor = SecurityEventIngestor()
+                _ingestor.start()
+                # Les événements en attente sont écrits à l'arrêt du processus
+                atexit.register(_ingestor.stop)
+    return _ingestor
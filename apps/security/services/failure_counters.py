@@ -0,0 +1,215 @@
+"""
+Compteurs d'échecs de connexion et état de blocage, servis depuis le cache
+
+Chaque tentative échouée incrémente des compteurs à fenêtre glissante par IP,
+par email, par couple (IP, email) et par utilisateur. Les tentatives bloquées
+ou verrouillées posent un marqueur horodaté sur l'IP ou l'utilisateur. Les
+décisions de blocage (`LoginAttempt.get_failed_attempts_count`, `is_ip_blocked`,
+`is_user_locked`, `IPBlockingMiddleware`) ne lisent que le cache : la table
+`LoginAttempt` n'est plus qu'une piste d'audit.
+
+Cet état n'a de sens que si le cache est partagé par tous les processus
+(Redis, Memcached...). Avec un cache propre au processus (LocMem, Dummy), un
+attaquant réparti sur plusieurs workers ne serait jamais bloqué : les
+décisions sont alors prises en base, sur `LoginAttempt`. Le comportement est
+fixé par `SECURITY_FAILURE_COUNTER_STORE` ('auto', 'cache' ou 'database').
+"""
+import hashlib
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.utils.helpers import is_shared_cache
+from .sliding_window import SlidingWindowCounter
+
+
+def uses_shared_cache() -> bool:
+    """
+    Indique si les compteurs d'échecs sont tenus dans le cache
+
+    En mode 'auto' (par défaut), seulement si le cache par défaut est partagé
+    entre processus ; sinon les décisions sont prises en base.
+    """
+    store = getattr(settings, 'SECURITY_FAILURE_COUNTER_STORE', 'auto')
+    if store in ('cache', 'database'):
+        return store == 'cache'
+    return is_shared_cache()
+
+
+class FailureCounterService:
+    """
+    Compteurs d'échecs par IP, email et utilisateur
+    """
+
+    def __init__(self, window: int = None, use_cache: bool = None):
+        self.window = window or getattr(settings, 'SECURITY_FAILURE_WINDOW', 900)
+        self.use_cache = use_cache if use_cache is not None else uses_shared_cache()
+        self.status_ttl = getattr(settings, 'SECURITY_STATUS_MARK_TTL', 3600)
+        self.ip = SlidingWindowCounter('login_failures_ip', self.window)
+        self.email = SlidingWindowCounter('login_failures_email', self.window)
+        self.ip_email = SlidingWindowCounter('login_failures_ip_email', self.window)
+        self.user = SlidingWindowCounter('login_failures_user', self.window)
+
+    # Échecs
+
+    def record_failure(self, ip_address: str, email: Optional[str] = None, user=None) -> Dict[str, int]:
+        """
+        Comptabilise une tentative échouée
+
+        Returns:
+            Dict[str, int]: Échecs de la fenêtre par IP, email et utilisateur
+        """
+        if not self.use_cache:
+            # La tentative est déjà enregistrée dans LoginAttempt
+            return self._count_failures(ip_address, email, user)
+
+        now = time.time()
+        counts = {'ip': self.ip.add(ip_address, now=now)}
+        if email:
+            counts['email'] = self.email.add(email, now=now)
+            counts['ip_email'] = self.ip_email.add(f'{ip_address}|{email}', now=now)
+        if user is not None:
+            counts['user'] = self.user.add(getattr(user, 'pk', user), now=now)
+        return counts
+
+    def get_failed_attempts_count(self, ip_address: str, email: Optional[str] = None, minutes: int = 15) -> int:
+        """
+        Tentatives échouées récentes d'une IP (et d'un email)
+
+        La période est bornée à la fenêtre des compteurs (`SECURITY_FAILURE_WINDOW`).
+        """
+        if not self.use_cache:
+            queryset = self._failed_attempts(minutes).filter(ip_address=ip_address)
+            if email:
+                queryset = queryset.filter(email=email)
+            return queryset.count()
+        if email:
+            return self.ip_email.count(f'{ip_address}|{email}', seconds=minutes * 60)
+        return self.ip.count(ip_address, seconds=minutes * 60)
+
+    def get_user_failures(self, user, minutes: int = 15) -> int:
+        """Tentatives échouées récentes d'un utilisateur"""
+        user_id = getattr(user, 'pk', user)
+        if not self.use_cache:
+            from ..models import LoginAttempt
+            queryset = self._failed_attempts(minutes).filter(user_id=user_id)
+            # Les échecs antérieurs à la dernière connexion réussie ne comptent plus
+            last_success = LoginAttempt.objects.filter(
+                user_id=user_id, status=LoginAttempt.SUCCESS
+            ).order_by('-created_at').values_list('created_at', flat=True).first()
+            if last_success is not None:
+                queryset = queryset.filter(created_at__gt=last_success)
+            return queryset.count()
+        return self.user.count(user_id, seconds=minutes * 60)
+
+    def reset_user(self, user):
+        """Remet à zéro les échecs d'un utilisateur (connexion réussie)"""
+        if self.use_cache:
+            self.user.reset(getattr(user, 'pk', user))
+
+    def _count_failures(self, ip_address: str, email: Optional[str], user) -> Dict[str, int]:
+        """
+        Échecs de la fenêtre par IP, email et utilisateur, en une seule requête
+
+        Chaque compteur est un `Count` conditionnel sur les tentatives échouées
+        de la fenêtre ; la dernière connexion réussie de l'utilisateur est lue
+        par sous-requête.
+        """
+        from ..models import LoginAttempt
+        since = timezone.now() - timedelta(seconds=self.window)
+        scope = Q(ip_address=ip_address)
+        counters = {'ip': Count('pk', filter=Q(ip_address=ip_address))}
+        if email:
+            scope |= Q(email=email)
+            counters['email'] = Count('pk', filter=Q(email=email))
+            counters['ip_email'] = Count('pk', filter=Q(ip_address=ip_address, email=email))
+        if user is not None:
+            user_id = getattr(user, 'pk', user)
+            scope |= Q(user_id=user_id)
+            # Les échecs antérieurs à la dernière connexion réussie ne comptent plus
+            last_success = LoginAttempt.objects.filter(
+                user_id=user_id, status=LoginAttempt.SUCCESS
+            ).order_by('-created_at').values('created_at')[:1]
+            counters['user'] = Count('pk', filter=Q(
+                user_id=user_id, created_at__gt=Coalesce(Subquery(last_success), Value(since))
+            ))
+        # Les alias ne doivent pas masquer les champs du modèle (email, user)
+        counts = self._failed_attempts(self.window / 60).filter(scope).aggregate(
+            **{f'{name}_failures': counter for name, counter in counters.items()}
+        )
+        return {name: counts[f'{name}_failures'] for name in counters}
+
+    @staticmethod
+    def _failed_attempts(minutes: float):
+        from ..models import LoginAttempt
+        return LoginAttempt.objects.filter(
+            status__in=[LoginAttempt.FAILED, LoginAttempt.BLOCKED],
+            created_at__gte=timezone.now() - timedelta(minutes=minutes),
+        )
+
+    def _attempt_since(self, minutes: float, **lookup) -> bool:
+        from ..models import LoginAttempt
+        return LoginAttempt.objects.filter(
+            created_at__gte=timezone.now() - timedelta(minutes=minutes), **lookup
+        ).exists()
+
+    # Blocages et verrouillages
+
+    @staticmethod
+    def _mark_key(scope: str, key) -> str:
+        digest = hashlib.sha1(str(key).lower().encode()).hexdigest()[:20]
+        return f'login_status:{scope}:{digest}'
+
+    def _mark(self, scope: str, key, at: Optional[float] = None):
+        if not self.use_cache:
+            # L'état est lu dans LoginAttempt
+            return
+        cache.set(self._mark_key(scope, key), at if at is not None else time.time(), self.status_ttl)
+
+    def _marked_since(self, scope: str, key, minutes: int) -> bool:
+        marked_at = cache.get(self._mark_key(scope, key))
+        return marked_at is not None and time.time() - marked_at <= minutes * 60
+
+    def mark_ip_blocked(self, ip_address: str, at: Optional[float] = None):
+        """Enregistre une tentative bloquée pour une IP"""
+        self._mark('ip_blocked', ip_address, at)
+
+    def is_ip_blocked(self, ip_address: str, minutes: int = 60) -> bool:
+        """Indique si une tentative de l'IP a été bloquée dans les `minutes` dernières minutes"""
+        if not self.use_cache:
+            from ..models import LoginAttempt
+            return self._attempt_since(minutes, ip_address=ip_address, status=LoginAttempt.BLOCKED)
+        return self._marked_since('ip_blocked', ip_address, minutes)
+
+    def mark_user_locked(self, user, at: Optional[float] = None):
+        """Enregistre une tentative sur un compte verrouillé"""
+        self._mark('user_locked', getattr(user, 'pk', user), at)
+
+    def is_user_locked(self, user, minutes: int = 30) -> bool:
+        """Indique si le compte a été verrouillé dans les `minutes` dernières minutes"""
+        user_id = getattr(user, 'pk', user)
+        if not self.use_cache:
+            from ..models import LoginAttempt
+            return self._attempt_since(minutes, user_id=user_id, status=LoginAttempt.LOCKED)
+        return self._marked_since('user_locked', user_id, minutes)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_failure_counters() -> FailureCounterService:
+    """Retourne le service de compteurs d'échecs du processus"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = FailureCounterService()
+    return _service
@@ -0,0 +1,211 @@
+"""
+Inspection des requêtes entrantes (injection SQL, XSS, path traversal)
+
+Toutes les signatures sont compilées une fois en une seule expression
+régulière (alternance de littéraux, insensible à la casse) : chaque valeur est
+parcourue une seule fois, quel que soit le nombre de signatures, sans copie en
+minuscules. Le corps n'est jamais parsé pour l'inspection : les formulaires
+urlencodés sont lus sur un préfixe borné, les autres corps (JSON, texte) sont
+décodés et analysés par blocs sur ce même préfixe, et les corps multipart ne
+sont inspectés que si la vue les a déjà parsés.
+"""
+import codecs
+import re
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.http.request import RawPostDataException
+
+# catégorie -> (score, libellé de l'indicateur, signatures)
+DEFAULT_SIGNATURES = {
+    'sql_injection': (30, 'Possible injection SQL', (
+        'union', 'select', 'drop', 'delete', 'insert', 'update', 'alter', 'create',
+    )),
+    'xss': (25, 'Possible XSS', (
+        '<script>', '<iframe>', 'javascript:', 'onload=', 'onerror=',
+    )),
+    'path_traversal': (20, 'Possible path traversal', (
+        '../', '..\\', '%2e%2e%2f', '%2e%2e%5c',
+    )),
+}
+
+SUSPICIOUS_THRESHOLD = 50
+STREAM_CHUNK_SIZE = 8192
+
+
+class RequestInspector:
+    """
+    Analyse d'une requête contre un jeu de signatures compilé
+    """
+
+    def __init__(self, signatures: Optional[Dict[str, Tuple[int, str, Iterable[str]]]] = None,
+                 max_body_bytes: int = None):
+        self.signatures = signatures or DEFAULT_SIGNATURES
+        self.max_body_bytes = (
+            max_body_bytes if max_body_bytes is not None
+            else getattr(settings, 'SECURITY_INSPECTION_MAX_BODY_BYTES', 64 * 1024)
+        )
+
+        self._categories: Dict[str, str] = {}
+        for category, (_, _, patterns) in self.signatures.items():
+            for pattern in patterns:
+                self._categories[pattern.lower()] = category
+
+        # Les plus longues d'abord : une signature n'en masque pas une plus spécifique
+        patterns = sorted(self._categories, key=len, reverse=True)
+        self._pattern = re.compile('|'.join(re.escape(p) for p in patterns), re.IGNORECASE)
+        # Recouvrement entre blocs pour détecter une signature à cheval sur deux blocs
+        self._overlap = max(map(len, patterns)) - 1
+
+    # Analyse des valeurs
+
+    def scan(self, value: str) -> Dict[str, str]:
+        """
+        Catégories détectées dans une valeur
+
+        Returns:
+            Dict[str, str]: Catégorie -> première signature trouvée
+        """
+        found = {}
+        for match in self._pattern.finditer(value):
+            signature = match.group(0).lower()
+            found.setdefault(self._categories[signature], signature)
+            if len(found) == len(self.signatures):
+                break
+        return found
+
+    def scan_stream(self, chunks: Iterable[bytes], encoding: str = 'utf-8') -> Dict[str, str]:
+        """Catégories détectées dans un flux d'octets, décodé bloc par bloc"""
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        found, tail = {}, ''
+        for chunk in chunks:
+            text = tail + decoder.decode(chunk)
+            for category, signature in self.scan(text).items():
+                found.setdefault(category, signature)
+            tail = text[-self._overlap:] if self._overlap else ''
+        text = tail + decoder.decode(b'', final=True)
+        for category, signature in self.scan(text).items():
+            found.setdefault(category, signature)
+        return found
+
+    # Analyse d'une requête
+
+    def inspect(self, request: HttpRequest) -> dict:
+        """
+        Analyse une requête
+
+        Returns:
+            dict: `is_suspicious`, `risk_score`, `indicators` et `matches`
+            (catégorie, emplacement, signature et score de chaque détection)
+        """
+        indicators, matches = [], []
+        risk_score = 0
+
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+        if not user_agent:
+            indicators.append('User-Agent manquant')
+            risk_score += 20
+        elif len(user_agent) < 10:
+            indicators.append('User-Agent suspect')
+            risk_score += 10
+
+        for location, found in self._inspect_values(request):
+            for category, signature in found.items():
+                score, label, _ = self.signatures[category]
+                indicators.append(f'{label} dans {location}')
+                matches.append({
+                    'category': category,
+                    'location': location,
+                    'signature': signature,
+                    'score': score,
+                })
+                risk_score += score
+
+        if len(request.GET) > 50:
+            indicators.append('Trop de paramètres de requête')
+            risk_score += 15
+
+        if self._content_length(request) > 10 * 1024 * 1024:
+            indicators.append('Requête trop volumineuse')
+            risk_score += 10
+
+        return {
+            'is_suspicious': risk_score > SUSPICIOUS_THRESHOLD,
+            'risk_score': risk_score,
+            'indicators': indicators,
+            'matches': matches,
+        }
+
+    def _inspect_values(self, request: HttpRequest):
+        """Détections par emplacement : paramètres de requête puis corps"""
+        fields = {key: value for key, value in request.GET.items()}
+        body_stream = None
+
+        if '_post' in request.__dict__:
+            # Corps déjà parsé par la vue : aucune lecture supplémentaire
+            fields.update(request.POST.items())
+        elif request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            content_type = request.META.get('CONTENT_TYPE', '').split(';')[0].strip().lower()
+            body = self._body_prefix(request, content_type)
+            if body:
+                if content_type == 'application/x-www-form-urlencoded':
+                    text = body.decode(request.encoding or 'utf-8', errors='replace')
+                    fields.update(parse_qsl(text, keep_blank_values=True))
+                else:
+                    body_stream = body
+
+        for key, value in fields.items():
+            found = self.scan(str(value))
+            if found:
+                yield key, found
+
+        if body_stream:
+            chunks = (
+                body_stream[i:i + STREAM_CHUNK_SIZE]
+                for i in range(0, len(body_stream), STREAM_CHUNK_SIZE)
+            )
+            found = self.scan_stream(chunks, request.encoding or 'utf-8')
+            if found:
+                yield 'le corps de la requête', found
+
+    def _body_prefix(self, request: HttpRequest, content_type: str) -> bytes:
+        """
+        Préfixe borné du corps, ou b'' si le lire forcerait un parsing multipart
+        ou dépasserait la limite mémoire de Django
+        """
+        if content_type.startswith('multipart/'):
+            return b''
+        if '_body' not in request.__dict__:
+            limit = getattr(settings, 'DATA_UPLOAD_MAX_MEMORY_SIZE', 2621440)
+            length = self._content_length(request)
+            if not length or (limit is not None and length > limit):
+                return b''
+        try:
+            # Le corps lu est conservé par Django et réutilisé par la vue
+            return request.body[:self.max_body_bytes]
+        except RawPostDataException:
+            return b''
+
+    @staticmethod
+    def _content_length(request: HttpRequest) -> int:
+        try:
+            return int(request.META.get('CONTENT_LENGTH') or 0)
+        except (TypeError, ValueError):
+            return 0
+
+
+_inspector = None
+_inspector_lock = threading.Lock()
+
+
+def get_request_inspector() -> RequestInspector:
+    """Retourne l'inspecteur de requêtes du processus"""
+    global _inspector
+    if _inspector is None:
+        with _inspector_lock:
+            if _inspector is None:
+                _inspector = RequestInspector()
+    return _inspector
@@ -0,0 +1,266 @@
+"""
+Moteur compilé des règles de sécurité
+
+Les règles actives sont chargées une fois par processus et leurs conditions
+(`SecurityRule.conditions`) compilées en prédicats. L'index est reconstruit
+quand la version des règles (clé de cache partagée, incrémentée à chaque
+modification) change. Les règles sont indexées par `rule_type` et par une clé
+de contexte requise : une évaluation ne parcourt que les règles dont les clés
+sont présentes dans le contexte. Une règle sans condition est ignorée : elle
+s'appliquerait à tout le trafic. Les compteurs de déclenchement sont écrits
+de façon différée (`core.utils.write_coalescer`).
+
+Conditions d'une règle (toutes doivent être vraies) :
+    {"country": "FR"}                          égalité
+    {"failed_attempts": {"gte": 5, "lt": 20}}  bornes (gt, gte, lt, lte, eq, neq)
+    {"country": {"in": ["RU", "KP"]}}          appartenance (in, not_in)
+    {"path": {"regex": "^/admin/"}}            expression régulière (recherche)
+    {"ip_address": {"cidr": ["10.0.0.0/8"]}}   réseaux IP (cidr, not_cidr)
+"""
+import ipaddress
+import logging
+import operator
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION_CACHE_KEY = 'security_rules_version'
+
+COMPARATORS = {
+    'eq': operator.eq,
+    'neq': operator.ne,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+def bump_rules_version():
+    """Invalide l'index compilé de tous les processus"""
+    cache.set(RULES_VERSION_CACHE_KEY, time.time(), None)
+
+
+def _networks(value):
+    values = value if isinstance(value, (list, tuple, set)) else [value]
+    return tuple(ipaddress.ip_network(str(network), strict=False) for network in values)
+
+
+def _in_networks(networks):
+    def check(actual):
+        try:
+            address = ipaddress.ip_address(str(actual))
+        except ValueError:
+            return False
+        return any(address in network for network in networks)
+    return check
+
+
+def _compile_operator(name: str, expected) -> Callable[[Any], bool]:
+    """Compile un opérateur de condition en test sur la valeur du contexte"""
+    if name in COMPARATORS:
+        compare = COMPARATORS[name]
+
+        def check(actual):
+            try:
+                return compare(actual, expected)
+            except TypeError:
+                return False
+        return check
+
+    if name in ('in', 'not_in'):
+        values = expected if isinstance(expected, (list, tuple, set)) else [expected]
+        try:
+            members = frozenset(values)
+        except TypeError:
+            members = tuple(values)
+        if name == 'in':
+            return lambda actual: _contains(members, actual)
+        return lambda actual: not _contains(members, actual)
+
+    if name == 'regex':
+        pattern = re.compile(expected)
+        return lambda actual: actual is not None and pattern.search(str(actual)) is not None
+
+    if name in ('cidr', 'not_cidr'):
+        check = _in_networks(_networks(expected))
+        return check if name == 'cidr' else (lambda actual: not check(actual))
+
+    raise ValueError(f"Opérateur de condition inconnu: {name}")
+
+
+def _contains(members, actual):
+    try:
+        return actual in members
+    except TypeError:
+        return False
+
+
+def compile_conditions(conditions: Dict[str, Any]) -> Predicate:
+    """
+    Compile les conditions d'une règle en prédicat sur un contexte
+
+    Raises:
+        ValueError: Opérateur inconnu, expression régulière ou réseau invalide
+    """
+    checks = []
+    for key, expected in (conditions or {}).items():
+        if isinstance(expected, dict) and expected:
+            for name, value in expected.items():
+                try:
+                    checks.append((key, _compile_operator(name, value)))
+                except re.error as e:
+                    raise ValueError(f"Expression régulière invalide pour {key}: {e}")
+        else:
+            checks.append((key, lambda actual, expected=expected: actual == expected))
+
+    checks = tuple(checks)
+
+    def predicate(context):
+        for key, check in checks:
+            if key not in context or not check(context[key]):
+                return False
+        return True
+
+    return predicate
+
+
+class CompiledSecurityRule:
+    """Règle compilée : prédicat et clés de contexte requises"""
+
+    __slots__ = ('rule', 'predicate', 'required_keys', 'order')
+
+    def __init__(self, rule, order: int):
+        self.rule = rule
+        self.predicate = compile_conditions(rule.conditions)
+        self.required_keys = frozenset((rule.conditions or {}).keys())
+        self.order = order
+
+
+class SecurityRuleEngine:
+    """
+    Index compilé des règles de sécurité actives
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = None
+        self.last_version_check = 0
+        self.version_check_interval = getattr(settings, 'SECURITY_RULE_ENGINE_VERSION_CHECK_INTERVAL', 5)
+        # rule_type (None = tous) -> clé de contexte -> règles ancrées sur cette clé
+        self.index: Dict[Optional[str], Dict[str, List[CompiledSecurityRule]]] = {}
+
+    # Évaluation
+
+    def match(self, context: Dict[str, Any], rule_type: Union[str, Iterable[str], None] = None) -> List:
+        """
+        Règles actives dont les conditions sont remplies, par priorité décroissante
+
+        Args:
+            rule_type: Type de règle, liste de types, ou None pour tous les types
+        """
+        self._ensure_compiled()
+        rule_types = (rule_type,) if rule_type is None or isinstance(rule_type, str) else tuple(rule_type)
+
+        candidates = []
+        with self.lock:
+            for current_type in rule_types:
+                by_key = self.index.get(current_type, {})
+                for key in context:
+                    candidates.extend(by_key.get(key, ()))
+
+        matched = [
+            compiled for compiled in candidates
+            if compiled.required_keys.issubset(context) and compiled.predicate(context)
+        ]
+        matched.sort(key=lambda compiled: compiled.order)
+        return [compiled.rule for compiled in matched]
+
+    def evaluate(self, context: Dict[str, Any], rule_type: Union[str, Iterable[str], None] = None) -> List[Dict]:
+        """Évalue les règles actives, exécute leurs actions et comptabilise les déclenchements"""
+        triggered_rules = []
+        for rule in self.match(context, rule_type):
+            self.record_trigger(rule)
+            actions_results = rule.execute_actions(context)
+            triggered_rules.append({
+                'rule': rule,
+                'actions_results': actions_results
+            })
+        return triggered_rules
+
+    # Déclenchements
+
+    def record_trigger(self, rule):
+        """Comptabilise un déclenchement (écriture différée, voir `SecurityRule.trigger`)"""
+        rule.trigger()
+
+    # Compilation
+
+    def invalidate(self):
+        """Force la recompilation au prochain appel"""
+        with self.lock:
+            self.version = None
+            self.last_version_check = 0
+
+    def _ensure_compiled(self):
+        """Recompile l'index si la version des règles a changé"""
+        now = time.time()
+        if self.version is not None and now - self.last_version_check < self.version_check_interval:
+            return
+
+        version = cache.get(RULES_VERSION_CACHE_KEY)
+        if version is None:
+            bump_rules_version()
+            version = cache.get(RULES_VERSION_CACHE_KEY)
+
+        with self.lock:
+            self.last_version_check = now
+            if version != self.version:
+                self._compile()
+                self.version = version
+
+    def _compile(self):
+        """Charge et compile les règles actives"""
+        from ..models import SecurityRule
+
+        index = defaultdict(lambda: defaultdict(list))
+
+        for order, rule in enumerate(SecurityRule.get_active_rules().order_by('-priority', 'name')):
+            try:
+                compiled = CompiledSecurityRule(rule, order)
+            except ValueError as e:
+                logger.error(f"Règle de sécurité {rule.name} ignorée: {e}")
+                continue
+            if not compiled.required_keys:
+                logger.warning(f"Règle de sécurité {rule.name} ignorée: aucune condition")
+                continue
+
+            # Une seule clé d'ancrage suffit : les autres sont vérifiées ensuite
+            anchor = min(compiled.required_keys)
+            for rule_type in (None, rule.rule_type):
+                index[rule_type][anchor].append(compiled)
+
+        self.index = {rule_type: dict(by_key) for rule_type, by_key in index.items()}
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_rule_engine() -> SecurityRuleEngine:
+    """Retourne le moteur de règles du processus"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SecurityRuleEngine()
+    return _engine
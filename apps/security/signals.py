@@ -1,27 +1,40 @@
 """
 Signaux pour l'app security
 """
-from django.db.models.signals import post_save, pre_save
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import UserSecurity, SecurityEvent, LoginAttempt
+from core.utils.bulk_signals import batched_receiver
+from .models import UserSecurity, SecurityEvent, LoginAttempt, SecurityRule
+from .services import get_event_ingestor, get_failure_counters
+from .services.rule_engine import bump_rules_version
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
 
-@receiver(post_save, sender=User)
-def create_user_security_profile(sender, instance, created, **kwargs):
-    """Crée automatiquement un profil de sécurité lors de la création d'un utilisateur"""
-    if created:
-        UserSecurity.get_or_create_for_user(instance)
+@batched_receiver(post_save, sender=User, created_only=True)
+def create_user_security_profile(sender, events):
+    """Crée automatiquement un profil de sécurité lors de la création d'utilisateurs"""
+    UserSecurity.bulk_create_for_users([event.instance for event in events])
 
 
 @receiver(post_save, sender=LoginAttempt)
 def handle_failed_login_attempt(sender, instance, created, **kwargs):
     """Gère les tentatives de connexion échouées"""
     if created and instance.status in [LoginAttempt.FAILED, LoginAttempt.BLOCKED]:
-        # Créer un événement de sécurité
-        SecurityEvent.create_event(
+        # Compteurs d'échecs et état de blocage (cache, sans requête COUNT)
+        failure_counters = get_failure_counters()
+        counts = failure_counters.record_failure(instance.ip_address, instance.email, instance.user)
+        if instance.status == LoginAttempt.BLOCKED:
+            failure_counters.mark_ip_blocked(instance.ip_address)
+        
+        # Créer un événement de sécurité (agrégé par IP, utilisateur et fenêtre)
+        ingestor = get_event_ingestor()
+        ingestor.ingest(
             event_type=SecurityEvent.LOGIN_FAILED,
             title='Tentative de connexion échouée',
             description=f'Tentative de connexion échouée pour {instance.email} depuis {instance.ip_address}',
@@ -34,16 +47,39 @@ def handle_failed_login_attempt(sender, instance, created, **kwargs):
             metadata={
                 'email': instance.email,
                 'failure_reason': instance.failure_reason,
-                'attempt_count': LoginAttempt.get_failed_attempts_count(
-                    instance.ip_address, instance.email, minutes=15
-                )
+                'ip_attempt_count': counts['ip'],
+                'email_attempt_count': counts.get('email', 0)
             }
         )
         
-        # Mettre à jour le profil de sécurité de l'utilisateur
+        # Mettre à jour le profil de sécurité de l'utilisateur (écrit par lots)
         if instance.user:
-            security_profile = UserSecurity.get_or_create_for_user(instance.user)
-            security_profile.record_failed_login(instance.ip_address, instance.user_agent)
+            ingestor.record_failed_login(instance.user, at=instance.created_at)
+        
+        # Évaluer les règles de sécurité sur l'échec (voir services.rule_engine)
+        try:
+            SecurityRule.evaluate_rules({
+                'event': 'login_failed',
+                'ip_address': instance.ip_address,
+                'email': instance.email,
+                'user_id': instance.user_id,
+                'status': instance.status,
+                'failure_reason': instance.failure_reason,
+                'failed_attempts': counts['ip'],
+                'email_failed_attempts': counts.get('email', 0),
+                'country': instance.country,
+                'city': instance.city,
+                'user_agent': instance.user_agent,
+            })
+        except Exception as e:
+            logger.error(f"Erreur lors de l'évaluation des règles de sécurité: {str(e)}")
+
+
+@receiver(post_save, sender=LoginAttempt)
+def handle_locked_login_attempt(sender, instance, created, **kwargs):
+    """Mémorise les tentatives sur un compte verrouillé (voir LoginAttempt.is_user_locked)"""
+    if created and instance.status == LoginAttempt.LOCKED and instance.user_id:
+        get_failure_counters().mark_user_locked(instance.user_id)
 
 
 @receiver(post_save, sender=LoginAttempt)
@@ -51,7 +87,7 @@ def handle_successful_login_attempt(sender, instance, created, **kwargs):
     """Gère les tentatives de connexion réussies"""
     if created and instance.status == LoginAttempt.SUCCESS:
         # Créer un événement de sécurité
-        SecurityEvent.create_event(
+        get_event_ingestor().ingest(
             event_type=SecurityEvent.LOGIN_SUCCESS,
             title='Connexion réussie',
             description=f'Connexion réussie pour {instance.email} depuis {instance.ip_address}',
@@ -69,6 +105,8 @@ def handle_successful_login_attempt(sender, instance, created, **kwargs):
         
         # Mettre à jour le profil de sécurité de l'utilisateur
         if instance.user:
+            get_failure_counters().reset_user(instance.user)
+            get_event_ingestor().discard_failed_logins(instance.user)
             security_profile = UserSecurity.get_or_create_for_user(instance.user)
             security_profile.record_successful_login(
                 instance.ip_address,
@@ -78,4 +116,12 @@ def handle_successful_login_attempt(sender, instance, created, **kwargs):
             )
 
 
-
+@receiver(post_save, sender=SecurityRule)
+@receiver(post_delete, sender=SecurityRule)
+def security_rules_changed(sender, instance, **kwargs):
+    """Invalide le jeu de règles compilé de tous les processus"""
+    # Les mises à jour des seuls compteurs de déclenchement ne changent pas les règles
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'times_triggered', 'last_triggered'}:
+        return
+    bump_rules_version()
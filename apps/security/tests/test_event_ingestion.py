@@ -0,0 +1,165 @@
+"""
+Tests pour l'ingestion agrégée des événements de sécurité
+"""
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.security.models import SecurityEvent, UserSecurity
+from apps.security.services import SecurityEventIngestor
+
+User = get_user_model()
+
+
+class SecurityEventIngestorTestCase(TestCase):
+    """Tests pour SecurityEventIngestor"""
+
+    def setUp(self):
+        # flush_interval élevé : écriture explicite par flush()
+        self.ingestor = SecurityEventIngestor(window=60, batch_size=1000, flush_interval=3600, max_retries=2)
+
+    def ingest(self, ip_address='10.0.0.1', event_type=SecurityEvent.LOGIN_FAILED, **kwargs):
+        return self.ingestor.ingest(event_type, 'Échec de connexion', 'Mot de passe invalide', ip_address, **kwargs)
+
+    def test_identical_events_are_aggregated(self):
+        """Une ligne par (type, IP, utilisateur, fenêtre)"""
+        keys = {self.ingest(metadata={'attempt': i}) for i in range(3)}
+        self.ingest(ip_address='10.0.0.2')
+
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(SecurityEvent.objects.count(), 0)
+        self.assertEqual(self.ingestor.flush(), 2)
+
+        event = SecurityEvent.objects.get(ip_address='10.0.0.1')
+        self.assertEqual(event.occurrence_count, 3)
+        self.assertEqual(event.metadata, {'attempt': 2})
+        self.assertLessEqual(event.first_seen_at, event.last_seen_at)
+        self.assertEqual(SecurityEvent.objects.get(ip_address='10.0.0.2').occurrence_count, 1)
+
+    def test_later_batch_updates_written_window(self):
+        """Un lot suivant de la même fenêtre incrémente la ligne existante"""
+        self.ingest()
+        self.ingestor.flush()
+        self.ingest()
+        self.ingest()
+        self.ingestor.flush()
+
+        self.assertEqual(SecurityEvent.objects.get().occurrence_count, 3)
+
+    def test_concurrent_writers_share_the_window_row(self):
+        """Une fenêtre écrite entre-temps par un autre processus est incrémentée"""
+        other = SecurityEventIngestor(window=60, batch_size=1000, flush_interval=3600)
+        other.ingest(SecurityEvent.LOGIN_FAILED, 'Échec de connexion', 'Mot de passe invalide', '10.0.0.1')
+        self.ingest()
+        self.ingest(ip_address='10.0.0.2')
+        other.flush()
+
+        # La ligne de l'autre processus n'était pas encore visible à la lecture
+        with mock.patch.object(SecurityEventIngestor, '_existing_events', return_value={}):
+            self.assertEqual(self.ingestor.flush(), 2)
+
+        self.assertEqual(SecurityEvent.objects.filter(ip_address='10.0.0.1').get().occurrence_count, 2)
+        self.assertEqual(SecurityEvent.objects.get(ip_address='10.0.0.2').occurrence_count, 1)
+
+    def test_aggregation_key(self):
+        """La clé dépend du type, de l'IP, de l'utilisateur et de la fenêtre"""
+        key = self.ingestor.aggregation_key
+        base = key('login_failed', '10.0.0.1', 7, 600)
+
+        self.assertEqual(base, key('login_failed', '10.0.0.1', 7, 600))
+        self.assertEqual(len(base), 40)
+        for other in (
+            key('login_blocked', '10.0.0.1', 7, 600),
+            key('login_failed', '10.0.0.2', 7, 600),
+            key('login_failed', '10.0.0.1', 8, 600),
+            key('login_failed', '10.0.0.1', None, 600),
+            key('login_failed', '10.0.0.1', 7, 660),
+        ):
+            self.assertNotEqual(base, other)
+
+    def test_events_in_next_window_get_new_row(self):
+        self.ingest()
+        with mock.patch.object(timezone, 'now', return_value=timezone.now() + timedelta(seconds=60)):
+            self.ingest()
+        self.ingestor.flush()
+
+        self.assertEqual(SecurityEvent.objects.count(), 2)
+
+    def test_failed_batch_is_requeued(self):
+        """Un lot en échec est retenté avec les occurrences reçues entre-temps"""
+        self.ingest()
+        with mock.patch.object(self.ingestor, '_write_events', side_effect=DatabaseError('verrou')):
+            self.assertEqual(self.ingestor.flush(), 0)
+        self.assertTrue(self.ingestor.has_pending())
+
+        self.ingest()
+        self.assertEqual(self.ingestor.flush(), 1)
+        self.assertEqual(SecurityEvent.objects.get().occurrence_count, 2)
+
+    def test_retries_are_capped(self):
+        """Le lot est abandonné après `max_retries` échecs"""
+        self.ingest()
+        with mock.patch.object(self.ingestor, '_write_events', side_effect=DatabaseError('verrou')):
+            for _ in range(2):
+                self.ingestor.flush()
+            self.assertTrue(self.ingestor.has_pending())
+            self.ingestor.flush()
+
+        self.assertFalse(self.ingestor.has_pending())
+        self.assertEqual(self.ingestor.flush(), 0)
+        self.assertFalse(SecurityEvent.objects.exists())
+
+    def test_flusher_thread_writes_without_new_events(self):
+        """Le thread vide le tampon sans attendre un nouvel événement"""
+        ingestor = SecurityEventIngestor(flush_interval=0.01)
+        flushed = threading.Event()
+        ingestor.ingest('login_failed', 'Échec', '', '10.0.0.1')
+
+        with mock.patch.object(ingestor, 'flush', side_effect=lambda: flushed.set()):
+            ingestor.start()
+            self.assertTrue(flushed.wait(5))
+            ingestor.stop()
+        self.assertIsNone(ingestor._flusher)
+
+
+@override_settings(MAX_LOGIN_ATTEMPTS=3)
+class UserFailureWriteTestCase(TestCase):
+    """Tests pour l'écriture cumulée des échecs de connexion"""
+
+    def setUp(self):
+        self.user = User.objects.bulk_create([User(email='failures@example.com', phone='+33600000020')])[0]
+        self.ingestor = SecurityEventIngestor(flush_interval=3600)
+
+    def test_failures_are_applied_as_increment(self):
+        """Les échecs cumulés créent le profil si besoin et l'incrémentent"""
+        for _ in range(2):
+            self.ingestor.record_failed_login(self.user)
+        self.ingestor.flush()
+
+        profile = UserSecurity.objects.get(user=self.user)
+        self.assertEqual(profile.failed_login_attempts, 2)
+        self.assertIsNotNone(profile.last_failed_login)
+        self.assertNotEqual(profile.status, UserSecurity.LOCKED)
+
+    def test_profile_is_locked_at_threshold(self):
+        self.ingestor.record_failed_login(self.user)
+        self.ingestor.flush()
+        for _ in range(2):
+            self.ingestor.record_failed_login(self.user)
+        self.ingestor.flush()
+
+        profile = UserSecurity.objects.get(user=self.user)
+        self.assertEqual(profile.failed_login_attempts, 3)
+        self.assertEqual(profile.status, UserSecurity.LOCKED)
+
+    def test_successful_login_discards_pending_failures(self):
+        self.ingestor.record_failed_login(self.user)
+        self.ingestor.discard_failed_logins(self.user)
+        self.ingestor.flush()
+
+        self.assertFalse(UserSecurity.objects.filter(user=self.user, failed_login_attempts__gt=0).exists())
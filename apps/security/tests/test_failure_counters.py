@@ -0,0 +1,203 @@
+"""
+Tests pour les compteurs d'échecs de connexion et l'état de blocage
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+
+from apps.security import signals
+from apps.security.middleware import ip_blocking_middleware
+from apps.security.middleware.ip_blocking_middleware import IPBlockingMiddleware
+from apps.security.models import IPBlock, LoginAttempt
+from apps.security.services import FailureCounterService, SecurityEventIngestor
+from apps.security.services.failure_counters import uses_shared_cache
+from apps.security.services.sliding_window import SlidingWindowCounter
+
+User = get_user_model()
+
+
+class SlidingWindowCounterTestCase(SimpleTestCase):
+    """Tests pour SlidingWindowCounter"""
+
+    def setUp(self):
+        cache.clear()
+        # Fenêtre de 60 s en 6 seaux de 10 s
+        self.counter = SlidingWindowCounter('test', 60, buckets=6)
+
+    def test_events_expire_with_the_window(self):
+        self.assertEqual(self.counter.add('10.0.0.1', now=1000), 1)
+        self.assertEqual(self.counter.add('10.0.0.1', now=1030), 2)
+
+        self.assertEqual(self.counter.count('10.0.0.1', now=1055), 2)
+        self.assertEqual(self.counter.count('10.0.0.1', now=1075), 1)
+        self.assertEqual(self.counter.count('10.0.0.1', now=1100), 0)
+
+    def test_count_over_shorter_period(self):
+        self.counter.add('10.0.0.1', now=1000)
+        self.counter.add('10.0.0.1', now=1045)
+
+        self.assertEqual(self.counter.count('10.0.0.1', now=1049, seconds=10), 1)
+        self.assertEqual(self.counter.count('10.0.0.1', now=1049), 2)
+
+    def test_keys_are_independent_and_resettable(self):
+        self.counter.add('a@example.com', now=1000)
+        self.counter.add('A@example.com', now=1000)
+        self.counter.add('b@example.com', now=1000)
+
+        # Les clés sont insensibles à la casse (emails)
+        self.assertEqual(self.counter.count('a@example.com', now=1000), 2)
+        self.counter.reset('a@example.com', now=1000)
+        self.assertEqual(self.counter.count('a@example.com', now=1000), 0)
+        self.assertEqual(self.counter.count('b@example.com', now=1000), 1)
+
+
+class CacheStoreTestCase(SimpleTestCase):
+    """Choix du stockage des compteurs"""
+
+    def test_local_cache_falls_back_to_database(self):
+        self.assertFalse(uses_shared_cache())
+        self.assertFalse(FailureCounterService().use_cache)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                           'LOCATION': 'redis://localhost:6379/0'}})
+    def test_shared_cache_is_used(self):
+        self.assertTrue(uses_shared_cache())
+
+    @override_settings(SECURITY_FAILURE_COUNTER_STORE='cache')
+    def test_store_can_be_forced(self):
+        self.assertTrue(uses_shared_cache())
+        with override_settings(SECURITY_FAILURE_COUNTER_STORE='database'):
+            self.assertFalse(uses_shared_cache())
+
+
+class CacheFailureCounterTestCase(SimpleTestCase):
+    """Compteurs tenus dans le cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.counters = FailureCounterService(window=900, use_cache=True)
+
+    def test_failures_are_counted_by_ip_email_and_user(self):
+        for _ in range(4):
+            counts = self.counters.record_failure('10.0.0.1', 'ana@example.com', user=7)
+        self.counters.record_failure('10.0.0.1', 'bob@example.com')
+
+        self.assertEqual(counts, {'ip': 4, 'email': 4, 'ip_email': 4, 'user': 4})
+        self.assertEqual(self.counters.get_failed_attempts_count('10.0.0.1'), 5)
+        self.assertEqual(self.counters.get_failed_attempts_count('10.0.0.1', 'ana@example.com'), 4)
+        self.assertEqual(self.counters.get_user_failures(7), 4)
+
+        self.counters.reset_user(7)
+        self.assertEqual(self.counters.get_user_failures(7), 0)
+
+    def test_block_and_lock_marks_expire(self):
+        self.counters.mark_ip_blocked('10.0.0.1', at=0)
+        self.assertFalse(self.counters.is_ip_blocked('10.0.0.1'))
+
+        self.counters.mark_ip_blocked('10.0.0.1')
+        self.counters.mark_user_locked(7)
+        self.assertTrue(self.counters.is_ip_blocked('10.0.0.1'))
+        self.assertFalse(self.counters.is_ip_blocked('10.0.0.2'))
+        self.assertTrue(self.counters.is_user_locked(7))
+
+
+class DatabaseFailureCounterTestCase(TestCase):
+    """Décisions prises en base (cache local au processus)"""
+
+    def setUp(self):
+        self.user = User.objects.bulk_create([User(email='ana@example.com', phone='+33600000030')])[0]
+        self.counters = FailureCounterService(window=900, use_cache=False)
+        # Signaux de LoginAttempt : compteurs en base, événements écrits à la demande
+        for target, value in (
+            ('get_failure_counters', self.counters),
+            ('get_event_ingestor', SecurityEventIngestor(flush_interval=3600)),
+        ):
+            patcher = mock.patch.object(signals, target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def attempt(self, status, ip_address='10.0.0.1', user=None):
+        return LoginAttempt.record_attempt(
+            'ana@example.com', ip_address, 'tests', status, user=user or self.user
+        )
+
+    def test_counts_come_from_login_attempts(self):
+        for _ in range(3):
+            self.attempt(LoginAttempt.FAILED)
+        self.attempt(LoginAttempt.BLOCKED, ip_address='10.0.0.2')
+
+        self.assertEqual(self.counters.get_failed_attempts_count('10.0.0.1'), 3)
+        self.assertEqual(self.counters.get_failed_attempts_count('10.0.0.1', 'ana@example.com'), 3)
+        self.assertEqual(self.counters.get_user_failures(self.user), 4)
+        self.assertEqual(
+            self.counters.record_failure('10.0.0.1', 'ana@example.com', self.user),
+            {'ip': 3, 'email': 4, 'ip_email': 3, 'user': 4}
+        )
+
+        self.assertTrue(self.counters.is_ip_blocked('10.0.0.2'))
+        self.assertFalse(self.counters.is_ip_blocked('10.0.0.1'))
+        self.assertTrue(LoginAttempt.is_ip_blocked('10.0.0.2'))
+
+    def test_record_failure_runs_a_single_query(self):
+        self.attempt(LoginAttempt.FAILED)
+        self.attempt(LoginAttempt.SUCCESS)
+        self.attempt(LoginAttempt.FAILED)
+        self.attempt(LoginAttempt.FAILED, ip_address='10.0.0.2')
+
+        with self.assertNumQueries(1):
+            counts = self.counters.record_failure('10.0.0.1', 'ana@example.com', self.user)
+        self.assertEqual(counts, {'ip': 2, 'email': 3, 'ip_email': 2, 'user': 2})
+
+    def test_successful_login_resets_user_failures(self):
+        self.attempt(LoginAttempt.FAILED)
+        self.attempt(LoginAttempt.SUCCESS)
+        self.attempt(LoginAttempt.FAILED)
+
+        self.assertEqual(self.counters.get_user_failures(self.user), 1)
+
+    def test_locked_user(self):
+        self.assertFalse(self.counters.is_user_locked(self.user))
+        self.attempt(LoginAttempt.LOCKED)
+        self.assertTrue(self.counters.is_user_locked(self.user))
+        self.assertTrue(self.counters.is_user_locked(self.user.pk))
+
+
+class IPBlockingMiddlewareTestCase(TestCase):
+    """Blocage automatique des IP par le middleware"""
+
+    def setUp(self):
+        cache.clear()
+        self.counters = FailureCounterService(use_cache=True)
+        patcher = mock.patch.object(ip_blocking_middleware, 'get_failure_counters', return_value=self.counters)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+        self.middleware = IPBlockingMiddleware(lambda request: HttpResponse())
+
+    def request(self, ip_address='10.0.0.1'):
+        return self.factory.post('/api/auth/login/', REMOTE_ADDR=ip_address)
+
+    def test_ip_is_blocked_after_repeated_failures(self):
+        for _ in range(4):
+            self.counters.record_failure('10.0.0.1')
+        self.middleware.process_response(self.request(), HttpResponse(status=401))
+        self.assertFalse(IPBlock.objects.exists())
+        self.assertIsNone(self.middleware.process_request(self.request()))
+
+        self.counters.record_failure('10.0.0.1')
+        self.middleware.process_response(self.request(), HttpResponse(status=401))
+
+        self.assertEqual(IPBlock.objects.get().ip_address, '10.0.0.1')
+        response = self.middleware.process_request(self.request())
+        self.assertEqual(response.status_code, 403)
+        self.assertIsNone(self.middleware.process_request(self.request('10.0.0.2')))
+
+    def test_successful_responses_do_not_block(self):
+        for _ in range(10):
+            self.counters.record_failure('10.0.0.1')
+        self.middleware.process_response(self.request(), HttpResponse(status=200))
+
+        self.assertFalse(IPBlock.objects.exists())
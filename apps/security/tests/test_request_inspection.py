@@ -0,0 +1,144 @@
+"""
+Tests pour l'inspection des requêtes entrantes
+"""
+import json
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+
+from apps.security.middleware import security_middleware
+from apps.security.middleware.security_middleware import SecurityMiddleware
+from apps.security.models import SecurityEvent
+from apps.security.services import RequestInspector, SecurityEventIngestor
+
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64)'
+
+
+class RequestInspectorTestCase(SimpleTestCase):
+    """Tests pour RequestInspector"""
+
+    def setUp(self):
+        self.inspector = RequestInspector(max_body_bytes=1024)
+        self.factory = RequestFactory(HTTP_USER_AGENT=USER_AGENT)
+
+    def categories(self, request):
+        return [(match['category'], match['location']) for match in self.inspector.inspect(request)['matches']]
+
+    def test_scan_detects_each_category(self):
+        for value, category, signature in (
+            ("1 UNION SELECT password", 'sql_injection', 'union'),
+            ('<SCRIPT>alert(1)</script>', 'xss', '<script>'),
+            ('<img onerror=alert(1)>', 'xss', 'onerror='),
+            ('javascript:alert(1)', 'xss', 'javascript:'),
+            ('../../etc/passwd', 'path_traversal', '../'),
+            ('..\\windows', 'path_traversal', '..\\'),
+            ('%2E%2E%2Fetc', 'path_traversal', '%2e%2e%2f'),
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(self.inspector.scan(value).get(category), signature)
+        self.assertEqual(self.inspector.scan('bonjour'), {})
+
+    def test_scan_reports_each_category_once(self):
+        found = self.inspector.scan('select ../ <script> drop ../')
+        self.assertEqual(found, {'sql_injection': 'select', 'path_traversal': '../', 'xss': '<script>'})
+
+    def test_scan_stream_detects_signatures_across_chunks(self):
+        chunks = [b'x' * 10 + b'<scr', b'ipt>' + b'y' * 10]
+        self.assertEqual(self.inspector.scan_stream(chunks), {'xss': '<script>'})
+        # Caractère multi-octets coupé entre deux blocs
+        self.assertEqual(self.inspector.scan_stream(['é../'.encode()[:1], 'é../'.encode()[1:]]),
+                         {'path_traversal': '../'})
+
+    def test_query_parameters_are_scored(self):
+        request = self.factory.get('/', {'q': "1 union select", 'file': '../x'})
+        self.assertEqual(self.categories(request), [('sql_injection', 'q'), ('path_traversal', 'file')])
+
+        result = self.inspector.inspect(request)
+        self.assertEqual(result['risk_score'], 50)
+        self.assertFalse(result['is_suspicious'])
+        self.assertIn('Possible injection SQL dans q', result['indicators'])
+
+    def test_user_agent_is_scored(self):
+        missing = self.inspector.inspect(RequestFactory().get('/'))
+        self.assertEqual(missing['indicators'], ['User-Agent manquant'])
+        self.assertEqual(missing['risk_score'], 20)
+
+        short = self.inspector.inspect(RequestFactory(HTTP_USER_AGENT='curl').get('/'))
+        self.assertEqual(short['risk_score'], 10)
+
+        # Sans User-Agent, deux catégories suffisent à dépasser le seuil
+        result = self.inspector.inspect(RequestFactory().get('/', {'q': '<script>', 'f': '../'}))
+        self.assertTrue(result['is_suspicious'])
+
+    def test_urlencoded_body_is_read_by_field(self):
+        request = self.factory.post('/', 'name=ana&comment=%3Cscript%3E',
+                                    content_type='application/x-www-form-urlencoded')
+        self.assertEqual(self.categories(request), [('xss', 'comment')])
+        # Le corps lu reste disponible pour la vue
+        self.assertEqual(request.POST['comment'], '<script>')
+
+    def test_json_body_is_streamed(self):
+        request = self.factory.post('/', json.dumps({'path': '../../etc/passwd'}),
+                                    content_type='application/json')
+        self.assertEqual(self.categories(request), [('path_traversal', 'le corps de la requête')])
+
+    def test_only_the_body_prefix_is_inspected(self):
+        body = json.dumps({'padding': 'x' * 2000, 'path': '../../etc/passwd'})
+        request = self.factory.post('/', body, content_type='application/json')
+        self.assertEqual(self.categories(request), [])
+
+        inspector = RequestInspector(max_body_bytes=4096)
+        self.assertEqual(len(inspector.inspect(request)['matches']), 1)
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_body_over_the_upload_limit_is_not_read(self):
+        request = self.factory.post('/', json.dumps({'path': '../', 'padding': 'x' * 200}),
+                                    content_type='application/json')
+        self.assertEqual(self.categories(request), [])
+        self.assertNotIn('_body', request.__dict__)
+
+    def test_multipart_body_is_inspected_only_once_parsed(self):
+        request = self.factory.post('/', {'comment': '<script>'})
+        self.assertEqual(self.categories(request), [])
+        self.assertNotIn('_body', request.__dict__)
+
+        request.POST  # parsé par la vue
+        self.assertEqual(self.categories(request), [('xss', 'comment')])
+
+
+class SecurityMiddlewareInspectionTestCase(TestCase):
+    """Événements de sécurité des requêtes suspectes"""
+
+    def setUp(self):
+        self.ingestor = SecurityEventIngestor(flush_interval=3600)
+        patcher = mock.patch.object(security_middleware, 'get_event_ingestor', return_value=self.ingestor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.middleware = SecurityMiddleware(lambda request: HttpResponse())
+
+    @override_settings(SECURITY_REQUEST_INSPECTION_ENABLED=True)
+    def test_suspicious_request_is_ingested(self):
+        request = RequestFactory().get('/api/', {'q': '<script>', 'f': '../'}, REMOTE_ADDR='10.0.0.1')
+
+        self.assertIsNone(self.middleware.process_request(request))
+        self.assertTrue(request.security_inspection['is_suspicious'])
+        self.middleware.process_response(request, HttpResponse())
+
+        # Aucune écriture synchrone : l'événement attend le lot suivant
+        self.assertFalse(SecurityEvent.objects.exists())
+        self.assertTrue(self.ingestor.has_pending())
+        self.ingestor.flush()
+
+        event = SecurityEvent.objects.get()
+        self.assertEqual(event.event_type, SecurityEvent.SUSPICIOUS_ACTIVITY)
+        self.assertEqual(event.ip_address, '10.0.0.1')
+        self.assertEqual(event.metadata['path'], '/api/')
+
+    def test_inspection_is_disabled_by_default(self):
+        request = RequestFactory().get('/api/', {'q': '<script>', 'f': '../'}, REMOTE_ADDR='10.0.0.1')
+        self.middleware.process_request(request)
+        self.middleware.process_response(request, HttpResponse())
+
+        self.assertFalse(hasattr(request, 'security_inspection'))
+        self.assertFalse(self.ingestor.has_pending())
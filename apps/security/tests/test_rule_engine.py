@@ -0,0 +1,281 @@
+"""
+Tests pour le moteur compilé des règles de sécurité
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory
+
+from core.utils.write_coalescer import WriteCoalescer
+from apps.security import signals
+from apps.security.middleware.security_middleware import SecurityMiddleware
+from apps.security.models import IPBlock, LoginAttempt, SecurityEvent, SecurityRule
+from apps.security.services import FailureCounterService, SecurityEventIngestor
+from apps.security.services import rule_engine
+from apps.security.services.rule_engine import SecurityRuleEngine, bump_rules_version, compile_conditions
+
+
+class CompileConditionsTestCase(SimpleTestCase):
+    """Tests des opérateurs de condition"""
+
+    def check(self, conditions, context):
+        return compile_conditions(conditions)(context)
+
+    def test_equality(self):
+        self.assertTrue(self.check({'country': 'FR'}, {'country': 'FR'}))
+        self.assertFalse(self.check({'country': 'FR'}, {'country': 'DE'}))
+
+    def test_comparators(self):
+        context = {'failed_attempts': 5}
+        for name, expected, result in (
+            ('eq', 5, True), ('eq', 4, False),
+            ('neq', 4, True), ('neq', 5, False),
+            ('gt', 4, True), ('gt', 5, False),
+            ('gte', 5, True), ('gte', 6, False),
+            ('lt', 6, True), ('lt', 5, False),
+            ('lte', 5, True), ('lte', 4, False),
+        ):
+            with self.subTest(operator=name, expected=expected):
+                self.assertIs(self.check({'failed_attempts': {name: expected}}, context), result)
+
+    def test_bounds_are_combined(self):
+        conditions = {'failed_attempts': {'gte': 5, 'lt': 20}}
+        self.assertFalse(self.check(conditions, {'failed_attempts': 4}))
+        self.assertTrue(self.check(conditions, {'failed_attempts': 5}))
+        self.assertFalse(self.check(conditions, {'failed_attempts': 20}))
+
+    def test_incomparable_values_do_not_match(self):
+        self.assertFalse(self.check({'failed_attempts': {'gte': 5}}, {'failed_attempts': None}))
+
+    def test_membership(self):
+        self.assertTrue(self.check({'country': {'in': ['RU', 'KP']}}, {'country': 'RU'}))
+        self.assertFalse(self.check({'country': {'in': ['RU', 'KP']}}, {'country': 'FR'}))
+        self.assertTrue(self.check({'country': {'not_in': ['RU', 'KP']}}, {'country': 'FR'}))
+        self.assertFalse(self.check({'country': {'not_in': ['RU', 'KP']}}, {'country': 'KP'}))
+        # Valeur seule et valeur non hachable
+        self.assertTrue(self.check({'country': {'in': 'FR'}}, {'country': 'FR'}))
+        self.assertFalse(self.check({'country': {'in': ['FR']}}, {'country': ['FR']}))
+
+    def test_regex(self):
+        conditions = {'path': {'regex': '^/admin/'}}
+        self.assertTrue(self.check(conditions, {'path': '/admin/users/'}))
+        self.assertFalse(self.check(conditions, {'path': '/api/admin/'}))
+        self.assertFalse(self.check(conditions, {'path': None}))
+
+    def test_cidr(self):
+        conditions = {'ip_address': {'cidr': ['10.0.0.0/8', '192.168.1.0/24']}}
+        self.assertTrue(self.check(conditions, {'ip_address': '10.1.2.3'}))
+        self.assertTrue(self.check(conditions, {'ip_address': '192.168.1.20'}))
+        self.assertFalse(self.check(conditions, {'ip_address': '192.168.2.20'}))
+        self.assertFalse(self.check(conditions, {'ip_address': 'inconnue'}))
+
+        self.assertTrue(self.check({'ip_address': {'not_cidr': '10.0.0.0/8'}}, {'ip_address': '8.8.8.8'}))
+        self.assertFalse(self.check({'ip_address': {'not_cidr': '10.0.0.0/8'}}, {'ip_address': '10.0.0.1'}))
+
+    def test_all_conditions_are_required(self):
+        conditions = {'country': 'FR', 'failed_attempts': {'gte': 5}}
+        self.assertTrue(self.check(conditions, {'country': 'FR', 'failed_attempts': 5}))
+        self.assertFalse(self.check(conditions, {'country': 'FR', 'failed_attempts': 1}))
+        self.assertFalse(self.check(conditions, {'country': 'FR'}))
+
+    def test_invalid_conditions(self):
+        with self.assertRaises(ValueError):
+            compile_conditions({'country': {'like': 'F%'}})
+        with self.assertRaises(ValueError):
+            compile_conditions({'path': {'regex': '('}})
+        with self.assertRaises(ValueError):
+            compile_conditions({'ip_address': {'cidr': 'pas un réseau'}})
+
+
+class RuleEngineTestBase(TestCase):
+    """Moteur neuf, cache vidé et écritures différées des déclenchements en mémoire"""
+
+    def setUp(self):
+        cache.clear()
+        self.engine = SecurityRuleEngine()
+        self.coalescer = WriteCoalescer(flush_interval=3600)
+        for patcher in (
+            mock.patch.object(rule_engine, '_engine', self.engine),
+            mock.patch('core.utils.write_coalescer.get_write_coalescer', return_value=self.coalescer),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def rule(self, name, conditions, rule_type=SecurityRule.IP_BLOCKING, actions=None, **kwargs):
+        return SecurityRule.objects.create(
+            name=name,
+            description=name,
+            rule_type=rule_type,
+            conditions=conditions,
+            actions=actions if actions is not None else [{'type': 'log_event'}],
+            **kwargs
+        )
+
+
+class SecurityRuleEngineTestCase(RuleEngineTestBase):
+    """Tests pour SecurityRuleEngine"""
+
+    def names(self, context, rule_type=None):
+        return [rule.name for rule in self.engine.match(context, rule_type)]
+
+    def test_rules_are_matched_by_priority(self):
+        self.rule('basse', {'country': 'FR'}, priority=1)
+        self.rule('haute', {'country': {'in': ['FR', 'DE']}}, priority=10)
+        self.rule('autre pays', {'country': 'DE'}, priority=5)
+        self.rule('inactive', {'country': 'FR'}, status=SecurityRule.INACTIVE)
+
+        self.assertEqual(self.names({'country': 'FR'}), ['haute', 'basse'])
+
+    def test_rules_are_filtered_by_type_and_context_keys(self):
+        self.rule('connexion', {'failed_attempts': {'gte': 5}}, rule_type=SecurityRule.LOGIN_ATTEMPTS)
+        self.rule('géographique', {'country': 'RU'}, rule_type=SecurityRule.GEOGRAPHIC)
+
+        context = {'failed_attempts': 5, 'country': 'RU'}
+        self.assertEqual(sorted(self.names(context)), ['connexion', 'géographique'])
+        self.assertEqual(self.names(context, SecurityRule.LOGIN_ATTEMPTS), ['connexion'])
+        self.assertEqual(self.names(context, SecurityRule.REQUEST_RULE_TYPES), ['géographique'])
+        # Les règles dont une clé manque au contexte ne sont pas évaluées
+        self.assertEqual(self.names({'path': '/'}), [])
+
+    def test_unconditional_rule_is_skipped(self):
+        with self.assertLogs(rule_engine.logger, 'WARNING'):
+            self.rule('toujours', {})
+            self.assertEqual(self.names({'ip_address': '8.8.8.8'}), [])
+
+    def test_invalid_rule_is_skipped(self):
+        self.rule('invalide', {'path': {'regex': '('}})
+        self.rule('valide', {'path': {'regex': '^/'}})
+
+        with self.assertLogs(rule_engine.logger, 'ERROR'):
+            self.assertEqual(self.names({'path': '/'}), ['valide'])
+
+    def test_evaluate_counts_triggers(self):
+        rule = self.rule('connexion', {'failed_attempts': {'gte': 5}})
+
+        self.assertEqual(self.engine.evaluate({'failed_attempts': 1}), [])
+        triggered = self.engine.evaluate({'failed_attempts': 5})
+        self.assertEqual([entry['rule'].pk for entry in triggered], [rule.pk])
+        self.assertEqual(triggered[0]['actions_results'], [{'action': 'log_event', 'result': 'Logged'}])
+        self.assertEqual(self.coalescer.pending_delta(rule, 'times_triggered'), 1)
+
+    def test_rule_changes_bump_the_version(self):
+        rule = self.rule('pays', {'country': 'FR'})
+        self.assertEqual(self.names({'country': 'FR'}), ['pays'])
+        version = cache.get(rule_engine.RULES_VERSION_CACHE_KEY)
+
+        rule.conditions = {'country': 'DE'}
+        rule.save()
+        self.assertNotEqual(cache.get(rule_engine.RULES_VERSION_CACHE_KEY), version)
+
+        # L'index compilé reste utilisé jusqu'à la vérification suivante de la version
+        self.assertEqual(self.names({'country': 'FR'}), ['pays'])
+        self.engine.last_version_check = 0
+        self.assertEqual(self.names({'country': 'FR'}), [])
+        self.assertEqual(self.names({'country': 'DE'}), ['pays'])
+
+        rule.delete()
+        self.engine.last_version_check = 0
+        self.assertEqual(self.names({'country': 'DE'}), [])
+
+    def test_trigger_counters_do_not_bump_the_version(self):
+        rule = self.rule('pays', {'country': 'FR'})
+        version = cache.get(rule_engine.RULES_VERSION_CACHE_KEY)
+        rule.save(update_fields=['times_triggered', 'last_triggered'])
+        self.assertEqual(cache.get(rule_engine.RULES_VERSION_CACHE_KEY), version)
+
+    def test_bump_rules_version_recompiles(self):
+        self.rule('pays', {'country': 'FR'})
+        self.assertEqual(self.names({'country': 'FR'}), ['pays'])
+
+        # Modification sans signal (update) : seule la version partagée la propage
+        SecurityRule.objects.update(status=SecurityRule.INACTIVE)
+        self.engine.last_version_check = 0
+        self.assertEqual(self.names({'country': 'FR'}), ['pays'])
+
+        bump_rules_version()
+        self.engine.last_version_check = 0
+        self.assertEqual(self.names({'country': 'FR'}), [])
+
+
+class SecurityRuleEvaluationTestCase(RuleEngineTestBase):
+    """Évaluation des règles sur les requêtes et les échecs de connexion"""
+
+    def setUp(self):
+        super().setUp()
+        for target, value in (
+            ('get_failure_counters', FailureCounterService(use_cache=True)),
+            ('get_event_ingestor', SecurityEventIngestor(flush_interval=3600)),
+        ):
+            patcher = mock.patch.object(signals, target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+        self.middleware = SecurityMiddleware(lambda request: HttpResponse())
+
+    def test_failed_logins_trigger_rules(self):
+        rule = self.rule(
+            'bourrage',
+            {'event': 'login_failed', 'failed_attempts': {'gte': 3}},
+            rule_type=SecurityRule.LOGIN_ATTEMPTS,
+            actions=[{'type': 'block_ip', 'params': {'reason': 'Bourrage'}}],
+        )
+
+        for _ in range(2):
+            LoginAttempt.record_attempt('ana@example.com', '10.0.0.1', 'tests', LoginAttempt.FAILED)
+        self.assertFalse(IPBlock.objects.exists())
+
+        LoginAttempt.record_attempt('ana@example.com', '10.0.0.1', 'tests', LoginAttempt.FAILED)
+        self.assertEqual(IPBlock.objects.get().ip_address, '10.0.0.1')
+        self.assertEqual(self.coalescer.pending_delta(rule, 'times_triggered'), 1)
+
+    def test_requests_trigger_rules(self):
+        self.rule(
+            'administration',
+            {'event': 'request', 'path': {'regex': '^/admin/'}, 'ip_address': {'not_cidr': '10.0.0.0/8'}},
+            actions=[{'type': 'block_ip', 'params': {'reason': 'Administration'}}],
+        )
+
+        self.assertIsNone(self.middleware.process_request(self.factory.get('/admin/', REMOTE_ADDR='10.0.0.1')))
+        self.assertIsNone(self.middleware.process_request(self.factory.get('/api/', REMOTE_ADDR='8.8.8.8')))
+        self.assertFalse(IPBlock.objects.exists())
+
+        response = self.middleware.process_request(self.factory.get('/admin/', REMOTE_ADDR='8.8.8.8'))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(IPBlock.objects.get().ip_address, '8.8.8.8')
+
+    def test_unconditional_block_rule_does_not_lock_out_all_traffic(self):
+        self.rule('tout bloquer', {}, actions=[{'type': 'block_ip'}])
+
+        with self.assertLogs(rule_engine.logger, 'WARNING'):
+            self.assertIsNone(self.middleware.process_request(self.factory.get('/', REMOTE_ADDR='8.8.8.8')))
+        self.assertIsNone(self.middleware.process_request(self.factory.get('/', REMOTE_ADDR='8.8.4.4')))
+        self.assertFalse(IPBlock.objects.exists())
+
+    def test_login_attempt_rules_ignore_requests(self):
+        self.rule('connexion', {'ip_address': '8.8.8.8'}, rule_type=SecurityRule.LOGIN_ATTEMPTS,
+                  actions=[{'type': 'block_ip'}])
+
+        self.assertIsNone(self.middleware.process_request(self.factory.get('/', REMOTE_ADDR='8.8.8.8')))
+        self.assertFalse(IPBlock.objects.exists())
+
+    def test_alerts_are_ingested(self):
+        ingestor = SecurityEventIngestor(flush_interval=3600)
+        self.rule('administration', {'path': {'regex': '^/admin/'}},
+                  actions=[{'type': 'send_alert', 'params': {'title': 'Administration'}}])
+
+        with mock.patch('apps.security.services.event_ingestion.get_event_ingestor', return_value=ingestor):
+            for _ in range(3):
+                self.middleware.process_request(self.factory.get('/admin/', REMOTE_ADDR='8.8.8.8'))
+
+        # Une seule ligne agrégée, écrite au prochain lot
+        self.assertFalse(SecurityEvent.objects.exists())
+        ingestor.flush()
+        event = SecurityEvent.objects.get()
+        self.assertEqual((event.title, event.occurrence_count), ('Administration', 3))
+
+    def test_login_rules_ignore_requests(self):
+        self.rule('échecs', {'event': 'login_failed'}, actions=[{'type': 'block_ip'}])
+
+        self.assertIsNone(self.middleware.process_request(self.factory.get('/', REMOTE_ADDR='8.8.8.8')))
+        self.assertFalse(IPBlock.objects.exists())
@@ -8,8 +8,6 @@ from .security_utils import (
     generate_security_token,
     validate_security_token,
 )
-from .rate_limiter import RateLimiter
-from .threat_detector import ThreatDetector
 
 __all__ = [
     'get_client_ip',
@@ -17,8 +15,6 @@ __all__ = [
     'is_suspicious_request',
     'generate_security_token',
     'validate_security_token',
-    'RateLimiter',
-    'ThreatDetector',
 ]
 
 
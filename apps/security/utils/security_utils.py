@@ -70,62 +70,12 @@ def get_geolocation(ip_address: str) -> dict:
 def is_suspicious_request(request: HttpRequest) -> dict:
     """
     Détecte les requêtes suspectes
+
+    Voir `RequestInspector` : signatures compilées, une passe par valeur.
     """
-    suspicious_indicators = []
-    risk_score = 0
-    
-    # Vérifier les headers suspects
-    user_agent = request.META.get('HTTP_USER_AGENT', '')
-    if not user_agent:
-        suspicious_indicators.append('User-Agent manquant')
-        risk_score += 20
-    elif len(user_agent) < 10:
-        suspicious_indicators.append('User-Agent suspect')
-        risk_score += 10
-    
-    # Vérifier les tentatives de SQL injection
-    query_params = request.GET.dict()
-    post_data = request.POST.dict() if hasattr(request, 'POST') else {}
-    
-    sql_keywords = ['union', 'select', 'drop', 'delete', 'insert', 'update', 'alter', 'create']
-    for key, value in {**query_params, **post_data}.items():
-        value_lower = str(value).lower()
-        if any(keyword in value_lower for keyword in sql_keywords):
-            suspicious_indicators.append(f'Possible injection SQL dans {key}')
-            risk_score += 30
-    
-    # Vérifier les tentatives de XSS
-    xss_patterns = ['<script>', '<iframe>', 'javascript:', 'onload=', 'onerror=']
-    for key, value in {**query_params, **post_data}.items():
-        value_lower = str(value).lower()
-        if any(pattern in value_lower for pattern in xss_patterns):
-            suspicious_indicators.append(f'Possible XSS dans {key}')
-            risk_score += 25
-    
-    # Vérifier les tentatives de path traversal
-    path_traversal_patterns = ['../', '..\\', '%2e%2e%2f', '%2e%2e%5c']
-    for key, value in {**query_params, **post_data}.items():
-        value_lower = str(value).lower()
-        if any(pattern in value_lower for pattern in path_traversal_patterns):
-            suspicious_indicators.append(f'Possible path traversal dans {key}')
-            risk_score += 20
-    
-    # Vérifier les requêtes avec des paramètres suspects
-    if len(query_params) > 50:  # Trop de paramètres
-        suspicious_indicators.append('Trop de paramètres de requête')
-        risk_score += 15
-    
-    # Vérifier la taille de la requête
-    content_length = request.META.get('CONTENT_LENGTH', 0)
-    if content_length and int(content_length) > 10 * 1024 * 1024:  # 10MB
-        suspicious_indicators.append('Requête trop volumineuse')
-        risk_score += 10
-    
-    return {
-        'is_suspicious': risk_score > 50,
-        'risk_score': risk_score,
-        'indicators': suspicious_indicators
-    }
+    from ..services.request_inspection import get_request_inspector
+
+    return get_request_inspector().inspect(request)
 
 
 def generate_security_token(length: int = 32) -> str:
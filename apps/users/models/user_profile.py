@@ -367,44 +367,12 @@ class UserActivity(models.Model):
     @staticmethod
     def _extract_device_info(request):
         """Extrait les informations du device depuis la requête"""
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        
-        # Analyse basique du User Agent
-        device_info = {
-            'user_agent': user_agent,
-            'browser': 'Unknown',
-            'os': 'Unknown',
-            'device_type': 'Unknown'
-        }
-        
-        # Détection basique du navigateur
-        if 'Chrome' in user_agent:
-            device_info['browser'] = 'Chrome'
-        elif 'Firefox' in user_agent:
-            device_info['browser'] = 'Firefox'
-        elif 'Safari' in user_agent:
-            device_info['browser'] = 'Safari'
-        elif 'Edge' in user_agent:
-            device_info['browser'] = 'Edge'
+        from core.utils.user_agent import parse_user_agent
         
-        # Détection basique de l'OS
-        if 'Windows' in user_agent:
-            device_info['os'] = 'Windows'
-        elif 'Mac' in user_agent:
-            device_info['os'] = 'macOS'
-        elif 'Linux' in user_agent:
-            device_info['os'] = 'Linux'
-        elif 'Android' in user_agent:
-            device_info['os'] = 'Android'
-        elif 'iOS' in user_agent:
-            device_info['os'] = 'iOS'
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
         
-        # Détection du type de device
-        if 'Mobile' in user_agent or 'Android' in user_agent or 'iPhone' in user_agent:
-            device_info['device_type'] = 'Mobile'
-        elif 'Tablet' in user_agent or 'iPad' in user_agent:
-            device_info['device_type'] = 'Tablet'
-        else:
-            device_info['device_type'] = 'Desktop'
+        # Analyse du User Agent (mise en cache par chaîne)
+        device_info = {'user_agent': user_agent}
+        device_info.update(parse_user_agent(user_agent).as_dict())
         
         return device_info
@@ -3,33 +3,32 @@ Signaux pour l'application users
 """
 
 from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
-from .models import UserProfile, UserPreference
+from core.utils.bulk_signals import batched_receiver
+from .models import UserActivity, UserProfile, UserPreference
 
 User = get_user_model()
 
 
-@receiver(post_save, sender=User)
-def create_user_profile_and_preferences(sender, instance, created, **kwargs):
+@batched_receiver(post_save, sender=User, created_only=True)
+def create_user_profile_and_preferences(sender, events):
     """
-    Crée automatiquement un profil et des préférences pour un nouvel utilisateur
+    Crée automatiquement un profil et des préférences pour les nouveaux utilisateurs
     """
-    if created:
-        # Créer le profil utilisateur
-        UserProfile.objects.get_or_create(user=instance)
-        
-        # Créer les préférences utilisateur
-        UserPreference.objects.get_or_create(user=instance)
-        
-        # Enregistrer l'activité
-        from .models import UserActivity
-        UserActivity.log_activity(
-            user=instance,
-            activity_type='account_created',
-            description='Compte créé'
-        )
+    users = [event.instance for event in events]
+    
+    # Créer les profils utilisateur
+    UserProfile.objects.bulk_create([UserProfile(user=user) for user in users], ignore_conflicts=True)
+    
+    # Créer les préférences utilisateur
+    UserPreference.objects.bulk_create([UserPreference(user=user) for user in users], ignore_conflicts=True)
+    
+    # Enregistrer l'activité
+    UserActivity.objects.bulk_create([
+        UserActivity(user=user, activity_type='account_created', description='Compte créé')
+        for user in users
+    ])
 
 
 
@@ -3,6 +3,10 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Les requêtes HTTP (y compris les flux SSE de /api/monitoring/live/) sont
+servies par Django ; les connexions WebSocket sur /ws/live/ sont servies par le
+hub de diffusion en direct du Monitoring App.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +17,25 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.apps import apps  # noqa: E402  (après l'initialisation de Django)
+
+if apps.is_installed('apps.monitoring'):
+    from apps.monitoring.live.websocket import LiveWebSocketApp
+    websocket_application = LiveWebSocketApp()
+else:
+    websocket_application = None
+
+
+async def application(scope, receive, send):
+    """Route les connexions HTTP vers Django et les WebSockets vers le hub"""
+    if scope['type'] == 'websocket':
+        if websocket_application is None:
+            await receive()
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        await websocket_application(scope, receive, send)
+        return
+
+    await django_application(scope, receive, send)
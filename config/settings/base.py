@@ -30,6 +30,7 @@ DJANGO_APPS = [
 THIRD_PARTY_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_otp',
     'django_otp.plugins.otp_totp',
@@ -129,7 +130,7 @@ AUTH_USER_MODEL = 'authentication.User'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -174,6 +175,24 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Index des jetons révoqués (filtre de Bloom devant les tables de blacklist)
+JWT_REVOCATION_FILTER_CAPACITY = config('JWT_REVOCATION_FILTER_CAPACITY', default=100000, cast=int)
+JWT_REVOCATION_FILTER_ERROR_RATE = config('JWT_REVOCATION_FILTER_ERROR_RATE', default=0.001, cast=float)
+JWT_REVOCATION_REFRESH_INTERVAL = config('JWT_REVOCATION_REFRESH_INTERVAL', default=5, cast=float)  # secondes
+JWT_REVOCATION_REBUILD_INTERVAL = config('JWT_REVOCATION_REBUILD_INTERVAL', default=86400, cast=int)  # secondes
+
+# Instantanés des utilisateurs authentifiés par JWT
+USER_SNAPSHOT_LOCAL_TTL = config('USER_SNAPSHOT_LOCAL_TTL', default=5, cast=float)  # secondes (processus)
+USER_SNAPSHOT_CACHE_TTL = config('USER_SNAPSHOT_CACHE_TTL', default=300, cast=int)  # secondes (cache partagé uniquement)
+
+# Import en masse d'utilisateurs
+USER_IMPORT_CHUNK_SIZE = config('USER_IMPORT_CHUNK_SIZE', default=1000, cast=int)  # utilisateurs par lot
+USER_IMPORT_HASH_WORKERS = config('USER_IMPORT_HASH_WORKERS', default=0, cast=int)  # 0 = un processus par cœur, < 0 = aucun
+USER_IMPORT_JOB_WORKERS = config('USER_IMPORT_JOB_WORKERS', default=1, cast=int)  # imports simultanés (API d'administration)
+
+# Analyse des User-Agent
+USER_AGENT_CACHE_SIZE = config('USER_AGENT_CACHE_SIZE', default=1024, cast=int)  # User-Agent analysés conservés (LRU)
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.sendgrid.net'
@@ -182,6 +201,47 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = 'apikey'
 EMAIL_HOST_PASSWORD = config('SENDGRID_API_KEY', default='')
 DEFAULT_FROM_EMAIL = config('FROM_EMAIL', default='noreply@localhost')
+EMAIL_SMTP_POOL_SIZE = config('EMAIL_SMTP_POOL_SIZE', default=4, cast=int)  # connexions SMTP réutilisées
+EMAIL_SMTP_BATCH_SIZE = config('EMAIL_SMTP_BATCH_SIZE', default=100, cast=int)  # messages par connexion et par lot
+
+# Notifications en masse (pools de threads d'envoi par canal)
+NOTIFICATION_FANOUT_CHUNK_SIZE = config('NOTIFICATION_FANOUT_CHUNK_SIZE', default=1000, cast=int)
+NOTIFICATION_FANOUT_JOB_WORKERS = config('NOTIFICATION_FANOUT_JOB_WORKERS', default=2, cast=int)
+NOTIFICATION_FANOUT_EMAIL_WORKERS = config('NOTIFICATION_FANOUT_EMAIL_WORKERS', default=8, cast=int)
+NOTIFICATION_FANOUT_SMS_WORKERS = config('NOTIFICATION_FANOUT_SMS_WORKERS', default=4, cast=int)
+NOTIFICATION_FANOUT_PUSH_WORKERS = config('NOTIFICATION_FANOUT_PUSH_WORKERS', default=8, cast=int)
+
+# Outbox des notifications ('inline' : envoi dans la requête, 'outbox' : envoi par `manage.py run_notification_worker`,
+# à activer uniquement avec au moins un worker démarré, sinon rien n'est envoyé, codes 2FA compris)
+NOTIFICATION_DELIVERY_MODE = config('NOTIFICATION_DELIVERY_MODE', default='inline')
+NOTIFICATION_OUTBOX_BATCH_SIZE = config('NOTIFICATION_OUTBOX_BATCH_SIZE', default=100, cast=int)
+NOTIFICATION_OUTBOX_POLL_INTERVAL = config('NOTIFICATION_OUTBOX_POLL_INTERVAL', default=1, cast=float)  # secondes
+NOTIFICATION_OUTBOX_IDLE_INTERVAL = config('NOTIFICATION_OUTBOX_IDLE_INTERVAL', default=15, cast=float)  # secondes
+NOTIFICATION_OUTBOX_LOCK_TIMEOUT = config('NOTIFICATION_OUTBOX_LOCK_TIMEOUT', default=600, cast=int)  # secondes
+NOTIFICATION_OUTBOX_BACKOFF_BASE = config('NOTIFICATION_OUTBOX_BACKOFF_BASE', default=30, cast=int)  # secondes
+NOTIFICATION_OUTBOX_BACKOFF_MAX = config('NOTIFICATION_OUTBOX_BACKOFF_MAX', default=3600, cast=int)  # secondes
+NOTIFICATION_OUTBOX_EMAIL_CONCURRENCY = config('NOTIFICATION_OUTBOX_EMAIL_CONCURRENCY', default=8, cast=int)
+NOTIFICATION_OUTBOX_SMS_CONCURRENCY = config('NOTIFICATION_OUTBOX_SMS_CONCURRENCY', default=4, cast=int)
+NOTIFICATION_OUTBOX_PUSH_CONCURRENCY = config('NOTIFICATION_OUTBOX_PUSH_CONCURRENCY', default=8, cast=int)
+
+# Résumés de notifications (regroupement par utilisateur, canal et catégorie)
+NOTIFICATION_DIGEST_ENABLED = config('NOTIFICATION_DIGEST_ENABLED', default=True, cast=bool)
+NOTIFICATION_DIGEST_WINDOW = config('NOTIFICATION_DIGEST_WINDOW', default=300, cast=int)  # secondes
+NOTIFICATION_DIGEST_WINDOWS = {}  # fenêtre par catégorie, ex. {'security': 120}
+NOTIFICATION_DIGEST_MAX_ITEMS = config('NOTIFICATION_DIGEST_MAX_ITEMS', default=50, cast=int)
+NOTIFICATION_DIGEST_BYPASS_PRIORITIES = ['urgent']
+
+# Compteurs de la boîte de réception des notifications (cache, en secondes)
+NOTIFICATION_INBOX_CACHE_TTL = config('NOTIFICATION_INBOX_CACHE_TTL', default=300, cast=int)
+
+# Cache des templates de notifications (lignes en base, en secondes)
+NOTIFICATION_TEMPLATE_CACHE_TTL = config('NOTIFICATION_TEMPLATE_CACHE_TTL', default=300, cast=int)
+NOTIFICATION_TEMPLATE_CACHE_SYNC_INTERVAL = config('NOTIFICATION_TEMPLATE_CACHE_SYNC_INTERVAL', default=1, cast=float)
+
+# Notifications push (FCM)
+FCM_MULTICAST_LIMIT = config('FCM_MULTICAST_LIMIT', default=500, cast=int)  # tokens par requête
+PUSH_MAX_CONCURRENCY = config('PUSH_MAX_CONCURRENCY', default=8, cast=int)
+PUSH_MAX_REQUESTS_PER_SECOND = config('PUSH_MAX_REQUESTS_PER_SECOND', default=50, cast=int)
 
 # Site Configuration
 SITE_NAME = config('SITE_NAME', default='Django 2FA Auth API')
@@ -216,6 +276,64 @@ RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
 MAX_LOGIN_ATTEMPTS = config('MAX_LOGIN_ATTEMPTS', default=5, cast=int)
 LOCKOUT_DURATION = config('LOCKOUT_DURATION', default=900, cast=int)  # 15 minutes
 
+# Ingestion des événements de sécurité (agrégation et écriture par lots)
+SECURITY_EVENT_AGGREGATION_WINDOW = config('SECURITY_EVENT_AGGREGATION_WINDOW', default=60, cast=int)  # secondes
+SECURITY_EVENT_BATCH_SIZE = config('SECURITY_EVENT_BATCH_SIZE', default=500, cast=int)
+SECURITY_EVENT_FLUSH_INTERVAL = config('SECURITY_EVENT_FLUSH_INTERVAL', default=5, cast=float)  # secondes
+SECURITY_EVENT_MAX_RETRIES = config('SECURITY_EVENT_MAX_RETRIES', default=3, cast=int)  # écritures d'un lot en échec
+SECURITY_FAILURE_WINDOW = config('SECURITY_FAILURE_WINDOW', default=900, cast=int)  # secondes
+# Compteurs d'échecs et état de blocage : 'cache' (cache partagé requis), 'database' ou 'auto' (base si cache local au processus)
+SECURITY_FAILURE_COUNTER_STORE = config('SECURITY_FAILURE_COUNTER_STORE', default='auto')
+SECURITY_SLIDING_WINDOW_BUCKETS = config('SECURITY_SLIDING_WINDOW_BUCKETS', default=15, cast=int)
+SECURITY_STATUS_MARK_TTL = config('SECURITY_STATUS_MARK_TTL', default=3600, cast=int)  # secondes (IP bloquée, compte verrouillé)
+SECURITY_RULE_ENGINE_VERSION_CHECK_INTERVAL = config('SECURITY_RULE_ENGINE_VERSION_CHECK_INTERVAL', default=5, cast=int)  # secondes
+SECURITY_REQUEST_INSPECTION_ENABLED = config('SECURITY_REQUEST_INSPECTION_ENABLED', default=False, cast=bool)
+SECURITY_INSPECTION_MAX_BODY_BYTES = config('SECURITY_INSPECTION_MAX_BODY_BYTES', default=65536, cast=int)  # préfixe du corps inspecté
+
+# Écritures différées (dernière activité, compteurs d'usage)
+WRITE_COALESCER_FLUSH_INTERVAL = config('WRITE_COALESCER_FLUSH_INTERVAL', default=5, cast=float)  # secondes, 0 = écriture immédiate
+WRITE_COALESCER_MAX_PENDING = config('WRITE_COALESCER_MAX_PENDING', default=1000, cast=int)  # lignes en attente
+
+# Dashboards (évaluation des widgets)
+DASHBOARD_ENGINE_MAX_WORKERS = config('DASHBOARD_ENGINE_MAX_WORKERS', default=4, cast=int)
+DASHBOARD_ENGINE_STALE_TTL = config('DASHBOARD_ENGINE_STALE_TTL', default=300, cast=int)  # 5 minutes
+DASHBOARD_ENGINE_LOCK_TIMEOUT = config('DASHBOARD_ENGINE_LOCK_TIMEOUT', default=30, cast=int)
+DASHBOARD_ENGINE_WAIT_TIMEOUT = config('DASHBOARD_ENGINE_WAIT_TIMEOUT', default=5, cast=int)
+
+# Moteur d'alertes du monitoring
+ALERT_ENGINE_VERSION_CHECK_INTERVAL = config('ALERT_ENGINE_VERSION_CHECK_INTERVAL', default=5, cast=int)  # secondes
+ALERT_ENGINE_MAX_WINDOW_SAMPLES = config('ALERT_ENGINE_MAX_WINDOW_SAMPLES', default=10000, cast=int)
+
+# Chaînes répétées des logs (User-Agent, chemin, app, module) stockées une fois
+LOG_DIMENSION_CACHE_SIZE = config('LOG_DIMENSION_CACHE_SIZE', default=10000, cast=int)  # valeurs conservées en mémoire (LRU)
+
+# Archive froide des logs (commande archive_logs)
+LOG_ARCHIVE_ROOT = config('LOG_ARCHIVE_ROOT', default=str(BASE_DIR / 'archive'))
+LOG_ARCHIVE_AFTER_DAYS = config('LOG_ARCHIVE_AFTER_DAYS', default=90, cast=int)  # jours conservés en base
+LOG_ARCHIVE_CODEC = config('LOG_ARCHIVE_CODEC', default='zstd')  # zstd (paquet zstandard, sinon gzip) ou gzip
+LOG_ARCHIVE_BLOCK_ROWS = config('LOG_ARCHIVE_BLOCK_ROWS', default=1000, cast=int)  # lignes par bloc compressé
+LOG_ARCHIVE_SEGMENT_ROWS = config('LOG_ARCHIVE_SEGMENT_ROWS', default=50000, cast=int)  # lignes par segment
+LOG_ARCHIVE_EXPORT_MAX_ROWS = config('LOG_ARCHIVE_EXPORT_MAX_ROWS', default=100000, cast=int)  # lignes archivées par export (0 : sans limite)
+
+# Planificateur des alertes système (Admin API)
+ADMIN_ALERT_SCHEDULER_RELOAD_INTERVAL = config('ADMIN_ALERT_SCHEDULER_RELOAD_INTERVAL', default=60, cast=int)  # secondes
+
+# Livraison HTTP des alertes (webhook, Slack, Teams, Discord)
+ADMIN_WEBHOOK_MAX_WORKERS = config('ADMIN_WEBHOOK_MAX_WORKERS', default=8, cast=int)  # 0 = envoi synchrone
+ADMIN_WEBHOOK_TIMEOUT = config('ADMIN_WEBHOOK_TIMEOUT', default=10, cast=float)  # secondes
+ADMIN_WEBHOOK_MAX_RETRIES = config('ADMIN_WEBHOOK_MAX_RETRIES', default=3, cast=int)
+ADMIN_WEBHOOK_BACKOFF_BASE = config('ADMIN_WEBHOOK_BACKOFF_BASE', default=0.5, cast=float)  # secondes
+ADMIN_WEBHOOK_BACKOFF_MAX = config('ADMIN_WEBHOOK_BACKOFF_MAX', default=30, cast=float)  # secondes
+ADMIN_WEBHOOK_HOST_CONCURRENCY = config('ADMIN_WEBHOOK_HOST_CONCURRENCY', default=4, cast=int)  # requêtes simultanées par hôte
+ADMIN_WEBHOOK_HOST_RATE = config('ADMIN_WEBHOOK_HOST_RATE', default=5, cast=float)  # requêtes par seconde par hôte
+ADMIN_WEBHOOK_CIRCUIT_FAILURE_THRESHOLD = config('ADMIN_WEBHOOK_CIRCUIT_FAILURE_THRESHOLD', default=5, cast=int)
+ADMIN_WEBHOOK_CIRCUIT_RESET_TIMEOUT = config('ADMIN_WEBHOOK_CIRCUIT_RESET_TIMEOUT', default=60, cast=int)  # secondes
+
+# Diffusion en direct (SSE / WebSocket, nécessite un serveur ASGI)
+LIVE_LOG_TAIL_INTERVAL = config('LIVE_LOG_TAIL_INTERVAL', default=2, cast=int)  # secondes
+LIVE_LOG_TAIL_BATCH_SIZE = config('LIVE_LOG_TAIL_BATCH_SIZE', default=200, cast=int)
+LIVE_KEEPALIVE_INTERVAL = config('LIVE_KEEPALIVE_INTERVAL', default=15, cast=int)  # secondes
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000,http://127.0.0.1:3000').split(',')
 
@@ -284,6 +402,7 @@ SPECTACULAR_SETTINGS = {
     ],
     'AUTHENTICATION_WHITELIST': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.JWTAuthentication',
     ],
     'PERMISSION_WHITELIST': [
         'rest_framework.permissions.IsAuthenticated',
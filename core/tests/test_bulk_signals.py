@@ -0,0 +1,60 @@
+"""
+Tests pour la diffusion groupée des signaux
+"""
+from django.db import transaction
+from django.dispatch import Signal
+from django.test import TestCase
+
+from apps.security.models import SecurityRule
+from core.utils.bulk_signals import batched_receiver, bulk_operation, in_bulk_operation, send_bulk_created
+
+
+class BulkSignalsTest(TestCase):
+    """Tests pour batched_receiver et bulk_operation"""
+
+    def setUp(self):
+        self.signal = Signal()
+        self.calls = []
+
+        @batched_receiver(self.signal, sender=SecurityRule, created_only=True)
+        def handler(sender, events):
+            self.calls.append([event.instance for event in events])
+
+    def send(self, instance, created=True):
+        self.signal.send(sender=SecurityRule, instance=instance, created=created)
+
+    def test_events_are_batched_in_bulk_operation(self):
+        """Le receiver est appelé une fois avec tous les événements du bloc"""
+        with bulk_operation():
+            self.assertTrue(in_bulk_operation())
+            with bulk_operation():
+                self.send('a')
+            self.send('b')
+            self.send('c', created=False)
+            self.assertEqual(self.calls, [])
+        self.assertFalse(in_bulk_operation())
+        self.assertEqual(self.calls, [['a', 'b']])
+
+    def test_events_are_discarded_on_error(self):
+        """Une exception dans le bloc abandonne les événements collectés"""
+        with self.assertRaises(ValueError):
+            with bulk_operation():
+                self.send('a')
+                raise ValueError
+        self.assertEqual(self.calls, [])
+        self.assertFalse(in_bulk_operation())
+
+    def test_outside_bulk_operation_runs_on_commit(self):
+        """Hors bloc, le receiver attend la validation de la transaction"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                self.send('a')
+            self.assertEqual(self.calls, [])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.calls, [['a']])
+
+    def test_send_bulk_created(self):
+        """send_bulk_created diffuse la création d'une liste d'instances"""
+        with bulk_operation():
+            send_bulk_created(SecurityRule, ['a', 'b'], signal=self.signal)
+        self.assertEqual(self.calls, [['a', 'b']])
@@ -0,0 +1,90 @@
+"""
+Tests pour l'archive froide en segments compressés
+"""
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.utils import segment_archive
+from core.utils.segment_archive import INDEX_SUFFIX, SegmentStore
+
+START = datetime(2024, 3, 1, tzinfo=dt_timezone.utc)
+
+
+def make_records(count, start=START, step=timedelta(minutes=30)):
+    return [
+        {
+            'id': i,
+            'created_at': start + step * i,
+            'level': 'ERROR' if i % 10 == 0 else 'INFO',
+            'user_id': i % 3 or None,
+            'message': f'message {i}',
+        }
+        for i in range(count)
+    ]
+
+
+class SegmentStoreTest(SimpleTestCase):
+    """Tests pour SegmentStore"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.store = SegmentStore(self.root, codec='gzip', block_rows=10, segment_rows=1000)
+
+    def write(self, records):
+        return self.store.write('logs', records, level_key='level', user_key='user_id')
+
+    def test_records_are_partitioned_by_day(self):
+        """Un segment par jour, relu à l'identique"""
+        written = self.write(make_records(96))  # 48 heures
+        self.assertEqual(len(written), 2)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root, 'logs'))), ['2024-03-01', '2024-03-02'])
+
+        records = list(self.store.scan('logs'))
+        self.assertEqual([record['id'] for record in records], list(range(96)))
+        self.assertEqual(records[5]['created_at'], (START + timedelta(minutes=150)).isoformat())
+
+    def test_scan_filters_time_level_and_user(self):
+        """Les critères portent sur le temps, le niveau, l'utilisateur et le filtre libre"""
+        self.write(make_records(96))
+        start = START + timedelta(hours=10)
+        end = START + timedelta(hours=20)
+
+        records = list(self.store.scan('logs', start=start, end=end))
+        self.assertEqual([record['id'] for record in records], list(range(20, 41)))
+
+        errors = list(self.store.scan('logs', levels=['ERROR'], level_key='level'))
+        self.assertEqual([record['id'] for record in errors], list(range(0, 96, 10)))
+
+        user_records = list(self.store.scan('logs', user_ids=[2], user_key='user_id',
+                                            match=lambda record: record['id'] < 20))
+        self.assertEqual([record['id'] for record in user_records], [2, 5, 8, 11, 14, 17])
+
+    def test_only_matching_blocks_are_decompressed(self):
+        """L'index clairsemé évite de décompresser les blocs hors de l'intervalle"""
+        self.write(make_records(96))
+        with mock.patch.object(segment_archive, '_decompress', wraps=segment_archive._decompress) as decompress:
+            records = list(self.store.scan('logs', start=START + timedelta(hours=1), end=START + timedelta(hours=2)))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(decompress.call_count, 1)
+
+    def test_newest_stops_at_older_segments(self):
+        """`newest` retourne les plus récents sans lire les segments plus anciens"""
+        self.write(make_records(96))
+        with mock.patch.object(segment_archive, '_decompress', wraps=segment_archive._decompress) as decompress:
+            records = self.store.newest('logs', 5)
+        self.assertEqual([record['id'] for record in records], [95, 94, 93, 92, 91])
+        # Seuls les blocs du segment le plus récent sont lus
+        self.assertEqual(decompress.call_count, 5)
+
+    def test_segment_without_index_is_ignored(self):
+        """Un segment dont l'index n'a pas été écrit n'est pas lu"""
+        index_path = self.write(make_records(10))[0]
+        os.remove(index_path)
+        self.assertEqual(list(self.store.scan('logs')), [])
+        self.assertTrue(index_path.endswith(INDEX_SUFFIX))
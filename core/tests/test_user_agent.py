@@ -0,0 +1,62 @@
+"""
+Tests pour l'analyse des User-Agent
+"""
+from django.test import SimpleTestCase
+
+from core.utils.user_agent import UserAgentParser
+
+CHROME_WINDOWS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+EDGE_WINDOWS = CHROME_WINDOWS + ' Edg/120.0.2210.91'
+SAFARI_IPHONE = (
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 '
+    '(KHTML, like Gecko) Version/17.1 Mobile/15E148 Safari/604.1'
+)
+CHROME_ANDROID_TABLET = (
+    'Mozilla/5.0 (Linux; Android 13; SM-X700) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+GOOGLEBOT = 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)'
+
+
+class UserAgentParserTest(SimpleTestCase):
+    """Tests pour UserAgentParser"""
+
+    def setUp(self):
+        self.parser = UserAgentParser(cache_size=2)
+
+    def test_ordered_patterns(self):
+        """Les motifs spécifiques l'emportent sur les motifs généraux"""
+        parsed = self.parser.parse(EDGE_WINDOWS)
+        self.assertEqual((parsed.browser, parsed.os, parsed.device_type), ('Edge', 'Windows', 'Desktop'))
+
+        parsed = self.parser.parse(SAFARI_IPHONE)
+        self.assertEqual((parsed.browser, parsed.os, parsed.device_type), ('Safari', 'iOS', 'Mobile'))
+
+        parsed = self.parser.parse(CHROME_ANDROID_TABLET)
+        self.assertEqual((parsed.browser, parsed.os, parsed.device_type), ('Chrome', 'Android', 'Tablet'))
+
+    def test_bot_and_empty_user_agent(self):
+        """Les robots et les User-Agent vides sont reconnus"""
+        parsed = self.parser.parse(GOOGLEBOT)
+        self.assertTrue(parsed.is_bot)
+        self.assertEqual(parsed.device_type, 'Bot')
+
+        parsed = self.parser.parse('')
+        self.assertFalse(parsed.is_bot)
+        self.assertEqual((parsed.browser, parsed.os), ('Unknown', 'Unknown'))
+        self.assertEqual(parsed.device_name, 'Desktop')
+
+    def test_results_are_cached_in_bounded_lru(self):
+        """Le même résultat est retourné et le cache reste borné"""
+        first = self.parser.parse(CHROME_WINDOWS)
+        self.assertIs(self.parser.parse(CHROME_WINDOWS), first)
+        self.assertEqual(first.as_dict()['browser'], 'Chrome')
+
+        self.parser.parse(SAFARI_IPHONE)
+        self.parser.parse(CHROME_WINDOWS)  # Devient le plus récent
+        self.parser.parse(GOOGLEBOT)
+        self.assertEqual(list(self.parser._cache), [CHROME_WINDOWS, GOOGLEBOT])
+        self.assertEqual(first.fingerprint, self.parser.parse(CHROME_WINDOWS).fingerprint)
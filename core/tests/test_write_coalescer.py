@@ -0,0 +1,77 @@
+"""
+Tests pour le tampon d'écritures différées
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.security.models import SecurityRule
+from core.utils.write_coalescer import WriteCoalescer
+
+User = get_user_model()
+
+
+class WriteCoalescerTest(TestCase):
+    """Tests pour WriteCoalescer"""
+
+    def setUp(self):
+        self.coalescer = WriteCoalescer(flush_interval=3600, max_pending=1000)
+        self.rules = SecurityRule.objects.bulk_create([
+            SecurityRule(name=f'Règle {i}', description='', rule_type=SecurityRule.RATE_LIMIT)
+            for i in range(3)
+        ])
+        self.user = User.objects.bulk_create([User(email='coalescer@example.com')])[0]
+
+    def test_counters_are_summed_and_written_in_one_update(self):
+        """Les incréments sont cumulés puis écrits en une requête par modèle"""
+        for _ in range(5):
+            self.coalescer.increment(self.rules[0], 'times_triggered')
+        self.coalescer.increment(self.rules[1], 'times_triggered', 2)
+        self.assertEqual(self.coalescer.pending_delta(self.rules[0], 'times_triggered'), 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = self.coalescer.flush()
+        self.assertEqual(updated, 2)
+        self.assertEqual(
+            len([q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]), 1
+        )
+
+        counts = dict(SecurityRule.objects.values_list('pk', 'times_triggered'))
+        self.assertEqual(counts[self.rules[0].pk], 5)
+        self.assertEqual(counts[self.rules[1].pk], 2)
+        self.assertEqual(counts[self.rules[2].pk], 0)
+        self.assertEqual(self.coalescer.pending_delta(self.rules[0], 'times_triggered'), 0)
+
+    def test_latest_timestamp_wins(self):
+        """Seule la valeur la plus récente d'un horodatage est écrite"""
+        now = timezone.now()
+        self.coalescer.touch(self.user, 'last_activity', now)
+        self.coalescer.touch(self.user, 'last_activity', now - timedelta(minutes=5))
+        self.coalescer.flush()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_activity, now)
+
+    def test_failed_flush_is_requeued(self):
+        """Une écriture en échec est retentée au vidage suivant"""
+        self.coalescer.increment(self.rules[0], 'times_triggered', 3)
+        with mock.patch.object(WriteCoalescer, '_write', side_effect=RuntimeError('db down')):
+            self.assertEqual(self.coalescer.flush(), 0)
+        self.coalescer.increment(self.rules[0], 'times_triggered')
+        self.coalescer.flush()
+
+        self.rules[0].refresh_from_db()
+        self.assertEqual(self.rules[0].times_triggered, 4)
+
+    def test_zero_interval_writes_through(self):
+        """Avec un intervalle nul, chaque enregistrement est écrit immédiatement"""
+        coalescer = WriteCoalescer(flush_interval=0)
+        coalescer.increment(self.rules[2], 'times_triggered')
+
+        self.rules[2].refresh_from_db()
+        self.assertEqual(self.rules[2].times_triggered, 1)
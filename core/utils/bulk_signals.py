@@ -0,0 +1,136 @@
+"""
+Diffusion groupée des effets de bord des signaux de modèles
+
+Un receiver déclaré avec `@batched_receiver` reçoit une liste d'événements
+(`ModelEvent`) au lieu d'une instance : il peut créer ses lignes dérivées par
+`bulk_create`, en un nombre de requêtes indépendant du nombre de lignes.
+
+- Dans un bloc `bulk_operation()`, les événements sont collectés puis chaque
+  receiver est appelé une fois, avec toute la liste, à la sortie du bloc le
+  plus externe (dans la transaction englobante éventuelle). Si le bloc lève
+  une exception, les événements sont abandonnés.
+- Hors de ce bloc, chaque événement est traité après la validation de la
+  transaction courante (`transaction.on_commit`), immédiatement en autocommit.
+  Une erreur dans un receiver est journalisée sans interrompre l'appelant.
+
+`bulk_create` n'émet pas `post_save` : `send_bulk_created` diffuse
+explicitement la création d'une liste d'instances aux receivers groupés.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from django.db import transaction
+from django.db.models.signals import post_save
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+class ModelEvent(NamedTuple):
+    """Événement transmis aux receivers groupés"""
+    instance: Any
+    created: bool = False
+    update_fields: Optional[frozenset] = None
+
+
+class BatchedReceiver:
+    """
+    Receiver Django qui transmet ses événements par lots à `func(sender, events)`
+    """
+
+    def __init__(self, func: Callable, signal, sender, created_only: bool = False):
+        self.func = func
+        self.signal = signal
+        self.sender = sender
+        self.created_only = created_only
+
+    def __call__(self, sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+        if raw or (self.created_only and not created):
+            return
+        _dispatch(self, [ModelEvent(instance, created, update_fields)])
+
+    def run(self, events: List[ModelEvent]):
+        self.func(self.sender, events)
+
+    def __repr__(self):
+        return f"BatchedReceiver({self.func.__module__}.{self.func.__qualname__})"
+
+
+# (signal, sender) -> receivers groupés, pour `send_bulk_created`
+_receivers: Dict[tuple, List[BatchedReceiver]] = {}
+
+
+def batched_receiver(signal, sender, created_only: bool = False, dispatch_uid: str = None):
+    """
+    Décorateur : connecte `func(sender, events)` à `signal` pour `sender`
+
+    Args:
+        created_only: Ignorer les événements `post_save` de mise à jour
+        dispatch_uid: Identifiant de connexion (par défaut, chemin de la fonction)
+    """
+    def decorator(func):
+        receiver = BatchedReceiver(func, signal, sender, created_only)
+        uid = dispatch_uid or f"{func.__module__}.{func.__qualname__}"
+        signal.connect(receiver, sender=sender, weak=False, dispatch_uid=uid)
+        _receivers.setdefault((signal, sender), []).append(receiver)
+        return func
+    return decorator
+
+
+@contextmanager
+def bulk_operation():
+    """
+    Collecte les événements des receivers groupés jusqu'à la sortie du bloc
+
+    Les blocs imbriqués sont fusionnés dans le bloc le plus externe.
+    """
+    depth = getattr(_state, 'depth', 0)
+    if depth == 0:
+        _state.buffer = {}
+    _state.depth = depth + 1
+    try:
+        yield
+    except BaseException:
+        if depth == 0:
+            _state.buffer = None
+        raise
+    finally:
+        _state.depth = depth
+
+    if depth == 0:
+        buffer, _state.buffer = _state.buffer, None
+        for receiver, events in buffer.items():
+            receiver.run(events)
+
+
+def in_bulk_operation() -> bool:
+    """Indique si un bloc `bulk_operation()` est actif dans ce thread"""
+    return getattr(_state, 'buffer', None) is not None
+
+
+def send_bulk_created(model, instances: Iterable, signal=post_save):
+    """Diffuse la création d'instances (ex. `bulk_create`) aux receivers groupés"""
+    events = [ModelEvent(instance, True) for instance in instances]
+    if not events:
+        return
+    for receiver in _receivers.get((signal, model), ()):
+        _dispatch(receiver, events)
+
+
+def _dispatch(receiver: BatchedReceiver, events: List[ModelEvent]):
+    buffer = getattr(_state, 'buffer', None)
+    if buffer is not None:
+        buffer.setdefault(receiver, []).extend(events)
+    else:
+        transaction.on_commit(partial(_run_safely, receiver, events))
+
+
+def _run_safely(receiver: BatchedReceiver, events: List[ModelEvent]):
+    try:
+        receiver.run(events)
+    except Exception as e:
+        logger.error(f"Erreur dans le receiver groupé {receiver!r}: {e}", exc_info=True)
@@ -119,6 +119,27 @@ def format_duration(seconds: Union[int, float]) -> str:
         return f"{days}j {hours}h"
 
 
+# Backends de cache propres au processus : un état qui y est écrit n'est pas partagé
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache(alias: str = 'default') -> bool:
+    """
+    Indique si un cache est partagé entre processus (Redis, Memcached, base...)
+    
+    Args:
+        alias: Alias du cache dans `CACHES`
+    
+    Returns:
+        True si le backend n'est pas propre au processus
+    """
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    return backend not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
 def get_client_ip(request) -> str:
     """
     Récupère l'adresse IP du client
@@ -0,0 +1,30 @@
+"""
+Limiteur de débit en mémoire (requêtes par seconde), partagé entre threads
+
+Utilisé par les clients HTTP sortants (push FCM, webhooks d'alerte) pour
+espacer les appels vers un même fournisseur ou une même destination.
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Limiteur de débit simple (requêtes par seconde, partagé entre threads)
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Attend le prochain créneau disponible"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
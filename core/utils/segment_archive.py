@@ -0,0 +1,331 @@
+"""
+Archive froide en segments compressés, avec index clairsemé
+
+Les enregistrements (dicts sérialisables en JSON) sont écrits dans des
+segments immuables, partitionnés par jour :
+
+    <racine>/<table>/<AAAA-MM-JJ>/<début>-<id>.seg        données
+    <racine>/<table>/<AAAA-MM-JJ>/<début>-<id>.idx.json   index
+
+Un segment est une suite de blocs JSONL compressés indépendamment (zstd si
+le paquet `zstandard` est installé, sinon gzip). L'index décrit le segment
+et chacun de ses blocs : position, nombre de lignes, plage de temps, niveaux
+et identifiants utilisateur présents (omis au-delà de `MAX_INDEXED_USERS`
+valeurs). Une recherche ne lit que les index des jours concernés, puis ne
+décompresse, depuis le fichier projeté en mémoire, que les blocs qui peuvent
+contenir un résultat.
+
+L'index est écrit après les données : un segment sans index n'existe pas
+pour la lecture.
+"""
+import gzip
+import heapq
+import json
+import mmap
+import os
+import threading
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    zstandard = None
+
+INDEX_VERSION = 1
+DATA_SUFFIX = '.seg'
+INDEX_SUFFIX = '.idx.json'
+CODECS = ('zstd', 'gzip')
+
+# Au-delà, l'index ne liste pas les utilisateurs (le bloc est toujours lu)
+MAX_INDEXED_USERS = 256
+
+
+class SegmentArchiveError(Exception):
+    """Segment illisible ou codec indisponible"""
+
+
+class ArchiveJSONEncoder(DjangoJSONEncoder):
+    """`DjangoJSONEncoder` sans troncature des microsecondes"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value.timestamp()
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise SegmentArchiveError("Le codec zstd nécessite le paquet 'zstandard'")
+        return zstandard.ZstdCompressor(level=9).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise SegmentArchiveError("Le codec zstd nécessite le paquet 'zstandard'")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _summary(times: List[float], levels: set, users: set) -> dict:
+    return {
+        'min_time': min(times),
+        'max_time': max(times),
+        'levels': sorted(levels),
+        'user_ids': sorted(users, key=str) if len(users) <= MAX_INDEXED_USERS else None,
+    }
+
+
+def _may_match(summary: dict, start: Optional[float], end: Optional[float],
+               levels: Optional[set], user_ids: Optional[set]) -> bool:
+    """Indique, d'après l'index, si un segment ou un bloc peut contenir un résultat"""
+    if start is not None and summary['max_time'] < start:
+        return False
+    if end is not None and summary['min_time'] > end:
+        return False
+    if levels is not None and not levels.intersection(summary['levels']):
+        return False
+    if user_ids is not None and summary['user_ids'] is not None:
+        if not user_ids.intersection(summary['user_ids']):
+            return False
+    return True
+
+
+class SegmentStore:
+    """
+    Écriture et lecture des segments d'archive d'une racine
+    """
+
+    def __init__(self, root: str, codec: str = 'zstd', block_rows: int = 1000, segment_rows: int = 100000):
+        self.root = str(root)
+        # zstd indisponible : repli sur gzip (les segments indiquent leur codec)
+        if codec == 'zstd' and zstandard is None:
+            codec = 'gzip'
+        if codec not in CODECS:
+            raise SegmentArchiveError(f"Codec d'archive inconnu: {codec}")
+        self.codec = codec
+        self.block_rows = max(1, block_rows)
+        self.segment_rows = max(self.block_rows, segment_rows)
+        # Index déjà lus (les segments sont immuables)
+        self._indexes: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    # Écriture
+
+    def write(self, table: str, records: Iterable[dict], time_key: str = 'created_at',
+              level_key: str = None, user_key: str = None) -> List[str]:
+        """
+        Écrit des enregistrements dans de nouveaux segments (un ou plusieurs par jour)
+
+        Args:
+            records: Dicts sérialisables par `ArchiveJSONEncoder`; `time_key` est
+                un datetime ou une chaîne ISO 8601
+            level_key: Champ indexé comme niveau (ex. 'level', 'severity')
+            user_key: Champ indexé comme identifiant utilisateur
+
+        Returns:
+            list: Chemins des index des segments écrits
+        """
+        by_day: Dict[str, list] = {}
+        for record in records:
+            timestamp = _timestamp(record[time_key])
+            day = datetime.fromtimestamp(timestamp, dt_timezone.utc).strftime('%Y-%m-%d')
+            by_day.setdefault(day, []).append((timestamp, record))
+
+        written = []
+        for day, rows in sorted(by_day.items()):
+            rows.sort(key=lambda row: row[0])
+            for start in range(0, len(rows), self.segment_rows):
+                written.append(self._write_segment(
+                    table, day, rows[start:start + self.segment_rows], level_key, user_key
+                ))
+        return written
+
+    def _write_segment(self, table: str, day: str, rows: list, level_key, user_key) -> str:
+        directory = os.path.join(self.root, table, day)
+        os.makedirs(directory, exist_ok=True)
+        name = f"{int(rows[0][0] * 1000)}-{uuid.uuid4().hex[:12]}"
+        data_path = os.path.join(directory, name + DATA_SUFFIX)
+        index_path = os.path.join(directory, name + INDEX_SUFFIX)
+
+        blocks = []
+        offset = 0
+        with open(data_path + '.tmp', 'wb') as data_file:
+            for start in range(0, len(rows), self.block_rows):
+                block = rows[start:start + self.block_rows]
+                payload = _compress(''.join(
+                    json.dumps(record, cls=ArchiveJSONEncoder, separators=(',', ':')) + '\n'
+                    for _, record in block
+                ).encode(), self.codec)
+                data_file.write(payload)
+                blocks.append({
+                    'offset': offset,
+                    'length': len(payload),
+                    'count': len(block),
+                    **self._summarize(block, level_key, user_key),
+                })
+                offset += len(payload)
+            data_file.flush()
+            os.fsync(data_file.fileno())
+        os.replace(data_path + '.tmp', data_path)
+
+        index = {
+            'version': INDEX_VERSION,
+            'table': table,
+            'codec': self.codec,
+            'data': name + DATA_SUFFIX,
+            'count': len(rows),
+            **self._summarize(rows, level_key, user_key),
+            'blocks': blocks,
+        }
+        with open(index_path + '.tmp', 'w') as index_file:
+            json.dump(index, index_file, separators=(',', ':'))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(index_path + '.tmp', index_path)
+        return index_path
+
+    @staticmethod
+    def _summarize(rows: list, level_key, user_key) -> dict:
+        levels = {record.get(level_key) for _, record in rows} - {None} if level_key else set()
+        users = {record.get(user_key) for _, record in rows} - {None} if user_key else set()
+        return _summary([timestamp for timestamp, _ in rows], levels, users)
+
+    # Lecture
+
+    def segments(self, table: str, start: datetime = None, end: datetime = None) -> List[dict]:
+        """Index des segments d'une table dont les jours recoupent l'intervalle"""
+        table_dir = os.path.join(self.root, table)
+        try:
+            days = sorted(entry.name for entry in os.scandir(table_dir) if entry.is_dir())
+        except FileNotFoundError:
+            return []
+
+        first_day = start.astimezone(dt_timezone.utc).strftime('%Y-%m-%d') if start else None
+        last_day = end.astimezone(dt_timezone.utc).strftime('%Y-%m-%d') if end else None
+        indexes = []
+        for day in days:
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            directory = os.path.join(table_dir, day)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(INDEX_SUFFIX):
+                    index = self._load_index(os.path.join(directory, name))
+                    index['path'] = os.path.join(directory, index['data'])
+                    indexes.append(index)
+        return indexes
+
+    def scan(self, table: str, start: datetime = None, end: datetime = None,
+             levels: Iterable = None, user_ids: Iterable = None, time_key: str = 'created_at',
+             level_key: str = None, user_key: str = None,
+             match: Callable[[dict], bool] = None) -> Iterator[dict]:
+        """
+        Enregistrements archivés correspondant aux critères
+
+        Les critères `levels` et `user_ids` s'appliquent à `level_key` et
+        `user_key`; `match` filtre les enregistrements restants.
+        """
+        for _, record in self._scan(table, start, end, levels, user_ids, time_key,
+                                    level_key, user_key, match):
+            yield record
+
+    def newest(self, table: str, limit: int, **criteria) -> List[dict]:
+        """
+        Les `limit` enregistrements les plus récents correspondant aux critères
+        (mêmes critères que `scan`), du plus récent au plus ancien
+
+        Les segments sont lus du plus récent au plus ancien; la lecture s'arrête
+        dès qu'aucun segment restant ne peut contenir un résultat plus récent.
+        """
+        if limit <= 0:
+            return []
+        start, end = criteria.pop('start', None), criteria.pop('end', None)
+        segments = sorted(self._matching(table, start, end, criteria.get('levels'), criteria.get('user_ids')),
+                          key=lambda index: index['max_time'], reverse=True)
+        heap = []
+        counter = 0
+        for index in segments:
+            if len(heap) >= limit and index['max_time'] < heap[0][0]:
+                break
+            for timestamp, record in self._scan(table, start, end, segments=[index], **criteria):
+                counter += 1
+                item = (timestamp, counter, record)
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                elif timestamp > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+        return [record for _, _, record in sorted(heap, reverse=True)]
+
+    def _matching(self, table, start, end, levels, user_ids) -> List[dict]:
+        levels = set(levels) if levels is not None else None
+        user_ids = set(user_ids) if user_ids is not None else None
+        start_ts = _timestamp(start) if start else None
+        end_ts = _timestamp(end) if end else None
+        return [
+            index for index in self.segments(table, start, end)
+            if _may_match(index, start_ts, end_ts, levels, user_ids)
+        ]
+
+    def _scan(self, table, start=None, end=None, levels=None, user_ids=None, time_key='created_at',
+              level_key=None, user_key=None, match=None, segments=None):
+        levels = set(levels) if levels is not None else None
+        user_ids = set(user_ids) if user_ids is not None else None
+        start_ts = _timestamp(start) if start else None
+        end_ts = _timestamp(end) if end else None
+        if segments is None:
+            segments = self._matching(table, start, end, levels, user_ids)
+
+        for index in segments:
+            blocks = [
+                block for block in index['blocks']
+                if _may_match(block, start_ts, end_ts, levels, user_ids)
+            ]
+            if not blocks:
+                continue
+            with open(index['path'], 'rb') as data_file, \
+                    mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for block in blocks:
+                    payload = _decompress(data[block['offset']:block['offset'] + block['length']], index['codec'])
+                    for line in payload.splitlines():
+                        record = json.loads(line)
+                        timestamp = _timestamp(record[time_key])
+                        if start_ts is not None and timestamp < start_ts:
+                            continue
+                        if end_ts is not None and timestamp > end_ts:
+                            continue
+                        if levels is not None and record.get(level_key) not in levels:
+                            continue
+                        if user_ids is not None and record.get(user_key) not in user_ids:
+                            continue
+                        if match is not None and not match(record):
+                            continue
+                        yield timestamp, record
+
+    def _load_index(self, path: str) -> dict:
+        with self._lock:
+            index = self._indexes.get(path)
+        if index is None:
+            try:
+                with open(path) as index_file:
+                    index = json.load(index_file)
+            except (OSError, ValueError) as e:
+                raise SegmentArchiveError(f"Index d'archive illisible {path}: {e}")
+            if index.get('version') != INDEX_VERSION:
+                raise SegmentArchiveError(f"Version d'index non prise en charge: {path}")
+            with self._lock:
+                self._indexes[path] = index
+        return dict(index)
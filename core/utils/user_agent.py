@@ -0,0 +1,158 @@
+"""
+Analyse des User-Agent (navigateur, OS, type d'appareil, robot)
+
+Les mêmes quelques centaines de User-Agent reviennent à chaque requête : le
+résultat de l'analyse est conservé dans un cache LRU borné
+(`USER_AGENT_CACHE_SIZE` entrées) indexé par la chaîne brute. Les motifs sont
+compilés une fois et testés dans l'ordre, du plus spécifique au plus général
+(un User-Agent Edge contient « Chrome », un User-Agent Android contient
+« Linux », un User-Agent iOS contient « Mac OS X »).
+
+Le résultat (`ParsedUserAgent`) est immuable et partagé entre les appelants.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+
+UNKNOWN = 'Unknown'
+
+# (valeur, motif) testés dans l'ordre : le premier motif trouvé l'emporte
+BROWSER_PATTERNS = (
+    ('Edge', r'Edge?/|EdgA/|EdgiOS/'),
+    ('Opera', r'OPR/|Opera'),
+    ('Chrome', r'Chrome/|CriOS/|Chromium/'),
+    ('Firefox', r'Firefox/|FxiOS/'),
+    ('Safari', r'Safari/'),
+)
+OS_PATTERNS = (
+    ('Windows', r'Windows'),
+    ('Android', r'Android'),
+    ('iOS', r'iPhone|iPad|iPod|\biOS\b'),
+    ('macOS', r'Mac OS X|Macintosh'),
+    ('Linux', r'Linux|X11'),
+)
+DEVICE_PATTERNS = (
+    ('Tablet', r'iPad|Tablet|Android(?!.*Mobile)'),
+    ('Mobile', r'Mobile|iPhone|iPod|Android'),
+)
+BOT_PATTERN = r'bot\b|crawl|spider|slurp|curl/|wget/|python-requests|httpclient|headless'
+
+
+def _compile(patterns):
+    return tuple((value, re.compile(pattern)) for value, pattern in patterns)
+
+
+_BROWSERS = _compile(BROWSER_PATTERNS)
+_OPERATING_SYSTEMS = _compile(OS_PATTERNS)
+_DEVICES = _compile(DEVICE_PATTERNS)
+_BOT = re.compile(BOT_PATTERN, re.IGNORECASE)
+
+
+def _first_match(compiled, user_agent: str, default: str) -> str:
+    for value, pattern in compiled:
+        if pattern.search(user_agent):
+            return value
+    return default
+
+
+class ParsedUserAgent(NamedTuple):
+    """Résultat immuable de l'analyse d'un User-Agent"""
+    browser: str
+    os: str
+    device_type: str
+    is_bot: bool
+    fingerprint: str
+
+    @property
+    def device_name(self) -> str:
+        """Nom lisible de l'appareil (ex. « Chrome Windows Desktop »)"""
+        return ' '.join(part for part in (self.browser, self.os, self.device_type) if part != UNKNOWN)
+
+    def as_dict(self) -> dict:
+        """Champs d'analyse au format de `device_info`"""
+        return {
+            'browser': self.browser,
+            'os': self.os,
+            'device_type': self.device_type,
+            'is_bot': self.is_bot,
+        }
+
+
+def fingerprint_user_agent(user_agent: str) -> str:
+    """Empreinte courte et stable d'un User-Agent"""
+    return hashlib.blake2b((user_agent or '').encode(), digest_size=8).hexdigest()
+
+
+class UserAgentParser:
+    """
+    Analyseur de User-Agent avec cache LRU borné
+    """
+
+    def __init__(self, cache_size: int = None):
+        self.cache_size = (
+            cache_size if cache_size is not None
+            else getattr(settings, 'USER_AGENT_CACHE_SIZE', 1024)
+        )
+        self._cache: 'OrderedDict[str, ParsedUserAgent]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, user_agent: str) -> ParsedUserAgent:
+        """Analyse un User-Agent (depuis le cache si déjà vu)"""
+        user_agent = user_agent or ''
+        with self._lock:
+            parsed = self._cache.get(user_agent)
+            if parsed is not None:
+                self._cache.move_to_end(user_agent)
+                return parsed
+
+        parsed = self._parse(user_agent)
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[user_agent] = parsed
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return parsed
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _parse(user_agent: str) -> ParsedUserAgent:
+        is_bot = bool(_BOT.search(user_agent))
+        if is_bot:
+            device_type = 'Bot'
+        else:
+            device_type = _first_match(_DEVICES, user_agent, 'Desktop')
+        return ParsedUserAgent(
+            browser=_first_match(_BROWSERS, user_agent, UNKNOWN),
+            os=_first_match(_OPERATING_SYSTEMS, user_agent, UNKNOWN),
+            device_type=device_type,
+            is_bot=is_bot,
+            fingerprint=fingerprint_user_agent(user_agent),
+        )
+
+
+_parser = None
+_parser_lock = threading.Lock()
+
+
+def get_user_agent_parser() -> UserAgentParser:
+    """Retourne l'analyseur de User-Agent du processus"""
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = UserAgentParser()
+    return _parser
+
+
+def parse_user_agent(user_agent: str) -> ParsedUserAgent:
+    """Raccourci : `get_user_agent_parser().parse(user_agent)`"""
+    return get_user_agent_parser().parse(user_agent)
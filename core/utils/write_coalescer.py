@@ -0,0 +1,184 @@
+"""
+Écritures différées et regroupées des horodatages et compteurs
+
+Les mises à jour fréquentes d'une même ligne (dernière activité, dernière
+utilisation, compteurs d'usage) sont cumulées en mémoire par (modèle, clé
+primaire, champ) : pour un horodatage seule la valeur la plus récente est
+conservée, pour un compteur l'incrément cumulé. Le tampon est écrit par une
+requête `UPDATE ... CASE` par modèle (par lots de clés), les compteurs par
+incrément `F()` : aucune ligne n'est verrouillée à chaque hit.
+
+Le tampon est écrit lorsqu'un enregistrement survient après
+`WRITE_COALESCER_FLUSH_INTERVAL` secondes, lorsqu'il atteint
+`WRITE_COALESCER_MAX_PENDING` lignes, et à l'arrêt du processus. Une écriture
+en échec est remise dans le tampon et retentée au vidage suivant. Avec un
+intervalle <= 0, chaque enregistrement est écrit immédiatement.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+logger = logging.getLogger(__name__)
+
+UPDATE_CHUNK_SIZE = 500
+
+RowKey = Tuple[type, Any]
+
+
+def _newest(current, value):
+    if current is None:
+        return value
+    try:
+        return value if value >= current else current
+    except TypeError:
+        return value
+
+
+class WriteCoalescer:
+    """
+    Tampon d'écritures d'horodatages et de compteurs
+    """
+
+    def __init__(self, flush_interval: float = None, max_pending: int = None):
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else getattr(settings, 'WRITE_COALESCER_FLUSH_INTERVAL', 5)
+        )
+        self.max_pending = max_pending or getattr(settings, 'WRITE_COALESCER_MAX_PENDING', 1000)
+        self._latest: Dict[RowKey, Dict[str, Any]] = {}
+        self._deltas: Dict[RowKey, Dict[str, int]] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    @staticmethod
+    def _key(instance) -> RowKey:
+        return instance._meta.concrete_model, instance.pk
+
+    # Enregistrement
+
+    def touch(self, instance, field: str, value):
+        """Enregistre la valeur la plus récente d'un champ (horodatage)"""
+        key = self._key(instance)
+        with self._lock:
+            fields = self._latest.setdefault(key, {})
+            fields[field] = _newest(fields.get(field), value)
+            should_flush = self._should_flush()
+        if should_flush:
+            self.flush()
+
+    def increment(self, instance, field: str, delta: int = 1):
+        """Cumule un incrément de compteur"""
+        key = self._key(instance)
+        with self._lock:
+            fields = self._deltas.setdefault(key, {})
+            fields[field] = fields.get(field, 0) + delta
+            should_flush = self._should_flush()
+        if should_flush:
+            self.flush()
+
+    def pending_delta(self, instance, field: str) -> int:
+        """Incrément de `field` non encore écrit (processus courant)"""
+        with self._lock:
+            return self._deltas.get(self._key(instance), {}).get(field, 0)
+
+    def _should_flush(self) -> bool:
+        return (
+            self.flush_interval <= 0
+            or len(self._latest) + len(self._deltas) >= self.max_pending
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    # Écriture
+
+    def flush(self) -> int:
+        """
+        Écrit les valeurs en attente
+
+        Returns:
+            int: Nombre de lignes mises à jour
+        """
+        with self._flush_lock:
+            with self._lock:
+                latest, self._latest = self._latest, {}
+                deltas, self._deltas = self._deltas, {}
+                self._last_flush = time.monotonic()
+
+            by_model = defaultdict(dict)
+            for (model, pk), fields in latest.items():
+                by_model[model].setdefault(pk, ({}, {}))[0].update(fields)
+            for (model, pk), fields in deltas.items():
+                by_model[model].setdefault(pk, ({}, {}))[1].update(fields)
+
+            updated = 0
+            for model, rows in by_model.items():
+                try:
+                    with transaction.atomic():
+                        updated += self._write(model, rows)
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'écriture différée de {model.__name__}: {e}")
+                    self._requeue(model, rows)
+        return updated
+
+    def _write(self, model, rows: Dict[Any, tuple]) -> int:
+        updated = 0
+        pks = list(rows)
+        for start in range(0, len(pks), UPDATE_CHUNK_SIZE):
+            chunk = pks[start:start + UPDATE_CHUNK_SIZE]
+            updates = {}
+
+            latest_fields = {field for pk in chunk for field in rows[pk][0]}
+            for field in latest_fields:
+                output_field = model._meta.get_field(field)
+                whens = [
+                    When(pk=pk, then=Value(rows[pk][0][field], output_field=output_field))
+                    for pk in chunk if field in rows[pk][0]
+                ]
+                updates[field] = Case(*whens, default=F(field), output_field=output_field)
+
+            delta_fields = {field for pk in chunk for field in rows[pk][1]}
+            for field in delta_fields:
+                whens = [
+                    When(pk=pk, then=Value(rows[pk][1][field]))
+                    for pk in chunk if field in rows[pk][1]
+                ]
+                updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+
+            updated += model._base_manager.filter(pk__in=chunk).update(**updates)
+        return updated
+
+    def _requeue(self, model, rows: Dict[Any, tuple]):
+        """Remet des valeurs non écrites dans le tampon (au moins une écriture)"""
+        with self._lock:
+            for pk, (latest, deltas) in rows.items():
+                if latest:
+                    fields = self._latest.setdefault((model, pk), {})
+                    for field, value in latest.items():
+                        fields[field] = _newest(fields.get(field), value)
+                if deltas:
+                    fields = self._deltas.setdefault((model, pk), {})
+                    for field, delta in deltas.items():
+                        fields[field] = fields.get(field, 0) + delta
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_write_coalescer() -> WriteCoalescer:
+    """Retourne le tampon d'écritures du processus"""
+    global _coalescer
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                _coalescer = WriteCoalescer()
+                # Les écritures en attente sont faites à l'arrêt du processus
+                atexit.register(_coalescer.flush)
+    return _coalescer